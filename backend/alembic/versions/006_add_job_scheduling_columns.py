@@ -0,0 +1,51 @@
+"""Add fair-share scheduling columns (user tier, job cost, dataset shape)
+
+Revision ID: 006_add_job_scheduling_columns
+Revises: 005_add_dataset_version_column
+Create Date: 2025-11-20 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "006_add_job_scheduling_columns"
+down_revision: Union[str, Sequence[str], None] = "005_add_dataset_version_column"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user",
+        sa.Column("tier", sa.String(length=50), server_default="STANDARD", nullable=False),
+        schema="profile",
+    )
+    op.add_column(
+        "user_launch",
+        sa.Column("estimated_cost", sa.BigInteger(), nullable=True),
+        schema="profile",
+    )
+    op.add_column("dataset", sa.Column("row_count", sa.Integer(), nullable=True), schema="profile")
+    op.add_column(
+        "dataset", sa.Column("column_count", sa.Integer(), nullable=True), schema="profile"
+    )
+    # Claim query scans NEW jobs per user ordered by expected cost
+    op.create_index(
+        "ix_profile_user_launch_status_user_cost",
+        "user_launch",
+        ["status", "user_id", "estimated_cost", "created_at"],
+        unique=False,
+        schema="profile",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_profile_user_launch_status_user_cost", table_name="user_launch", schema="profile"
+    )
+    op.drop_column("dataset", "column_count", schema="profile")
+    op.drop_column("dataset", "row_count", schema="profile")
+    op.drop_column("user_launch", "estimated_cost", schema="profile")
+    op.drop_column("user", "tier", schema="profile")
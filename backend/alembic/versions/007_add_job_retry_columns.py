@@ -0,0 +1,52 @@
+"""Add job retry columns (attempts, next_attempt_at, last_error)
+
+Revision ID: 007_add_job_retry_columns
+Revises: 006_add_job_scheduling_columns
+Create Date: 2025-11-24 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "007_add_job_retry_columns"
+down_revision: Union[str, Sequence[str], None] = "006_add_job_scheduling_columns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_launch",
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        schema="profile",
+    )
+    op.add_column(
+        "user_launch",
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True),
+        schema="profile",
+    )
+    op.add_column(
+        "user_launch",
+        sa.Column("last_error", sa.String(length=500), nullable=True),
+        schema="profile",
+    )
+    # Operators list dead-lettered jobs; the partial index stays tiny
+    op.create_index(
+        "ix_profile_user_launch_dead_letter",
+        "user_launch",
+        ["updated_at"],
+        unique=False,
+        schema="profile",
+        postgresql_where=sa.text("status = 'DEAD_LETTER'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_profile_user_launch_dead_letter", table_name="user_launch", schema="profile"
+    )
+    op.drop_column("user_launch", "last_error", schema="profile")
+    op.drop_column("user_launch", "next_attempt_at", schema="profile")
+    op.drop_column("user_launch", "attempts", schema="profile")
@@ -0,0 +1,72 @@
+"""Add idempotency_key table for replaying responses of retried requests
+
+Revision ID: 008_add_idempotency_key
+Revises: 007_add_job_retry_columns
+Create Date: 2025-11-26 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "008_add_idempotency_key"
+down_revision: Union[str, Sequence[str], None] = "007_add_job_retry_columns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_key",
+        sa.Column("id", postgresql.UUID(), nullable=False),
+        sa.Column("user_id", postgresql.UUID(), nullable=False),
+        sa.Column("scope", sa.String(length=50), nullable=False),
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("response", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["profile.user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        schema="profile",
+    )
+    op.create_index(
+        "ux_idempotency_key_user_scope_key",
+        "idempotency_key",
+        ["user_id", "scope", "key"],
+        unique=True,
+        schema="profile",
+    )
+    op.create_index(
+        op.f("ix_profile_idempotency_key_expires_at"),
+        "idempotency_key",
+        ["expires_at"],
+        unique=False,
+        schema="profile",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_profile_idempotency_key_expires_at"),
+        table_name="idempotency_key",
+        schema="profile",
+    )
+    op.drop_index(
+        "ux_idempotency_key_user_scope_key", table_name="idempotency_key", schema="profile"
+    )
+    op.drop_table("idempotency_key", schema="profile")
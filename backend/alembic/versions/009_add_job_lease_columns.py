@@ -0,0 +1,34 @@
+"""Add job lease columns (claimed_by, lease_expires_at)
+
+Revision ID: 009_add_job_lease_columns
+Revises: 008_add_idempotency_key
+Create Date: 2025-11-28 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "009_add_job_lease_columns"
+down_revision: Union[str, Sequence[str], None] = "008_add_idempotency_key"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_launch",
+        sa.Column("claimed_by", sa.String(length=255), nullable=True),
+        schema="profile",
+    )
+    op.add_column(
+        "user_launch",
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        schema="profile",
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user_launch", "lease_expires_at", schema="profile")
+    op.drop_column("user_launch", "claimed_by", schema="profile")
@@ -0,0 +1,28 @@
+"""Add user_launch.started_at (start of the current processing attempt)
+
+Revision ID: 010_add_job_started_at
+Revises: 009_add_job_lease_columns
+Create Date: 2025-11-29 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "010_add_job_started_at"
+down_revision: Union[str, Sequence[str], None] = "009_add_job_lease_columns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_launch",
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        schema="profile",
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user_launch", "started_at", schema="profile")
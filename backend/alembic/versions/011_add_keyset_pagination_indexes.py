@@ -0,0 +1,49 @@
+"""Add (user_id, created_at DESC, id DESC) indexes for keyset pagination of list endpoints
+
+Revision ID: 011_add_keyset_pagination_indexes
+Revises: 010_add_job_started_at
+Create Date: 2025-11-30 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "011_add_keyset_pagination_indexes"
+down_revision: Union[str, Sequence[str], None] = "010_add_job_started_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INDEXES = {
+    "ix_user_file_user_mode_created_id": ("user_file", ["user_id", "mode"]),
+    "ix_model_artifact_user_created_id": ("model_artifact", ["user_id"]),
+    "ix_dataset_user_created_id": ("dataset", ["user_id"]),
+    "ix_training_run_user_created_id": ("training_run", ["user_id"]),
+}
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        for name, (table, prefix) in _INDEXES.items():
+            op.create_index(
+                name,
+                table,
+                [*prefix, sa.text("created_at DESC"), sa.text("id DESC")],
+                schema="profile",
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, (table, _) in _INDEXES.items():
+            op.drop_index(
+                name,
+                table_name=table,
+                schema="profile",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
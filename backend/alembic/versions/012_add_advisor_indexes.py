@@ -0,0 +1,65 @@
+"""Add indexes for hot queries covered by tools/index_advisor.py
+
+- dataset(created_at): TTL cleanup scanned and sorted the whole table
+- dataset(user_id, mode, created_at DESC): latest dataset size lookup on job submission
+- user_launch(user_id, status): quota counts and job listings filtered a user's whole history
+- training_run(created_at DESC) WHERE status = 'SUCCESS': runtime samples for job ETAs
+
+Revision ID: 012_add_advisor_indexes
+Revises: 011_add_keyset_pagination_indexes
+Create Date: 2025-12-01 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "012_add_advisor_indexes"
+down_revision: Union[str, Sequence[str], None] = "011_add_keyset_pagination_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INDEXES = [
+    ("ix_dataset_created_at", "dataset", ["created_at"], None),
+    (
+        "ix_dataset_user_mode_created",
+        "dataset",
+        ["user_id", "mode", sa.text("created_at DESC")],
+        None,
+    ),
+    ("ix_user_launch_user_status", "user_launch", ["user_id", "status"], None),
+    (
+        "ix_training_run_success_created",
+        "training_run",
+        [sa.text("created_at DESC")],
+        sa.text("status = 'SUCCESS'"),
+    ),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in _INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                schema="profile",
+                postgresql_where=where,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(_INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                schema="profile",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,87 @@
+"""Issue dataset versions from a per-(user, mode) counter; make versions unique
+
+Concurrent uploads read the same max(version) and created duplicate versions. Duplicates
+are renumbered in creation order, counters start from the current maximum and
+(user_id, mode, version) becomes unique (replacing the plain index of 005).
+
+Revision ID: 013_add_dataset_version_counter
+Revises: 012_add_advisor_indexes
+Create Date: 2025-12-02 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "013_add_dataset_version_counter"
+down_revision: Union[str, Sequence[str], None] = "012_add_advisor_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dataset_version_counter",
+        sa.Column("user_id", postgresql.UUID(), nullable=False),
+        sa.Column("mode", sa.String(length=50), nullable=False),
+        sa.Column("last_version", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["profile.user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "mode"),
+        schema="profile",
+    )
+    # Renumber only the (user, mode) histories that already have duplicates
+    op.execute(
+        """
+        WITH dup AS (
+            SELECT user_id, mode FROM profile.dataset
+            GROUP BY user_id, mode HAVING count(*) <> count(DISTINCT version)
+        ), renumbered AS (
+            SELECT d.id, row_number() OVER (
+                PARTITION BY d.user_id, d.mode ORDER BY d.version, d.created_at, d.id
+            ) AS version
+            FROM profile.dataset d JOIN dup USING (user_id, mode)
+        )
+        UPDATE profile.dataset d SET version = r.version
+        FROM renumbered r WHERE d.id = r.id AND d.version <> r.version
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO profile.dataset_version_counter (user_id, mode, last_version)
+        SELECT user_id, mode, max(version) FROM profile.dataset GROUP BY user_id, mode
+        """
+    )
+    op.create_index(
+        "ux_dataset_user_mode_version",
+        "dataset",
+        ["user_id", "mode", "version"],
+        unique=True,
+        schema="profile",
+    )
+    op.drop_index("ix_profile_dataset_user_mode_version", table_name="dataset", schema="profile")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_profile_dataset_user_mode_version",
+        "dataset",
+        ["user_id", "mode", "version"],
+        unique=False,
+        schema="profile",
+    )
+    op.drop_index("ux_dataset_user_mode_version", table_name="dataset", schema="profile")
+    op.drop_table("dataset_version_counter", schema="profile")
@@ -0,0 +1,50 @@
+"""Add user_launch.file_id (input file of the job)
+
+Batches may enqueue one job per dataset version, so a job keeps the file it was
+started for instead of training on the user's latest upload.
+
+Revision ID: 014_add_job_file_id
+Revises: 013_add_dataset_version_counter
+Create Date: 2025-12-04 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "014_add_job_file_id"
+down_revision: Union[str, Sequence[str], None] = "013_add_dataset_version_counter"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_launch",
+        sa.Column("file_id", postgresql.UUID(), nullable=True),
+        schema="profile",
+    )
+    op.create_foreign_key(
+        "user_launch_file_id_fkey",
+        "user_launch",
+        "user_file",
+        ["file_id"],
+        ["id"],
+        source_schema="profile",
+        referent_schema="profile",
+        ondelete="SET NULL",
+    )
+    op.create_index(
+        "ix_profile_user_launch_file_id",
+        "user_launch",
+        ["file_id"],
+        schema="profile",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_profile_user_launch_file_id", table_name="user_launch", schema="profile")
+    op.drop_constraint("user_launch_file_id_fkey", "user_launch", schema="profile")
+    op.drop_column("user_launch", "file_id", schema="profile")
@@ -0,0 +1,31 @@
+"""Add user_launch.feature_count (feature columns of the input dataset)
+
+Job ETAs predict the run time from rows x features; the row count was already kept
+in estimated_cost.
+
+Revision ID: 015_add_job_feature_count
+Revises: 014_add_job_file_id
+Create Date: 2025-12-05 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "015_add_job_feature_count"
+down_revision: Union[str, Sequence[str], None] = "014_add_job_file_id"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_launch",
+        sa.Column("feature_count", sa.Integer(), nullable=True),
+        schema="profile",
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user_launch", "feature_count", schema="profile")
@@ -0,0 +1,33 @@
+"""Add user_launch.file_pinned (the job was started for a specific input file)
+
+Deleting a user file clears user_launch.file_id (ON DELETE SET NULL) so the job history
+stays. Without a marker a queued job would then fall back to the user's latest file;
+with it the job fails instead. Jobs that already have a file_id are marked pinned.
+
+Revision ID: 016_add_job_file_pinned
+Revises: 015_add_job_feature_count
+Create Date: 2025-12-06 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "016_add_job_file_pinned"
+down_revision: Union[str, Sequence[str], None] = "015_add_job_feature_count"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_launch",
+        sa.Column("file_pinned", sa.Boolean(), server_default=sa.false(), nullable=False),
+        schema="profile",
+    )
+    op.execute("UPDATE profile.user_launch SET file_pinned = true WHERE file_id IS NOT NULL")
+
+
+def downgrade() -> None:
+    op.drop_column("user_launch", "file_pinned", schema="profile")
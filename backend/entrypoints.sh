@@ -25,11 +25,17 @@ case "$1" in
             echo "Starting in reload mode"
             RELOAD_ARGS="--reload"
         fi
+        # One worker per core with UVICORN_WORKERS=auto; every worker has its own DB pools
+        # (PG__DB_POOL_SIZE each), singleton loops run in the elected leader only
+        WORKERS="${UVICORN_WORKERS:-1}"
+        if [ "${WORKERS}" = "auto" ]; then
+            WORKERS="$(nproc)"
+        fi
         # Use direct app import for reload compatibility
         exec python -m uvicorn service.main:app \
             --host 0.0.0.0 \
             --port ${SERVICE_SERVER_PORT:-8000} \
-            --workers ${UVICORN_WORKERS:-1} \
+            --workers ${WORKERS} \
             --proxy-headers \
             ${RELOAD_ARGS}
         ;;
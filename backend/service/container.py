@@ -1,12 +1,18 @@
 import logging
 
+from service.infrastructure.database.leader import LeaderElection
 from service.infrastructure.database.postgresql import PgConnector
+from service.infrastructure.job_state.event_broadcaster import JobEventBroadcaster
+from service.infrastructure.job_state.pg_notify_bridge import PgNotifyBridge
 from service.repositories.auth_repository import AuthRepository
 from service.repositories.file_repository import FileRepository
+from service.repositories.idempotency_repository import IdempotencyRepository
 from service.repositories.job_repository import JobRepository
 from service.repositories.profile_repository import ProfileRepository
 from service.services.auth_service import AuthService
 from service.services.file_saver_service import FileSaverService
+from service.services.idempotency_service import IdempotencyService
+from service.services.job_eta import JobEtaEstimator
 from service.services.job_processor import NewJobProcessor
 from service.services.job_service import JobService
 from service.services.profile_service import ProfileService
@@ -21,12 +27,23 @@ def build(config: Config):
     _CONTAINER.clear()
     _CONTAINER[BackgroundTaskManagerName] = BackgroundTaskManager()
     _CONTAINER[PgConnectorName] = PgConnector(config.pg)
+    _CONTAINER[LeaderElectionName] = LeaderElection(
+        get(PgConnectorName), config.leader.lock_name, config.leader.check_interval_sec
+    )
+
+    # Job events: in-process fan-out, relayed across replicas via Postgres NOTIFY
+    _CONTAINER[JobEventBroadcasterName] = JobEventBroadcaster()
+    _CONTAINER[PgNotifyBridgeName] = PgNotifyBridge(
+        get(PgConnectorName), get(JobEventBroadcasterName)
+    )
+    get(JobEventBroadcasterName).set_forwarder(get(PgNotifyBridgeName).notify)
 
     # Repositories
     _CONTAINER[AuthRepositoryName] = AuthRepository(get(PgConnectorName))
     _CONTAINER[JobRepositoryName] = JobRepository(get(PgConnectorName))
     _CONTAINER[ProfileRepositoryName] = ProfileRepository(get(PgConnectorName))
     _CONTAINER[FileRepositoryName] = FileRepository(get(PgConnectorName))
+    _CONTAINER[IdempotencyRepositoryName] = IdempotencyRepository(get(PgConnectorName))
 
     # Services
     _CONTAINER[ProfileServiceName] = ProfileService(config.profile, get(ProfileRepositoryName))
@@ -35,10 +52,8 @@ def build(config: Config):
         get(AuthRepositoryName),
         get(ProfileServiceName),
     )
-    _CONTAINER[JobServiceName] = JobService(
-        config.job,
-        get(JobRepositoryName),
-        get(ProfileServiceName),
+    _CONTAINER[IdempotencyServiceName] = IdempotencyService(
+        config.idempotency, get(IdempotencyRepositoryName)
     )
     # Storage backend selection
     backend = config.storage_backend.strip().lower()
@@ -62,6 +77,7 @@ def build(config: Config):
         storage = LocalFileStorage()
         logger.info("Fallback: Using Local storage backend")
 
+    _CONTAINER[FileStorageName] = storage
     _CONTAINER[FileSaverServiceName] = FileSaverService(
         repository=get(FileRepositoryName),
         folder_name="uploads",
@@ -71,6 +87,8 @@ def build(config: Config):
     _CONTAINER[TrainingServiceName] = TrainingService(
         training_repo=None,  # will be set via DI names below if needed
         file_repo=get(FileRepositoryName),
+        events=get(JobEventBroadcasterName),
+        storage=storage,
     )
 
     # Переинициализируем TrainingService c TrainingRepository при наличии
@@ -81,14 +99,32 @@ def build(config: Config):
         _CONTAINER[TrainingServiceName] = TrainingService(
             training_repo=get(TrainingRepositoryName),
             file_repo=get(FileRepositoryName),
+            events=get(JobEventBroadcasterName),
+            storage=storage,
         )
     except Exception:
         logger.warning("TrainingRepository not available; training service will be limited")
 
+    # Queue position / ETA: runtime history of the trainer new jobs will use
+    _CONTAINER[JobEtaEstimatorName] = JobEtaEstimator(
+        config.job,
+        get(JobRepositoryName),
+        training_repo=_CONTAINER.get(TrainingRepositoryName),
+        trainer=lambda: get(TrainingServiceName).trainer_name,
+    )
+    _CONTAINER[JobServiceName] = JobService(
+        config.job,
+        get(JobRepositoryName),
+        get(ProfileServiceName),
+        events=get(JobEventBroadcasterName),
+        eta=get(JobEtaEstimatorName),
+    )
+
     _CONTAINER[NewJobProcessorName] = NewJobProcessor(
         config.job,
         get(JobRepositoryName),
         training_runner=get(TrainingServiceName).run_for_job,
+        events=get(JobEventBroadcasterName),
     )
 
 
@@ -117,6 +153,10 @@ FileSaverServiceT = FileSaverService
 FileSaverServiceName = "FileSaverService"
 TrainingServiceT = TrainingService
 TrainingServiceName = "TrainingService"
+IdempotencyServiceT = IdempotencyService
+IdempotencyServiceName = "IdempotencyService"
+JobEtaEstimatorT = JobEtaEstimator
+JobEtaEstimatorName = "JobEtaEstimator"
 
 # Repository names
 AuthRepositoryName = "AuthRepository"
@@ -124,6 +164,7 @@ JobRepositoryName = "JobRepository"
 ProfileRepositoryName = "ProfileRepository"
 FileRepositoryName = "FileRepository"
 TrainingRepositoryName = "TrainingRepository"
+IdempotencyRepositoryName = "IdempotencyRepository"
 
 # Processor names and types
 NewJobProcessorT = NewJobProcessor
@@ -132,6 +173,13 @@ NewJobProcessorName = "NewJobProcessor"
 # Utils names
 BackgroundTaskManagerT = BackgroundTaskManager
 BackgroundTaskManagerName = "BackgroundTaskManager"
+PgConnectorT = PgConnector
 PgConnectorName = "PgConnector"
+FileStorageName = "FileStorage"
+LeaderElectionT = LeaderElection
+LeaderElectionName = "LeaderElection"
+JobEventBroadcasterT = JobEventBroadcaster
+JobEventBroadcasterName = "JobEventBroadcaster"
+PgNotifyBridgeName = "PgNotifyBridge"
 
 _CONTAINER = {}
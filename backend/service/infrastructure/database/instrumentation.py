@@ -0,0 +1,278 @@
+"""Pool and query instrumentation on SQLAlchemy engine/pool events.
+
+Collected per process and exposed by the admin API (``GET /api/admin/v1/db/stats``):
+
+- pool: time to get a connection (checkout wait), connections in use, peak and saturation;
+- queries: duration histogram per statement fingerprint (SQL with literals and
+  parameter lists collapsed), statements slower than ``slow_query_ms`` are logged with
+  their call site;
+- requests: number of statements per endpoint; a request above ``request_query_warn``
+  is logged, which is how an N+1 shows up.
+"""
+
+import bisect
+import hashlib
+import logging
+import re
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets, ms (the last bucket is unbounded)
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_WAIT_KEY = "checkout_wait_ms"
+_STARTED_KEY = "query_started"
+_OTHER = "(other)"
+# Plumbing between the caller and the driver, never the interesting frame
+_NOT_CALL_SITES = ("/infrastructure/database/", "/repositories/decorators/")
+
+_call_site: ContextVar[str | None] = ContextVar("db_call_site", default=None)
+_request_queries: ContextVar[list[int] | None] = ContextVar("db_request_queries", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s")
+_PARAM_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement text with values removed: the same query always maps to the same text.
+
+    ``IN`` lists of any length collapse to one placeholder, so an expanded
+    ``IN (...)`` does not create a fingerprint per list size.
+    """
+    text = _STRING.sub("?", statement)
+    text = _PARAM.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _PARAM_LIST.sub("?", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (``max`` for the last one)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(float(bound), self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "total": round(self.total, 3),
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 3),
+            "buckets": dict(zip([*map(str, BUCKETS_MS), "inf"], self.counts)),
+        }
+
+
+@dataclass(slots=True)
+class PoolStats:
+    capacity: int  # pool_size + max_overflow
+    in_use: int = 0
+    peak_in_use: int = 0
+    checkouts: int = 0
+    saturated_checkouts: int = 0  # the checkout took the last free connection
+    checkout_wait_ms: Histogram = field(default_factory=Histogram)
+
+    def snapshot(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "checkouts": self.checkouts,
+            "saturated_checkouts": self.saturated_checkouts,
+            "checkout_wait_ms": self.checkout_wait_ms.snapshot(),
+        }
+
+
+@dataclass(slots=True)
+class QueryStats:
+    sample: str
+    duration_ms: Histogram = field(default_factory=Histogram)
+
+
+class DbStats:
+    """Process-wide database statistics, fed by ``instrument``."""
+
+    def __init__(
+        self,
+        slow_query_ms: float = 200.0,
+        request_query_warn: int = 30,
+        max_fingerprints: int = 500,
+    ) -> None:
+        self.slow_query_ms = slow_query_ms
+        self.request_query_warn = request_query_warn
+        self.max_fingerprints = max_fingerprints
+        self.pools: dict[str, PoolStats] = {}
+        self.queries: dict[str, QueryStats] = {}
+        self.requests: dict[str, Histogram] = {}
+        self.slow_queries = 0
+
+    def observe_query(self, statement: str, duration_ms: float) -> None:
+        key = fingerprint(statement)
+        stats = self.queries.get(key)
+        if stats is None:
+            # Dynamic SQL must not grow the table without bound
+            if len(self.queries) >= self.max_fingerprints:
+                key = _OTHER
+                stats = self.queries.setdefault(key, QueryStats(_OTHER))
+            else:
+                stats = self.queries[key] = QueryStats(key[:500])
+        stats.duration_ms.observe(duration_ms)
+        if (counter := _request_queries.get()) is not None:
+            counter[0] += 1
+        if duration_ms >= self.slow_query_ms:
+            self.slow_queries += 1
+            logger.warning(
+                "Slow query %.1f ms [%s] at %s: %s",
+                duration_ms,
+                _fingerprint_id(key),
+                _current_call_site(),
+                stats.sample[:300],
+            )
+
+    def observe_request(self, endpoint: str, queries: int) -> None:
+        self.requests.setdefault(endpoint, Histogram()).observe(queries)
+        if queries > self.request_query_warn:
+            logger.warning("%s ran %s queries (N+1?)", endpoint, queries)
+
+    def snapshot(self, top: int = 20) -> dict:
+        by_time = sorted(self.queries.items(), key=lambda item: -item[1].duration_ms.total)
+        return {
+            "pools": {name: pool.snapshot() for name, pool in self.pools.items()},
+            "slow_query_ms": self.slow_query_ms,
+            "slow_queries": self.slow_queries,
+            "queries": [
+                {"fingerprint": _fingerprint_id(key), "sql": stats.sample}
+                | stats.duration_ms.snapshot()
+                for key, stats in by_time[:top]
+            ],
+            "requests": {
+                endpoint: histogram.snapshot()
+                for endpoint, histogram in sorted(self.requests.items())
+            },
+        }
+
+
+def _fingerprint_id(key: str) -> str:
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+@contextmanager
+def call_site(name: str) -> Iterator[None]:
+    """Name the code running the next statements (repository method) for the slow-query log."""
+    token = _call_site.set(name)
+    try:
+        yield
+    finally:
+        _call_site.reset(token)
+
+
+def _current_call_site() -> str:
+    for frame in reversed(traceback.extract_stack()):
+        path = frame.filename.replace("\\", "/")
+        if "/service/" in path and not any(skip in path for skip in _NOT_CALL_SITES):
+            site = f"{path.rsplit('/service/', 1)[-1]}:{frame.lineno} ({frame.name})"
+            break
+    else:
+        site = None
+    # Under asyncio the statement runs in a greenlet without the caller's frames
+    name = _call_site.get()
+    if site and name:
+        return f"{name}, {site}"
+    return name or site or "unknown"
+
+
+@contextmanager
+def count_request_queries(stats: DbStats, endpoint: str) -> Iterator[list[int]]:
+    """Count the statements run while handling one request and record them per endpoint."""
+    counter = [0]
+    token = _request_queries.set(counter)
+    try:
+        yield counter
+    finally:
+        _request_queries.reset(token)
+        stats.observe_request(endpoint, counter[0])
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that measures how long getting a connection took (wait + connect)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        record = super()._do_get()
+        record.info[_WAIT_KEY] = (time.perf_counter() - started) * 1000
+        return record
+
+
+def instrument(engine: Engine, stats: DbStats, name: str, capacity: int) -> None:
+    """Attach pool and query listeners of ``engine`` (sync engine of an async one)."""
+    instrument_pool(engine, stats, name, capacity)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info[_STARTED_KEY].pop()
+        stats.observe_query(statement, (time.perf_counter() - started) * 1000)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context) -> None:
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_STARTED_KEY):
+            conn.info[_STARTED_KEY].pop()
+
+
+def instrument_pool(target: Engine | Pool, stats: DbStats, name: str, capacity: int) -> None:
+    """Pool listeners only; the wait is known when the pool is an ``InstrumentedPool``."""
+    pool_stats = stats.pools[name] = PoolStats(capacity=capacity)
+
+    @event.listens_for(target, "checkout")
+    def _checkout(dbapi_connection, record, proxy) -> None:
+        pool_stats.checkouts += 1
+        pool_stats.in_use += 1
+        pool_stats.peak_in_use = max(pool_stats.peak_in_use, pool_stats.in_use)
+        if pool_stats.in_use >= capacity:
+            pool_stats.saturated_checkouts += 1
+        if (wait_ms := record.info.pop(_WAIT_KEY, None)) is not None:
+            pool_stats.checkout_wait_ms.observe(wait_ms)
+
+    @event.listens_for(target, "checkin")
+    def _checkin(dbapi_connection, record) -> None:
+        pool_stats.in_use = max(pool_stats.in_use - 1, 0)
@@ -0,0 +1,91 @@
+"""Leader election over a Postgres advisory lock: one process runs the singleton loops.
+
+Every app process (uvicorn worker, container replica) runs ``LeaderElection.run``. The
+process that gets ``pg_try_advisory_lock`` on its connection becomes the leader and runs
+the registered loops; the others retry every ``check_interval_sec``. The lock belongs to
+the database session, so when the leader dies or loses its connection Postgres releases
+it and another process takes over on its next attempt. The leader checks its connection
+every interval and stops its loops when it is gone, so a lost leader does not keep
+working next to the new one for longer than that.
+
+The lock connection must reach Postgres directly: behind PgBouncer in transaction mode a
+session-level advisory lock is not bound to this client.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Awaitable, Callable, NoReturn
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+_TRY_LOCK = text("SELECT pg_try_advisory_lock(:key)")
+_PING = text("SELECT 1")
+
+
+def lock_key(name: str) -> int:
+    """Stable signed 64-bit advisory lock key of ``name``."""
+    digest = hashlib.blake2b(name.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class LeaderElection:
+    def __init__(self, connector, name: str, check_interval_sec: float = 5.0) -> None:
+        self.connector = connector
+        self.name = name
+        self.key = lock_key(name)
+        self.check_interval_sec = check_interval_sec
+        self.loops: dict[str, Callable[[], Awaitable]] = {}
+        self.is_leader = False
+
+    def add_loop(self, name: str, loop: Callable[[], Awaitable]) -> None:
+        """Register a loop to run only in the leader process."""
+        self.loops[name] = loop
+
+    async def run(self) -> NoReturn:
+        while True:
+            try:
+                async with self.connector.engine.connect() as conn:
+                    if await self._try_lock(conn):
+                        await self._lead(conn)
+            except Exception:  # noqa: BLE001
+                logger.warning("Leader election %s failed", self.name, exc_info=True)
+            await asyncio.sleep(self.check_interval_sec)
+
+    async def _try_lock(self, conn: AsyncConnection) -> bool:
+        acquired = (await conn.execute(_TRY_LOCK, {"key": self.key})).scalar()
+        await conn.commit()
+        return bool(acquired)
+
+    async def _lead(self, conn: AsyncConnection) -> None:
+        self.is_leader = True
+        logger.info(f"Process {os.getpid()} is the leader of {self.name}")
+        tasks = [
+            asyncio.create_task(self._supervise(name, loop), name=name)
+            for name, loop in self.loops.items()
+        ]
+        try:
+            while True:
+                await asyncio.sleep(self.check_interval_sec)
+                await conn.execute(_PING)
+                await conn.commit()
+        finally:
+            self.is_leader = False
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Closing the session releases the lock; a pooled connection would keep it
+            await conn.invalidate()
+            logger.info(f"Process {os.getpid()} stepped down as the leader of {self.name}")
+
+    async def _supervise(self, name: str, loop: Callable[[], Awaitable]) -> None:
+        while True:
+            try:
+                await loop()
+            except Exception:  # noqa: BLE001
+                logger.exception(f"Singleton loop {name} failed, restarting")
+            await asyncio.sleep(self.check_interval_sec)
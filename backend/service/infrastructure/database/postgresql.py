@@ -1,5 +1,10 @@
+import asyncio
+import itertools
 import logging
+import os
+from dataclasses import dataclass
 from typing import AsyncGenerator
+from uuid import uuid4
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
@@ -9,45 +14,128 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
+from service.infrastructure.database.instrumentation import (
+    DbStats,
+    InstrumentedPool,
+    instrument,
+)
+from service.infrastructure.database.routing import ReadYourWrites
 from service.settings import Postgresql
 
 logger = logging.getLogger(__name__)
 
+# Seconds the replica is behind; 0 when it has replayed everything it received
+# (an idle primary does not make a caught-up replica look stale)
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+@dataclass(slots=True)
+class _Replica:
+    host: str
+    engine: AsyncEngine
+    session_maker: async_sessionmaker
+    lag_sec: float | None = None  # None: not checked yet or unreachable
+
 
 class PgConnector:
     _engine: AsyncEngine | None = None
     _session_maker: async_sessionmaker | None = None
+    _replicas: list[_Replica] | None = None
+    _stats: DbStats | None = None
 
     def __init__(self, config: Postgresql) -> None:
         self.config = config
+        self._stats = self._get_stats()
         self._engine = self._get_engine()
         self._session_maker = self._get_session_maker()
+        self._replicas = self._get_replicas()
+        self._next_replica = itertools.count()
+        self.read_routing = ReadYourWrites(config.read_your_writes_sec)
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            raise ValueError("PostgreSQL engine is not initialized")
+        return self._engine
+
+    @property
+    def replicas(self) -> list[_Replica]:
+        return self._replicas or []
+
+    @property
+    def stats(self) -> DbStats:
+        return self._stats
+
+    def _create_engine(self, dsn: str, name: str = "primary") -> AsyncEngine:
+        engine = create_async_engine(
+            dsn,
+            echo=self.config.db_echo,
+            echo_pool=self.config.db_echo,
+            pool_size=self.config.db_pool_size,
+            max_overflow=self.config.db_max_overflow,
+            pool_timeout=self.config.db_pool_timeout,
+            pool_recycle=self.config.db_pool_recycle,
+            pool_pre_ping=self.config.db_pool_pre_ping,
+            query_cache_size=self.config.sql_compile_cache_size,
+            connect_args=self._connect_args(),
+            poolclass=InstrumentedPool,
+            future=True,
+        )
+        capacity = self.config.db_pool_size + self.config.db_max_overflow
+        instrument(engine.sync_engine, self.stats, name, capacity)
+        return engine
+
+    def _connect_args(self) -> dict:
+        if self.config.pgbouncer_mode:
+            # Unnamed-per-use statements: a pooled server connection may belong to another
+            # client next time, so nothing prepared may be looked up by a fixed name
+            return {
+                "prepared_statement_cache_size": 0,
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        size = self.config.prepared_statement_cache_size
+        return {"prepared_statement_cache_size": size, "statement_cache_size": size}
+
+    @staticmethod
+    def _create_session_maker(engine: AsyncEngine) -> async_sessionmaker:
+        return async_sessionmaker(
+            bind=engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+        )
+
+    def _get_stats(self) -> DbStats:
+        if not PgConnector._stats:
+            PgConnector._stats = DbStats(
+                slow_query_ms=self.config.slow_query_ms,
+                request_query_warn=self.config.request_query_warn,
+            )
+        return PgConnector._stats
 
     def _get_engine(self) -> AsyncEngine:
         if not PgConnector._engine:
-            PgConnector._engine = create_async_engine(
-                self.config.dsn,
-                echo=self.config.db_echo,
-                echo_pool=self.config.db_echo,
-                pool_size=self.config.db_pool_size,
-                max_overflow=self.config.db_max_overflow,
-                pool_timeout=self.config.db_pool_timeout,
-                pool_recycle=self.config.db_pool_recycle,
-                pool_pre_ping=self.config.db_pool_pre_ping,
-                future=True,
-            )
+            PgConnector._engine = self._create_engine(self.config.dsn)
         return PgConnector._engine
 
     def _get_session_maker(self) -> async_sessionmaker:
         if not PgConnector._session_maker:
-            PgConnector._session_maker = async_sessionmaker(
-                bind=self._engine,
-                class_=AsyncSession,
-                expire_on_commit=False,
-                autoflush=False,
-            )
+            PgConnector._session_maker = self._create_session_maker(self._engine)
         return PgConnector._session_maker
 
+    def _get_replicas(self) -> list[_Replica]:
+        if PgConnector._replicas is None:
+            replicas = []
+            for host in self.config.replica_hosts:
+                engine = self._create_engine(self.config.replica_dsn(host), name=host)
+                replicas.append(_Replica(host, engine, self._create_session_maker(engine)))
+            PgConnector._replicas = replicas
+        return PgConnector._replicas
+
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
         """Get database session for use as FastAPI dependency"""
         if self._session_maker is None:
@@ -64,15 +152,56 @@ class PgConnector:
             logger.exception(f"Error managing database session: {e}")
             raise
 
-    def get_session_context(self) -> AsyncSession:
-        """Returns context manager for use outside FastAPI dependency injection."""
+    def get_session_context(self, read_only: bool = False) -> AsyncSession:
+        """Returns context manager for use outside FastAPI dependency injection.
+
+        ``read_only`` sessions go to a replica within the lag threshold, round-robin;
+        without one they fall back to the primary.
+        """
         if self._session_maker is None:
             logger.error("Attempted to get session context but sessionmaker is not initialized")
             raise ValueError("PostgreSQL sessionmaker is not initialized")
 
+        if read_only and (replica := self._pick_replica()) is not None:
+            logger.debug("Creating replica session context (%s)", replica.host)
+            return replica.session_maker()
+
         logger.debug("Creating database session context")
         return self._session_maker()
 
+    def _pick_replica(self) -> _Replica | None:
+        fresh = [
+            replica
+            for replica in self.replicas
+            if replica.lag_sec is not None and replica.lag_sec <= self.config.replica_max_lag_sec
+        ]
+        if not fresh:
+            return None
+        return fresh[next(self._next_replica) % len(fresh)]
+
+    async def check_replicas(self) -> None:
+        """Measure replication lag of every replica; unreachable ones are taken out."""
+        for replica in self.replicas:
+            try:
+                async with replica.session_maker() as session:
+                    lag = (await session.execute(_REPLICA_LAG_SQL)).scalar()
+                replica.lag_sec = float(lag or 0)
+            except Exception as e:
+                if replica.lag_sec is not None:
+                    logger.warning("Replica %s is unavailable: %s", replica.host, e)
+                replica.lag_sec = None
+                continue
+            if replica.lag_sec > self.config.replica_max_lag_sec:
+                logger.warning(
+                    "Replica %s lags %.1fs, reads go to primary", replica.host, replica.lag_sec
+                )
+
+    async def run_replica_monitor(self) -> None:
+        """Background loop keeping replica lag fresh (started by the app lifespan)."""
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(self.config.replica_check_interval_sec)
+
     async def verify_connection(self) -> None:
         """Open a short session and execute a trivial statement to verify connectivity."""
         if self._engine is None:
@@ -92,5 +221,26 @@ class PgConnector:
             if self._engine is not None:
                 await self._engine.dispose()
                 logger.debug("PostgreSQL engine disposed")
+            for replica in self.replicas:
+                await replica.engine.dispose()
         except Exception as e:
             logger.exception("Error disposing PostgreSQL engine: %s", e)
+
+
+def _drop_inherited_pools() -> None:
+    """A forked child must not use the parent's pooled connections (shared sockets).
+
+    The engines get empty pools without closing anything, so the parent's connections
+    stay intact; the child opens its own on first use.
+    """
+    engines = [PgConnector._engine, *(replica.engine for replica in PgConnector._replicas or [])]
+    for engine in engines:
+        if engine is not None:
+            engine.sync_engine.dispose(close=False)
+    if PgConnector._stats is not None:
+        for pool in PgConnector._stats.pools.values():
+            pool.in_use = 0
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_drop_inherited_pools)
@@ -0,0 +1,61 @@
+"""Read routing between the primary and replicas: read-your-writes pinning.
+
+A request bound to a user (``bind_user`` from the auth dependency) may read from a replica
+unless it has written itself or the same user wrote within the last ``window_sec``.
+Everything else (background workers, anonymous requests) reads from the primary.
+Pins live in process memory: another app process may still serve a stale read
+to the same user, just as a lagging replica would within the lag threshold.
+"""
+
+from contextvars import ContextVar
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from service.utils.lru_cache import LRUCache
+
+_user: ContextVar[UUID | None] = ContextVar("read_routing_user", default=None)
+_request_wrote: ContextVar[bool] = ContextVar("read_routing_request_wrote", default=False)
+
+WROTE_KEY = "read_routing_wrote"
+
+
+def bind_user(user_id: UUID) -> None:
+    """Reads of the current request belong to ``user_id``."""
+    _user.set(user_id)
+    _request_wrote.set(False)
+
+
+class ReadYourWrites:
+    def __init__(self, window_sec: float, maxsize: int = 100_000) -> None:
+        self.window_sec = window_sec
+        self._pins: LRUCache[UUID, bool] = LRUCache(maxsize, ttl_sec=window_sec)
+
+    def note_write(self) -> None:
+        _request_wrote.set(True)
+        if (user_id := _user.get()) is not None and self.window_sec > 0:
+            self._pins.put(user_id, True)
+
+    def reads_need_primary(self) -> bool:
+        user_id = _user.get()
+        if user_id is None or _request_wrote.get():
+            return True
+        return self._pins.get(user_id) is not None
+
+
+def session_wrote(session) -> bool:
+    """Whether ``session`` sent an INSERT/UPDATE/DELETE since the last call (resets the flag)."""
+    return bool(session.info.pop(WROTE_KEY, False))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context) -> None:
+    if session.new or session.dirty or session.deleted:
+        session.info[WROTE_KEY] = True
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable
+from uuid import UUID
+
+from service.models.jobs_models import JobEvent
+
+logger = logging.getLogger(__name__)
+
+EventForwarder = Callable[[JobEvent], Awaitable[None]]
+EventListener = Callable[[JobEvent], None]
+
+
+class JobEventBroadcaster:
+    """In-process fan-out of job events to subscribers of a given job.
+
+    Events published here are delivered to local subscribers immediately and, if a
+    forwarder is attached (see PgNotifyBridge), sent to other replicas as well.
+    Events coming from other replicas enter through ``publish_local``.
+    """
+
+    def __init__(self, queue_size: int = 100) -> None:
+        self._queue_size = queue_size
+        self._subscribers: dict[UUID, set[asyncio.Queue[JobEvent]]] = defaultdict(set)
+        self._forwarder: EventForwarder | None = None
+        self._listeners: list[EventListener] = []
+
+    def set_forwarder(self, forwarder: EventForwarder | None) -> None:
+        self._forwarder = forwarder
+
+    def add_listener(self, listener: EventListener) -> None:
+        """Register a synchronous callback invoked for every event of every job."""
+        self._listeners.append(listener)
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: UUID) -> AsyncIterator[asyncio.Queue[JobEvent]]:
+        queue: asyncio.Queue[JobEvent] = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers[job_id].add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    self._subscribers.pop(job_id, None)
+
+    def subscriber_count(self, job_id: UUID) -> int:
+        return len(self._subscribers.get(job_id, ()))
+
+    def publish_local(self, event: JobEvent) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception:  # noqa: BLE001
+                logger.exception("Job event listener failed for job %s", event.job_id)
+
+        for queue in list(self._subscribers.get(event.job_id, ())):
+            if queue.full():
+                # Slow consumer: drop the oldest progress event, keep the newest state
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(event)
+
+    async def publish(self, event: JobEvent) -> None:
+        self.publish_local(event)
+        if self._forwarder is None:
+            return
+        try:
+            await self._forwarder(event)
+        except Exception:  # noqa: BLE001
+            # Delivery to other replicas is best effort; local subscribers already got it
+            logger.warning("Failed to forward job event for job %s", event.job_id, exc_info=True)
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import logging
+import uuid
+
+from sqlalchemy import text
+
+from service.infrastructure.database.postgresql import PgConnector
+from service.infrastructure.job_state.event_broadcaster import JobEventBroadcaster
+from service.models.jobs_models import JobEvent
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes and more
+MAX_NOTIFY_PAYLOAD_BYTES = 7900
+
+
+class PgNotifyBridge:
+    """Relays job events between replicas through Postgres LISTEN/NOTIFY.
+
+    ``notify`` is attached to the broadcaster as its forwarder; ``listen`` runs as a
+    background task holding one dedicated connection and re-publishes events of other
+    replicas to local subscribers. Notifications are sent over that same connection, so
+    progress events never take pool connections; while it reconnects, only status
+    changes are sent (through the pool) and progress is dropped.
+    """
+
+    def __init__(
+        self,
+        connector: PgConnector,
+        broadcaster: JobEventBroadcaster,
+        channel: str = "job_events",
+    ) -> None:
+        self.connector = connector
+        self.broadcaster = broadcaster
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._connection = None  # asyncpg connection of the running listener
+        self._send_lock = asyncio.Lock()  # one query at a time on that connection
+
+    def encode(self, event: JobEvent) -> str:
+        payload = {"origin": self.origin, "event": event.model_dump(mode="json")}
+        encoded = json.dumps(payload, separators=(",", ":"))
+        if len(encoded.encode()) > MAX_NOTIFY_PAYLOAD_BYTES:
+            # Large metrics (confusion matrix) are fetched with the final result instead
+            payload["event"]["metrics"] = None
+            encoded = json.dumps(payload, separators=(",", ":"))
+        return encoded
+
+    def decode(self, payload: str) -> JobEvent | None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Malformed job event notification: %s", payload[:200])
+            return None
+        if message.get("origin") == self.origin:
+            return None
+        return JobEvent.model_validate(message["event"])
+
+    async def notify(self, event: JobEvent) -> None:
+        connection = self._connection
+        if connection is not None and not connection.is_closed():
+            async with self._send_lock:
+                await connection.execute(
+                    "SELECT pg_notify($1, $2)", self.channel, self.encode(event)
+                )
+            return
+        if event.stage is not None:
+            return
+        async with self.connector.get_session_context() as session:
+            await session.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": self.encode(event)},
+            )
+            await session.commit()
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        event = self.decode(payload)
+        if event is not None:
+            self.broadcaster.publish_local(event)
+
+    async def listen(self) -> None:
+        async with self.connector.engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver_connection = raw.driver_connection
+            terminated = asyncio.Event()
+            driver_connection.add_termination_listener(lambda _conn: terminated.set())
+            await driver_connection.add_listener(self.channel, self._on_notification)
+            logger.info("Listening for job events on channel %s", self.channel)
+            self._connection = driver_connection
+            try:
+                await terminated.wait()
+                # Let BackgroundTaskManager restart the listener on a fresh connection
+                raise ConnectionError("Job events listener connection was closed")
+            finally:
+                self._connection = None
+                try:
+                    await driver_connection.remove_listener(self.channel, self._on_notification)
+                except Exception:  # noqa: BLE001
+                    logger.debug("Failed to remove job events listener", exc_info=True)
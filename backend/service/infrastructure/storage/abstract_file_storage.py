@@ -1,6 +1,36 @@
 from __future__ import annotations
 
-from typing import Protocol
+import asyncio
+from dataclasses import dataclass, field
+from typing import Iterable, Protocol, Sequence
+
+
+@dataclass(slots=True)
+class DeleteFilesResult:
+    """Итог массового удаления: missing — файла уже не было, failed — ключи с ошибкой."""
+
+    removed: int = 0
+    missing: int = 0
+    failed: list[str] = field(default_factory=list)
+
+    @classmethod
+    def merge(cls, parts: Iterable[DeleteFilesResult]) -> DeleteFilesResult:
+        total = cls()
+        for part in parts:
+            total.removed += part.removed
+            total.missing += part.missing
+            total.failed.extend(part.failed)
+        return total
+
+
+class StorageWriter(Protocol):
+    """Потоковая запись файла: виден в хранилище только после ``commit``."""
+
+    async def write(self, chunk: bytes) -> None: ...
+
+    async def commit(self) -> str: ...
+
+    async def abort(self) -> None: ...
 
 
 class AbstractFileStorage(Protocol):
@@ -14,3 +44,63 @@ class AbstractFileStorage(Protocol):
     async def upload_file(self, *, file_key: str, file_data: bytes) -> str: ...
 
     async def delete_file(self, *, file_key: str) -> None: ...
+
+    def open_writer(self, *, file_key: str) -> StorageWriter: ...
+
+    async def delete_files(
+        self, *, file_keys: Sequence[str], concurrency: int = 16
+    ) -> DeleteFilesResult: ...
+
+
+async def delete_many(
+    storage: AbstractFileStorage, file_keys: Sequence[str], *, concurrency: int = 16
+) -> DeleteFilesResult:
+    """Удалить файлы одним вызовом бэкенда, не более ``concurrency`` операций одновременно.
+
+    Бэкенд без ``delete_files`` удаляется по одному файлу, но параллельно.
+    """
+    if not file_keys:
+        return DeleteFilesResult()
+    bulk = getattr(storage, "delete_files", None)
+    if callable(bulk):
+        return await bulk(file_keys=file_keys, concurrency=concurrency)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def delete_one(key: str) -> DeleteFilesResult:
+        async with semaphore:
+            try:
+                await storage.delete_file(file_key=key)
+            except FileNotFoundError:
+                return DeleteFilesResult(missing=1)
+            except Exception:  # noqa: BLE001
+                return DeleteFilesResult(failed=[key])
+            return DeleteFilesResult(removed=1)
+
+    return DeleteFilesResult.merge(await asyncio.gather(*map(delete_one, file_keys)))
+
+
+class _BufferedWriter:
+    """Запись для бэкенда без ``open_writer``: один ``upload_file`` при commit."""
+
+    def __init__(self, storage: AbstractFileStorage, file_key: str) -> None:
+        self._storage = storage
+        self._file_key = file_key
+        self._chunks: list[bytes] = []
+
+    async def write(self, chunk: bytes) -> None:
+        self._chunks.append(chunk)
+
+    async def commit(self) -> str:
+        data, self._chunks = b"".join(self._chunks), []
+        return await self._storage.upload_file(file_key=self._file_key, file_data=data)
+
+    async def abort(self) -> None:
+        self._chunks = []
+
+
+def writer_for(storage: AbstractFileStorage, file_key: str) -> StorageWriter:
+    opener = getattr(storage, "open_writer", None)
+    if callable(opener):
+        return opener(file_key=file_key)
+    return _BufferedWriter(storage, file_key)
@@ -1,7 +1,79 @@
+import asyncio
+import logging
 import os
+import uuid
 from pathlib import Path
+from typing import BinaryIO, Sequence
 
-from .abstract_file_storage import AbstractFileStorage
+from .abstract_file_storage import AbstractFileStorage, DeleteFilesResult
+
+logger = logging.getLogger(__name__)
+
+
+def _unlink_all(paths: Sequence[tuple[str, Path]]) -> DeleteFilesResult:
+    result = DeleteFilesResult()
+    for key, path in paths:
+        try:
+            path.unlink()
+            result.removed += 1
+        except FileNotFoundError:
+            result.missing += 1
+        except OSError as e:
+            logger.warning("Failed to delete file %s: %s", path, e)
+            result.failed.append(key)
+    return result
+
+
+async def unlink_paths(paths: dict[str, Path], *, concurrency: int = 16) -> DeleteFilesResult:
+    """Удалить файлы (ключ -> путь) в пуле потоков: ``concurrency`` потоков делят список."""
+    items = list(paths.items())
+    workers = max(1, min(concurrency, len(items)))
+    chunks = [items[i::workers] for i in range(workers)]
+    parts = await asyncio.gather(*(asyncio.to_thread(_unlink_all, chunk) for chunk in chunks))
+    return DeleteFilesResult.merge(parts)
+
+
+class _LocalWriter:
+    """Пишет во временный файл рядом с целевым и атомарно переименовывает при commit.
+
+    Файловые операции идут в потоках: файл создаётся первой записью, не в конструкторе.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+        self._file: BinaryIO | None = None
+
+    async def write(self, chunk: bytes) -> None:
+        await asyncio.to_thread(self._write, chunk)
+
+    async def commit(self) -> str:
+        await asyncio.to_thread(self._finish)
+        return str(self._path.resolve())
+
+    async def abort(self) -> None:
+        await asyncio.to_thread(self._discard)
+
+    def _open(self) -> BinaryIO:
+        if self._file is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self._tmp.open("wb")
+        return self._file
+
+    def _write(self, chunk: bytes) -> None:
+        self._open().write(chunk)
+
+    def _finish(self) -> None:
+        file = self._open()
+        file.flush()
+        os.fsync(file.fileno())
+        file.close()
+        os.replace(self._tmp, self._path)
+
+    def _discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._tmp.unlink(missing_ok=True)
 
 
 class LocalFileStorage(AbstractFileStorage):
@@ -26,6 +98,9 @@ class LocalFileStorage(AbstractFileStorage):
         # Возвращаем абсолютный путь как URL-заменитель; при необходимости заменить на CDN/S3 URL
         return str(path.resolve())
 
+    def open_writer(self, *, file_key: str) -> _LocalWriter:
+        return _LocalWriter(self.base_dir / file_key)
+
     async def delete_file(self, *, file_key: str) -> None:
         path = self.base_dir / file_key
         try:
@@ -34,3 +109,10 @@ class LocalFileStorage(AbstractFileStorage):
             # Для Python <3.8 совместимости можно обойтись проверкой exists
             if path.exists():
                 path.unlink()
+
+    async def delete_files(
+        self, *, file_keys: Sequence[str], concurrency: int = 16
+    ) -> DeleteFilesResult:
+        return await unlink_paths(
+            {key: self.base_dir / key for key in file_keys}, concurrency=concurrency
+        )
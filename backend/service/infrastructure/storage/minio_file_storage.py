@@ -1,11 +1,121 @@
+import asyncio
+import functools
 import logging
+import os
+import queue
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Sequence, TypeVar
 
 from service.settings import MinioConfig
 
-from .abstract_file_storage import AbstractFileStorage
+from .abstract_file_storage import AbstractFileStorage, DeleteFilesResult
 
 logger = logging.getLogger(__name__)
 
+# S3 multi-object delete accepts at most 1000 keys per request
+_DELETE_BATCH = 1000
+# S3 multipart upload limit
+_MAX_PARTS = 10_000
+
+T = TypeVar("T")
+
+
+class _ChunkStream:
+    """File-like ``read()`` for ``put_object`` fed with chunks from the event loop.
+
+    The queue is bounded, so a writer ahead of the upload waits instead of buffering.
+    """
+
+    def __init__(self, max_chunks: int = 4) -> None:
+        self._queue: queue.Queue[bytes | None] = queue.Queue(max_chunks)
+        self._buffer = b""
+        self._eof = False
+        self.aborted = False
+        self.closed = False  # the upload stopped reading
+
+    def put(self, chunk: bytes | None) -> None:
+        while True:
+            if self.closed:
+                raise RuntimeError("MinIO upload stopped")
+            try:
+                self._queue.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._buffer and not self._eof:
+            if self.aborted:
+                raise OSError("Upload aborted")
+            try:
+                chunk = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if chunk is None:
+                self._eof = True
+            else:
+                self._buffer = chunk
+        if size < 0 or size >= len(self._buffer):
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class _MinioWriter:
+    """Streams an object with ``put_object(length=-1)``: multipart upload part by part.
+
+    Memory is the parts in flight (``transfer_concurrency`` + 1) plus a few queued
+    chunks. An aborted or failed upload never becomes visible: minio aborts the
+    multipart upload.
+    """
+
+    def __init__(self, storage: "MinioFileStorage", file_key: str) -> None:
+        self._storage = storage
+        self._file_key = file_key
+        self._stream = _ChunkStream()
+        # The upload holds its thread until the last chunk: a pool of its own
+        self._upload = asyncio.get_running_loop().run_in_executor(
+            storage._writer_executor, self._put
+        )
+
+    def _put(self):
+        try:
+            return self._storage._client.put_object(
+                bucket_name=self._storage._bucket,
+                object_name=self._file_key,
+                data=self._stream,
+                length=-1,
+                part_size=self._storage._part_size,
+                num_parallel_uploads=self._storage._transfer_concurrency,
+            )
+        finally:
+            self._stream.closed = True
+
+    async def _send(self, chunk: bytes | None) -> None:
+        try:
+            await asyncio.to_thread(self._stream.put, chunk)
+        except RuntimeError:
+            await self._upload  # raises the upload error
+            raise
+
+    async def write(self, chunk: bytes) -> None:
+        await self._send(chunk)
+
+    async def commit(self) -> str:
+        await self._send(None)  # end of data
+        result = await self._upload
+        logger.info(f"Uploaded file to MinIO: {self._file_key} (etag: {result.etag})")
+        return f"s3://{self._storage._bucket}/{self._file_key}"
+
+    async def abort(self) -> None:
+        self._stream.aborted = True
+        try:
+            await self._upload
+        except Exception:  # noqa: BLE001
+            pass
+
 
 class MinioFileStorage(AbstractFileStorage):
     """S3/MinIO storage backend with presigned URLs support.
@@ -16,6 +126,13 @@ class MinioFileStorage(AbstractFileStorage):
     - Presigned URLs for secure direct access
     - Automatic bucket creation
     - Retry logic with exponential backoff
+
+    The minio client is synchronous: every call runs in a dedicated pool of
+    ``io_threads`` threads, so a transfer never blocks the event loop. Streaming uploads,
+    paced by the client, get a separate pool of ``stream_upload_threads``. Objects larger
+    than ``part_size`` move in parts, ``transfer_concurrency`` at a time: multipart
+    uploads (minio's parallel ``put_object``) and ranged GETs into one preallocated
+    buffer or file. The HTTP connection pool fits every thread and its part transfers.
     """
 
     def __init__(self, config: MinioConfig) -> None:
@@ -31,6 +148,15 @@ class MinioFileStorage(AbstractFileStorage):
         self._retry_attempts = config.retry_attempts
         self._retry_backoff = config.retry_backoff
         self._presign_expiry = config.presign_expiry
+        self._part_size = config.part_size
+        self._transfer_concurrency = max(1, config.transfer_concurrency)
+
+        io_threads = max(1, config.io_threads)
+        self._executor = ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="minio")
+        writer_threads = max(1, config.stream_upload_threads)
+        self._writer_executor = ThreadPoolExecutor(
+            max_workers=writer_threads, thread_name_prefix="minio-writer"
+        )
 
         # Initialize MinIO client
         self._client = Minio(
@@ -39,11 +165,51 @@ class MinioFileStorage(AbstractFileStorage):
             secret_key=config.secret_key,
             secure=config.secure,
             region=config.region,
+            http_client=self._http_client(
+                config, maxsize=(io_threads + writer_threads) * self._transfer_concurrency
+            ),
         )
 
         # Ensure bucket exists (idempotent)
         self._ensure_bucket_exists()
 
+    @staticmethod
+    def _http_client(config: MinioConfig, maxsize: int):
+        """minio's default PoolManager, sized to the transfer threads"""
+        import certifi
+        import urllib3
+        from urllib3.util import Retry, Timeout
+
+        return urllib3.PoolManager(
+            timeout=Timeout(connect=config.timeout_sec, read=config.timeout_sec),
+            maxsize=maxsize,
+            cert_reqs="CERT_REQUIRED" if config.secure else "CERT_NONE",
+            ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+            retries=Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+        )
+
+    async def _run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking client call in the storage thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def _run_joined(self, func: Callable[..., T], *args) -> T:
+        """``_run`` for calls that use the caller's buffer or fd.
+
+        A running thread cannot be interrupted, so a cancelled caller waits for it to return.
+        """
+        future = self._executor.submit(func, *args)
+        try:
+            return await asyncio.shield(asyncio.wrap_future(future))
+        except asyncio.CancelledError:
+            if not future.cancel():  # already running
+                await _wait_all([asyncio.wrap_future(future)])
+            raise
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._writer_executor.shutdown(wait=False, cancel_futures=True)
+
     def _ensure_bucket_exists(self) -> None:
         """Create bucket if it doesn't exist"""
         try:
@@ -62,7 +228,6 @@ class MinioFileStorage(AbstractFileStorage):
 
     async def upload_file(self, *, file_key: str, file_data: bytes) -> str:
         """Upload file to MinIO with retry logic"""
-        import asyncio
         from io import BytesIO
 
         last_exc: Exception | None = None
@@ -70,11 +235,15 @@ class MinioFileStorage(AbstractFileStorage):
             try:
                 data = BytesIO(file_data)
                 length = len(file_data)
-                result = self._client.put_object(
+                result = await self._run(
+                    self._client.put_object,
                     bucket_name=self._bucket,
                     object_name=file_key,
                     data=data,
                     length=length,
+                    # Up to 10000 parts: very large objects get larger parts
+                    part_size=max(self._part_size, -(-length // _MAX_PARTS)),
+                    num_parallel_uploads=self._transfer_concurrency,
                 )
                 logger.info(
                     f"Uploaded file to MinIO: {file_key} (etag: {result.etag}, size: {length} bytes)"
@@ -96,13 +265,15 @@ class MinioFileStorage(AbstractFileStorage):
             raise last_exc
         return f"s3://{self._bucket}/{file_key}"
 
+    def open_writer(self, *, file_key: str) -> _MinioWriter:
+        """Streaming upload, see ``_MinioWriter``"""
+        return _MinioWriter(self, file_key)
+
     async def delete_file(self, *, file_key: str) -> None:
         """Delete file from MinIO with retry logic"""
-        import asyncio
-
         for i in range(max(1, self._retry_attempts)):
             try:
-                self._client.remove_object(self._bucket, file_key)
+                await self._run(self._client.remove_object, self._bucket, file_key)
                 logger.info(f"Deleted file from MinIO: {file_key}")
                 return
             except Exception as e:
@@ -114,6 +285,58 @@ class MinioFileStorage(AbstractFileStorage):
                     logger.error(f"Failed to delete file {file_key}, but continuing")
                     return
 
+    async def delete_files(
+        self, *, file_keys: Sequence[str], concurrency: int = 4
+    ) -> DeleteFilesResult:
+        """Bulk delete: one multi-object DELETE per 1000 keys, ``concurrency`` requests at once"""
+        keys = list(dict.fromkeys(file_keys))
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def remove(batch: list[str]) -> DeleteFilesResult:
+            async with semaphore:
+                return await self._remove_batch(batch)
+
+        batches = [keys[i : i + _DELETE_BATCH] for i in range(0, len(keys), _DELETE_BATCH)]
+        result = DeleteFilesResult.merge(await asyncio.gather(*map(remove, batches)))
+        logger.info(
+            f"Deleted {result.removed} files from MinIO in {len(batches)} requests "
+            f"({len(result.failed)} failed)"
+        )
+        return result
+
+    async def _remove_batch(self, keys: list[str]) -> DeleteFilesResult:
+        from minio.deleteobjects import DeleteObject  # type: ignore
+
+        def remove():
+            # The iterator is lazy: the request is sent while it is consumed
+            objects = [DeleteObject(key) for key in keys]
+            return list(self._client.remove_objects(self._bucket, objects))
+
+        for i in range(max(1, self._retry_attempts)):
+            try:
+                errors = await self._run(remove)
+                break
+            except Exception as e:  # noqa: BLE001
+                logger.warning(
+                    f"MinIO bulk delete attempt {i + 1}/{self._retry_attempts} failed: {e}"
+                )
+                if i < self._retry_attempts - 1:
+                    await asyncio.sleep(self._retry_backoff * (2**i))
+                else:
+                    # Non-fatal for cleanup flows
+                    logger.error(f"Failed to delete {len(keys)} files, but continuing")
+                    return DeleteFilesResult(failed=list(keys))
+
+        result = DeleteFilesResult()
+        for error in errors:
+            if error.code == "NoSuchKey":
+                result.missing += 1
+            else:
+                logger.warning(f"MinIO could not delete {error.name}: {error.code} {error.message}")
+                result.failed.append(error.name)
+        result.removed = len(keys) - result.missing - len(result.failed)
+        return result
+
     async def get_presigned_url(self, *, file_key: str, expiry_sec: int | None = None) -> str:
         """Generate presigned URL for direct file download"""
         from datetime import timedelta
@@ -121,7 +344,8 @@ class MinioFileStorage(AbstractFileStorage):
         expiry = expiry_sec if expiry_sec is not None else self._presign_expiry
 
         try:
-            url = self._client.presigned_get_object(
+            url = await self._run(
+                self._client.presigned_get_object,
                 bucket_name=self._bucket,
                 object_name=file_key,
                 expires=timedelta(seconds=max(1, int(expiry))),
@@ -142,7 +366,8 @@ class MinioFileStorage(AbstractFileStorage):
         expiry = expiry_sec if expiry_sec is not None else self._presign_expiry
 
         try:
-            url = self._client.presigned_put_object(
+            url = await self._run(
+                self._client.presigned_put_object,
                 bucket_name=self._bucket,
                 object_name=file_key,
                 expires=timedelta(seconds=max(1, int(expiry))),
@@ -153,23 +378,180 @@ class MinioFileStorage(AbstractFileStorage):
             logger.error(f"Failed to generate presigned upload URL for {file_key}: {e}")
             raise
 
-    def file_exists(self, file_key: str) -> bool:
+    async def file_exists(self, file_key: str) -> bool:
         """Check if file exists in MinIO"""
         try:
-            self._client.stat_object(self._bucket, file_key)
+            await self._run(self._client.stat_object, self._bucket, file_key)
             return True
         except Exception:
             return False
 
-    async def get_file(self, file_key: str) -> bytes:
-        """Download file from MinIO"""
+    def _get_range(self, file_key: str, offset: int, length: int, etag: str | None):
+        # If-Match: every range must come from the same version of the object
+        headers = {"If-Match": etag} if etag else None
+        return self._client.get_object(
+            self._bucket, file_key, offset=offset, length=length, request_headers=headers
+        )
+
+    def _fetch_range(self, file_key: str, offset: int, length: int, etag: str, sink) -> None:
+        response = self._get_range(file_key, offset, length, etag)
         try:
-            response = self._client.get_object(self._bucket, file_key)
-            data = response.read()
+            sink(offset, length, response)
+        finally:
             response.close()
             response.release_conn()
-            logger.debug(f"Downloaded file from MinIO: {file_key} ({len(data)} bytes)")
-            return data
+
+    async def _with_retries(self, what: str, func: Callable[..., T], *args) -> T:
+        from minio.error import S3Error  # type: ignore
+
+        for i in range(max(1, self._retry_attempts)):
+            try:
+                return await self._run_joined(func, *args)
+            except S3Error:
+                raise  # the server answered: missing object, changed ETag, ...
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"MinIO {what} attempt {i + 1}/{self._retry_attempts} failed: {e}")
+                if i >= self._retry_attempts - 1:
+                    raise
+                await asyncio.sleep(self._retry_backoff * (2**i))
+
+    async def _download(self, file_key: str, open_sink: Callable[[int], Callable]) -> int:
+        """Fetch the object part by part into ``open_sink(size)``; returns the size.
+
+        The first ranged GET also tells the size and ETag; the other parts follow,
+        ``transfer_concurrency`` at a time, each retried on its own. If one part fails
+        (or the download is cancelled), the others are cancelled and this returns only
+        after every thread writing into the sink has finished.
+        """
+        from minio.error import S3Error  # type: ignore
+
+        try:
+            first = await self._with_retries(
+                "download", self._get_range, file_key, 0, self._part_size, None
+            )
+        except S3Error as e:
+            if e.code != "InvalidRange":
+                raise
+            open_sink(0)  # an empty object has no byte ranges
+            return 0
+        try:
+            size = _object_size(first)
+            etag = first.headers.get("ETag")
+            sink = open_sink(size)
+            await self._run_joined(sink, 0, min(size, self._part_size), first)
+        finally:
+            first.close()
+            first.release_conn()
+
+        semaphore = asyncio.Semaphore(self._transfer_concurrency)
+
+        async def fetch(offset: int) -> None:
+            length = min(self._part_size, size - offset)
+            async with semaphore:
+                await self._with_retries(
+                    "download", self._fetch_range, file_key, offset, length, etag, sink
+                )
+
+        tasks = [
+            asyncio.create_task(fetch(o)) for o in range(self._part_size, size, self._part_size)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await _wait_all(tasks)
+            raise
+        return size
+
+    async def get_file(self, file_key: str) -> bytes:
+        """Download file from MinIO into one preallocated buffer, parts in parallel"""
+        buffer = bytearray()
+
+        def open_sink(size: int):
+            buffer.extend(bytes(size))  # allocated once, filled in place
+            view = memoryview(buffer)
+            return lambda offset, length, response: _read_into(
+                response, view[offset : offset + length]
+            )
+
+        try:
+            await self._download(file_key, open_sink)
+            logger.debug(f"Downloaded file from MinIO: {file_key} ({len(buffer)} bytes)")
+            return bytes(buffer)
         except Exception as e:
             logger.error(f"Failed to download file {file_key}: {e}")
             raise
+
+    async def download_file(self, file_key: str, path: str | os.PathLike) -> int:
+        """Download file from MinIO to ``path`` (parts written in place, then renamed)"""
+        path = os.fspath(path)
+        tmp = f"{path}.{uuid.uuid4().hex}.part"
+        fd = await self._run(os.open, tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+
+        def open_sink(size: int):
+            os.ftruncate(fd, size)
+            return lambda offset, length, response: _write_at(fd, offset, length, response)
+
+        try:
+            size = await self._download(file_key, open_sink)
+            await self._run_joined(os.fsync, fd)
+        except BaseException as e:
+            # No part thread is writing any more: _download waits for them
+            await self._run_joined(_discard, fd, tmp)
+            logger.error(f"Failed to download file {file_key}: {e}")
+            raise
+        await self._run(_publish, fd, tmp, path)
+        logger.debug(f"Downloaded file from MinIO: {file_key} -> {path} ({size} bytes)")
+        return size
+
+
+def _discard(fd: int, tmp: str) -> None:
+    os.close(fd)
+    os.unlink(tmp)
+
+
+def _publish(fd: int, tmp: str, path: str) -> None:
+    os.close(fd)
+    os.replace(tmp, path)
+
+
+async def _wait_all(futures: Sequence[asyncio.Future]) -> None:
+    """Wait until every future is done; a cancellation meanwhile is re-raised afterwards."""
+    pending = set(futures)
+    cancelled = False
+    while pending:
+        try:
+            _, pending = await asyncio.wait(pending)
+        except asyncio.CancelledError:
+            cancelled = True
+    if cancelled:
+        raise asyncio.CancelledError
+
+
+def _object_size(response) -> int:
+    # "bytes 0-8388607/123456789" for a range; a server ignoring Range sends everything
+    content_range = response.headers.get("Content-Range")
+    if content_range:
+        return int(content_range.rsplit("/", 1)[1])
+    return int(response.headers["Content-Length"])
+
+
+def _read_into(response, view: memoryview) -> None:
+    filled = 0
+    while filled < len(view):
+        read = response.readinto(view[filled:])
+        if not read:
+            raise OSError(f"Connection closed after {filled} of {len(view)} bytes")
+        filled += read
+
+
+def _write_at(fd: int, offset: int, length: int, response, chunk: int = 1024 * 1024) -> None:
+    buffer = bytearray(min(chunk, length))
+    view = memoryview(buffer)
+    end = offset + length
+    while offset < end:
+        part = view[: min(len(buffer), end - offset)]
+        _read_into(response, part)
+        os.pwrite(fd, part, offset)
+        offset += len(part)
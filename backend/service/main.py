@@ -6,10 +6,13 @@
 import logging
 import logging.config
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 
+from service import container
+from service.presentation.dependencies.db_stats import count_db_queries
 from service.presentation.handlers.exceptions_handlers import setup_exception_handlers
+from service.presentation.routers.admin_api.admin_api import admin_router
 from service.presentation.routers.auth_api.auth_api import auth_router
 from service.presentation.routers.files_api.files_api import files_router
 from service.presentation.routers.jobs_api.jobs_api import jobs_router
@@ -28,6 +31,7 @@ def create_app() -> FastAPI:
         docs_url="/api/docs",
         openapi_url="/api/openapi.json",
         redoc_url="/api/redoc",
+        dependencies=[Depends(count_db_queries)],
     )
 
     allow_origins = getattr(config, "cors", None)
@@ -44,6 +48,7 @@ def create_app() -> FastAPI:
     app.include_router(auth_router, tags=["Auth-API"])
     app.include_router(jobs_router, tags=["Jobs-API"])
     app.include_router(files_router, tags=["Files-API"])
+    app.include_router(admin_router, tags=["Admin-API"])
     # Роутер статистики удалён как легаси (см. backend_audit.md #21)
     from service.presentation.routers.ml_api.ml_api import ml_router
 
@@ -52,8 +57,17 @@ def create_app() -> FastAPI:
     setup_exception_handlers(app)
 
     @app.get("/api/health", include_in_schema=False)
-    async def health() -> dict:
-        return {"status": "ok"}
+    async def health(response: Response) -> dict:
+        # Во время drain оркестратор ждёт state == "drained" перед остановкой реплики;
+        # 503 снимает реплику с балансировки (readiness), пока она ещё слушает порт
+        try:
+            processor = container.get(container.NewJobProcessorName)
+        except ValueError:
+            return {"status": "ok"}
+        jobs = processor.drain_status()
+        if jobs["state"] != "running":
+            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "ok" if jobs["state"] == "running" else jobs["state"], "jobs": jobs}
 
     return app
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, String
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -13,6 +13,7 @@ from service.models.key_value import (
     ServiceMode,
     ServiceType,
     SessionStatus,
+    UserTier,
 )
 
 
@@ -28,18 +29,29 @@ class User(Base):
     phone: Mapped[int | None] = mapped_column(BigInteger, comment="User phone number")
     first_name: Mapped[str | None] = mapped_column(String(50), comment="User first name")
     available_launches: Mapped[int] = mapped_column(comment="Number of available launches")
+    tier: Mapped[UserTier] = mapped_column(
+        String(50),
+        default=UserTier.STANDARD,
+        server_default=UserTier.STANDARD.value,
+        comment="Scheduling tier (fair-share weight)",
+    )
 
+    # Relationships never load implicitly (lazy="raise"): a user's history can be large,
+    # and hidden lazy loads do not work under asyncio anyway. Queries that need related
+    # rows opt in with selectinload()/joinedload(); the database cascades deletes.
     user_launches: Mapped[list["UserLaunch"]] = relationship(
         cascade="all, delete-orphan",
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
 
     # Files owned by the user
     user_files: Mapped[list["UserFile"]] = relationship(
         cascade="all, delete-orphan",
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
 
     # Note: legacy ML models removed; will be reintroduced with new design
@@ -63,10 +75,44 @@ class UserLaunch(Base):
     is_payment_taken: Mapped[bool] = mapped_column(
         default=False, comment="Flag indicating if payment was taken"
     )
+    file_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("profile.user_file.id", ondelete="SET NULL"),
+        index=True,
+        comment="Input file (dataset version) to train on; latest file when empty",
+    )
+    file_pinned: Mapped[bool] = mapped_column(
+        default=False,
+        server_default="false",
+        comment="The job was started for file_id: fail if the file is deleted",
+    )
+    estimated_cost: Mapped[int | None] = mapped_column(
+        BigInteger, comment="Expected job size (dataset rows) for shortest-first scheduling"
+    )
+    feature_count: Mapped[int | None] = mapped_column(
+        comment="Feature columns of the input dataset (runtime estimate)"
+    )
+    attempts: Mapped[int] = mapped_column(
+        default=0, server_default="0", comment="Number of processing attempts made"
+    )
+    next_attempt_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), comment="Earliest time the job may be claimed again"
+    )
+    last_error: Mapped[str | None] = mapped_column(
+        String(500), comment="Error of the last failed attempt"
+    )
+    claimed_by: Mapped[str | None] = mapped_column(
+        String(255), comment="Worker holding the lease of a PROCESSING job"
+    )
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), comment="Lease end; renewed while the job runs"
+    )
+    started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), comment="Start of the current processing attempt"
+    )
 
     user: Mapped["User"] = relationship(
         back_populates="user_launches",
-        lazy="selectin",
+        lazy="raise",
     )
 
 
@@ -93,7 +139,17 @@ class UserSession(Base):
 
 class UserFile(Base):
     __tablename__ = "user_file"
-    __table_args__ = {"schema": "profile"}
+    __table_args__ = (
+        # Keyset pages: WHERE user_id = ... ORDER BY created_at DESC, id DESC
+        Index(
+            "ix_user_file_user_mode_created_id",
+            "user_id",
+            "mode",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        {"schema": "profile"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID, primary_key=True, default=uuid.uuid4, comment="Unique image identifier"
@@ -109,7 +165,7 @@ class UserFile(Base):
 
     user: Mapped["User"] = relationship(
         back_populates="user_files",
-        lazy="selectin",
+        lazy="raise",
     )
 
 
@@ -118,7 +174,12 @@ class UserFile(Base):
 
 class ModelArtifact(Base):
     __tablename__ = "model_artifact"
-    __table_args__ = {"schema": "profile"}
+    __table_args__ = (
+        Index(
+            "ix_model_artifact_user_created_id", "user_id", text("created_at DESC"), text("id DESC")
+        ),
+        {"schema": "profile"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID, primary_key=True, default=uuid.uuid4, comment="Unique artifact identifier"
@@ -136,13 +197,17 @@ class ModelArtifact(Base):
     model_url: Mapped[str] = mapped_column(String(1000), comment="Stored model file path/URL")
     metrics: Mapped[dict | None] = mapped_column(JSONB, comment="Training metrics JSON")
 
-    user: Mapped["User"] = relationship(lazy="selectin")
-    launch: Mapped["UserLaunch"] = relationship(lazy="selectin")
+    user: Mapped["User"] = relationship(lazy="raise")
+    launch: Mapped["UserLaunch"] = relationship(lazy="raise")
 
 
 class Dataset(Base):
     __tablename__ = "dataset"
-    __table_args__ = {"schema": "profile"}
+    __table_args__ = (
+        Index("ix_dataset_user_created_id", "user_id", text("created_at DESC"), text("id DESC")),
+        Index("ux_dataset_user_mode_version", "user_id", "mode", "version", unique=True),
+        {"schema": "profile"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID, primary_key=True, default=uuid.uuid4, comment="Unique dataset identifier"
@@ -163,17 +228,39 @@ class Dataset(Base):
     version: Mapped[int] = mapped_column(
         default=1, comment="Sequential dataset version per user+mode"
     )
+    row_count: Mapped[int | None] = mapped_column(comment="Number of data rows (if validated)")
+    column_count: Mapped[int | None] = mapped_column(comment="Number of CSV columns (if validated)")
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow, comment="Creation timestamp"
     )
 
-    user: Mapped["User"] = relationship(lazy="selectin")
-    launch: Mapped[UserLaunch | None] = relationship(lazy="selectin")
+    user: Mapped["User"] = relationship(lazy="raise")
+    launch: Mapped[UserLaunch | None] = relationship(lazy="raise")
+
+
+class DatasetVersionCounter(Base):
+    """Last issued dataset version per user+mode (next one via upsert, see TrainingRepository)."""
+
+    __tablename__ = "dataset_version_counter"
+    __table_args__ = {"schema": "profile"}
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("profile.user.id", ondelete="CASCADE"), primary_key=True, comment="Owner"
+    )
+    mode: Mapped[ServiceMode] = mapped_column(
+        String(50), primary_key=True, comment="Dataset mode type"
+    )
+    last_version: Mapped[int] = mapped_column(comment="Last version issued for user+mode")
 
 
 class TrainingRun(Base):
     __tablename__ = "training_run"
-    __table_args__ = {"schema": "profile"}
+    __table_args__ = (
+        Index(
+            "ix_training_run_user_created_id", "user_id", text("created_at DESC"), text("id DESC")
+        ),
+        {"schema": "profile"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID, primary_key=True, default=uuid.uuid4, comment="Unique training run identifier"
@@ -200,9 +287,36 @@ class TrainingRun(Base):
         DateTime(timezone=True), default=datetime.utcnow, comment="Creation timestamp"
     )
 
-    user: Mapped["User"] = relationship(lazy="selectin")
-    launch: Mapped["UserLaunch"] = relationship(lazy="selectin")
-    dataset: Mapped["Dataset"] = relationship(lazy="selectin")
+    user: Mapped["User"] = relationship(lazy="raise")
+    launch: Mapped["UserLaunch"] = relationship(lazy="raise")
+    dataset: Mapped["Dataset"] = relationship(lazy="raise")
+
+
+class IdempotencyKey(Base):
+    """Stored first response of a request sent with an ``Idempotency-Key`` header."""
+
+    __tablename__ = "idempotency_key"
+    __table_args__ = (
+        Index("ux_idempotency_key_user_scope_key", "user_id", "scope", "key", unique=True),
+        {"schema": "profile"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID, primary_key=True, default=uuid.uuid4, comment="Unique record identifier"
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("profile.user.id", ondelete="CASCADE"), comment="Request owner"
+    )
+    scope: Mapped[str] = mapped_column(String(50), comment="Endpoint the key belongs to")
+    key: Mapped[str] = mapped_column(String(255), comment="Client supplied Idempotency-Key")
+    request_hash: Mapped[str] = mapped_column(String(64), comment="Fingerprint of the request")
+    status_code: Mapped[int | None] = mapped_column(comment="Stored response status code")
+    response: Mapped[dict | None] = mapped_column(
+        JSONB, comment="Stored response body; NULL while the request is in flight"
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), index=True, comment="Record may be purged after this time"
+    )
 
 
 # class TelegramBot(Base):
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class IdempotencyRecord(BaseModel):
+    """Запись ключа идемпотентности: отпечаток запроса и сохранённый первый ответ."""
+
+    id: UUID
+    user_id: UUID
+    scope: str
+    key: str
+    request_hash: str
+    status_code: int | None = None
+    response: dict[str, Any] | None = None
+    expires_at: datetime
+    created_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @property
+    def is_completed(self) -> bool:
+        return self.response is not None
@@ -1,10 +1,20 @@
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field
 
 from service.models.key_value import ProcessingStatus, ServiceMode, ServiceType
 
+TERMINAL_STATUSES = frozenset(
+    {
+        ProcessingStatus.SUCCESS,
+        ProcessingStatus.FAILURE,
+        ProcessingStatus.CANCELLED,
+        ProcessingStatus.DEAD_LETTER,
+    }
+)
+
 
 class JobLogic(BaseModel):
     id: uuid.UUID = Field(default_factory=uuid.uuid4)
@@ -12,9 +22,68 @@ class JobLogic(BaseModel):
     mode: ServiceMode
     type: ServiceType
     status: ProcessingStatus
-    # Поля источников/результатов исключены до внедрения таблицы файлов/результатов
+    # Входной файл (версия датасета); без него обучение берёт последний файл пользователя
+    file_id: uuid.UUID | None = None
+    # Задача запущена для конкретного файла: без него она падает, а не берёт последний
+    file_pinned: bool = False
     created_at: datetime | None = None
     updated_at: datetime | None = None
     is_payment_taken: bool = False
+    estimated_cost: int | None = None
+    feature_count: int | None = None
+    # Повторные попытки: номер текущей попытки, время следующей и последняя ошибка
+    attempts: int = 0
+    next_attempt_at: datetime | None = None
+    last_error: str | None = None
+    # Аренда задачи воркером (PROCESSING)
+    claimed_by: str | None = None
+    lease_expires_at: datetime | None = None
+    started_at: datetime | None = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class QueueSnapshot(BaseModel):
+    """Состояние очереди для оценки позиции и ETA задачи."""
+
+    jobs_ahead: int = 0
+    cost_ahead: int = 0  # sum of estimated_cost (rows) of the jobs ahead
+    running_jobs: int = 0
+    running_cost: int = 0
+    active_workers: int = 0  # distinct workers holding PROCESSING jobs
+
+
+class JobResultView(BaseModel):
+    """Задача вместе со всем, что нужно для ответа о результате (одна выборка)."""
+
+    job: JobLogic
+    available_launches: int
+    model_url: str | None = None
+    metrics: dict[str, Any] | None = None
+    queue: QueueSnapshot | None = None  # only for NEW jobs
+
+
+class QuotaSnapshot(BaseModel):
+    """Квота пользователя и его незавершённые задачи на момент приёма новых."""
+
+    available_launches: int
+    pending: int = 0  # NEW
+    running: int = 0  # PROCESSING
+    files_found: int = 0  # requested input files that belong to the user
+
+
+class JobEvent(BaseModel):
+    """Изменение состояния задачи: статус, прогресс стадии обучения или итоговые метрики."""
+
+    job_id: uuid.UUID
+    user_id: uuid.UUID
+    status: ProcessingStatus
+    stage: str | None = None
+    progress: float | None = None
+    model_url: str | None = None
+    metrics: dict[str, Any] | None = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
@@ -5,6 +5,13 @@ class UserTypes(StrEnum):
     REGISTERED = "REGISTERED"
 
 
+class UserTier(StrEnum):
+    """Тарифные уровни пользователей (веса для fair-share планировщика)"""
+
+    STANDARD = "STANDARD"
+    PREMIUM = "PREMIUM"
+
+
 class ServiceMode(StrEnum):
     LIPS = "LIPS"
 
@@ -25,6 +32,8 @@ class ProcessingStatus(StrEnum):
     PROCESSING = "PROCESSING"
     SUCCESS = "SUCCESS"
     FAILURE = "FAILURE"
+    CANCELLED = "CANCELLED"
+    DEAD_LETTER = "DEAD_LETTER"
 
 
 class BotJobStatus(StrEnum):
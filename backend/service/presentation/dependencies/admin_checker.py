@@ -0,0 +1,14 @@
+import hmac
+
+from fastapi import Header, HTTPException, status
+
+from service.settings import config
+
+
+def check_admin(x_admin_token: str | None = Header(None)) -> None:
+    """Проверяет заголовок X-Admin-Token для служебных (операторских) эндпоинтов."""
+    expected = config.auth.admin_token
+    if not expected:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Admin API is disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, expected):
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token")
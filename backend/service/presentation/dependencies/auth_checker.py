@@ -1,12 +1,16 @@
 import jwt
 from fastapi import Cookie, HTTPException, status
 
+from service.infrastructure.database.routing import bind_user
 from service.models.auth_models import AuthProfile
 from service.settings import config
 
 
-def check_auth(auth_token: str = Cookie(None)) -> AuthProfile:
-    """Проверяет JWT из secure cookie 'auth_token'."""
+async def check_auth(auth_token: str = Cookie(None)) -> AuthProfile:
+    """Проверяет JWT из secure cookie 'auth_token'.
+
+    Async on purpose: it binds the user for read routing in the request's own context.
+    """
     if not auth_token:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Missing auth token")
 
@@ -20,6 +24,7 @@ def check_auth(auth_token: str = Cookie(None)) -> AuthProfile:
             fingerprint=payload.get("fingerprint"),
             type=payload["type"],
         )
+        bind_user(user_profile.user_id)
 
         return user_profile
     except jwt.ExpiredSignatureError:
@@ -0,0 +1,22 @@
+from typing import AsyncIterator
+
+from fastapi import Request
+
+from service import container
+from service.infrastructure.database.instrumentation import count_request_queries
+
+
+async def count_db_queries(request: Request) -> AsyncIterator[None]:
+    """Считает SQL-запросы одного HTTP-запроса (статистика по эндпоинтам, поиск N+1)."""
+    try:
+        stats = getattr(container.get(container.PgConnectorName), "stats", None)
+    except ValueError:
+        stats = None
+    if stats is None:
+        yield
+        return
+
+    route = request.scope.get("route")
+    endpoint = f"{request.method} {getattr(route, 'path', request.url.path)}"
+    with count_request_queries(stats, endpoint):
+        yield
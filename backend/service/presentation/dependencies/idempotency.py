@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+from typing import Annotated, Awaitable, Callable, TypeVar
+from uuid import UUID
+
+from fastapi import Depends, Header, Response, status
+from pydantic import BaseModel
+
+from service import container
+from service.models.auth_models import AuthProfile
+from service.presentation.dependencies.auth_checker import check_auth
+from service.services.idempotency_service import IdempotencyService
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+@dataclass(slots=True)
+class IdempotentRequest:
+    """Request sent with an ``Idempotency-Key``: wraps the endpoint work."""
+
+    service: IdempotencyService
+    user_id: UUID
+    scope: str
+    key: str
+
+    async def run(
+        self,
+        request_hash: str,
+        handler: Callable[[], Awaitable[ResponseT]],
+        response_model: type[ResponseT],
+        response: Response,
+        status_code: int = status.HTTP_200_OK,
+    ) -> ResponseT:
+        result, replayed = await self.service.run(
+            self.user_id, self.scope, self.key, request_hash, handler, response_model, status_code
+        )
+        if replayed:
+            response.headers[REPLAYED_HEADER] = "true"
+        return result
+
+
+def idempotency(scope: str) -> Callable[..., IdempotentRequest | None]:
+    """Зависимость для эндпоинтов с заголовком ``Idempotency-Key`` (без заголовка — None)."""
+
+    def _dependency(
+        profile: Annotated[AuthProfile, Depends(check_auth)],
+        idempotency_key: Annotated[
+            str | None, Header(alias="Idempotency-Key", min_length=1, max_length=255)
+        ] = None,
+    ) -> IdempotentRequest | None:
+        if idempotency_key is None:
+            return None
+        return IdempotentRequest(
+            service=container.get(container.IdempotencyServiceName),
+            user_id=profile.user_id,
+            scope=scope,
+            key=idempotency_key,
+        )
+
+    return _dependency
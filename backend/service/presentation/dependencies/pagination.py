@@ -0,0 +1,34 @@
+from typing import Annotated, Any, Sequence
+
+from fastapi import HTTPException, Query, Response, status
+
+from service.repositories.pagination import Cursor, InvalidCursorError, next_cursor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def page_cursor(
+    cursor: Annotated[
+        str | None,
+        Query(description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} of the previous page"),
+    ] = None,
+) -> Cursor | None:
+    """Курсор страницы из query (``None`` — первая страница)."""
+    if cursor is None:
+        return None
+    try:
+        return Cursor.decode(cursor)
+    except InvalidCursorError:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+
+def set_next_cursor(response: Response, rows: Sequence[Any], limit: int) -> str | None:
+    """Expose the cursor of the next page in a header (list bodies stay plain arrays)."""
+    return set_cursor_header(response, next_cursor(rows, limit))
+
+
+def set_cursor_header(response: Response, token: str | None) -> str | None:
+    """Same as :func:`set_next_cursor` for a cursor computed by the service."""
+    if token is not None:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return token
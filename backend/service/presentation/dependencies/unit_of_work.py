@@ -0,0 +1,22 @@
+from typing import AsyncIterator
+
+from service import container
+from service.repositories.unit_of_work import unit_of_work
+
+
+async def request_unit_of_work() -> AsyncIterator[None]:
+    """Run all repository calls of the request in one session and one transaction.
+
+    Opt-in per endpoint (``dependencies=[Depends(request_unit_of_work)]``): the connection
+    stays checked out until the response is ready, so it is not meant for long-polling
+    or streaming endpoints. Commit happens before the response is sent; a failed commit
+    turns into an error response. Without a built container (tests) it is a no-op.
+    """
+    try:
+        connector = container.get(container.PgConnectorName)
+    except ValueError:
+        yield
+        return
+
+    async with unit_of_work(connector):
+        yield
@@ -0,0 +1,90 @@
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Body, Depends, Query
+
+from service import container
+from service.presentation.dependencies.admin_checker import check_admin
+from service.presentation.routers.admin_api.schemas import (
+    DbStatsResponse,
+    DeadLetterJobsResponse,
+    DrainRequest,
+    DrainStatusResponse,
+    RequeueJobsRequest,
+    RequeueJobsResponse,
+)
+
+logger = logging.getLogger(__name__)
+admin_router = APIRouter(prefix="/api/admin/v1", dependencies=[Depends(check_admin)])
+
+
+@admin_router.get(
+    "/jobs/dead-letter",
+    summary="List jobs that ran out of retry attempts",
+    response_model=DeadLetterJobsResponse,
+)
+async def list_dead_letter_jobs(
+    service: Annotated[container.JobServiceT, Depends(container.getter(container.JobServiceName))],
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    offset: Annotated[int, Query(ge=0)] = 0,
+) -> DeadLetterJobsResponse:
+
+    return await service.list_dead_letter_jobs(limit=limit, offset=offset)
+
+
+@admin_router.post(
+    "/jobs/dead-letter/requeue",
+    summary="Move dead-lettered jobs back to the queue",
+    response_model=RequeueJobsResponse,
+)
+async def requeue_dead_letter_jobs(
+    request_body: Annotated[RequeueJobsRequest, Body()],
+    service: Annotated[container.JobServiceT, Depends(container.getter(container.JobServiceName))],
+) -> RequeueJobsResponse:
+
+    return await service.requeue_dead_letter_jobs(request_body)
+
+
+@admin_router.post(
+    "/drain",
+    summary="Stop claiming jobs and let running ones finish (graceful drain)",
+    response_model=DrainStatusResponse,
+)
+async def start_drain(
+    processor: Annotated[
+        container.NewJobProcessorT, Depends(container.getter(container.NewJobProcessorName))
+    ],
+    request_body: Annotated[DrainRequest, Body()] = DrainRequest(),
+) -> DrainStatusResponse:
+
+    processor.start_drain(request_body.timeout_sec)
+    return DrainStatusResponse(**processor.drain_status())
+
+
+@admin_router.get(
+    "/drain",
+    summary="Drain progress of this replica",
+    response_model=DrainStatusResponse,
+)
+async def drain_status(
+    processor: Annotated[
+        container.NewJobProcessorT, Depends(container.getter(container.NewJobProcessorName))
+    ],
+) -> DrainStatusResponse:
+
+    return DrainStatusResponse(**processor.drain_status())
+
+
+@admin_router.get(
+    "/db/stats",
+    summary="Connection pool, query duration and per-endpoint query count stats",
+    response_model=DbStatsResponse,
+)
+async def db_stats(
+    connector: Annotated[
+        container.PgConnectorT, Depends(container.getter(container.PgConnectorName))
+    ],
+    top: Annotated[int, Query(ge=1, le=500)] = 20,
+) -> DbStatsResponse:
+
+    return DbStatsResponse(**connector.stats.snapshot(top=top))
@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Annotated
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from service.models.key_value import ServiceMode, ServiceType
+
+
+class DeadLetterJob(BaseModel):
+    job_id: Annotated[UUID, Field(..., description="Unique job identifier")]
+    user_id: Annotated[UUID, Field(..., description="Job owner")]
+    mode: Annotated[ServiceMode, Field(..., description="Processing mode")]
+    type: Annotated[ServiceType, Field(..., description="Type of service")]
+    attempts: Annotated[int, Field(..., description="Attempts made before giving up")]
+    last_error: Annotated[str | None, Field(None, description="Error of the last attempt")]
+    updated_at: Annotated[datetime | None, Field(None, description="When the job gave up")]
+
+
+class DeadLetterJobsResponse(BaseModel):
+    jobs: Annotated[list[DeadLetterJob], Field(..., description="Dead-lettered jobs, newest first")]
+
+
+class RequeueJobsRequest(BaseModel):
+    job_ids: Annotated[
+        list[UUID] | None,
+        Field(None, description="Jobs to requeue; all dead-lettered (up to limit) if omitted"),
+    ]
+    limit: Annotated[int, Field(1000, ge=1, le=10000, description="Max jobs to requeue")]
+
+
+class RequeueJobsResponse(BaseModel):
+    requeued: Annotated[int, Field(..., description="Number of jobs moved back to NEW")]
+    job_ids: Annotated[list[UUID], Field(..., description="Requeued job identifiers")]
+
+
+class DrainRequest(BaseModel):
+    timeout_sec: Annotated[
+        int | None,
+        Field(None, ge=0, description="Deadline for running jobs (default from config)"),
+    ]
+
+
+class DrainStatusResponse(BaseModel):
+    state: Annotated[str, Field(..., description="running | draining | drained")]
+    running_jobs: Annotated[int, Field(..., description="Jobs still running in this process")]
+    released_jobs: Annotated[int, Field(0, description="Unfinished jobs returned to the queue")]
+    elapsed_sec: Annotated[float | None, Field(None, description="Time since drain started")]
+    deadline_in_sec: Annotated[float | None, Field(None, description="Time left for running jobs")]
+
+
+class HistogramSnapshot(BaseModel):
+    count: Annotated[int, Field(..., description="Observations")]
+    total: Annotated[float, Field(..., description="Sum of observed values")]
+    avg: Annotated[float, Field(..., description="Mean value")]
+    p50: Annotated[float, Field(..., description="Median (bucket upper bound)")]
+    p95: Annotated[float, Field(..., description="95th percentile (bucket upper bound)")]
+    p99: Annotated[float, Field(..., description="99th percentile (bucket upper bound)")]
+    max: Annotated[float, Field(..., description="Largest observed value")]
+    buckets: Annotated[dict[str, int], Field(..., description="Observations per upper bound")]
+
+
+class PoolStatsResponse(BaseModel):
+    capacity: Annotated[int, Field(..., description="pool_size + max_overflow")]
+    in_use: Annotated[int, Field(..., description="Connections checked out now")]
+    peak_in_use: Annotated[int, Field(..., description="Most connections checked out at once")]
+    checkouts: Annotated[int, Field(..., description="Connections handed out")]
+    saturated_checkouts: Annotated[
+        int, Field(..., description="Checkouts that took the last free connection")
+    ]
+    checkout_wait_ms: Annotated[
+        HistogramSnapshot, Field(..., description="Time to get a connection, ms")
+    ]
+
+
+class QueryStatsResponse(HistogramSnapshot):
+    fingerprint: Annotated[str, Field(..., description="Short id of the normalized statement")]
+    sql: Annotated[str, Field(..., description="Statement with values replaced by ?")]
+
+
+class DbStatsResponse(BaseModel):
+    pools: Annotated[
+        dict[str, PoolStatsResponse], Field(..., description="Pools by engine (primary, replicas)")
+    ]
+    slow_query_ms: Annotated[float, Field(..., description="Slow-query log threshold")]
+    slow_queries: Annotated[int, Field(..., description="Statements over the threshold")]
+    queries: Annotated[
+        list[QueryStatsResponse],
+        Field(..., description="Statement durations in ms, most total time first"),
+    ]
+    requests: Annotated[
+        dict[str, HistogramSnapshot], Field(..., description="Statements per request by endpoint")
+    ]
@@ -4,6 +4,7 @@ from typing import Annotated
 from fastapi import APIRouter, Body, Depends, Request, Response
 
 from service import container
+from service.presentation.dependencies.unit_of_work import request_unit_of_work
 from service.presentation.routers.auth_api.schemas import (
     LoginRequest,
     LoginResponse,
@@ -22,6 +23,7 @@ auth_router = APIRouter(prefix="/api/auth/v1")
     response_model=RegisterResponse,
     summary="User registration with password",
     description="Register new user with email and password. User needs to login separately after registration.",
+    dependencies=[Depends(request_unit_of_work)],
 )
 async def register(
     request_body: Annotated[RegisterRequest, Body],
@@ -42,6 +44,7 @@ async def register(
     response_model=LoginResponse,
     summary="User login with password",
     description="Login with email and password. Returns JWT token on success.",
+    dependencies=[Depends(request_unit_of_work)],
 )
 async def login(
     request_body: Annotated[LoginRequest, Body],
@@ -2,18 +2,21 @@ import logging
 from typing import Annotated, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, UploadFile, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, UploadFile, status
 from pydantic import BaseModel
 
 from service import container
 from service.models.auth_models import AuthProfile
 from service.models.key_value import Languages, ServiceMode
 from service.presentation.dependencies.auth_checker import check_auth
+from service.presentation.dependencies.pagination import page_cursor, set_cursor_header
 from service.presentation.routers.files_api.schemas import (
     FetchModesResponse,
     FetchUserFilesResponse,
     UploadResponse,
 )
+from service.repositories.pagination import Cursor
+from service.services.upload_pipeline import UploadStream, UploadTooLargeError
 from service.settings import config
 
 logger = logging.getLogger(__name__)
@@ -42,18 +45,25 @@ async def fetch_available_modes(
 @files_router.get(
     path="/files/v1/fetch/{mode}",
     summary="Fetch user photos metadata",
-    description="Fetch metadata of all user photos.",
+    description=(
+        "Fetch metadata of user photos, newest first, one page at a time. "
+        "The cursor of the next page is returned in the X-Next-Cursor header."
+    ),
     response_model=FetchUserFilesResponse,
 )
 async def fetch_handler(
+    response: Response,
     profile: Annotated[AuthProfile, Depends(check_auth)],
     mode: Annotated[ServiceMode, Path(...)],
     service: Annotated[
         container.FileSaverServiceT,
         Depends(container.getter(container.FileSaverServiceName)),
     ],
+    cursor: Annotated[Cursor | None, Depends(page_cursor)],
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
 ) -> FetchUserFilesResponse:
-    user_files = await service.fetch_all_user_files(profile.user_id, mode)
+    user_files, token = await service.fetch_all_user_files(profile.user_id, mode, limit, cursor)
+    set_cursor_header(response, token)
     return user_files
 
 
@@ -79,18 +89,20 @@ async def upload_handler(
                 detail=f"Invalid file extension. Only: {config.allowed_extensions} allowed.",
             )
 
-        content = await file.read()
-        if len(content) > config.max_file_size_byte:
+        stream = UploadStream(file, max_bytes=config.max_file_size_byte)
+        try:
+            response = await service.save_stream(
+                user_id=profile.user_id,
+                mode=mode,
+                file_name=file_name,
+                chunks=stream,
+            )
+        except UploadTooLargeError:
             raise HTTPException(
                 status.HTTP_400_BAD_REQUEST,
                 detail=f"File too large. Max size: {config.max_file_size_byte} bytes.",
             )
-        response = await service.save(
-            user_id=profile.user_id,
-            mode=mode,
-            file_name=file_name,
-            file_content=content,
-        )
+        response.sha256 = stream.sha256
         return response
     raise HTTPException(status.HTTP_400_BAD_REQUEST, "Empty filename")
 
@@ -14,6 +14,8 @@ class FileMetadata(BaseModel):
 class UploadResponse(FileMetadata):
     # Optional storage file key (backend-internal reference)
     file_key: str | None = None
+    # SHA-256 of the uploaded content, computed while streaming it to storage
+    sha256: str | None = None
 
 
 class FetchUserFilesResponse(BaseModel):
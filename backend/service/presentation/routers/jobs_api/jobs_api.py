@@ -2,12 +2,22 @@ import logging
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Body, Depends, Path
+from fastapi import APIRouter, Body, Depends, Path, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
 from service import container
 from service.models.auth_models import AuthProfile
 from service.presentation.dependencies.auth_checker import check_auth
-from service.presentation.routers.jobs_api.schemas import JobResponse, StartJobRequest
+from service.presentation.dependencies.idempotency import IdempotentRequest, idempotency
+from service.presentation.dependencies.unit_of_work import request_unit_of_work
+from service.presentation.routers.jobs_api.schemas import (
+    JobResponse,
+    JobsBatchResponse,
+    StartJobRequest,
+    StartJobsBatchRequest,
+)
+from service.services.idempotency_service import fingerprint
 
 # from service.settings import config  # not used here, left for future extensions
 
@@ -18,15 +28,41 @@ jobs_router = APIRouter(prefix="/api/jobs/v1")
 @jobs_router.post(
     "/start",
     summary="Start a modify job",
+    dependencies=[Depends(request_unit_of_work)],
     response_model=JobResponse,
 )
 async def start_processing_job(
     profile: Annotated[AuthProfile, Depends(check_auth)],
     request_body: Annotated[StartJobRequest, Body()],
     service: Annotated[container.JobServiceT, Depends(container.getter(container.JobServiceName))],
+    idempotent: Annotated[IdempotentRequest | None, Depends(idempotency("jobs.start"))],
+    response: Response,
 ) -> JobResponse:
 
-    return await service.create_job(profile.user_id, request_body)
+    if idempotent is None:
+        return await service.create_job(profile.user_id, request_body)
+    # Retried submission with the same Idempotency-Key gets the first response back
+    return await idempotent.run(
+        fingerprint(request_body.model_dump_json()),
+        lambda: service.create_job(profile.user_id, request_body),
+        JobResponse,
+        response,
+    )
+
+
+@jobs_router.post(
+    "/start/batch",
+    summary="Enqueue several jobs in one request",
+    dependencies=[Depends(request_unit_of_work)],
+    response_model=JobsBatchResponse,
+)
+async def start_processing_jobs_batch(
+    profile: Annotated[AuthProfile, Depends(check_auth)],
+    request_body: Annotated[StartJobsBatchRequest, Body()],
+    service: Annotated[container.JobServiceT, Depends(container.getter(container.JobServiceName))],
+) -> JobsBatchResponse:
+
+    return await service.create_jobs_batch(profile.user_id, request_body)
 
 
 @jobs_router.get(
@@ -38,6 +74,64 @@ async def fetch_result(
     profile: Annotated[AuthProfile, Depends(check_auth)],
     job_id: Annotated[str, Path(...)],
     service: Annotated[container.JobServiceT, Depends(container.getter(container.JobServiceName))],
+    wait: Annotated[
+        int,
+        Query(
+            ge=0,
+            le=120,
+            description="Long-poll: hold the request up to N seconds until the status changes",
+        ),
+    ] = 0,
+) -> JobResponse:
+
+    return await service.fetch_job_result(profile.user_id, UUID(job_id), wait_sec=wait)
+
+
+@jobs_router.delete(
+    "/{job_id}",
+    summary="Cancel a queued or running job",
+    dependencies=[Depends(request_unit_of_work)],
+    response_model=JobResponse,
+)
+async def cancel_job(
+    profile: Annotated[AuthProfile, Depends(check_auth)],
+    job_id: Annotated[UUID, Path(...)],
+    service: Annotated[container.JobServiceT, Depends(container.getter(container.JobServiceName))],
 ) -> JobResponse:
 
-    return await service.fetch_job_result(profile.user_id, UUID(job_id))
+    return await service.cancel_job(profile.user_id, job_id)
+
+
+def _format_sse(event_name: str, payload: BaseModel | None) -> str:
+    if payload is None:
+        return f": {event_name}\n\n"
+    return f"event: {event_name}\ndata: {payload.model_dump_json()}\n\n"
+
+
+@jobs_router.get(
+    "/stream/{job_id}",
+    summary="Stream job status, stage progress and final result (Server-Sent Events)",
+    response_class=StreamingResponse,
+)
+async def stream_result(
+    profile: Annotated[AuthProfile, Depends(check_auth)],
+    job_id: Annotated[UUID, Path(...)],
+    service: Annotated[container.JobServiceT, Depends(container.getter(container.JobServiceName))],
+) -> StreamingResponse:
+    updates = service.stream_job_updates(profile.user_id, job_id)
+    # Resolve the snapshot before the response starts so 404 is returned as usual
+    first = await anext(updates)
+
+    async def _events():
+        try:
+            yield _format_sse(*first)
+            async for update in updates:
+                yield _format_sse(*update)
+        finally:
+            await updates.aclose()
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
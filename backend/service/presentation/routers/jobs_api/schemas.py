@@ -13,6 +13,13 @@ class StartJobRequest(BaseModel):
     type: Annotated[ServiceType, Field(..., description="Type of service to apply")]
 
 
+class StartJobsBatchRequest(BaseModel):
+    jobs: Annotated[
+        list[StartJobRequest],
+        Field(..., min_length=1, description="Jobs to enqueue in a single transaction"),
+    ]
+
+
 class JobResponse(BaseModel):
     job_id: Annotated[UUID, Field(..., description="Unique job identifier")]
     status: Annotated[ProcessingStatus, Field(..., description="Current job processing status")]
@@ -25,7 +32,18 @@ class JobResponse(BaseModel):
     wait_time_sec: Annotated[
         int, Field(..., description="Estimated wait time in seconds before job completion")
     ]
+    queue_position: Annotated[
+        int | None,
+        Field(None, description="Position in the queue: 1 is next, 0 is running"),
+    ]
+    eta_sec: Annotated[
+        int | None, Field(None, description="Estimated seconds until the job finishes")
+    ]
     model_url: Annotated[str | None, Field(None, description="URL модели (ML TRAIN jobs)")]
     metrics: Annotated[
         MetricsResponse | None, Field(None, description="Метрики обучения (ML TRAIN jobs)")
     ]
+
+
+class JobsBatchResponse(BaseModel):
+    jobs: Annotated[list[JobResponse], Field(..., description="Enqueued jobs in request order")]
@@ -1,12 +1,19 @@
 """Minimal ML API (v1): datasets, training runs, artifacts lists."""
 
+import asyncio
+from pathlib import Path
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
 
+from service.infrastructure.storage.abstract_file_storage import delete_many
+from service.infrastructure.storage.local_file_storage import unlink_paths
 from service.models.auth_models import AuthProfile
 from service.models.key_value import ServiceMode
 from service.presentation.dependencies.auth_checker import check_auth
+from service.presentation.dependencies.idempotency import IdempotentRequest, idempotency
+from service.presentation.dependencies.pagination import page_cursor, set_next_cursor
+from service.presentation.dependencies.unit_of_work import request_unit_of_work
 from service.presentation.routers.ml_api.schemas import (
     ArtifactDeleteResponse,
     DatasetResponse,
@@ -19,8 +26,17 @@ from service.presentation.routers.ml_api.schemas import (
     TrainingRunResponse,
 )
 from service.repositories.file_repository import FileRepository
+from service.repositories.pagination import Cursor
 from service.repositories.training_repository import TrainingRepository
 from service.services.file_saver_service import FileSaverService
+from service.services.idempotency_service import fingerprint
+from service.services.upload_pipeline import (
+    CsvValidator,
+    UploadStream,
+    UploadTooLargeError,
+    content_sha256,
+)
+from service.settings import config
 
 ml_router = APIRouter(prefix="/api/ml/v1")
 
@@ -46,25 +62,34 @@ def get_file_repo() -> FileRepository:
 @ml_router.get("/training-runs", response_model=list[TrainingRunResponse])
 async def list_training_runs(
     profile: Annotated[AuthProfile, Depends(check_auth)],
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
+    cursor: Cursor | None = Depends(page_cursor),
     repo: TrainingRepository = Depends(get_training_repo),
 ):
-    items = await repo.list_training_runs(profile.user_id, limit=limit)
+    items = await repo.list_training_runs(profile.user_id, limit=limit, cursor=cursor)
+    set_next_cursor(response, items, limit)
     return items
 
 
 @ml_router.get("/artifacts", response_model=list[ModelArtifactResponse])
 async def list_artifacts(
     profile: Annotated[AuthProfile, Depends(check_auth)],
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
+    cursor: Cursor | None = Depends(page_cursor),
     repo: TrainingRepository = Depends(get_training_repo),
 ):
-    items = await repo.list_artifacts(profile.user_id, limit=limit)
+    items = await repo.list_artifacts(profile.user_id, limit=limit, cursor=cursor)
+    set_next_cursor(response, items, limit)
     return items
 
 
 @ml_router.delete(
-    "/artifacts/{artifact_id}", response_model=ArtifactDeleteResponse, status_code=200
+    "/artifacts/{artifact_id}",
+    response_model=ArtifactDeleteResponse,
+    status_code=200,
+    dependencies=[Depends(request_unit_of_work)],
 )
 async def delete_artifact(
     artifact_id: str,
@@ -104,12 +129,9 @@ async def delete_artifact(
         return _os.path.join(root, path_url)
 
     abs_path = _resolve(model_url)
-    try:
-        _os.remove(abs_path)
-    except FileNotFoundError:
+    deleted = await unlink_paths({model_url: Path(abs_path)})
+    if deleted.missing:
         logger.debug("Файл артефакта уже отсутствует: %s", abs_path)
-    except Exception as e:  # noqa: BLE001
-        logger.warning("Ошибка удаления файла артефакта %s: %s", abs_path, e)
 
     return ArtifactDeleteResponse(id=art_uuid)
 
@@ -117,46 +139,59 @@ async def delete_artifact(
 @ml_router.get("/datasets", response_model=list[DatasetResponse])
 async def list_datasets(
     profile: Annotated[AuthProfile, Depends(check_auth)],
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
+    cursor: Cursor | None = Depends(page_cursor),
     repo: TrainingRepository = Depends(get_training_repo),
     saver: FileSaverService = Depends(get_file_saver),
     file_repo: FileRepository = Depends(get_file_repo),
 ):
-    """Список датасетов пользователя с presigned URLs (если MinIO включён)."""
-    items = await repo.list_datasets(profile.user_id, limit=limit)
+    """Список датасетов пользователя с presigned URLs (если MinIO включён).
 
-    # Add presigned URLs if storage backend supports it
-    result = []
-    for dataset in items:
-        dataset_dict = dataset.model_dump()
+    Read-only: both queries may go to a replica, and no connection is held while
+    the URLs are presigned.
+    """
+    items = await repo.list_datasets(profile.user_id, limit=limit, cursor=cursor)
+    set_next_cursor(response, items, limit)
+    # Get file metadata to retrieve file_name (storage key), one query for the page
+    user_files = await file_repo.fetch_user_files_by_ids(
+        profile.user_id, [dataset.id for dataset in items]
+    )
+    file_keys = {user_file.id: user_file.file_name for user_file in user_files}
 
-        # Try to get presigned URL for MinIO backend
+    async def _download_url(dataset) -> str | None:
+        if dataset.id not in file_keys:
+            return None
         try:
-            # Get file metadata to retrieve file_name (storage key)
-            user_file = await file_repo.fetch_user_file_by_id(profile.user_id, dataset.id)
-            if user_file:
-                presigned_url = await saver.get_presigned_url_by_key(
-                    file_key=user_file.file_name, expiry_sec=3600  # 1 hour default
-                )
-                if presigned_url:
-                    dataset_dict["download_url"] = presigned_url
+            return await saver.get_presigned_url_by_key(
+                file_key=file_keys[dataset.id], expiry_sec=3600  # 1 hour default
+            )
         except Exception:
             # If presigned URL generation fails, just skip it
-            pass
-
-        result.append(DatasetResponse(**dataset_dict))
+            return None
 
-    return result
+    urls = await asyncio.gather(*(_download_url(dataset) for dataset in items))
+    return [
+        DatasetResponse.model_validate(dataset).model_copy(update={"download_url": url or None})
+        for dataset, url in zip(items, urls)
+    ]
 
 
-@ml_router.post("/datasets/upload", response_model=DatasetUploadResponse, status_code=201)
+@ml_router.post(
+    "/datasets/upload",
+    response_model=DatasetUploadResponse,
+    status_code=201,
+    dependencies=[Depends(request_unit_of_work)],
+)
 async def upload_dataset(
     profile: Annotated[AuthProfile, Depends(check_auth)],
+    response: Response,
     mode: ServiceMode = Query(ServiceMode.LIPS),
     file: UploadFile = File(...),
     saver: FileSaverService = Depends(get_file_saver),
     repo: TrainingRepository = Depends(get_training_repo),
     file_repo: FileRepository = Depends(get_file_repo),
+    idempotent: IdempotentRequest | None = Depends(idempotency("datasets.upload")),
 ):
     """Загрузка CSV датасета и регистрация Dataset записи.
 
@@ -164,7 +199,29 @@ async def upload_dataset(
     - расширение .csv
     - размер > 0 байт
     - базовая проверка CSV (не пустой, >= 2 колонки)
+
+    С заголовком ``Idempotency-Key`` повторная загрузка того же содержимого (sha256)
+    возвращает сохранённый ответ без валидации и записи файла; другой файл с тем же
+    ключом получает 422.
     """
+    if idempotent is None:
+        return await _store_dataset(profile, mode, file, saver, repo)
+    return await idempotent.run(
+        fingerprint(mode, file.filename, await content_sha256(file)),
+        lambda: _store_dataset(profile, mode, file, saver, repo),
+        DatasetUploadResponse,
+        response,
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+async def _store_dataset(
+    profile: AuthProfile,
+    mode: ServiceMode,
+    file: UploadFile,
+    saver: FileSaverService,
+    repo: TrainingRepository,
+) -> DatasetUploadResponse:
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Только .csv поддерживается"
@@ -172,103 +229,34 @@ async def upload_dataset(
 
     import os
 
-    raw = await file.read()
-    if len(raw) == 0:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Пустой файл")
-
     # Size limit (env MAX_CSV_UPLOAD_BYTES, default 10 MiB)
     try:
         max_bytes = int(os.getenv("MAX_CSV_UPLOAD_BYTES", str(10 * 1024 * 1024)))
     except Exception:
         max_bytes = 10 * 1024 * 1024
-    if len(raw) > max_bytes:
-        raise HTTPException(
-            status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail="Файл слишком большой"
-        )
-
-    # Lightweight CSV validation without heavy deps to avoid Windows NumPy access violation
+    # Minimum data rows (env MIN_CSV_DATA_ROWS, default 2)
     try:
-        import csv
-        import io
-
-        # Decode to text stream; tolerate minor encoding issues
-        text_stream = io.TextIOWrapper(
-            io.BytesIO(raw), encoding="utf-8", errors="replace", newline=""
-        )
-        reader = csv.reader(text_stream)
-
-        header = next(reader, None)
-        if not header:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Отсутствует заголовок CSV"
-            )
-        cleaned_header = [c.strip() for c in header if c is not None and str(c).strip() != ""]
-        if len(cleaned_header) < 2:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Недостаточно колонок в CSV"
-            )
-
-        data_rows = []
-        for row in reader:
-            if row and any(str(cell).strip() != "" for cell in row):
-                data_rows.append(row)
-
-        if not data_rows:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Пустой CSV без данных"
-            )
-
-        # Minimum data rows (env MIN_CSV_DATA_ROWS, default 2)
-        try:
-            import os as _os
-
-            min_rows = int(_os.getenv("MIN_CSV_DATA_ROWS", "2"))
-        except Exception:
-            min_rows = 2
-        if len(data_rows) < min_rows:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Недостаточно строк данных: {len(data_rows)} < {min_rows}",
-            )
+        min_rows = int(os.getenv("MIN_CSV_DATA_ROWS", "2"))
+    except Exception:
+        min_rows = 2
+    # NaN / пустые значения доля (env MAX_EMPTY_RATIO, default 0.5)
+    try:
+        max_empty_ratio = float(os.getenv("MAX_EMPTY_RATIO", "0.5"))
+    except Exception:
+        max_empty_ratio = 0.5
 
-        # NaN / пустые значения доля (env MAX_EMPTY_RATIO, default 0.5)
-        try:
-            max_empty_ratio = float(_os.getenv("MAX_EMPTY_RATIO", "0.5"))
-        except Exception:
-            max_empty_ratio = 0.5
-        total_cells = len(data_rows) * len(cleaned_header)
-        empty_cells = 0
-        for r in data_rows:
-            empty_cells += sum(
-                1
-                for cell in r
-                if str(cell).strip() == "" or cell.lower() in {"nan", "none", "null"}
-            )
-        if total_cells > 0 and (empty_cells / total_cells) > max_empty_ratio:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Слишком много пустых значений в CSV",
-            )
-    except HTTPException:
-        raise
-    except Exception as e:  # noqa: BLE001
+    # Lightweight CSV validation without heavy deps to avoid Windows NumPy access violation.
+    # The file is streamed to storage chunk by chunk; a failed check discards it.
+    csv_check = CsvValidator(min_rows=min_rows, max_empty_ratio=max_empty_ratio)
+    stream = UploadStream(file, max_bytes=max_bytes, validators=[csv_check])
+    try:
+        # Persist file via FileSaverService (will generate masked name)
+        upload_resp = await saver.save_stream(profile.user_id, mode, file.filename, stream)
+    except UploadTooLargeError:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Ошибка чтения CSV: {e}"
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail="Файл слишком большой"
         )
 
-    # Persist file via FileSaverService (will generate masked name)
-    upload_resp = await saver.save(profile.user_id, mode, file.filename, raw)
-
-    # Register Dataset
-    dataset = await repo.get_or_create_dataset_from_file(
-        user_id=profile.user_id,
-        launch_id=None,
-        mode=mode,
-        # Store internal storage key rather than original filename for TTL alignment
-        file_name=upload_resp.file_key or file.filename,
-        file_url=upload_resp.file_url,
-    )
-
     # Attempt presigned URL if supported
     presigned: str | None = None
     try:
@@ -280,14 +268,29 @@ async def upload_dataset(
     except Exception:
         presigned = None
 
+    # Register Dataset last: the version counter row stays locked until commit
+    dataset = await repo.get_or_create_dataset_from_file(
+        user_id=profile.user_id,
+        launch_id=None,
+        mode=mode,
+        # Store internal storage key rather than original filename for TTL alignment
+        file_name=upload_resp.file_key or file.filename,
+        file_url=upload_resp.file_url,
+        # Dataset shape drives shortest-expected-first job scheduling
+        row_count=csv_check.rows,
+        column_count=len(csv_check.header),
+    )
+
     return DatasetUploadResponse(
         dataset_id=dataset.id,
+        file_id=upload_resp.file_id,
         file_url=dataset.file_url,
         name=dataset.name,  # internal key or original name
         mode=dataset.mode.value if hasattr(dataset.mode, "value") else str(dataset.mode),
         version=getattr(dataset, "version", 1),
         created_at=dataset.created_at,
         download_url=presigned,
+        sha256=stream.sha256,
     )
 
 
@@ -337,8 +340,10 @@ async def get_file_download_url(
 @ml_router.get("/metrics/trends", response_model=list[MetricTrendPoint])
 async def list_metrics_trends(
     profile: Annotated[AuthProfile, Depends(check_auth)],
+    response: Response,
     mode: ServiceMode | None = Query(None),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Cursor | None = Depends(page_cursor),
     repo: TrainingRepository = Depends(get_training_repo),
 ):
     """Список точек тренда метрик обучения.
@@ -347,8 +352,12 @@ async def list_metrics_trends(
     Параметры:
     - mode: фильтр по режиму датасета (опционально)
     - limit: максимум точек (по умолчанию 50)
+    - cursor: продолжение с предыдущей страницы (заголовок X-Next-Cursor)
     """
-    rows = await repo.list_training_metrics_trends(profile.user_id, mode=mode, limit=limit)
+    rows = await repo.list_training_metrics_trends(
+        profile.user_id, mode=mode, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, [tr for tr, _ in rows], limit)
     return [
         MetricTrendPoint(
             run_id=tr.id,
@@ -501,22 +510,15 @@ async def cleanup_expired_datasets(
 
     file_keys = await repo.cleanup_expired_datasets(cutoff=cutoff, limit=limit)
 
-    files_removed = 0
-    files_missing = 0
-    for key in file_keys:
-        try:
-            await saver.storage.delete_file(file_key=key)
-            files_removed += 1
-        except FileNotFoundError:
-            files_missing += 1
-        except Exception:
-            # non-fatal
-            files_missing += 1
+    deleted = await delete_many(
+        saver.storage, file_keys, concurrency=config.storage_delete_concurrency
+    )
 
     return DatasetTTLResponse(
         cutoff=cutoff,
         limit=limit,
         deleted=len(file_keys),
-        files_removed=files_removed,
-        files_missing=files_missing,
+        files_removed=deleted.removed,
+        # non-fatal: failed deletions are reported as missing
+        files_missing=deleted.missing + len(deleted.failed),
     )
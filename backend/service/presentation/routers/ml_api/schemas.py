@@ -115,6 +115,8 @@ class DatasetUploadResponse(BaseModel):
     """Ответ на успешную загрузку датасета (CSV)."""
 
     dataset_id: UUID
+    # Входной файл для запуска обучения на этой версии (StartJobRequest.file_id)
+    file_id: Optional[UUID] = None
     file_url: str
     name: str
     mode: str
@@ -122,6 +124,8 @@ class DatasetUploadResponse(BaseModel):
     created_at: datetime
     # Если доступно: временная ссылка для скачивания, напр. из MinIO
     download_url: Optional[str] = None
+    # SHA-256 содержимого, считается при потоковой записи
+    sha256: Optional[str] = None
 
 
 class PresignedUrlResponse(BaseModel):
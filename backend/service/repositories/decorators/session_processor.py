@@ -1,10 +1,13 @@
 import logging
+from contextlib import contextmanager
 from functools import wraps
-from typing import Any, Callable, Coroutine, ParamSpec, TypeVar
+from typing import Any, Callable, Coroutine, Iterator, ParamSpec, TypeVar
 
 from sqlalchemy.exc import IntegrityError, MultipleResultsFound, NoResultFound, OperationalError
 
+from service.infrastructure.database.instrumentation import call_site
 from service.infrastructure.database.postgresql import PgConnector
+from service.infrastructure.database.routing import ReadYourWrites, session_wrote
 from service.repositories.exceptions import (
     RepositoryError,
     RepositoryIntegrityError,
@@ -12,6 +15,7 @@ from service.repositories.exceptions import (
     RepositoryNotFoundError,
     RepositoryOperationalError,
 )
+from service.repositories.unit_of_work import current_session
 
 logger = logging.getLogger(__name__)
 
@@ -20,14 +24,25 @@ P = ParamSpec("P")
 R = TypeVar("R")
 
 
-def connection() -> (
-    Callable[[Callable[P, Coroutine[Any, Any, R]]], Callable[P, Coroutine[Any, Any, R]]]
-):
+def connection(
+    read_only: bool = False,
+) -> Callable[[Callable[P, Coroutine[Any, Any, R]]], Callable[P, Coroutine[Any, Any, R]]]:
+    """Inject a ``session`` and commit (or join the running unit of work).
+
+    ``read_only`` methods may be served by a replica when the connector has one and the
+    read routing allows it (no recent write of the same user, see ``routing``).
+    """
+
     def decorator(
         func: Callable[P, Coroutine[Any, Any, R]],
     ) -> Callable[P, Coroutine[Any, Any, R]]:
         @wraps(func)
         async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            # Slow statements are logged with the repository method that ran them
+            with call_site(func.__qualname__):
+                return await _run(*args, **kwargs)
+
+        async def _run(*args: P.args, **kwargs: P.kwargs) -> R:
 
             # fetch connector from self
             self_instance = args[0]
@@ -35,40 +50,63 @@ def connection() -> (
                 raise AttributeError("Instance must have 'connector' attribute")
 
             connector: PgConnector = getattr(self_instance, "connector")
+            routing: ReadYourWrites | None = getattr(connector, "read_routing", None)
 
-            async with connector.get_session_context() as session:
+            # Inside a unit of work: join its session, it commits/rolls back once at the end
+            if (session := current_session()) is not None:
+                kwargs["session"] = session
+                with _translate_errors():
+                    result = await func(*args, **kwargs)
+                    await session.flush()
+                if routing is not None and session_wrote(session):
+                    routing.note_write()
+                return result
+
+            to_replica = read_only and routing is not None and not routing.reads_need_primary()
+            session_context = (
+                connector.get_session_context(read_only=True)
+                if to_replica
+                else connector.get_session_context()
+            )
+            async with session_context as session:
                 try:
                     kwargs["session"] = session
-                    result = await func(*args, **kwargs)
+                    with _translate_errors():
+                        result = await func(*args, **kwargs)
+                        await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+                if routing is not None and session_wrote(session):
+                    routing.note_write()
+                return result
 
-                    await session.commit()
-                    return result
+        return wrapper
 
-                except IntegrityError as exc:
-                    await session.rollback()
-                    logger.exception("Data integrity violation")
-                    raise RepositoryIntegrityError("Uniqueness violation") from exc
+    return decorator
 
-                except NoResultFound as exc:
-                    await session.rollback()
-                    logger.warning("Record not found: %s", exc)
-                    raise RepositoryNotFoundError("Record not found") from exc
 
-                except MultipleResultsFound as exc:
-                    await session.rollback()
-                    logger.exception("Multiple records found")
-                    raise RepositoryMultipleResultsError() from exc
+@contextmanager
+def _translate_errors() -> Iterator[None]:
+    """Map SQLAlchemy errors to repository exceptions."""
+    try:
+        yield
+    except IntegrityError as exc:
+        logger.exception("Data integrity violation")
+        raise RepositoryIntegrityError("Uniqueness violation") from exc
 
-                except OperationalError as exc:
-                    await session.rollback()
-                    logger.exception("Database connection error")
-                    raise RepositoryOperationalError("Database unavailable") from exc
+    except NoResultFound as exc:
+        logger.warning("Record not found: %s", exc)
+        raise RepositoryNotFoundError("Record not found") from exc
 
-                except Exception as exc:
-                    await session.rollback()
-                    logger.exception("Unexpected error occurred")
-                    raise RepositoryError("Internal repository error") from exc
+    except MultipleResultsFound as exc:
+        logger.exception("Multiple records found")
+        raise RepositoryMultipleResultsError() from exc
 
-        return wrapper
+    except OperationalError as exc:
+        logger.exception("Database connection error")
+        raise RepositoryOperationalError("Database unavailable") from exc
 
-    return decorator
+    except Exception as exc:
+        logger.exception("Unexpected error occurred")
+        raise RepositoryError("Internal repository error") from exc
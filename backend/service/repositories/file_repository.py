@@ -8,17 +8,39 @@ from service.models.db.db_models import UserFile
 from service.models.key_value import ServiceMode
 from service.repositories.base_repository import BseRepository
 from service.repositories.decorators.session_processor import connection
+from service.repositories.pagination import Cursor, keyset_page
 
 logger = logging.getLogger(__name__)
 
 
 class FileRepository(BseRepository):
-    @connection()
+    @connection(read_only=True)
     async def fetch_user_files_metadata(
-        self, user_id: UUID, mode: ServiceMode, session: AsyncSession | None = None
+        self,
+        user_id: UUID,
+        mode: ServiceMode,
+        limit: int = 100,
+        cursor: Cursor | None = None,
+        session: AsyncSession | None = None,
+    ) -> list[UserFile]:
+        stmt = keyset_page(
+            select(UserFile).where(UserFile.user_id == user_id, UserFile.mode == mode),
+            UserFile.created_at,
+            UserFile.id,
+            cursor,
+            limit,
+        )
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+    @connection(read_only=True)
+    async def fetch_user_files_by_ids(
+        self, user_id: UUID, file_ids: list[UUID], session: AsyncSession | None = None
     ) -> list[UserFile]:
+        if not file_ids:
+            return []
         result = await session.execute(
-            select(UserFile).where(UserFile.user_id == user_id, UserFile.mode == mode)
+            select(UserFile).where(UserFile.user_id == user_id, UserFile.id.in_(file_ids))
         )
         return list(result.scalars().all())
 
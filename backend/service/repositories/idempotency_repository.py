@@ -0,0 +1,115 @@
+import logging
+from datetime import timedelta
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, func, null, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from service.models.db.db_models import IdempotencyKey
+from service.models.idempotency_models import IdempotencyRecord
+from service.repositories.base_repository import BaseRepository
+from service.repositories.decorators.session_processor import connection
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyRepository(BaseRepository):
+
+    @connection()
+    async def reserve(
+        self,
+        user_id: UUID,
+        scope: str,
+        key: str,
+        request_hash: str,
+        *,
+        ttl_sec: int,
+        in_flight_timeout_sec: int,
+        session: AsyncSession | None = None,
+    ) -> tuple[IdempotencyRecord, bool]:
+        """Take the key for a new request.
+
+        Returns ``(record, True)`` when the caller owns the key and must do the work;
+        ``(existing_record, False)`` when the key is already used. Expired records and
+        requests stuck in flight longer than ``in_flight_timeout_sec`` are taken over
+        in the same statement; a record released or purged right after the conflict
+        is reserved again.
+        """
+        table = IdempotencyKey.__table__
+        stmt = insert(IdempotencyKey).values(
+            id=uuid4(),
+            user_id=user_id,
+            scope=scope,
+            key=key,
+            request_hash=request_hash,
+            expires_at=func.now() + timedelta(seconds=ttl_sec),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.scope, table.c.key],
+            set_={
+                "request_hash": stmt.excluded.request_hash,
+                "status_code": null(),
+                # null() keeps SQL NULL; None would be stored as JSON 'null'
+                "response": null(),
+                "expires_at": stmt.excluded.expires_at,
+                "created_at": func.now(),
+            },
+            where=or_(
+                table.c.expires_at <= func.now(),
+                (table.c.response.is_(None))
+                & (table.c.created_at <= func.now() - timedelta(seconds=in_flight_timeout_sec)),
+            ),
+        ).returning(IdempotencyKey)
+        stmt = stmt.execution_options(populate_existing=True)
+
+        existing_stmt = select(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key,
+        )
+        while True:
+            reserved = (await session.execute(stmt)).scalar_one_or_none()
+            if reserved is not None:
+                return IdempotencyRecord.model_validate(reserved), True
+            existing = (await session.execute(existing_stmt)).scalar_one_or_none()
+            if existing is not None:
+                return IdempotencyRecord.model_validate(existing), False
+            # Released or purged between the two statements: the key is free again
+            logger.debug(f"Idempotency key of user {user_id} vanished, reserving again")
+
+    @connection()
+    async def complete(
+        self,
+        record_id: UUID,
+        status_code: int,
+        response: dict[str, Any],
+        session: AsyncSession | None = None,
+    ) -> None:
+        stmt = (
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == record_id)
+            .values(status_code=status_code, response=response)
+        )
+        await session.execute(stmt)
+
+    @connection()
+    async def release(self, record_id: UUID, session: AsyncSession | None = None) -> None:
+        """Drop an unfinished record so the client can retry a failed request."""
+        stmt = delete(IdempotencyKey).where(
+            IdempotencyKey.id == record_id, IdempotencyKey.response.is_(None)
+        )
+        await session.execute(stmt)
+
+    @connection()
+    async def delete_expired(self, limit: int = 1000, session: AsyncSession | None = None) -> int:
+        expired = (
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.expires_at <= func.now())
+            .limit(limit)
+            .scalar_subquery()
+        )
+        stmt = delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired))
+        result = await session.execute(stmt)
+        return result.rowcount or 0
@@ -1,17 +1,154 @@
 import logging
+from datetime import datetime, timedelta
+from typing import Callable
 from uuid import UUID
 
-from sqlalchemy import select, update
+from sqlalchemy import (
+    BigInteger,
+    Integer,
+    and_,
+    bindparam,
+    case,
+    func,
+    literal,
+    or_,
+    select,
+    true,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from service.models.db.db_models import UserLaunch
-from service.models.jobs_models import JobLogic
+from service.models.db.db_models import (
+    Dataset,
+    ModelArtifact,
+    TrainingRun,
+    User,
+    UserFile,
+    UserLaunch,
+)
+from service.models.jobs_models import JobLogic, JobResultView, QueueSnapshot, QuotaSnapshot
 from service.models.key_value import ProcessingStatus
 from service.repositories.base_repository import BaseRepository
 from service.repositories.decorators.session_processor import connection
 
 logger = logging.getLogger(__name__)
 
+# (candidates as (job, user tier), running jobs per user, limit) -> jobs to claim
+JobSelector = Callable[[list[tuple[JobLogic, str | None]], dict[UUID, int], int], list[JobLogic]]
+# Quota of the user (row locked) -> whether the jobs may be enqueued
+QuotaAdmission = Callable[[QuotaSnapshot], bool]
+
+# Hot statements are built once at import; calls only bind parameters, so neither the
+# construct nor its cache key is rebuilt per request (SQLAlchemy reuses the compiled SQL,
+# asyncpg the prepared statement).
+_JOB_BY_ID = select(UserLaunch).where(
+    UserLaunch.id == bindparam("job_id"), UserLaunch.user_id == bindparam("user_id")
+)
+
+
+def _queue_columns(launch, job_id, created_before, default_cost) -> list:
+    """Queue snapshot aggregates over ``launch`` rows (see ``fetch_queue_snapshot``)."""
+    is_new = and_(launch.status == ProcessingStatus.NEW, launch.id != job_id)
+    is_ready = or_(launch.next_attempt_at.is_(None), launch.next_attempt_at <= func.now())
+    ahead = and_(is_new, is_ready)
+    if created_before is not None:
+        ahead = and_(ahead, launch.created_at < created_before)
+    is_running = launch.status == ProcessingStatus.PROCESSING
+    cost = func.coalesce(launch.estimated_cost, default_cost)
+    return [
+        func.count(launch.id).filter(ahead).label("jobs_ahead"),
+        func.coalesce(func.sum(cost).filter(ahead), 0).label("cost_ahead"),
+        func.count(launch.id).filter(is_running).label("running_jobs"),
+        func.coalesce(func.sum(cost).filter(is_running), 0).label("running_cost"),
+        func.count(func.distinct(launch.claimed_by)).filter(is_running).label("active_workers"),
+    ]
+
+
+def _job_result_view_stmt():
+    run = (
+        select(TrainingRun.model_url, TrainingRun.metrics)
+        .where(TrainingRun.launch_id == UserLaunch.id, TrainingRun.user_id == bindparam("user_id"))
+        .order_by(TrainingRun.created_at.desc())
+        .limit(1)
+        .lateral("run")
+    )
+    artifact = (
+        select(ModelArtifact.model_url, ModelArtifact.metrics)
+        .where(
+            ModelArtifact.launch_id == UserLaunch.id,
+            ModelArtifact.user_id == bindparam("user_id"),
+        )
+        .order_by(ModelArtifact.created_at.desc())
+        .limit(1)
+        .lateral("artifact")
+    )
+    # Queue position of a NEW job; for other statuses the filter skips the scan
+    queued = aliased(UserLaunch, name="queued")
+    default_cost = bindparam("default_cost", type_=BigInteger)
+    queue = (
+        select(*_queue_columns(queued, UserLaunch.id, UserLaunch.created_at, default_cost))
+        .where(
+            UserLaunch.status == ProcessingStatus.NEW,
+            queued.status.in_([ProcessingStatus.NEW, ProcessingStatus.PROCESSING]),
+        )
+        .lateral("queue")
+    )
+    return (
+        select(
+            *UserLaunch.__table__.columns,
+            User.available_launches,
+            run.c.model_url.label("run_model_url"),
+            run.c.metrics.label("run_metrics"),
+            artifact.c.model_url.label("artifact_model_url"),
+            artifact.c.metrics.label("artifact_metrics"),
+            *queue.c,
+        )
+        .join(User, User.id == UserLaunch.user_id)
+        .outerjoin(run, true())
+        .outerjoin(artifact, true())
+        .join(queue, true())
+        .where(UserLaunch.id == bindparam("job_id"), UserLaunch.user_id == bindparam("user_id"))
+    )
+
+
+def _claim_candidates_stmt(per_user: bool):
+    """NEW jobs ranked per user, locked; ``per_user`` adds the ``per_user_limit`` cut."""
+    scan_limit = bindparam("scan_limit", type_=Integer)
+    ranked = select(
+        UserLaunch.id.label("id"),
+        func.row_number()
+        .over(
+            partition_by=UserLaunch.user_id,
+            order_by=(UserLaunch.estimated_cost.asc().nulls_last(), UserLaunch.created_at),
+        )
+        .label("rank"),
+    ).where(
+        UserLaunch.status == ProcessingStatus.NEW,
+        # Retried jobs wait for their backoff to pass
+        or_(UserLaunch.next_attempt_at.is_(None), UserLaunch.next_attempt_at <= func.now()),
+    )
+    if not per_user:
+        ranked = ranked.order_by(UserLaunch.created_at).limit(scan_limit)
+    ranked = ranked.subquery()
+
+    stmt = (
+        select(UserLaunch, User.tier)
+        .join(ranked, ranked.c.id == UserLaunch.id)
+        .join(User, User.id == UserLaunch.user_id)
+        .order_by(ranked.c.rank, UserLaunch.created_at)
+        .limit(scan_limit)
+        .with_for_update(of=UserLaunch, skip_locked=True)
+    )
+    if per_user:
+        stmt = stmt.where(ranked.c.rank <= bindparam("per_user_limit", type_=Integer))
+    return stmt
+
+
+_JOB_RESULT_VIEW = _job_result_view_stmt()
+_CLAIM_CANDIDATES = {per_user: _claim_candidates_stmt(per_user) for per_user in (False, True)}
+
 
 class JobRepository(BaseRepository):
 
@@ -19,17 +156,162 @@ class JobRepository(BaseRepository):
     async def create_job(self, job: JobLogic, session: AsyncSession | None = None) -> JobLogic:
         logger.debug(f"Creating job: {job}")
 
-        new_job = UserLaunch(
-            user_id=job.user_id,
-            mode=job.mode,
-            type=job.type,
-            status=job.status,
-            is_payment_taken=job.is_payment_taken,
+        created = await self._insert_jobs(session, [job])
+        return created[0]
+
+    @connection()
+    async def create_jobs(
+        self, jobs: list[JobLogic], session: AsyncSession | None = None
+    ) -> list[JobLogic]:
+        """Insert several jobs in a single transaction (all or nothing)."""
+        logger.debug(f"Creating {len(jobs)} jobs")
+
+        return await self._insert_jobs(session, jobs)
+
+    @connection()
+    async def create_jobs_with_quota(
+        self,
+        user_id: UUID,
+        jobs: list[JobLogic],
+        admit: QuotaAdmission,
+        session: AsyncSession | None = None,
+    ) -> tuple[QuotaSnapshot | None, list[JobLogic]]:
+        """Admit and insert jobs of one user in a single transaction.
+
+        The user row is locked while the quota is read together with the user's NEW and
+        PROCESSING counts, so concurrent submissions of the same user are serialized and
+        cannot overrun the quota. The same query counts which of the jobs' input files
+        belong to the user. Returns the snapshot (``None`` if the user does not exist) and
+        the created jobs (empty if ``admit`` rejected them).
+        """
+        logger.debug(f"Admitting {len(jobs)} jobs for user: {user_id}")
+
+        def _count(status: ProcessingStatus):
+            return (
+                select(func.count(UserLaunch.id))
+                .where(UserLaunch.user_id == user_id, UserLaunch.status == status)
+                .scalar_subquery()
+            )
+
+        # An input file must be the user's and of the job's mode
+        files = {(job.file_id, job.mode) for job in jobs if job.file_id is not None}
+        files_found = (
+            select(func.count(UserFile.id))
+            .where(UserFile.user_id == user_id, tuple_(UserFile.id, UserFile.mode).in_(files))
+            .scalar_subquery()
+            if files
+            else literal(0)
         )
+        stmt = (
+            select(
+                User.available_launches,
+                _count(ProcessingStatus.NEW),
+                _count(ProcessingStatus.PROCESSING),
+                files_found,
+            )
+            .where(User.id == user_id)
+            .with_for_update(of=User)
+        )
+        row = (await session.execute(stmt)).one_or_none()
+        if row is None:
+            return None, []
+
+        quota = QuotaSnapshot(
+            available_launches=row[0], pending=row[1], running=row[2], files_found=row[3]
+        )
+        if not admit(quota):
+            return quota, []
+        return quota, await self._insert_jobs(session, jobs)
+
+    @connection()
+    async def take_payment(self, job_id: UUID, session: AsyncSession | None = None) -> int | None:
+        """Charge one launch for a successful job, exactly once.
+
+        One statement: the job is flagged as paid only if it was not yet, and only then
+        the owner's counter is decremented (never below zero). Returns the remaining
+        launches, or ``None`` if the job was already paid (e.g. by a concurrent poll).
+        """
+        logger.debug(f"Taking payment for job: {job_id}")
 
-        session.add(new_job)
+        paid = (
+            update(UserLaunch)
+            .where(
+                UserLaunch.id == job_id,
+                UserLaunch.status == ProcessingStatus.SUCCESS,
+                UserLaunch.is_payment_taken.is_(False),
+            )
+            .values(is_payment_taken=True)
+            .returning(UserLaunch.user_id)
+            .cte("paid")
+        )
+        charged = (
+            update(User)
+            .where(User.id == paid.c.user_id, User.available_launches > 0)
+            .values(available_launches=User.available_launches - 1)
+            .returning(User.id, User.available_launches)
+            .cte("charged")
+        )
+        stmt = select(func.coalesce(charged.c.available_launches, 0)).select_from(
+            paid.outerjoin(charged, charged.c.id == paid.c.user_id)
+        )
+        return (await session.execute(stmt)).scalar_one_or_none()
+
+    async def _insert_jobs(self, session: AsyncSession, jobs: list[JobLogic]) -> list[JobLogic]:
+        # Shortest-expected-first and ETA: shape of the job's dataset version, or of the
+        # latest validated dataset of the user+mode when the job has no input file
+        file_ids = {job.file_id for job in jobs if job.estimated_cost is None and job.file_id}
+        shapes: dict = {}
+        if file_ids:
+            file_shape_stmt = (
+                select(UserFile.id, Dataset.row_count, Dataset.column_count)
+                .join(
+                    Dataset,
+                    and_(
+                        Dataset.user_id == UserFile.user_id,
+                        Dataset.file_url == UserFile.file_url,
+                    ),
+                )
+                .where(UserFile.id.in_(file_ids))
+            )
+            for file_id, rows, columns in await session.execute(file_shape_stmt):
+                shapes[file_id] = (rows, columns)
+        for job in jobs:
+            key = (job.user_id, job.mode)
+            if job.estimated_cost is not None or job.file_id or key in shapes:
+                continue
+            shape_stmt = (
+                select(Dataset.row_count, Dataset.column_count)
+                .where(Dataset.user_id == job.user_id, Dataset.mode == job.mode)
+                .order_by(Dataset.created_at.desc())
+                .limit(1)
+            )
+            shapes[key] = (await session.execute(shape_stmt)).one_or_none()
+
+        def _shape(job: JobLogic) -> tuple[int | None, int | None]:
+            rows, columns = shapes.get(job.file_id or (job.user_id, job.mode)) or (None, None)
+            if job.estimated_cost is not None:
+                return job.estimated_cost, job.feature_count
+            # The last CSV column is the target
+            return rows, (max(columns - 1, 1) if columns else None)
+
+        new_jobs = [
+            UserLaunch(
+                user_id=job.user_id,
+                mode=job.mode,
+                type=job.type,
+                status=job.status,
+                is_payment_taken=job.is_payment_taken,
+                file_id=job.file_id,
+                file_pinned=job.file_pinned or job.file_id is not None,
+                estimated_cost=rows,
+                feature_count=features,
+            )
+            for job, (rows, features) in zip(jobs, map(_shape, jobs))
+        ]
+
+        session.add_all(new_jobs)
         await session.flush()
-        return JobLogic.model_validate(new_job)
+        return [JobLogic.model_validate(new_job) for new_job in new_jobs]
 
     @connection()
     async def fetch_job_by_id(
@@ -37,8 +319,7 @@ class JobRepository(BaseRepository):
     ) -> JobLogic | None:
         logger.debug(f"Fetching job by id: {job_id} for user: {user_id}")
 
-        stmt = select(UserLaunch).where(UserLaunch.id == job_id, UserLaunch.user_id == user_id)
-        result = await session.execute(stmt)
+        result = await session.execute(_JOB_BY_ID, {"job_id": job_id, "user_id": user_id})
 
         if db_job := result.scalar_one_or_none():
             job = JobLogic.model_validate(db_job)
@@ -47,6 +328,48 @@ class JobRepository(BaseRepository):
 
         return job
 
+    @connection()
+    async def fetch_job_result_view(
+        self,
+        job_id: UUID,
+        user_id: UUID,
+        default_cost: int = 1000,
+        session: AsyncSession | None = None,
+    ) -> JobResultView | None:
+        """Job, owner's available launches, latest training run/artifact and, for a NEW
+        job, the queue snapshot (as ``fetch_queue_snapshot``) in one query.
+
+        Plain column projection: no ORM entities are loaded, so none of the ``selectin``
+        relationships of User/UserLaunch fire.
+        """
+        logger.debug(f"Fetching job result view: {job_id} for user: {user_id}")
+
+        params = {"job_id": job_id, "user_id": user_id, "default_cost": default_cost}
+        row = (await session.execute(_JOB_RESULT_VIEW, params)).mappings().one_or_none()
+        if row is None:
+            return None
+
+        # The run is the source of truth; the artifact covers runs that were cleaned up
+        if row["run_model_url"]:
+            model_url = row["run_model_url"]
+            metrics = row["run_metrics"] or row["artifact_metrics"]
+        else:
+            model_url = row["artifact_model_url"]
+            metrics = row["artifact_metrics"]
+
+        job = JobLogic.model_validate(dict(row))
+        return JobResultView(
+            job=job,
+            available_launches=row["available_launches"],
+            model_url=model_url,
+            metrics=metrics,
+            queue=(
+                QueueSnapshot.model_validate(dict(row))
+                if job.status == ProcessingStatus.NEW
+                else None
+            ),
+        )
+
     @connection()
     async def fetch_jobs_by_user_id(
         self,
@@ -65,6 +388,51 @@ class JobRepository(BaseRepository):
         jobs = [JobLogic.model_validate(job) for job in db_jobs]
         return jobs
 
+    @connection()
+    async def count_jobs_by_status(
+        self,
+        user_id: UUID,
+        statuses: list[ProcessingStatus],
+        session: AsyncSession | None = None,
+    ) -> dict[ProcessingStatus, int]:
+        logger.debug(f"Counting jobs for user: {user_id}")
+
+        stmt = (
+            select(UserLaunch.status, func.count(UserLaunch.id))
+            .where(UserLaunch.user_id == user_id, UserLaunch.status.in_(statuses))
+            .group_by(UserLaunch.status)
+        )
+        result = await session.execute(stmt)
+        counts = {status: 0 for status in statuses}
+        counts.update({ProcessingStatus(row[0]): int(row[1]) for row in result.all()})
+        return counts
+
+    @connection()
+    async def fetch_available_launches(
+        self, user_id: UUID, session: AsyncSession | None = None
+    ) -> int:
+        stmt = select(User.available_launches).where(User.id == user_id)
+        return (await session.execute(stmt)).scalar_one_or_none() or 0
+
+    @connection()
+    async def fetch_queue_snapshot(
+        self,
+        job_id: UUID,
+        created_before: datetime | None,
+        default_cost: int,
+        session: AsyncSession | None = None,
+    ) -> QueueSnapshot:
+        """Queue state in one scan: NEW jobs ahead of ``job_id`` and running jobs.
+
+        ``created_before=None`` counts the whole queue (e.g. a job that has just been created).
+        Jobs waiting for a retry backoff are not counted as ahead.
+        """
+        stmt = select(*_queue_columns(UserLaunch, job_id, created_before, default_cost)).where(
+            UserLaunch.status.in_([ProcessingStatus.NEW, ProcessingStatus.PROCESSING])
+        )
+        row = (await session.execute(stmt)).mappings().one()
+        return QueueSnapshot.model_validate(dict(row))
+
     @connection()
     async def update_job_status(
         self, job: JobLogic, session: AsyncSession | None = None
@@ -78,6 +446,16 @@ class JobRepository(BaseRepository):
             type=job.type,
             status=job.status,
             is_payment_taken=job.is_payment_taken,
+            file_id=job.file_id,
+            file_pinned=job.file_pinned,
+            estimated_cost=job.estimated_cost,
+            feature_count=job.feature_count,
+            attempts=job.attempts,
+            next_attempt_at=job.next_attempt_at,
+            last_error=job.last_error,
+            claimed_by=job.claimed_by,
+            lease_expires_at=job.lease_expires_at,
+            started_at=job.started_at,
             created_at=job.created_at,
             updated_at=job.updated_at,
         )
@@ -88,37 +466,299 @@ class JobRepository(BaseRepository):
         return JobLogic.model_validate(updating_job)
 
     @connection()
-    async def fetch_new_jobs(
-        self, limit: int = 10, session: AsyncSession | None = None
+    async def cancel_job(
+        self, job_id: UUID, user_id: UUID, session: AsyncSession | None = None
+    ) -> JobLogic | None:
+        """Move a NEW/PROCESSING job to CANCELLED; ``None`` if it is missing or finished."""
+        logger.debug(f"Cancelling job: {job_id} for user: {user_id}")
+
+        stmt = (
+            update(UserLaunch)
+            .where(
+                UserLaunch.id == job_id,
+                UserLaunch.user_id == user_id,
+                UserLaunch.status.in_([ProcessingStatus.NEW, ProcessingStatus.PROCESSING]),
+            )
+            .values(status=ProcessingStatus.CANCELLED)
+            .returning(UserLaunch)
+            .execution_options(populate_existing=True)
+        )
+        result = await session.execute(stmt)
+        db_job = result.scalar_one_or_none()
+        return JobLogic.model_validate(db_job) if db_job else None
+
+    @connection()
+    async def complete_job(
+        self,
+        job_id: UUID,
+        status: ProcessingStatus,
+        *,
+        last_error: str | None = None,
+        session: AsyncSession | None = None,
+    ) -> JobLogic | None:
+        """Store the outcome of a PROCESSING job.
+
+        Returns ``None`` when the job is no longer PROCESSING (e.g. it was cancelled
+        meanwhile), so a late result never overwrites the newer status.
+        """
+        logger.debug(f"Completing job: {job_id} with status {status}")
+
+        stmt = (
+            update(UserLaunch)
+            .where(UserLaunch.id == job_id, UserLaunch.status == ProcessingStatus.PROCESSING)
+            .values(
+                status=status,
+                last_error=last_error,
+                next_attempt_at=None,
+                claimed_by=None,
+                lease_expires_at=None,
+            )
+            .returning(UserLaunch)
+            .execution_options(populate_existing=True)
+        )
+        result = await session.execute(stmt)
+        db_job = result.scalar_one_or_none()
+        return JobLogic.model_validate(db_job) if db_job else None
+
+    @connection()
+    async def schedule_retry(
+        self,
+        job_id: UUID,
+        next_attempt_at: datetime,
+        last_error: str | None = None,
+        session: AsyncSession | None = None,
+    ) -> JobLogic | None:
+        """Put a failed PROCESSING job back to NEW, not claimable before ``next_attempt_at``."""
+        logger.debug(f"Scheduling retry of job: {job_id} at {next_attempt_at}")
+
+        stmt = (
+            update(UserLaunch)
+            .where(UserLaunch.id == job_id, UserLaunch.status == ProcessingStatus.PROCESSING)
+            .values(
+                status=ProcessingStatus.NEW,
+                next_attempt_at=next_attempt_at,
+                last_error=last_error,
+                claimed_by=None,
+                lease_expires_at=None,
+            )
+            .returning(UserLaunch)
+            .execution_options(populate_existing=True)
+        )
+        result = await session.execute(stmt)
+        db_job = result.scalar_one_or_none()
+        return JobLogic.model_validate(db_job) if db_job else None
+
+    @connection()
+    async def renew_leases(
+        self,
+        job_ids: list[UUID],
+        worker_id: str,
+        lease_sec: int,
+        session: AsyncSession | None = None,
+    ) -> int:
+        stmt = (
+            update(UserLaunch)
+            .where(
+                UserLaunch.id.in_(job_ids),
+                UserLaunch.claimed_by == worker_id,
+                UserLaunch.status == ProcessingStatus.PROCESSING,
+            )
+            .values(lease_expires_at=func.now() + timedelta(seconds=lease_sec))
+        )
+        result = await session.execute(stmt)
+        return result.rowcount or 0
+
+    @connection()
+    async def release_jobs(
+        self, job_ids: list[UUID], worker_id: str, session: AsyncSession | None = None
+    ) -> list[UUID]:
+        """Return unfinished jobs of a stopping worker to NEW, claimable right away.
+
+        The interrupted attempt is not counted against the retry budget.
+        """
+        stmt = (
+            update(UserLaunch)
+            .where(
+                UserLaunch.id.in_(job_ids),
+                UserLaunch.claimed_by == worker_id,
+                UserLaunch.status == ProcessingStatus.PROCESSING,
+            )
+            .values(
+                status=ProcessingStatus.NEW,
+                attempts=func.greatest(UserLaunch.attempts - 1, 0),
+                next_attempt_at=None,
+                claimed_by=None,
+                lease_expires_at=None,
+            )
+            .returning(UserLaunch.id)
+        )
+        result = await session.execute(stmt)
+        released = list(result.scalars().all())
+        logger.info(f"Released {len(released)} jobs of worker {worker_id}")
+        return released
+
+    @connection()
+    async def reclaim_expired_leases(
+        self, max_attempts: int, limit: int = 100, session: AsyncSession | None = None
     ) -> list[JobLogic]:
-        logger.debug(f"Fetching {limit} new jobs")
+        """Take back PROCESSING jobs whose worker stopped renewing the lease (crashed, lost).
+
+        The lost attempt counts: jobs with attempts left go back to NEW, claimable right
+        away, the rest to DEAD_LETTER.
+        """
+        expired = (
+            select(UserLaunch.id)
+            .where(
+                UserLaunch.status == ProcessingStatus.PROCESSING,
+                UserLaunch.lease_expires_at < func.now(),
+            )
+            .order_by(UserLaunch.lease_expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(UserLaunch)
+            .where(UserLaunch.id.in_(expired.scalar_subquery()))
+            .values(
+                status=case(
+                    (UserLaunch.attempts >= max_attempts, ProcessingStatus.DEAD_LETTER),
+                    else_=ProcessingStatus.NEW,
+                ),
+                next_attempt_at=None,
+                last_error="Lease expired: worker stopped renewing it",
+                claimed_by=None,
+                lease_expires_at=None,
+            )
+            .returning(UserLaunch)
+            .execution_options(populate_existing=True)
+        )
+        result = await session.execute(stmt)
+        return [JobLogic.model_validate(job) for job in result.scalars().all()]
+
+    @connection()
+    async def fetch_jobs_by_status(
+        self,
+        status: ProcessingStatus,
+        limit: int = 100,
+        offset: int = 0,
+        session: AsyncSession | None = None,
+    ) -> list[JobLogic]:
+        logger.debug(f"Fetching jobs with status: {status}")
 
         stmt = (
             select(UserLaunch)
-            .where(UserLaunch.status == ProcessingStatus.NEW)
+            .where(UserLaunch.status == status)
+            .order_by(UserLaunch.updated_at.desc(), UserLaunch.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await session.execute(stmt)
+        return [JobLogic.model_validate(job) for job in result.scalars().all()]
+
+    @connection()
+    async def requeue_dead_letter_jobs(
+        self,
+        job_ids: list[UUID] | None = None,
+        limit: int = 1000,
+        session: AsyncSession | None = None,
+    ) -> list[UUID]:
+        """Move DEAD_LETTER jobs (given ones or the oldest ``limit``) back to NEW.
+
+        Attempts are reset, so requeued jobs get the full retry budget again.
+        """
+        target = (
+            select(UserLaunch.id)
+            .where(UserLaunch.status == ProcessingStatus.DEAD_LETTER)
+            .order_by(UserLaunch.updated_at)
             .limit(limit)
             .with_for_update(skip_locked=True)
         )
+        if job_ids is not None:
+            target = target.where(UserLaunch.id.in_(job_ids))
+
+        stmt = (
+            update(UserLaunch)
+            .where(UserLaunch.id.in_(target.scalar_subquery()))
+            .values(status=ProcessingStatus.NEW, attempts=0, next_attempt_at=None)
+            .returning(UserLaunch.id)
+        )
         result = await session.execute(stmt)
-        db_jobs = result.scalars().all()
+        requeued = list(result.scalars().all())
+        logger.info(f"Requeued {len(requeued)} dead-letter jobs")
+        return requeued
+
+    @connection()
+    async def fetch_new_jobs(
+        self,
+        limit: int = 10,
+        *,
+        per_user_limit: int | None = None,
+        scan_limit: int | None = None,
+        selector: JobSelector | None = None,
+        worker_id: str | None = None,
+        lease_sec: int | None = None,
+        session: AsyncSession | None = None,
+    ) -> list[JobLogic]:
+        """Claim NEW jobs and mark them PROCESSING.
+
+        At most ``per_user_limit`` cheapest NEW jobs of every user are locked as candidates
+        (``scan_limit`` in total); ``selector`` then decides which of them are claimed,
+        the rest are released on commit. Claimed jobs are leased to ``worker_id`` for
+        ``lease_sec`` seconds.
+        """
+        logger.debug(f"Fetching {limit} new jobs")
 
-        if not db_jobs:
+        scan_limit = max(limit, scan_limit or limit)
+        params = {"scan_limit": scan_limit}
+        if per_user_limit is not None:
+            params["per_user_limit"] = per_user_limit
+        stmt = _CLAIM_CANDIDATES[per_user_limit is not None]
+        result = await session.execute(stmt, params)
+        candidates = [(JobLogic.model_validate(row[0]), row[1]) for row in result.all()]
+
+        if not candidates:
             logger.debug("No new jobs found")
             return []
 
-        job_ids = [job.id for job in db_jobs]
+        if selector is None:
+            picked = [job for job, _ in candidates[:limit]]
+        else:
+            user_ids = {job.user_id for job, _ in candidates}
+            running_stmt = (
+                select(UserLaunch.user_id, func.count(UserLaunch.id))
+                .where(
+                    UserLaunch.status == ProcessingStatus.PROCESSING,
+                    UserLaunch.user_id.in_(user_ids),
+                )
+                .group_by(UserLaunch.user_id)
+            )
+            running = {row[0]: int(row[1]) for row in (await session.execute(running_stmt)).all()}
+            picked = selector(candidates, running, limit)
+
+        if not picked:
+            logger.debug("All candidate jobs are throttled by per-user limits")
+            return []
+
+        job_ids = [job.id for job in picked]
         update_stmt = (
             update(UserLaunch)
             .where(UserLaunch.id.in_(job_ids))
-            .values(status=ProcessingStatus.PROCESSING)
+            .values(
+                status=ProcessingStatus.PROCESSING,
+                attempts=UserLaunch.attempts + 1,
+                claimed_by=worker_id,
+                lease_expires_at=(
+                    func.now() + timedelta(seconds=lease_sec) if lease_sec is not None else None
+                ),
+                started_at=func.now(),
+            )
+            .returning(UserLaunch)
+            .execution_options(populate_existing=True)
         )
-        await session.execute(update_stmt)
-        await session.flush()
-
-        updated_stmt = select(UserLaunch).where(UserLaunch.id.in_(job_ids))
-        updated_result = await session.execute(updated_stmt)
-        updated_jobs = updated_result.scalars().all()
+        updated_result = await session.execute(update_stmt)
+        claimed = {job.id: JobLogic.model_validate(job) for job in updated_result.scalars().all()}
 
-        jobs = [JobLogic.model_validate(job) for job in updated_jobs]
+        # Keep selector order: it is the fair-share dispatch order
+        jobs = [claimed[job_id] for job_id in job_ids if job_id in claimed]
         logger.debug(f"Fetched: {len(jobs)} jobs")
         return jobs
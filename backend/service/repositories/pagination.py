@@ -0,0 +1,62 @@
+"""Keyset pagination on ``(created_at, id)``.
+
+Pages are ordered newest first; the cursor is the sort key of the last row of the previous
+page, so every page is one index range scan on ``(user_id, created_at DESC, id DESC)``
+however deep the client pages.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Sequence, TypeVar
+from uuid import UUID
+
+from sqlalchemy import Select, tuple_
+
+SelectT = TypeVar("SelectT", bound=Select)
+
+
+class InvalidCursorError(ValueError):
+    """Cursor token is malformed or was not issued by this API."""
+
+
+@dataclass(frozen=True, slots=True)
+class Cursor:
+    created_at: datetime
+    id: UUID
+
+    @classmethod
+    def after(cls, row: Any) -> "Cursor":
+        """Cursor pointing past ``row`` (anything with ``created_at`` and ``id``)."""
+        return cls(created_at=row.created_at, id=row.id)
+
+    def encode(self) -> str:
+        raw = json.dumps([self.created_at.isoformat(), str(self.id)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            created_at, id_ = json.loads(raw)
+            return cls(created_at=datetime.fromisoformat(created_at), id=UUID(id_))
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+            raise InvalidCursorError("Invalid pagination cursor") from exc
+
+
+def keyset_page(
+    stmt: SelectT, created_at_col: Any, id_col: Any, cursor: Cursor | None, limit: int
+) -> SelectT:
+    """Order ``stmt`` newest first and cut one page after ``cursor``."""
+    if cursor is not None:
+        stmt = stmt.where(tuple_(created_at_col, id_col) < tuple_(cursor.created_at, cursor.id))
+    return stmt.order_by(created_at_col.desc(), id_col.desc()).limit(limit)
+
+
+def next_cursor(rows: Sequence[Any], limit: int) -> str | None:
+    """Cursor of the following page; ``None`` once a page comes back short."""
+    if len(rows) < limit or not rows:
+        return None
+    return Cursor.after(rows[-1]).encode()
@@ -1,7 +1,9 @@
 import logging
+from uuid import UUID
 
-from sqlalchemy import select, update
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from service.models.db.db_models import User
 from service.models.profile_models import UserProfileLogic
@@ -11,6 +13,22 @@ from service.repositories.exceptions import RepositoryNotFoundError
 
 logger = logging.getLogger(__name__)
 
+# Columns of UserProfileLogic: profile reads never touch launches/files of the user
+_PROFILE_COLUMNS = load_only(
+    User.id,
+    User.email,
+    User.password_hash,
+    User.phone,
+    User.first_name,
+    User.available_launches,
+    User.created_at,
+    User.updated_at,
+    raiseload=True,
+)
+# Hot lookups (every login and profile read): built once, only the parameters change
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id")).options(_PROFILE_COLUMNS)
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email")).options(_PROFILE_COLUMNS)
+
 
 class ProfileRepository(BaseRepository):
 
@@ -42,8 +60,7 @@ class ProfileRepository(BaseRepository):
     ) -> UserProfileLogic | None:
         logger.debug(f"Fetching user profile by id: {user_id}")
 
-        stmt = select(User).where(User.id == user_id)
-        result = await session.execute(stmt)
+        result = await session.execute(_USER_BY_ID, {"user_id": user_id})
         user_profile = result.scalar_one_or_none()
 
         if user_profile:
@@ -59,8 +76,7 @@ class ProfileRepository(BaseRepository):
     ) -> UserProfileLogic | None:
         logger.debug(f"Fetching user by email: {email}")
 
-        stmt = select(User).where(User.email == email)
-        result = await session.execute(stmt)
+        result = await session.execute(_USER_BY_EMAIL, {"email": email})
         user = result.scalar_one_or_none()
 
         if user:
@@ -70,6 +86,25 @@ class ProfileRepository(BaseRepository):
             logger.debug(f"User not found for email: {email}")
         return user
 
+    @connection()
+    async def add_available_launches(
+        self, user_id: UUID, delta: int, session: AsyncSession | None = None
+    ) -> int | None:
+        """Atomically change the launch counter; ``None`` if it would go negative.
+
+        A single conditional UPDATE, so concurrent charges cannot lose updates.
+        """
+        logger.debug(f"Changing available launches of user: {user_id} by {delta}")
+
+        stmt = (
+            update(User)
+            .where(User.id == user_id, User.available_launches + delta >= 0)
+            .values(available_launches=User.available_launches + delta)
+            .returning(User.available_launches)
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
     @connection()
     async def update_user_profile(
         self, user: UserProfileLogic, session: AsyncSession | None = None
@@ -1,17 +1,103 @@
 import logging
+import time
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select, update
+from sqlalchemy import Integer, bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
-from service.models.db.db_models import Dataset, ModelArtifact, TrainingRun, UserFile
+from service.models.db.db_models import (
+    Dataset,
+    DatasetVersionCounter,
+    ModelArtifact,
+    TrainingRun,
+    UserFile,
+)
 from service.models.key_value import ProcessingStatus, ServiceMode
 from service.repositories.base_repository import BaseRepository
 from service.repositories.decorators.session_processor import connection
+from service.repositories.pagination import Cursor, keyset_page
 
 logger = logging.getLogger(__name__)
 
+# Projections of the listing endpoints (response schema fields only)
+_RUN_LIST_COLUMNS = load_only(
+    TrainingRun.id,
+    TrainingRun.user_id,
+    TrainingRun.launch_id,
+    TrainingRun.dataset_id,
+    TrainingRun.status,
+    TrainingRun.model_url,
+    TrainingRun.metrics,
+    TrainingRun.created_at,
+    raiseload=True,
+)
+_RUN_TREND_COLUMNS = load_only(
+    TrainingRun.id, TrainingRun.created_at, TrainingRun.metrics, raiseload=True
+)
+_DATASET_LIST_COLUMNS = load_only(
+    Dataset.id,
+    Dataset.user_id,
+    Dataset.launch_id,
+    Dataset.mode,
+    Dataset.name,
+    Dataset.file_url,
+    Dataset.version,
+    Dataset.created_at,
+    raiseload=True,
+)
+
+# Next dataset version of a user+mode: one upsert on the counter row (constant cost, no
+# max() over the history). The row stays locked until commit, so concurrent uploads of
+# the same user+mode get consecutive versions; other users are not blocked. Callers issue
+# it last in the transaction, with no storage or network I/O after it.
+_NEXT_DATASET_VERSION = (
+    insert(DatasetVersionCounter)
+    .values(user_id=bindparam("user_id"), mode=bindparam("mode"), last_version=1)
+    .on_conflict_do_update(
+        index_elements=[DatasetVersionCounter.user_id, DatasetVersionCounter.mode],
+        set_={
+            "last_version": DatasetVersionCounter.last_version + 1,
+            "updated_at": func.now(),
+        },
+    )
+    .returning(DatasetVersionCounter.last_version)
+)
+
+
+def _delete_expired_batch_stmt():
+    """One TTL batch in one statement: lock expired datasets, delete their runs, then them.
+
+    Returns the file keys (``Dataset.name``) of the deleted datasets. Rows locked by a
+    concurrent cleanup are skipped, so parallel cleaners never wait on each other.
+    """
+    expired = (
+        select(Dataset.id)
+        .where(Dataset.created_at < bindparam("cutoff"))
+        .order_by(Dataset.created_at)
+        .limit(bindparam("batch_size", type_=Integer))
+        .with_for_update(skip_locked=True)
+        .cte("expired")
+    )
+    runs = (
+        delete(TrainingRun)
+        .where(TrainingRun.dataset_id.in_(select(expired.c.id)))
+        .returning(TrainingRun.id)
+        .cte("deleted_runs")
+    )
+    return (
+        delete(Dataset)
+        .where(Dataset.id.in_(select(expired.c.id)))
+        .returning(Dataset.name)
+        .add_cte(runs)
+        .execution_options(synchronize_session=False)
+    )
+
+
+_DELETE_EXPIRED_BATCH = _delete_expired_batch_stmt()
+
 
 class TrainingRepository(BaseRepository):
     @connection()
@@ -35,6 +121,9 @@ class TrainingRepository(BaseRepository):
         mode: ServiceMode,
         file_name: str,
         file_url: str,
+        *,
+        row_count: int | None = None,
+        column_count: int | None = None,
         session: AsyncSession | None = None,
     ) -> Dataset:
         # Deprecated semantics: previously reused dataset by file_url. Now always create new with version.
@@ -44,6 +133,8 @@ class TrainingRepository(BaseRepository):
             mode=mode,
             file_name=file_name,
             file_url=file_url,
+            row_count=row_count,
+            column_count=column_count,
             session=session,
         )
 
@@ -55,17 +146,13 @@ class TrainingRepository(BaseRepository):
         mode: ServiceMode,
         file_name: str,
         file_url: str,
+        *,
+        row_count: int | None = None,
+        column_count: int | None = None,
         session: AsyncSession | None = None,
     ) -> Dataset:
-        # Fetch max version for this user+mode
-        from sqlalchemy import func
-
-        v_stmt = select(func.max(Dataset.version)).where(
-            Dataset.user_id == user_id, Dataset.mode == mode
-        )
-        v_res = await session.execute(v_stmt)
-        current_max = v_res.scalar()
-        next_version = (current_max or 0) + 1
+        params = {"user_id": user_id, "mode": mode}
+        next_version = (await session.execute(_NEXT_DATASET_VERSION, params)).scalar_one()
         ds = Dataset(
             user_id=user_id,
             launch_id=launch_id,
@@ -73,6 +160,8 @@ class TrainingRepository(BaseRepository):
             name=file_name,
             file_url=file_url,
             version=next_version,
+            row_count=row_count,
+            column_count=column_count,
         )
         session.add(ds)
         await session.flush()
@@ -142,28 +231,38 @@ class TrainingRepository(BaseRepository):
         return art
 
     # Listing helpers for API
-    @connection()
+    @connection(read_only=True)
     async def list_training_runs(
-        self, user_id: UUID, limit: int = 20, session: AsyncSession | None = None
+        self,
+        user_id: UUID,
+        limit: int = 20,
+        cursor: Cursor | None = None,
+        session: AsyncSession | None = None,
     ) -> list[TrainingRun]:
-        stmt = (
-            select(TrainingRun)
-            .where(TrainingRun.user_id == user_id)
-            .order_by(TrainingRun.created_at.desc())
-            .limit(limit)
+        stmt = keyset_page(
+            select(TrainingRun).options(_RUN_LIST_COLUMNS).where(TrainingRun.user_id == user_id),
+            TrainingRun.created_at,
+            TrainingRun.id,
+            cursor,
+            limit,
         )
         result = await session.execute(stmt)
         return list(result.scalars().all())
 
-    @connection()
+    @connection(read_only=True)
     async def list_artifacts(
-        self, user_id: UUID, limit: int = 20, session: AsyncSession | None = None
+        self,
+        user_id: UUID,
+        limit: int = 20,
+        cursor: Cursor | None = None,
+        session: AsyncSession | None = None,
     ) -> list[ModelArtifact]:
-        stmt = (
-            select(ModelArtifact)
-            .where(ModelArtifact.user_id == user_id)
-            .order_by(ModelArtifact.created_at.desc())
-            .limit(limit)
+        stmt = keyset_page(
+            select(ModelArtifact).where(ModelArtifact.user_id == user_id),
+            ModelArtifact.created_at,
+            ModelArtifact.id,
+            cursor,
+            limit,
         )
         result = await session.execute(stmt)
         return list(result.scalars().all())
@@ -213,30 +312,34 @@ class TrainingRepository(BaseRepository):
         """Delete a single artifact by id for a user and return its model_url if it existed."""
         # fetch model_url first
         stmt = (
-            select(ModelArtifact)
+            select(ModelArtifact.model_url)
             .where(ModelArtifact.user_id == user_id, ModelArtifact.id == artifact_id)
             .limit(1)
         )
         result = await session.execute(stmt)
-        art = result.scalar_one_or_none()
-        if not art:
+        model_url = result.scalar_one_or_none()
+        if model_url is None:
             return None
-        model_url = art.model_url
         from sqlalchemy import delete
 
         del_stmt = delete(ModelArtifact).where(ModelArtifact.id == artifact_id)
         await session.execute(del_stmt)
         return model_url
 
-    @connection()
+    @connection(read_only=True)
     async def list_datasets(
-        self, user_id: UUID, limit: int = 20, session: AsyncSession | None = None
+        self,
+        user_id: UUID,
+        limit: int = 20,
+        cursor: Cursor | None = None,
+        session: AsyncSession | None = None,
     ) -> list[Dataset]:
-        stmt = (
-            select(Dataset)
-            .where(Dataset.user_id == user_id)
-            .order_by(Dataset.created_at.desc())
-            .limit(limit)
+        stmt = keyset_page(
+            select(Dataset).options(_DATASET_LIST_COLUMNS).where(Dataset.user_id == user_id),
+            Dataset.created_at,
+            Dataset.id,
+            cursor,
+            limit,
         )
         result = await session.execute(stmt)
         return list(result.scalars().all())
@@ -269,34 +372,53 @@ class TrainingRepository(BaseRepository):
         return result.scalar_one_or_none()
 
     # --- Metrics trends listing ---
-    @connection()
+    @connection(read_only=True)
     async def list_training_metrics_trends(
         self,
         user_id: UUID,
         mode: ServiceMode | None = None,
         limit: int = 50,
+        cursor: Cursor | None = None,
         session: AsyncSession | None = None,
     ) -> list[tuple[TrainingRun, int]]:
         """Return recent training runs with associated dataset version.
 
         Output list items are (TrainingRun, dataset_version).
         Optional filtering by dataset mode.
-        Ordered by TrainingRun.created_at DESC.
+        Ordered by TrainingRun.created_at DESC, id DESC; ``cursor`` continues a previous page.
         """
-        from sqlalchemy import select
-
-        stmt = (
+        stmt = keyset_page(
             select(TrainingRun, Dataset.version)
+            .options(_RUN_TREND_COLUMNS)
             .join(Dataset, TrainingRun.dataset_id == Dataset.id)
-            .where(TrainingRun.user_id == user_id)
-            .order_by(TrainingRun.created_at.desc())
-            .limit(limit)
+            .where(TrainingRun.user_id == user_id),
+            TrainingRun.created_at,
+            TrainingRun.id,
+            cursor,
+            limit,
         )
         if mode is not None:
             stmt = stmt.where(Dataset.mode == mode)
         result = await session.execute(stmt)
         return [(row[0], int(row[1])) for row in result.all()]
 
+    @connection(read_only=True)
+    async def list_runtime_samples(
+        self, limit: int = 200, session: AsyncSession | None = None
+    ) -> list[dict[str, Any]]:
+        """Metrics of the latest successful runs that recorded their duration (for job ETAs)."""
+        stmt = (
+            select(TrainingRun.metrics)
+            .where(
+                TrainingRun.status == ProcessingStatus.SUCCESS,
+                TrainingRun.metrics.has_key("duration_sec"),
+            )
+            .order_by(TrainingRun.created_at.desc())
+            .limit(limit)
+        )
+        result = await session.execute(stmt)
+        return [metrics for metrics in result.scalars().all() if metrics]
+
     # --- Dataset TTL cleanup ---
     @connection()
     async def cleanup_expired_datasets(
@@ -304,32 +426,23 @@ class TrainingRepository(BaseRepository):
         *,
         cutoff,
         limit: int = 1000,
+        batch_size: int = 500,
+        time_budget_sec: float | None = None,
         session: AsyncSession | None = None,
     ) -> list[str]:
-        """Delete datasets older than cutoff and their training runs.
+        """Delete datasets older than cutoff and their training runs, oldest first.
 
-        Returns list of dataset file_keys (Dataset.name) for storage deletion.
+        One transaction, at most ``limit`` datasets in ``DELETE ... RETURNING`` batches of
+        ``batch_size``; no new batch starts once ``time_budget_sec`` is spent, so locks are
+        held briefly. Returns dataset file_keys (Dataset.name) for storage deletion.
         """
-        # Select expired dataset IDs and file names
-        ds_stmt = (
-            select(Dataset.id, Dataset.name)
-            .where(Dataset.created_at < cutoff)
-            .order_by(Dataset.created_at.asc())
-            .limit(limit)
-        )
-        res = await session.execute(ds_stmt)
-        rows = res.fetchall()
-        if not rows:
-            return []
-        ids = [row[0] for row in rows]
-        file_keys = [row[1] for row in rows]
-
-        # Delete related training runs
-        from sqlalchemy import delete
-
-        del_runs = delete(TrainingRun).where(TrainingRun.dataset_id.in_(ids))
-        await session.execute(del_runs)
-        # Delete datasets themselves
-        del_ds = delete(Dataset).where(Dataset.id.in_(ids))
-        await session.execute(del_ds)
+        deadline = time.monotonic() + time_budget_sec if time_budget_sec else None
+        file_keys: list[str] = []
+        while len(file_keys) < limit:
+            size = min(batch_size, limit - len(file_keys))
+            params = {"cutoff": cutoff, "batch_size": size}
+            batch = (await session.execute(_DELETE_EXPIRED_BATCH, params)).scalars().all()
+            file_keys.extend(batch)
+            if len(batch) < size or (deadline is not None and time.monotonic() >= deadline):
+                break
         return file_keys
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Iterator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from service.infrastructure.database.postgresql import PgConnector
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class _UnitOfWork:
+    session: AsyncSession
+    owner: asyncio.Task | None
+    on_commit: list[Callable[[], Awaitable[None]]] = field(default_factory=list)
+
+
+_current: ContextVar[_UnitOfWork | None] = ContextVar("unit_of_work", default=None)
+
+
+def _current_uow() -> _UnitOfWork | None:
+    uow = _current.get()
+    if uow is None or uow.owner is not _current_task():
+        return None
+    return uow
+
+
+def current_session() -> AsyncSession | None:
+    """Session of the unit of work of the running task, if any.
+
+    Tasks spawned inside a unit of work inherit the context variable but not the
+    session: they may outlive it, so they fall back to their own sessions.
+    """
+    uow = _current_uow()
+    return uow.session if uow is not None else None
+
+
+async def after_commit(callback: Callable[[], Awaitable[None]]) -> None:
+    """Run ``callback`` once the running unit of work has committed (right away without one).
+
+    For side effects others act on (events, notifications): inside a unit of work the
+    changes are only flushed, so they must not be announced before the commit. Dropped
+    if the unit of work rolls back.
+    """
+    if (uow := _current_uow()) is None:
+        await callback()
+        return
+    uow.on_commit.append(callback)
+
+
+@contextmanager
+def detached() -> Iterator[None]:
+    """Repository calls in the block do not join the running unit of work.
+
+    They get their own sessions and commit right away: for state other requests must
+    see before this one finishes (e.g. a reserved idempotency key).
+    """
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+@asynccontextmanager
+async def unit_of_work(connector: PgConnector) -> AsyncIterator[AsyncSession]:
+    """One session and one transaction for everything repositories do inside the block.
+
+    ``@connection()`` methods join it instead of opening their own sessions; the block
+    commits once at the end or rolls back if it raises. Nested blocks reuse the outer one.
+    """
+    if (session := current_session()) is not None:
+        yield session
+        return
+
+    async with connector.get_session_context() as session:
+        uow = _UnitOfWork(session, _current_task())
+        token = _current.set(uow)
+        try:
+            yield session
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            raise
+        finally:
+            _current.reset(token)
+
+    # Committed: the work itself cannot fail any more, so neither do its side effects
+    for callback in uow.on_commit:
+        try:
+            await callback()
+        except Exception:  # noqa: BLE001
+            logger.exception("After-commit callback failed")
+
+
+def _current_task() -> asyncio.Task | None:
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return None
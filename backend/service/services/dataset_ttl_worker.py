@@ -1,14 +1,115 @@
 import asyncio
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Callable
 
+from service.infrastructure.storage.abstract_file_storage import delete_many
 from service.repositories.training_repository import TrainingRepository
 from service.services.file_saver_service import FileSaverService
 
 logger = logging.getLogger(__name__)
 
 
+class AdaptivePacer:
+    """Pause between cleanup transactions, driven by how long a DELETE batch took.
+
+    A batch slower than ``target_batch_sec`` means the database is busy: the pause doubles
+    (up to ``max_pause_sec``). Fast batches halve it back, down to no pause at all.
+    """
+
+    def __init__(
+        self,
+        target_batch_sec: float = 0.25,
+        min_pause_sec: float = 0.05,
+        max_pause_sec: float = 5.0,
+    ) -> None:
+        self.target_batch_sec = target_batch_sec
+        self.min_pause_sec = min_pause_sec
+        self.max_pause_sec = max_pause_sec
+        self.pause_sec = 0.0
+
+    def observe(self, batch_sec: float) -> float:
+        """Record one batch latency and return the pause before the next transaction."""
+        if batch_sec > self.target_batch_sec:
+            self.pause_sec = min(max(self.pause_sec * 2, self.min_pause_sec), self.max_pause_sec)
+        else:
+            self.pause_sec /= 2
+            if self.pause_sec < self.min_pause_sec:
+                self.pause_sec = 0.0
+        return self.pause_sec
+
+
+@dataclass(slots=True)
+class CleanupCycle:
+    datasets: int = 0
+    files_removed: int = 0
+    files_missing: int = 0
+    files_failed: int = 0
+    transactions: int = 0
+    db_sec: float = 0.0
+    elapsed_sec: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.datasets / self.elapsed_sec if self.elapsed_sec else 0.0
+
+    @property
+    def db_rows_per_sec(self) -> float:
+        return self.datasets / self.db_sec if self.db_sec else 0.0
+
+
+async def drain_expired_datasets(
+    *,
+    cutoff: datetime,
+    training_repo: TrainingRepository,
+    file_saver: FileSaverService,
+    batch_limit: int = 500,
+    txn_max_rows: int = 5000,
+    txn_budget_sec: float = 2.0,
+    pacer: AdaptivePacer | None = None,
+    delete_concurrency: int = 8,
+) -> CleanupCycle:
+    """Delete expired datasets until none are left, one short transaction at a time.
+
+    Each transaction deletes up to ``txn_max_rows`` in ``batch_limit`` batches and stops
+    after ``txn_budget_sec``; files are removed after its commit, ``delete_concurrency`` at
+    a time. An empty transaction means the backlog is clear.
+    """
+    pacer = pacer or AdaptivePacer()
+    cycle = CleanupCycle()
+    started = time.monotonic()
+    while True:
+        txn_started = time.monotonic()
+        file_keys = await training_repo.cleanup_expired_datasets(
+            cutoff=cutoff,
+            limit=txn_max_rows,
+            batch_size=batch_limit,
+            time_budget_sec=txn_budget_sec,
+        )
+        txn_sec = time.monotonic() - txn_started
+        cycle.transactions += 1
+        cycle.db_sec += txn_sec
+        if not file_keys:
+            break
+        cycle.datasets += len(file_keys)
+        deleted = await delete_many(file_saver.storage, file_keys, concurrency=delete_concurrency)
+        if deleted.failed:
+            logger.warning("Failed to delete %d files during TTL cleanup", len(deleted.failed))
+        cycle.files_removed += deleted.removed
+        cycle.files_missing += deleted.missing
+        cycle.files_failed += len(deleted.failed)
+
+        batches = -(-len(file_keys) // batch_limit)
+        pause = pacer.observe(txn_sec / batches)
+        if pause:
+            logger.debug("Dataset TTL cleanup: database is slow, pausing %.2f sec", pause)
+            await asyncio.sleep(pause)
+    cycle.elapsed_sec = time.monotonic() - started
+    return cycle
+
+
 async def run_dataset_ttl_loop(
     *,
     ttl_days_supplier: Callable[[], int],
@@ -16,11 +117,17 @@ async def run_dataset_ttl_loop(
     batch_limit_supplier: Callable[[], int],
     training_repo: TrainingRepository,
     file_saver: FileSaverService,
+    txn_max_rows: int = 5000,
+    txn_budget_sec: float = 2.0,
+    pacer: AdaptivePacer | None = None,
+    delete_concurrency: int = 8,
 ):
     """Periodic loop to cleanup expired datasets and remove files.
 
+    Every cycle drains the whole backlog, then sleeps for the interval.
     Suppliers are used to read up-to-date config values on each iteration.
     """
+    pacer = pacer or AdaptivePacer()
     while True:
         ttl_days = max(0, int(ttl_days_supplier() or 0))
         interval_sec = max(5, int(interval_sec_supplier() or 3600))
@@ -39,26 +146,29 @@ async def run_dataset_ttl_loop(
                 batch_limit,
             )
 
-            file_keys = await training_repo.cleanup_expired_datasets(
-                cutoff=cutoff, limit=batch_limit
+            cycle = await drain_expired_datasets(
+                cutoff=cutoff,
+                training_repo=training_repo,
+                file_saver=file_saver,
+                batch_limit=batch_limit,
+                txn_max_rows=max(batch_limit, txn_max_rows),
+                txn_budget_sec=txn_budget_sec,
+                pacer=pacer,
+                delete_concurrency=delete_concurrency,
             )
-            files_removed = 0
-            files_missing = 0
-            for key in file_keys:
-                try:
-                    await file_saver.storage.delete_file(file_key=key)
-                    files_removed += 1
-                except FileNotFoundError:
-                    files_missing += 1
-                except Exception:
-                    logger.exception("Failed to delete file during TTL cleanup: %s", key)
-
-            if file_keys:
+
+            if cycle.datasets:
                 logger.info(
-                    "Dataset TTL cleanup cycle: datasets=%d, files_removed=%d, files_missing=%d",
-                    len(file_keys),
-                    files_removed,
-                    files_missing,
+                    "Dataset TTL cleanup cycle: datasets=%d, files_removed=%d, files_missing=%d, "
+                    "files_failed=%d, transactions=%d, %.1f rows/s (db %.1f rows/s), pause=%.2fs",
+                    cycle.datasets,
+                    cycle.files_removed,
+                    cycle.files_missing,
+                    cycle.files_failed,
+                    cycle.transactions,
+                    cycle.rows_per_sec,
+                    cycle.db_rows_per_sec,
+                    pacer.pause_sec,
                 )
             else:
                 logger.debug("Dataset TTL cleanup: no expired datasets found")
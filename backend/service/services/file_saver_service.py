@@ -1,10 +1,11 @@
 import logging
 import uuid
 from pathlib import Path
+from typing import AsyncIterable
 
 from fastapi import HTTPException, status
 
-from service.infrastructure.storage.abstract_file_storage import AbstractFileStorage
+from service.infrastructure.storage.abstract_file_storage import AbstractFileStorage, writer_for
 from service.infrastructure.storage.local_file_storage import LocalFileStorage
 from service.models.db.db_models import UserFile
 from service.models.file_models import FileMetadataLogic
@@ -15,6 +16,7 @@ from service.presentation.routers.files_api.schemas import (
     UploadResponse,
 )
 from service.repositories.file_repository import FileRepository
+from service.repositories.pagination import Cursor, next_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -31,23 +33,30 @@ class FileSaverService:
         self.folder = folder_name
 
     async def fetch_all_user_files(
-        self, user_id: uuid.UUID, mode: ServiceMode
-    ) -> FetchUserFilesResponse:
+        self,
+        user_id: uuid.UUID,
+        mode: ServiceMode,
+        limit: int = 100,
+        cursor: Cursor | None = None,
+    ) -> tuple[FetchUserFilesResponse, str | None]:
+        """Страница файлов пользователя и курсор следующей (``None`` — последняя)."""
         logger.info(f"Fetching all files for user: {user_id}")
 
-        user_files = await self.repository.fetch_user_files_metadata(user_id, mode)
+        user_files = await self.repository.fetch_user_files_metadata(
+            user_id, mode, limit=limit, cursor=cursor
+        )
 
         logger.info(f"Fetched {len(user_files)} files for user: {user_id}")
 
         if not user_files:
-            return FetchUserFilesResponse(files=[])
+            return FetchUserFilesResponse(files=[]), None
 
         logger.debug(f"User files: {user_files}")
 
         response = FetchUserFilesResponse(
             files=[FileMetadata(file_id=file.id, file_url=file.file_url) for file in user_files]
         )
-        return response
+        return response, next_cursor(user_files, limit)
 
     async def save(
         self,
@@ -65,7 +74,36 @@ class FileSaverService:
             file_key=file_key,
             file_data=file_content,
         )
+        return await self._add_metadata(user_id, mode, file_key, file_url)
 
+    async def save_stream(
+        self,
+        user_id: uuid.UUID,
+        mode: ServiceMode,
+        file_name: str,
+        chunks: AsyncIterable[bytes],
+    ) -> UploadResponse:
+        """Как ``save``, но файл пишется в хранилище по мере чтения ``chunks``.
+
+        Ошибка в ``chunks`` (лимит размера, валидация) отменяет запись: файл не появляется.
+        """
+        masked_file_name = self._generate_file_name(file_name)
+
+        file_key = self.storage.build_file_path(self.folder, mode.value, masked_file_name)
+
+        writer = writer_for(self.storage, file_key)
+        try:
+            async for chunk in chunks:
+                await writer.write(chunk)
+            file_url = await writer.commit()
+        except BaseException:
+            await writer.abort()
+            raise
+        return await self._add_metadata(user_id, mode, file_key, file_url)
+
+    async def _add_metadata(
+        self, user_id: uuid.UUID, mode: ServiceMode, file_key: str, file_url: str
+    ) -> UploadResponse:
         file_metadata = UserFile(
             user_id=user_id,
             mode=mode,
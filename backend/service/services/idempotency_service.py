@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import logging
+from typing import Awaitable, Callable, NoReturn, TypeVar
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+from service.repositories.idempotency_repository import IdempotencyRepository
+from service.repositories.unit_of_work import detached
+from service.settings import IdempotencyConf
+
+logger = logging.getLogger(__name__)
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+
+def fingerprint(*parts: object) -> str:
+    """Stable hash of the request parts that must match on replay."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class IdempotencyService:
+    """Executes a request at most once per ``(user, scope, Idempotency-Key)``.
+
+    The first request stores its response; replays with the same key get the stored
+    response without running the handler. Failed requests are not stored, so the
+    client may retry them with the same key.
+
+    The key is reserved and released in short transactions of their own, outside the
+    request unit of work: a concurrent retry sees the reservation at once (409) instead
+    of waiting on its row lock, and no connection is held while the handler runs. The
+    response is stored in the request transaction, atomically with the work.
+    """
+
+    def __init__(self, config: IdempotencyConf, repository: IdempotencyRepository) -> None:
+        self.config = config
+        self.repository = repository
+
+    async def run(
+        self,
+        user_id: UUID,
+        scope: str,
+        key: str,
+        request_hash: str,
+        handler: Callable[[], Awaitable[ResponseT]],
+        response_model: type[ResponseT],
+        status_code: int = status.HTTP_200_OK,
+    ) -> tuple[ResponseT, bool]:
+        """Return ``(response, replayed)``."""
+        with detached():
+            record, owned = await self.repository.reserve(
+                user_id,
+                scope,
+                key,
+                request_hash,
+                ttl_sec=self.config.ttl_sec,
+                in_flight_timeout_sec=self.config.in_flight_timeout_sec,
+            )
+        if not owned:
+            if record.request_hash != request_hash:
+                self._reject(
+                    status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    "Idempotency-Key was already used with a different request",
+                )
+            if not record.is_completed:
+                self._reject(
+                    status.HTTP_409_CONFLICT, "A request with this Idempotency-Key is in progress"
+                )
+            logger.info(f"Replaying stored response for {scope} key of user: {user_id}")
+            return response_model.model_validate(record.response), True
+
+        try:
+            result = await handler()
+        except BaseException:
+            try:
+                await asyncio.shield(self._release(record.id))
+            except Exception:  # noqa: BLE001
+                logger.warning("Failed to release idempotency key %s", record.id)
+            raise
+
+        await self.repository.complete(record.id, status_code, result.model_dump(mode="json"))
+        return result, False
+
+    async def _release(self, record_id: UUID) -> None:
+        with detached():
+            await self.repository.release(record_id)
+
+    async def purge_expired(self) -> int:
+        return await self.repository.delete_expired(limit=self.config.cleanup_batch_limit)
+
+    async def run_cleanup_loop(self) -> NoReturn:
+        while True:
+            try:
+                removed = await self.purge_expired()
+                if removed:
+                    logger.info(f"Purged {removed} expired idempotency keys")
+            except Exception:  # noqa: BLE001
+                logger.exception("Idempotency keys cleanup failed")
+            await asyncio.sleep(self.config.cleanup_interval_sec)
+
+    @staticmethod
+    def _reject(status_code: int, detail: str) -> NoReturn:
+        logger.warning(detail)
+        raise HTTPException(status_code=status_code, detail=detail)
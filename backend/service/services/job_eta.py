@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from service.models.jobs_models import TERMINAL_STATUSES, JobLogic, QueueSnapshot
+from service.models.key_value import ProcessingStatus, ServiceType
+from service.repositories.job_repository import JobRepository
+from service.settings import JobConf
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RuntimeModel:
+    """Training time of one trainer: ``duration ≈ intercept + slope · rows · features``.
+
+    Fitted by least squares on recorded runs; with too little spread in the data it
+    degrades to the mean duration (``slope == 0``).
+    """
+
+    intercept: float
+    slope: float = 0.0
+    mean_features: float = 1.0
+    samples: int = 0
+
+    @classmethod
+    def fit(cls, samples: list[tuple[int, int, float]]) -> "RuntimeModel | None":
+        """``samples`` are ``(rows, features, duration_sec)``; ``None`` when empty."""
+        if not samples:
+            return None
+        n = len(samples)
+        xs = [float(rows * max(features, 1)) for rows, features, _ in samples]
+        ys = [float(duration) for _, _, duration in samples]
+        mean_x, mean_y = sum(xs) / n, sum(ys) / n
+        mean_features = sum(max(features, 1) for _, features, _ in samples) / n
+
+        var_x = sum((x - mean_x) ** 2 for x in xs)
+        covar = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+        slope = covar / var_x if var_x else 0.0
+        if slope <= 0:
+            # Bigger datasets are never faster: noise, fall back to the mean
+            return cls(intercept=mean_y, mean_features=mean_features, samples=n)
+        intercept = max(mean_y - slope * mean_x, 0.0)
+        return cls(intercept=intercept, slope=slope, mean_features=mean_features, samples=n)
+
+    def predict(self, rows: int, features: float | None = None) -> float:
+        features = self.mean_features if features is None else features
+        return self.intercept + self.slope * rows * features
+
+    def predict_total(self, jobs: int, rows: int) -> float:
+        """Run time of ``jobs`` jobs with ``rows`` rows in total (the model is linear)."""
+        return jobs * self.intercept + self.slope * rows * self.mean_features
+
+
+@dataclass(frozen=True, slots=True)
+class JobEta:
+    """Позиция в очереди (1 — следующая, 0 — выполняется) и оценка времени до завершения."""
+
+    queue_position: int | None
+    eta_sec: int
+    run_sec: int
+
+
+class JobEtaEstimator:
+    """Queue position and ETA from live queue depth and per-trainer runtime models.
+
+    Runtime models are fitted on ``duration_sec`` of recent successful training runs and
+    refreshed in the background every ``eta_model_refresh_sec``. Work ahead of a NEW
+    job (jobs created earlier, plus the unfinished half of the running ones) is spread
+    over the worker slots: ``processing_batch_size`` per active worker. Dispatch is
+    fair-share, so the position is the FIFO approximation of it.
+    """
+
+    def __init__(
+        self,
+        config: JobConf,
+        repository: JobRepository,
+        training_repo: Any | None = None,
+        trainer: Callable[[], str] | None = None,
+    ) -> None:
+        self.config = config
+        self.repository = repository
+        self.training_repo = training_repo
+        self._trainer = trainer
+        self._models: dict[str, RuntimeModel] = {}
+        self._models_loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+        self._refresh: asyncio.Task | None = None
+
+    async def estimate(self, job: JobLogic, snapshot: QueueSnapshot | None = None) -> JobEta:
+        return (await self.estimate_batch([job], snapshot))[0]
+
+    async def estimate_batch(
+        self, jobs: list[JobLogic], snapshot: QueueSnapshot | None = None
+    ) -> list[JobEta]:
+        """ETAs of jobs queued one after another (e.g. a batch), from one queue snapshot.
+
+        The snapshot is of the queue before the first NEW job (fetched unless given);
+        every later NEW job of ``jobs`` also waits for the ones before it.
+        """
+        model = await self._runtime_model()
+        now = datetime.now(timezone.utc)
+        queued = [job for job in jobs if job.status == ProcessingStatus.NEW]
+        if queued and snapshot is None:
+            snapshot = await self.repository.fetch_queue_snapshot(
+                queued[0].id, queued[0].created_at, self.config.default_job_cost
+            )
+
+        estimates = []
+        for job in jobs:
+            if job.status in TERMINAL_STATUSES:
+                estimates.append(JobEta(queue_position=None, eta_sec=0, run_sec=0))
+                continue
+            run_sec = self._job_runtime(job, model)
+            if job.status == ProcessingStatus.PROCESSING:
+                elapsed = (now - job.started_at).total_seconds() if job.started_at else 0.0
+                estimates.append(
+                    JobEta(
+                        queue_position=0, eta_sec=_ceil(run_sec - elapsed), run_sec=_ceil(run_sec)
+                    )
+                )
+                continue
+            estimates.append(self._queued_eta(job, model, snapshot, run_sec, now))
+            snapshot = snapshot.model_copy(
+                update={
+                    "jobs_ahead": snapshot.jobs_ahead + 1,
+                    "cost_ahead": snapshot.cost_ahead + self._job_cost(job),
+                }
+            )
+        return estimates
+
+    def _queued_eta(
+        self,
+        job: JobLogic,
+        model: RuntimeModel,
+        snapshot: QueueSnapshot,
+        run_sec: float,
+        now: datetime,
+    ) -> JobEta:
+        slots = self.config.processing_batch_size * max(snapshot.active_workers, 1)
+        work_ahead = model.predict_total(snapshot.jobs_ahead, snapshot.cost_ahead)
+        work_ahead += model.predict_total(snapshot.running_jobs, snapshot.running_cost) / 2
+        wait = work_ahead / slots + self.config.processing_interval_sec
+        if job.next_attempt_at is not None:
+            wait = max(wait, (job.next_attempt_at - now).total_seconds())
+
+        return JobEta(
+            queue_position=snapshot.jobs_ahead + 1,
+            eta_sec=_ceil(wait + run_sec),
+            run_sec=_ceil(run_sec),
+        )
+
+    def _job_cost(self, job: JobLogic) -> int:
+        rows = job.estimated_cost
+        return self.config.default_job_cost if rows is None else rows
+
+    def _job_runtime(self, job: JobLogic, model: RuntimeModel) -> float:
+        if job.type != ServiceType.TRAIN:
+            return float(self.config.wait_time_sec)
+        # Own shape of the job; the model's mean feature count when it is unknown
+        return model.predict(self._job_cost(job), job.feature_count)
+
+    async def _runtime_model(self) -> RuntimeModel:
+        models = await self._load_models()
+        trainer = self._trainer() if self._trainer else None
+        model = models.get(trainer) if trainer else None
+        if model is None and models:
+            # Unknown trainer (e.g. just switched): any history is better than a constant
+            model = max(models.values(), key=lambda m: m.samples)
+        return model or RuntimeModel(intercept=self.config.eta_default_train_sec)
+
+    async def _load_models(self) -> dict[str, RuntimeModel]:
+        if self.training_repo is None:
+            return {}
+        if self._models_loaded_at is None:
+            # Cold start: the first estimate of the process waits for the history
+            await self._refresh_models()
+        elif self._is_stale() and self._refresh is None:
+            # Polls never wait for a refresh: they use the current models meanwhile
+            self._refresh = asyncio.create_task(self._refresh_models())
+            self._refresh.add_done_callback(self._refresh_done)
+        return self._models
+
+    async def _refresh_models(self) -> None:
+        async with self._lock:
+            if not self._is_stale():
+                return
+            try:
+                runs = await self.training_repo.list_runtime_samples(
+                    limit=self.config.eta_history_limit
+                )
+                self._models = _fit_models(runs)
+            except Exception:  # noqa: BLE001
+                logger.warning("Failed to refresh job runtime models", exc_info=True)
+            self._models_loaded_at = time.monotonic()
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refresh = None
+
+    def _is_stale(self) -> bool:
+        return (
+            self._models_loaded_at is None
+            or time.monotonic() - self._models_loaded_at >= self.config.eta_model_refresh_sec
+        )
+
+
+def _fit_models(runs: list[dict[str, Any]]) -> dict[str, RuntimeModel]:
+    samples: dict[str, list[tuple[int, int, float]]] = {}
+    for metrics in runs:
+        try:
+            sample = (
+                int(metrics["n_samples"]),
+                int(metrics["n_features"]),
+                float(metrics["duration_sec"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            continue
+        samples.setdefault(str(metrics.get("trainer")), []).append(sample)
+
+    models = {trainer: RuntimeModel.fit(items) for trainer, items in samples.items()}
+    return {trainer: model for trainer, model in models.items() if model is not None}
+
+
+def _ceil(seconds: float) -> int:
+    return max(int(-(-seconds // 1)), 0)
@@ -1,28 +1,63 @@
 import asyncio
 import logging
+import os
+import socket
+import time
 from typing import NoReturn
+from uuid import UUID, uuid4
 
-from service.models.jobs_models import JobLogic
+from service.infrastructure.job_state.event_broadcaster import JobEventBroadcaster
+from service.models.jobs_models import JobEvent, JobLogic
 from service.models.key_value import ProcessingStatus
 from service.repositories.job_repository import JobRepository
+from service.services.job_retry_policy import JobTimeoutError, RetryPolicy
+from service.services.job_scheduler import FairShareScheduler
 from service.settings import JobConf
+from service.utils.cancellation import CancellationToken, JobCancelledError
 
 logger = logging.getLogger(__name__)
 
 
 class NewJobProcessor:
-    def __init__(self, config: JobConf, repository: JobRepository, training_runner=None) -> None:
+    def __init__(
+        self,
+        config: JobConf,
+        repository: JobRepository,
+        training_runner=None,
+        scheduler: FairShareScheduler | None = None,
+        events: JobEventBroadcaster | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
         self.config = config
         self.repository = repository
         # training_runner: Optional[Callable[[JobLogic], Awaitable[dict]]]
         self.training_runner = training_runner
+        self.scheduler = scheduler or FairShareScheduler(config)
+        self.events = events
+        self.retry_policy = retry_policy or RetryPolicy(config)
+        # Identifies this worker in job leases (claimed_by)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        # Jobs running in this process: cancellation token and the task doing the work
+        self._running: dict[UUID, tuple[CancellationToken, asyncio.Task]] = {}
+        # Drain mode: no new claims, running jobs finish until the deadline
+        self._drain_task: asyncio.Task | None = None
+        self._drain_started_at: float | None = None
+        self._drain_deadline: float | None = None
+        self._released: list[UUID] = []
+        if events is not None:
+            events.add_listener(self._on_job_event)
 
     async def process_new_jobs(self) -> NoReturn:
+        renewer = asyncio.create_task(self._renew_leases_forever())
+        try:
+            await self._process_loop()
+        finally:
+            renewer.cancel()
+
+    async def _process_loop(self) -> NoReturn:
         while True:
             logger.info("Starting job processing...")
-            while new_jobs := await self.repository.fetch_new_jobs(
-                limit=self.config.processing_batch_size
-            ):
+            while new_jobs := await self._claim_jobs():
                 logger.info(f"Processing {len(new_jobs)} new jobs...")
 
                 processing_tasks = []
@@ -39,62 +74,237 @@ class NewJobProcessor:
             )
             await asyncio.sleep(self.config.processing_interval_sec)
 
+    async def _claim_jobs(self) -> list[JobLogic]:
+        if self.draining:
+            return []
+        batch_size = self.config.processing_batch_size
+        return await self.repository.fetch_new_jobs(
+            limit=batch_size,
+            per_user_limit=self.config.max_running_jobs_per_user,
+            scan_limit=batch_size * max(1, self.config.scheduling_scan_factor),
+            selector=self.scheduler.select,
+            worker_id=self.worker_id,
+            lease_sec=self.config.lease_sec,
+        )
+
+    async def _renew_leases_forever(self) -> NoReturn:
+        """Keep leases of running jobs alive so long trainings are not taken as abandoned."""
+        while True:
+            await asyncio.sleep(self.config.lease_renew_interval_sec)
+            if not self._running:
+                continue
+            try:
+                await self.repository.renew_leases(
+                    list(self._running), self.worker_id, self.config.lease_sec
+                )
+            except Exception:  # noqa: BLE001
+                logger.warning("Failed to renew job leases", exc_info=True)
+
+    async def run_lease_reaper(self) -> NoReturn:
+        """Requeue jobs of workers that died without releasing them (one process runs this)."""
+        while True:
+            try:
+                reclaimed = await self.repository.reclaim_expired_leases(
+                    self.config.retry_max_attempts, limit=self.config.lease_reap_batch_limit
+                )
+            except Exception:  # noqa: BLE001
+                logger.warning("Failed to reclaim expired job leases", exc_info=True)
+                reclaimed = []
+            for job in reclaimed:
+                logger.warning(f"Lease of job {job.id} expired, moved to {job.status}")
+                await self._publish(JobEvent(job_id=job.id, user_id=job.user_id, status=job.status))
+            await asyncio.sleep(self.config.lease_reap_interval_sec)
+
+    @property
+    def draining(self) -> bool:
+        return self._drain_task is not None
+
+    def start_drain(self, timeout_sec: float | None = None) -> asyncio.Task:
+        """Switch to drain mode (idempotent) and return the task finishing the drain."""
+        if self._drain_task is None:
+            timeout_sec = self.config.drain_timeout_sec if timeout_sec is None else timeout_sec
+            self._drain_started_at = time.monotonic()
+            self._drain_deadline = self._drain_started_at + max(timeout_sec, 0)
+            logger.info(
+                f"Draining job processor: {len(self._running)} running jobs, "
+                f"deadline in {timeout_sec} seconds"
+            )
+            self._drain_task = asyncio.create_task(self._drain())
+        return self._drain_task
+
+    async def drain(self, timeout_sec: float | None = None) -> None:
+        await asyncio.shield(self.start_drain(timeout_sec))
+
+    async def _drain(self) -> None:
+        tasks = [task for _, task in self._running.values()]
+        if tasks:
+            remaining = max(self._drain_deadline - time.monotonic(), 0)
+            await asyncio.wait(tasks, timeout=remaining)
+
+        leftover = list(self._running)
+        if leftover:
+            # Give unfinished jobs back to the queue right away instead of waiting for
+            # their leases to expire; the attempt is not counted as a failure
+            try:
+                self._released = await self.repository.release_jobs(leftover, self.worker_id)
+            except Exception:  # noqa: BLE001
+                logger.exception("Failed to release leases of unfinished jobs")
+            for job_id in leftover:
+                running = self._running.get(job_id)
+                if running is not None:
+                    token, task = running
+                    token.cancel()
+                    task.cancel()
+        logger.info(f"Job processor drained, released {len(self._released)} jobs")
+
+    def drain_status(self) -> dict:
+        if self._drain_task is None:
+            return {"state": "running", "running_jobs": len(self._running)}
+        now = time.monotonic()
+        return {
+            "state": "drained" if self._drain_task.done() else "draining",
+            "running_jobs": len(self._running),
+            "released_jobs": len(self._released),
+            "elapsed_sec": round(now - self._drain_started_at, 1),
+            "deadline_in_sec": round(max(self._drain_deadline - now, 0), 1),
+        }
+
+    def _on_job_event(self, event: JobEvent) -> None:
+        if event.status != ProcessingStatus.CANCELLED:
+            return
+        running = self._running.get(event.job_id)
+        if running is None:
+            return
+        token, task = running
+        logger.info(f"Cancelling running job {event.job_id}")
+        # Token stops offloaded CPU work at the next chunk, task.cancel frees the slot now
+        token.cancel()
+        task.cancel()
+
     async def _process_job_with_timeout(self, job: JobLogic) -> JobLogic | None:
+        token = CancellationToken()
+        task = asyncio.ensure_future(self._process_job(job, token))
+        self._running[job.id] = (token, task)
         try:
-            result = await asyncio.wait_for(
-                self._process_job(job), timeout=self.config.processing_timeout_sec
-            )
-            return result
-        except asyncio.TimeoutError:
+            return await self._await_with_timeout(job, task)
+        except JobTimeoutError as e:
+            token.cancel()
             logger.error(
                 f"Job {job.id} timed out after {self.config.processing_timeout_sec} seconds"
             )
+            await self._handle_failure(job, e)
+            return None
 
-            job.status = ProcessingStatus.FAILURE
-            await self._save_job_result(job)
-            logger.info(f"Marked job {job.id} as FAILURE due to timeout")
-
+        except (asyncio.CancelledError, JobCancelledError):
+            token.cancel()
+            current = asyncio.current_task()
+            if current is not None and current.cancelling():
+                # Processor itself is being stopped
+                raise
+            if job.id in self._released:
+                logger.info(f"Job {job.id} was released back to the queue")
+            else:
+                logger.info(f"Job {job.id} was cancelled")
             return None
 
         except Exception as e:
-            logger.error(f"Unexpected error processing job {job.id}: {e}", exc_info=True)
+            logger.error(f"Error processing job {job.id}: {e}", exc_info=True)
+            await self._handle_failure(job, e)
+            return None
 
-            job.status = ProcessingStatus.FAILURE
-            await self._save_job_result(job)
-            logger.info(f"Marked job {job.id} as FAILURE due to error")
+        finally:
+            self._running.pop(job.id, None)
 
-            return None
+    async def _await_with_timeout(self, job: JobLogic, task: asyncio.Future) -> JobLogic:
+        try:
+            return await asyncio.wait_for(task, timeout=self.config.processing_timeout_sec)
+        except TimeoutError:
+            # wait_for cancels the task at the deadline; a TimeoutError the job raised
+            # itself (socket, storage, database) leaves it done and stays transient
+            if not task.cancelled():
+                raise
+            raise JobTimeoutError(
+                f"Job {job.id} ran longer than {self.config.processing_timeout_sec} seconds"
+            ) from None
 
-    async def _process_job(self, job: JobLogic) -> JobLogic:
+    async def _process_job(self, job: JobLogic, token: CancellationToken) -> JobLogic:
         logger.info(f"Processing job ID: {job.id}")
-        # If ML training service is available, run it and mark job accordingly
+        await self._publish(JobEvent(job_id=job.id, user_id=job.user_id, status=job.status))
+
+        result: dict | None = None
+        # If ML training service is available, run it; failures go to _handle_failure
         if self.training_runner is not None and getattr(job.type, "name", str(job.type)) == "TRAIN":
-            try:
-                await self._run_training(job)
-                job.status = ProcessingStatus.SUCCESS
-            except Exception:
-                logger.exception("Training failed for job %s", job.id)
-                job.status = ProcessingStatus.FAILURE
+            result = await self._run_training(job, token)
+            job.status = ProcessingStatus.SUCCESS
         else:
             # Fallback: simple wait to simulate processing
             await asyncio.sleep(self.config.wait_time_sec)
             job.status = ProcessingStatus.SUCCESS
 
-        job = await self._save_job_result(job)
+        job = await self._save_job_result(job, result)
         logger.info(f"Job ID: {job.id} completed with status {job.status}.")
         return job
 
-    async def _run_training(self, job: JobLogic) -> None:
+    async def _run_training(self, job: JobLogic, token: CancellationToken) -> dict | None:
         # Run training via provided runner callable/service
-        await self.training_runner(job)
+        return await self.training_runner(job, cancel_token=token)
 
-    async def _save_job_result(self, job: JobLogic) -> JobLogic:
+    async def _handle_failure(self, job: JobLogic, error: BaseException) -> None:
+        decision = self.retry_policy.decide(error, job.attempts)
         try:
-            updated_job = await self.repository.update_job_status(job)
-            logger.info(f"Job {job.id} result saved successfully.")
-            if updated_job is None:
-                raise ValueError("Failed to save job result")
-            return updated_job
+            if not decision.retry:
+                job.status = decision.status
+                await self._save_job_result(job, last_error=decision.error)
+                logger.info(f"Marked job {job.id} as {job.status} after attempt {job.attempts}")
+                return
+
+            retried = await self.repository.schedule_retry(
+                job.id, decision.next_attempt_at, decision.error
+            )
+        except Exception:
+            logger.exception(f"Failed to record failure of job {job.id}")
+            return
+
+        if retried is None:
+            logger.info(f"Job {job.id} is no longer PROCESSING; retry skipped")
+            return
+        logger.info(
+            f"Job {job.id} attempt {job.attempts} failed, retry at {decision.next_attempt_at}"
+        )
+        await self._publish(
+            JobEvent(job_id=retried.id, user_id=retried.user_id, status=retried.status)
+        )
+
+    async def _save_job_result(
+        self, job: JobLogic, result: dict | None = None, last_error: str | None = None
+    ) -> JobLogic:
+        try:
+            updated_job = await self.repository.complete_job(
+                job.id, job.status, last_error=last_error
+            )
         except Exception:
             logger.exception(f"Failed to save job {job.id} result.")
-            raise Exception("Failed to save job result")
+            # Keep the original error: a database blip is retried like any transient failure
+            raise
+
+        if updated_job is None:
+            # Status changed meanwhile (cancelled): keep it, drop the late result
+            logger.info(f"Job {job.id} is no longer PROCESSING; result {job.status} discarded")
+            return job
+        logger.info(f"Job {job.id} result saved successfully.")
+
+        result = result if isinstance(result, dict) else None
+        await self._publish(
+            JobEvent(
+                job_id=updated_job.id,
+                user_id=updated_job.user_id,
+                status=updated_job.status,
+                model_url=result.get("model_url") if result else None,
+                metrics=result,
+            )
+        )
+        return updated_job
+
+    async def _publish(self, event: JobEvent) -> None:
+        if self.events is not None:
+            await self.events.publish(event)
@@ -0,0 +1,104 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from service.models.key_value import ProcessingStatus
+from service.repositories.exceptions import RepositoryOperationalError
+from service.settings import JobConf
+
+
+class JobTimeoutError(Exception):
+    """The job ran longer than ``processing_timeout_sec`` and was stopped by the processor.
+
+    Not a ``TimeoutError`` subclass: a socket, storage or database timeout inside the job
+    is a transient error and keeps the ordinary retry limit.
+    """
+
+
+# Errors worth another attempt: the job itself is fine, the environment was not
+TRANSIENT_ERRORS: tuple[type[BaseException], ...] = (
+    RepositoryOperationalError,
+    ConnectionError,
+    TimeoutError,
+)
+# Environment-looking errors that still mean the input is broken
+PERMANENT_ERRORS: tuple[type[BaseException], ...] = (FileNotFoundError, PermissionError)
+
+
+@dataclass(frozen=True, slots=True)
+class RetryDecision:
+    """What to do with a failed attempt: retry at ``next_attempt_at`` or finish with ``status``."""
+
+    status: ProcessingStatus
+    next_attempt_at: datetime | None = None
+    error: str | None = None
+
+    @property
+    def retry(self) -> bool:
+        return self.status == ProcessingStatus.NEW
+
+
+class RetryPolicy:
+    """Per-error-class retry rules with capped exponential backoff and jitter.
+
+    - processing timeouts (JobTimeoutError): up to ``retry_timeout_max_attempts`` attempts
+    - transient errors (database, connection, storage I/O): up to ``retry_max_attempts``
+    - anything else: FAILURE right away
+
+    A transient job that runs out of attempts goes to DEAD_LETTER instead of FAILURE,
+    so operators can requeue it once the underlying problem is fixed.
+    """
+
+    def __init__(self, config: JobConf, rng: random.Random | None = None) -> None:
+        self.config = config
+        self._rng = rng or random.Random()
+
+    def max_attempts_for(self, error: BaseException) -> int:
+        if isinstance(error, JobTimeoutError):
+            return self.config.retry_timeout_max_attempts
+        if isinstance(error, PERMANENT_ERRORS):
+            return 1
+        if isinstance(error, TRANSIENT_ERRORS) or _is_storage_error(error):
+            return self.config.retry_max_attempts
+        return 1
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before attempt ``attempt + 1``; a random share of it is jitter."""
+        delay = min(
+            self.config.retry_max_delay_sec,
+            self.config.retry_base_delay_sec * 2 ** max(attempt - 1, 0),
+        )
+        jitter = min(max(self.config.retry_jitter, 0.0), 1.0)
+        return delay * (1 - jitter) + self._rng.uniform(0, delay * jitter)
+
+    def decide(
+        self, error: BaseException, attempts: int, now: datetime | None = None
+    ) -> RetryDecision:
+        """``attempts`` is the number of attempts made so far, including the failed one."""
+        message = _describe(error)
+        max_attempts = self.max_attempts_for(error)
+        if max_attempts <= 1:
+            return RetryDecision(status=ProcessingStatus.FAILURE, error=message)
+        if attempts >= max_attempts:
+            return RetryDecision(status=ProcessingStatus.DEAD_LETTER, error=message)
+
+        now = now or datetime.now(timezone.utc)
+        return RetryDecision(
+            status=ProcessingStatus.NEW,
+            next_attempt_at=now + timedelta(seconds=self.backoff(attempts)),
+            error=message,
+        )
+
+
+def _is_storage_error(error: BaseException) -> bool:
+    # minio.error.S3Error / urllib3 errors without importing optional dependencies
+    if isinstance(error, OSError):
+        return True
+    module = type(error).__module__ or ""
+    return module.startswith(("minio", "urllib3"))
+
+
+def _describe(error: BaseException) -> str:
+    if isinstance(error, JobTimeoutError):
+        return "Processing timed out"
+    return f"{type(error).__name__}: {error}"[:500]
@@ -0,0 +1,76 @@
+import heapq
+import logging
+from collections import defaultdict, deque
+from uuid import UUID
+
+from service.models.jobs_models import JobLogic
+from service.settings import JobConf
+
+logger = logging.getLogger(__name__)
+
+
+class FairShareScheduler:
+    """Weighted fair-share selection of NEW jobs across users.
+
+    Every user gets a virtual time equal to ``running / weight``; the next slot goes to
+    the user with the smallest virtual time, so heavy users cannot take every worker slot.
+    Within a user's share jobs are picked shortest-expected-first (``estimated_cost``),
+    and a user never exceeds ``max_running_jobs_per_user`` running jobs.
+    """
+
+    def __init__(self, config: JobConf) -> None:
+        self.config = config
+
+    def weight_for(self, tier: str | None) -> float:
+        weight = self.config.tier_weights.get(str(tier), 1.0) if tier else 1.0
+        return weight if weight > 0 else 1.0
+
+    def cost_of(self, job: JobLogic) -> int:
+        if job.estimated_cost is None:
+            return self.config.default_job_cost
+        return job.estimated_cost
+
+    def select(
+        self,
+        candidates: list[tuple[JobLogic, str | None]],
+        running: dict[UUID, int],
+        limit: int,
+    ) -> list[JobLogic]:
+        """Pick up to ``limit`` jobs from ``(job, user_tier)`` candidates.
+
+        ``running`` holds the number of PROCESSING jobs per user at claim time.
+        """
+        cap = max(1, self.config.max_running_jobs_per_user)
+
+        queues: dict[UUID, deque[JobLogic]] = defaultdict(deque)
+        weights: dict[UUID, float] = {}
+        for job, tier in sorted(
+            candidates, key=lambda c: (self.cost_of(c[0]), c[0].created_at is None, c[0].created_at)
+        ):
+            queues[job.user_id].append(job)
+            weights.setdefault(job.user_id, self.weight_for(tier))
+
+        taken: dict[UUID, int] = defaultdict(int)
+        heap: list[tuple[float, int, int, UUID]] = []
+        for seq, (user_id, queue) in enumerate(queues.items()):
+            if running.get(user_id, 0) >= cap:
+                continue
+            virtual_time = running.get(user_id, 0) / weights[user_id]
+            heapq.heappush(heap, (virtual_time, self.cost_of(queue[0]), seq, user_id))
+
+        picked: list[JobLogic] = []
+        while heap and len(picked) < limit:
+            virtual_time, _, seq, user_id = heapq.heappop(heap)
+            queue = queues[user_id]
+            picked.append(queue.popleft())
+            taken[user_id] += 1
+
+            if queue and running.get(user_id, 0) + taken[user_id] < cap:
+                virtual_time += 1 / weights[user_id]
+                heapq.heappush(heap, (virtual_time, self.cost_of(queue[0]), seq, user_id))
+
+        logger.debug(
+            f"Fair-share picked {len(picked)} of {len(candidates)} candidates "
+            f"across {len(taken)} users"
+        )
+        return picked
@@ -1,18 +1,44 @@
+import asyncio
 import logging
+from typing import AsyncIterator
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from pydantic import BaseModel
 
-from service.models.jobs_models import JobLogic
+from service.infrastructure.job_state.event_broadcaster import JobEventBroadcaster
+from service.models.jobs_models import (
+    TERMINAL_STATUSES,
+    JobEvent,
+    JobLogic,
+    QueueSnapshot,
+    QuotaSnapshot,
+)
 from service.models.key_value import ProcessingStatus, ServiceType
-from service.models.profile_models import UserProfileLogic
-from service.presentation.routers.jobs_api.schemas import JobResponse, StartJobRequest
+from service.presentation.routers.admin_api.schemas import (
+    DeadLetterJob,
+    DeadLetterJobsResponse,
+    RequeueJobsRequest,
+    RequeueJobsResponse,
+)
+from service.presentation.routers.jobs_api.schemas import (
+    JobResponse,
+    JobsBatchResponse,
+    StartJobRequest,
+    StartJobsBatchRequest,
+)
 from service.repositories.job_repository import JobRepository
+from service.repositories.unit_of_work import after_commit
+from service.services.job_eta import JobEta, JobEtaEstimator
 from service.services.profile_service import ProfileService
 from service.settings import JobConf
+from service.utils.lru_cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
+# Final states whose response can be cached (DEAD_LETTER may still be requeued)
+CACHEABLE_RESULT_STATUSES = frozenset({ProcessingStatus.SUCCESS, ProcessingStatus.FAILURE})
+
 
 class JobService:
     def __init__(
@@ -20,138 +46,351 @@ class JobService:
         config: JobConf,
         repository: JobRepository,
         profile_source: ProfileService,
+        events: JobEventBroadcaster | None = None,
+        eta: JobEtaEstimator | None = None,
     ) -> None:
         self.config = config
         self.repository = repository
         self.profile_source = profile_source
+        self.events = events
+        self.eta = eta
+        # Results of finished jobs never change: polls of them are served from memory,
+        # only the launch balance (changed by other jobs and processes) is read each time
+        self._results: LRUCache[tuple[UUID, UUID], JobResponse] = LRUCache(
+            config.result_cache_size, ttl_sec=config.result_cache_ttl_sec
+        )
 
     async def create_job(self, user_id: UUID, request_body: StartJobRequest) -> JobResponse:
         logger.info(
             f"Creating job for user: {user_id} with params: {request_body.mode=}, {request_body.type}"
         )
 
-        user_attempts = await self._fetch_user_attempts(user_id)
-        if user_attempts <= 0:
-            logger.error(f"No available launches for user: {user_id}")
+        user_attempts, created = await self._admit_jobs(
+            user_id, [self._new_job(user_id, request_body)]
+        )
+        created_job = created[0]
+
+        logger.info(f"Job created with ID: {created_job.id} for user: {user_id}")
+        (estimate,) = await self._estimates([created_job])
+        return self._created_job_response(created_job, user_attempts - 1, estimate)
+
+    async def create_jobs_batch(
+        self, user_id: UUID, request_body: StartJobsBatchRequest
+    ) -> JobsBatchResponse:
+        requests = request_body.jobs
+        logger.info(f"Creating batch of {len(requests)} jobs for user: {user_id}")
+
+        # A batch larger than the queue limit could never be admitted
+        max_batch = min(self.config.max_batch_size, self.config.max_pending_jobs_per_user)
+        if len(requests) > max_batch:
             raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Too many jobs in batch. Max: {max_batch}",
+            )
+
+        user_attempts, created_jobs = await self._admit_jobs(
+            user_id, [self._new_job(user_id, request) for request in requests]
+        )
+
+        logger.info(f"Batch of {len(created_jobs)} jobs created for user: {user_id}")
+        # Every queued job will take a launch: each reports what is left after the ones before
+        estimates = await self._estimates(created_jobs)
+        return JobsBatchResponse(
+            jobs=[
+                self._created_job_response(job, user_attempts - i - 1, estimate)
+                for i, (job, estimate) in enumerate(zip(created_jobs, estimates))
+            ]
+        )
+
+    async def _admit_jobs(self, user_id: UUID, jobs: list[JobLogic]) -> tuple[int, list[JobLogic]]:
+        """Check quota and queue limits and enqueue ``jobs`` in one transaction.
+
+        Returns available launches and the created jobs.
+        """
+        count = len(jobs)
+        files = len({(job.file_id, job.mode) for job in jobs if job.file_id is not None})
+        quota, created = await self.repository.create_jobs_with_quota(
+            user_id, jobs, lambda q: self._admission_error(q, count, files) is None
+        )
+        if quota is None:
+            logger.error(f"User profile not found for user: {user_id}")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User profile not found or inactive",
+            )
+        if error := self._admission_error(quota, count, files):
+            logger.error(f"Jobs of user: {user_id} rejected: {error.detail}")
+            raise error
+        return quota.available_launches, created
+
+    def _admission_error(
+        self, quota: QuotaSnapshot, count: int, files: int = 0
+    ) -> HTTPException | None:
+        if quota.files_found < files:
+            return HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found",
+            )
+
+        if quota.available_launches <= 0:
+            return HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No available launches",
             )
 
-        user_ongoing_jobs = await self.repository.fetch_jobs_by_user_id(
-            user_id, [ProcessingStatus.NEW, ProcessingStatus.PROCESSING]
-        )
-        if user_ongoing_jobs:
-            logger.error(f"User: {user_id} has an ongoing job")
-            logger.debug(
-                f"Ongoing jobs: {[j.model_dump_json(indent=2) for j in user_ongoing_jobs]}"
+        # Every queued job will be charged on success: do not accept more than the quota covers
+        if quota.pending + quota.running + count > quota.available_launches:
+            return HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough available launches for queued jobs",
             )
-            raise HTTPException(
+
+        if quota.pending + count > self.config.max_pending_jobs_per_user:
+            return HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User has an ongoing job. Please wait for it to complete before starting a new one.",
+                detail=(
+                    "Too many queued jobs. "
+                    f"Max pending per user: {self.config.max_pending_jobs_per_user}"
+                ),
             )
+        return None
 
-        # Примем file_id на уровне API, но пока не сохраняем его в user_launch
-        logger.info(f"Processing job with file_id: {request_body.file_id}")
-
-        new_job = JobLogic(
+    def _new_job(self, user_id: UUID, request_body: StartJobRequest) -> JobLogic:
+        return JobLogic(
             user_id=user_id,
             mode=request_body.mode,
             type=request_body.type,
             status=ProcessingStatus.NEW,
+            file_id=request_body.file_id,
+            file_pinned=request_body.file_id is not None,
         )
-        created_job = await self.repository.create_job(new_job)
-
-        logger.info(f"Job created with ID: {created_job.id} for user: {user_id}")
 
+    def _created_job_response(
+        self, job: JobLogic, available_launches: int, estimate: JobEta | None
+    ) -> JobResponse:
         # TRAIN jobs предполагают ML обучение: период ожидания может быть выше
         wait_time = self.config.wait_time_sec
-        if created_job.type.name == "TRAIN":
+        if job.type == ServiceType.TRAIN:
             wait_time = max(wait_time, self.config.processing_timeout_sec)
 
         return JobResponse(
-            job_id=created_job.id,
-            status=created_job.status,
+            job_id=job.id,
+            status=job.status,
             result_file_url=None,
-            available_launches=user_attempts - 1,
-            wait_time_sec=wait_time,
+            available_launches=available_launches,
+            wait_time_sec=self._wait_time_hint(estimate, wait_time),
+            queue_position=estimate.queue_position if estimate else None,
+            eta_sec=estimate.eta_sec if estimate else None,
             model_url=None,
             metrics=None,
         )
 
-    async def fetch_job_result(self, user_id: UUID, job_id: UUID) -> JobResponse:
+    async def _estimate(
+        self, job: JobLogic, snapshot: QueueSnapshot | None = None
+    ) -> JobEta | None:
+        if job.status in TERMINAL_STATUSES:
+            return None
+        return (await self._estimates([job], snapshot))[0]
+
+    async def _estimates(
+        self, jobs: list[JobLogic], snapshot: QueueSnapshot | None = None
+    ) -> list[JobEta | None]:
+        """ETAs of jobs queued together: one queue snapshot for all of them."""
+        if self.eta is None:
+            return [None] * len(jobs)
+        try:
+            return list(await self.eta.estimate_batch(jobs, snapshot))
+        except Exception:  # noqa: BLE001
+            logger.warning(
+                "Failed to estimate ETA for jobs: %s", [job.id for job in jobs], exc_info=True
+            )
+            return [None] * len(jobs)
+
+    def _wait_time_hint(self, estimate: JobEta | None, default: int) -> int:
+        """Seconds to wait before polling again: the ETA, bounded by the processing timeout."""
+        if estimate is None:
+            return default
+        return min(max(estimate.eta_sec, 1), self.config.processing_timeout_sec)
+
+    async def fetch_job_result(
+        self, user_id: UUID, job_id: UUID, wait_sec: float = 0
+    ) -> JobResponse:
+        """Return the job result; with ``wait_sec`` > 0 long-poll for a status change.
+
+        Long-polling registers in the event broadcaster before reading the job, then
+        sleeps until an event with a different status arrives (or the timeout ends)
+        and reads the job once more. No database queries run while waiting.
+        """
+        wait_sec = min(max(wait_sec, 0), self.config.long_poll_max_sec)
+        if wait_sec <= 0 or self.events is None:
+            return await self._fetch_job_result(user_id, job_id)
+
+        async with self.events.subscribe(job_id) as queue:
+            result = await self._fetch_job_result(user_id, job_id)
+            if result.status in TERMINAL_STATUSES:
+                return result
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + wait_sec
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return result
+                if event.status != result.status:
+                    return await self._fetch_job_result(user_id, job_id)
+            return result
+
+    async def _fetch_job_result(self, user_id: UUID, job_id: UUID) -> JobResponse:
+        cache_key = (user_id, job_id)
+        if (cached := self._results.get(cache_key)) is not None:
+            launches = await self.repository.fetch_available_launches(user_id)
+            return cached.model_copy(update={"available_launches": launches})
+
         logger.info(f"Fetching job result for job: {job_id} and user: {user_id}")
 
-        job = await self.repository.fetch_job_by_id(job_id, user_id)
+        # The queue snapshot of a NEW job comes with the view: one round trip per poll
+        view = await self.repository.fetch_job_result_view(
+            job_id, user_id, default_cost=self.config.default_job_cost
+        )
 
-        if not job:
+        if not view:
             logger.error(f"Job not found for user: {user_id}")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
 
+        job = view.job
+        user_attempts = view.available_launches
         if job.status == ProcessingStatus.SUCCESS and job.is_payment_taken is False:
             logger.info(f"Job {job.id} completed successfully, processing payment")
-            job = await self._take_payment(job)
-
-        user_attempts = await self._fetch_user_attempts(user_id)
+            job, user_attempts = await self._take_payment(job, user_attempts)
 
-        # Enrich TRAIN job with model_url + metrics if available
-        model_url = None
-        metrics = None
-        if job.type == ServiceType.TRAIN:
-            try:
-                from service.repositories.training_repository import (
-                    TrainingRepository,  # local import
-                )
-
-                training_repo = self.repository.connector  # PgConnector via JobRepository -> reuse
-                # Instantiate a lightweight TrainingRepository to fetch enrichment data
-                tr_repo = TrainingRepository(training_repo)
-                run = await tr_repo.get_training_run_by_launch(job.user_id, job.id)
-                art = await tr_repo.get_model_artifact_by_launch(job.user_id, job.id)
-                if run and run.model_url:
-                    model_url = run.model_url
-                    metrics = run.metrics or (art.metrics if art else None)
-                elif art:
-                    model_url = art.model_url
-                    metrics = art.metrics
-            except Exception:  # noqa: BLE001
-                logger.warning("Failed to enrich TRAIN job with metrics")
-
-        return JobResponse(
+        # model_url + metrics only make sense for TRAIN jobs
+        is_train = job.type == ServiceType.TRAIN
+        estimate = await self._estimate(job, view.queue)
+        response = JobResponse(
             job_id=job.id,
             status=job.status,
             result_file_url=None,
             available_launches=user_attempts,
-            wait_time_sec=self.config.wait_time_sec,
-            model_url=model_url,
-            metrics=metrics,
+            wait_time_sec=self._wait_time_hint(estimate, self.config.wait_time_sec),
+            queue_position=estimate.queue_position if estimate else None,
+            eta_sec=estimate.eta_sec if estimate else None,
+            model_url=view.model_url if is_train else None,
+            metrics=view.metrics if is_train else None,
         )
 
-    async def _take_payment(self, job: JobLogic) -> JobLogic:
+        if job.status in CACHEABLE_RESULT_STATUSES and (
+            job.status != ProcessingStatus.SUCCESS or job.is_payment_taken
+        ):
+            self._results.put(cache_key, response)
+        return response
 
-        await self.profile_source.decrement_available_launches(job.user_id)
+    async def cancel_job(self, user_id: UUID, job_id: UUID) -> JobResponse:
+        """Cancel a queued or running job.
 
-        updated_job = await self.repository.update_job_status(job)
-        if not updated_job:
-            logger.error(f"Failed to update job payment status for job: {job.id}")
-            raise ValueError("Failed to update job payment status")
+        The status is switched atomically, so the slot is free for the scheduler right
+        away; the worker running the job learns about it from the CANCELLED event and
+        stops at the next checkpoint. The event goes out once the change is committed.
+        """
+        logger.info(f"Cancelling job: {job_id} for user: {user_id}")
 
-        logger.info(f"Payment processed for job: {job.id}")
-        return updated_job
-
-    async def _fetch_user_attempts(self, user_id: UUID) -> int:
-        user_profile = await self._fetch_user(user_id)
-        return user_profile.available_launches
-
-    async def _fetch_user(self, user_id: UUID) -> UserProfileLogic:
-        try:
-            user_profile = await self.profile_source.fetch_user_profile(user_id)
-        except ValueError:
-            logger.exception(f"User profile not found or inactive for user: {user_id}")
+        cancelled = await self.repository.cancel_job(job_id, user_id)
+        if cancelled is None:
+            job = await self.repository.fetch_job_by_id(job_id, user_id)
+            if not job:
+                logger.error(f"Job not found for user: {user_id}")
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+            logger.error(f"Job {job_id} is already finished with status {job.status}")
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User profile not found or inactive",
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Job is already finished with status {job.status}",
             )
 
-        logger.debug(f"User {user_id} has: {user_profile.available_launches} available launches")
-        return user_profile
+        if self.events is not None:
+            event = JobEvent(
+                job_id=cancelled.id,
+                user_id=cancelled.user_id,
+                status=ProcessingStatus.CANCELLED,
+            )
+            await after_commit(lambda: self.events.publish(event))
+
+        return await self._fetch_job_result(user_id, job_id)
+
+    async def list_dead_letter_jobs(
+        self, limit: int = 100, offset: int = 0
+    ) -> DeadLetterJobsResponse:
+        jobs = await self.repository.fetch_jobs_by_status(
+            ProcessingStatus.DEAD_LETTER, limit=limit, offset=offset
+        )
+        return DeadLetterJobsResponse(
+            jobs=[
+                DeadLetterJob(
+                    job_id=job.id,
+                    user_id=job.user_id,
+                    mode=job.mode,
+                    type=job.type,
+                    attempts=job.attempts,
+                    last_error=job.last_error,
+                    updated_at=job.updated_at,
+                )
+                for job in jobs
+            ]
+        )
+
+    async def requeue_dead_letter_jobs(
+        self, request_body: RequeueJobsRequest
+    ) -> RequeueJobsResponse:
+        job_ids = await self.repository.requeue_dead_letter_jobs(
+            request_body.job_ids, limit=request_body.limit
+        )
+        logger.info(f"Requeued {len(job_ids)} dead-letter jobs")
+        return RequeueJobsResponse(requeued=len(job_ids), job_ids=job_ids)
+
+    async def stream_job_updates(
+        self, user_id: UUID, job_id: UUID
+    ) -> AsyncIterator[tuple[str, BaseModel | None]]:
+        """Yield ``(event_name, payload)`` pairs for a job until it reaches a terminal state.
+
+        The first item is a snapshot of the current result (404 is raised before anything
+        is yielded). Further updates come from the event broadcaster without touching the
+        database; only the final result is fetched once more. ``("ping", None)`` is
+        yielded as a keep-alive while the job is idle.
+        """
+        if self.events is None:
+            yield "result", await self.fetch_job_result(user_id, job_id)
+            return
+
+        # Subscribe before taking the snapshot so no transition is lost in between
+        async with self.events.subscribe(job_id) as queue:
+            snapshot = await self.fetch_job_result(user_id, job_id)
+            if snapshot.status in TERMINAL_STATUSES:
+                yield "result", snapshot
+                return
+            yield "status", snapshot
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=self.config.stream_heartbeat_sec
+                    )
+                except asyncio.TimeoutError:
+                    yield "ping", None
+                    continue
+
+                if event.is_terminal:
+                    # Final fetch also takes the payment for successful jobs
+                    yield "result", await self.fetch_job_result(user_id, job_id)
+                    return
+                yield ("progress" if event.stage else "status"), event
+
+    async def _take_payment(self, job: JobLogic, available_launches: int) -> tuple[JobLogic, int]:
+        """Charge a launch for a successful job; return the job and the remaining launches."""
+        remaining = await self.repository.take_payment(job.id)
+        paid_job = job.model_copy(update={"is_payment_taken": True})
+        if remaining is None:
+            # Already charged by a concurrent poll of the same job
+            logger.info(f"Payment for job: {job.id} was already taken")
+            return paid_job, available_launches
+
+        logger.info(f"Payment processed for job: {job.id}")
+        return paid_job, remaining
@@ -69,22 +69,21 @@ class ProfileService:
         return updated_profile
 
     async def decrement_available_launches(self, user_id: UUID) -> int:
-        user_profile = await self.fetch_user_profile(user_id)
-        if user_profile.available_launches <= 0:
+        available_launches = await self.repository.add_available_launches(user_id, -1)
+        if available_launches is None:
             logger.error(f"No available launches for user: {user_id}")
             raise ValueError("No available launches")
-        user_profile.available_launches -= 1
-        updated_profile = await self.repository.update_user_profile(user_profile)
         logger.info(
-            f"Decremented available launches for user: {user_id}. New count: {updated_profile.available_launches}"
+            f"Decremented available launches for user: {user_id}. New count: {available_launches}"
         )
-        return updated_profile.available_launches
+        return available_launches
 
     async def increment_available_launches(self, user_id: UUID) -> int:
-        user_profile = await self.fetch_user_profile(user_id)
-        user_profile.available_launches += 1
-        updated_profile = await self.repository.update_user_profile(user_profile)
+        available_launches = await self.repository.add_available_launches(user_id, 1)
+        if available_launches is None:
+            logger.error(f"User profile not found for user: {user_id}")
+            raise ValueError("User profile not found")
         logger.info(
-            f"Incremented available launches for user: {user_id}. New count: {updated_profile.available_launches}"
+            f"Incremented available launches for user: {user_id}. New count: {available_launches}"
         )
-        return updated_profile.available_launches
+        return available_launches
@@ -1,21 +1,38 @@
+import asyncio
 import logging
 import os
+import shutil
+import tempfile
+import time
 import uuid
-from typing import Any
-
-from service.models.jobs_models import JobLogic
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from service.infrastructure.job_state.event_broadcaster import JobEventBroadcaster
+from service.infrastructure.storage.abstract_file_storage import AbstractFileStorage
+from service.infrastructure.storage.local_file_storage import unlink_paths
+from service.models.jobs_models import JobEvent, JobLogic
 from service.models.key_value import ProcessingStatus
 from service.repositories.file_repository import FileRepository
 from service.repositories.training_repository import TrainingRepository
+from service.settings import config
+from service.utils.cancellation import CancellationToken, JobCancelledError
 
 logger = logging.getLogger(__name__)
 
+# How often the lightweight trainer checks for cancellation while reading rows
+_CANCEL_CHECK_ROWS = 10_000
+
+TRAINER_SKLEARN = "sklearn"
+TRAINER_BASELINE = "baseline"
+
 
 class TrainingService:
     """Minimal ML training pipeline bound to Jobs.
 
     For now, it:
-    - picks the latest uploaded user file for a given mode
+    - picks the job's input file (or the latest uploaded user file for its mode)
     - creates a Dataset if needed
     - creates a TrainingRun with status PROCESSING
     - simulates training (sleep) and writes a small artifact file
@@ -28,8 +45,12 @@ class TrainingService:
         file_repo: FileRepository,
         *,
         storage_root: str | None = None,
+        events: JobEventBroadcaster | None = None,
+        storage: AbstractFileStorage | None = None,
     ) -> None:
         self._training_repo = training_repo
+        self._storage = storage
+        self._events = events
         self._file_repo = file_repo
         self._storage_root = storage_root or os.getenv("STORAGE_ROOT", "/var/lib/app/storage")
         # Feature flag to enable real training with pandas/sklearn on safe platforms
@@ -40,24 +61,26 @@ class TrainingService:
             "on",
         }
 
-    async def run_for_job(self, job: JobLogic) -> dict[str, Any]:
+    async def run_for_job(
+        self, job: JobLogic, cancel_token: CancellationToken | None = None
+    ) -> dict[str, Any]:
         """Execute real training flow on a CSV dataset.
 
         Heuristics:
-        - resolve dataset path from stored file_url
+        - resolve dataset path from stored file_url (MinIO objects are downloaded first)
         - read CSV with pandas
         - choose task: classification if target is categorical or has few unique values; otherwise regression
         - compute basic metrics and persist model via joblib
+
+        CPU-bound training runs in a worker thread; ``cancel_token`` is checked between
+        chunks of work so a cancelled job stops early (JobCancelledError is raised).
         """
         logger.info("Starting training for job %s", job.id)
+        cancel_token = cancel_token or CancellationToken()
 
-        # 1) Find latest user file for the job.mode
-        latest_files = await self._file_repo.fetch_user_files_metadata(job.user_id, job.mode)
-        if not latest_files:
-            logger.warning("No user files found for user=%s mode=%s", job.user_id, job.mode)
-            raise ValueError("No input dataset available for training")
-
-        user_file = sorted(latest_files, key=lambda f: getattr(f, "created_at", 0), reverse=True)[0]
+        # 1) The file the job was started for, or the latest user file for the job.mode
+        user_file = await self._input_file(job)
+        await self._report_progress(job, "dataset", 0.1)
 
         # 2) Ensure dataset exists (registry record)
         dataset = await self._training_repo.get_or_create_dataset_from_file(
@@ -77,8 +100,19 @@ class TrainingService:
         )
 
         # 4) Load dataset and train a simple model
-        data_path = self._resolve_data_path(user_file.file_url)
-        metrics: dict[str, Any] = await self._train_and_export_model(data_path)
+        await self._report_progress(job, "training", 0.3)
+        try:
+            async with self._input_path(user_file) as data_path:
+                started = time.monotonic()
+                metrics: dict[str, Any] = await asyncio.to_thread(
+                    self._train_and_export_model, data_path, cancel_token
+                )
+            # Stage timing feeds the runtime model behind job ETAs (see JobEtaEstimator)
+            metrics["duration_sec"] = round(time.monotonic() - started, 3)
+        except (JobCancelledError, asyncio.CancelledError):
+            cancel_token.cancel()
+            await self._mark_run_cancelled(run.id)
+            raise
 
         # 5) Persist a model artifact file (already created by _train_and_export_model)
         model_url = metrics.get("model_url")
@@ -86,6 +120,7 @@ class TrainingService:
             raise ValueError("Training completed but no model_url was generated")
 
         # 6) Save artifact and mark run done
+        await self._report_progress(job, "artifact", 0.9)
         await self._training_repo.create_model_artifact(
             user_id=job.user_id,
             launch_id=job.id,
@@ -110,21 +145,17 @@ class TrainingService:
                     deleted_urls = await self._training_repo.delete_oldest_artifacts(
                         job.user_id, keep=max_artifacts
                     )
-                    removed_files = 0
-                    for url in deleted_urls:
-                        path = self._resolve_model_path(url)
-                        try:
-                            os.remove(path)
-                            removed_files += 1
-                        except FileNotFoundError:
-                            logger.debug("Retention cleanup skipped missing file: %s", path)
-                        except Exception as e:  # noqa: BLE001
-                            logger.warning("Failed to delete artifact file %s: %s", path, e)
+                    deleted = await unlink_paths(
+                        {url: Path(self._resolve_model_path(url)) for url in deleted_urls},
+                        concurrency=config.storage_delete_concurrency,
+                    )
                     logger.info(
-                        "Artifact retention: removed %s DB records and %s files for user %s",
+                        "Artifact retention: removed %s DB records and %s files for user %s "
+                        "(%s already missing)",
                         len(deleted_urls),
-                        removed_files,
+                        deleted.removed,
                         job.user_id,
+                        deleted.missing,
                     )
             except Exception:  # noqa: BLE001
                 logger.warning("Artifact retention step failed for user %s", job.user_id)
@@ -132,6 +163,69 @@ class TrainingService:
         logger.info("Training for job %s finished successfully", job.id)
         return metrics
 
+    async def _input_file(self, job: JobLogic):
+        # A pinned job whose file was deleted has file_id cleared (ON DELETE SET NULL)
+        if job.file_id is not None or job.file_pinned:
+            user_file = (
+                await self._file_repo.fetch_user_file_by_id(job.user_id, job.file_id)
+                if job.file_id is not None
+                else None
+            )
+            if user_file is None:
+                logger.warning("Input file %s of job %s is gone", job.file_id, job.id)
+                raise ValueError("Input dataset of the job no longer exists")
+            return user_file
+
+        latest_files = await self._file_repo.fetch_user_files_metadata(
+            job.user_id, job.mode, limit=1
+        )
+        if not latest_files:
+            logger.warning("No user files found for user=%s mode=%s", job.user_id, job.mode)
+            raise ValueError("No input dataset available for training")
+        return sorted(latest_files, key=lambda f: getattr(f, "created_at", 0), reverse=True)[0]
+
+    @property
+    def trainer_name(self) -> str:
+        """Trainer that new jobs are expected to use (recorded as ``metrics["trainer"]``)."""
+        return TRAINER_SKLEARN if self._enable_real else TRAINER_BASELINE
+
+    async def _mark_run_cancelled(self, run_id: uuid.UUID) -> None:
+        try:
+            await self._training_repo.update_training_run_status(
+                run_id=run_id, status=ProcessingStatus.CANCELLED
+            )
+        except Exception:  # noqa: BLE001
+            logger.warning("Failed to mark training run %s as cancelled", run_id)
+
+    async def _report_progress(self, job: JobLogic, stage: str, progress: float) -> None:
+        if self._events is None:
+            return
+        await self._events.publish(
+            JobEvent(
+                job_id=job.id,
+                user_id=job.user_id,
+                status=ProcessingStatus.PROCESSING,
+                stage=stage,
+                progress=progress,
+            )
+        )
+
+    @asynccontextmanager
+    async def _input_path(self, user_file) -> AsyncIterator[str]:
+        """Local path of the input file: objects in MinIO are downloaded with parallel
+        ranged GETs into a temporary directory, removed after training."""
+        download = getattr(self._storage, "download_file", None)
+        if not user_file.file_url.startswith("s3://") or not callable(download):
+            yield self._resolve_data_path(user_file.file_url)
+            return
+        workdir = await asyncio.to_thread(tempfile.mkdtemp, prefix="train-")
+        try:
+            path = os.path.join(workdir, os.path.basename(user_file.file_name))
+            await download(user_file.file_name, path)
+            yield path
+        finally:
+            await asyncio.to_thread(shutil.rmtree, workdir, True)
+
     def _resolve_data_path(self, file_url: str) -> str:
         # Map "/storage/..." to storage_root, else treat as absolute or relative under storage_root
         if file_url.startswith("/storage/"):
@@ -141,12 +235,15 @@ class TrainingService:
             return file_url
         return os.path.join(self._storage_root, file_url)
 
-    async def _train_and_export_model(self, csv_path: str) -> dict[str, Any]:
-        """Train a simple model on CSV.
+    def _train_and_export_model(
+        self, csv_path: str, cancel_token: CancellationToken | None = None
+    ) -> dict[str, Any]:
+        """Train a simple model on CSV (blocking, runs in a worker thread).
 
         If ENABLE_REAL_TRAINING is set, try pandas/sklearn path; otherwise use lightweight fallback.
         Any failure on heavy path results in fallback.
         """
+        cancel_token = cancel_token or CancellationToken()
         if not os.path.exists(csv_path):
             raise FileNotFoundError(f"Dataset not found: {csv_path}")
         if self._enable_real:
@@ -166,6 +263,7 @@ class TrainingService:
                 from sklearn.model_selection import train_test_split
 
                 df = pd.read_csv(csv_path)
+                cancel_token.raise_if_cancelled()
                 if df.empty:
                     raise ValueError("Dataset is empty")
 
@@ -189,6 +287,7 @@ class TrainingService:
                     X, y, test_size=0.25, random_state=42
                 )
 
+                cancel_token.raise_if_cancelled()
                 task = "classification"
                 if pd.api.types.is_numeric_dtype(y) and y.nunique() > 20:
                     task = "regression"
@@ -208,6 +307,7 @@ class TrainingService:
                     cm = confusion_matrix(y_test, y_pred)
                     metrics: dict[str, Any] = {
                         "task": task,
+                        "trainer": TRAINER_SKLEARN,
                         "accuracy": float(acc),
                         "precision": float(prec),
                         "recall": float(rec),
@@ -225,6 +325,7 @@ class TrainingService:
                     mae = mean_absolute_error(y_test, y_pred)
                     metrics = {
                         "task": task,
+                        "trainer": TRAINER_SKLEARN,
                         "r2": float(r2),
                         "mse": float(mse),
                         "mae": float(mae),
@@ -232,18 +333,23 @@ class TrainingService:
                         "n_samples": int(df.shape[0]),
                     }
 
+                cancel_token.raise_if_cancelled()
                 model_rel_path = f"models/model_{uuid.uuid4().hex}.joblib"
                 model_abs_path = os.path.join(self._storage_root, model_rel_path)
                 os.makedirs(os.path.dirname(model_abs_path), exist_ok=True)
                 joblib.dump(model, model_abs_path)
                 metrics["model_url"] = f"/storage/{model_rel_path}"
                 return metrics
+            except JobCancelledError:
+                raise
             except Exception as e:  # noqa: BLE001
                 logger.warning("Heavy training failed or unavailable, falling back: %s", e)
         # fallback
-        return await self._train_lightweight(csv_path)
+        return self._train_lightweight(csv_path, cancel_token)
 
-    async def _train_lightweight(self, csv_path: str) -> dict[str, Any]:
+    def _train_lightweight(
+        self, csv_path: str, cancel_token: CancellationToken | None = None
+    ) -> dict[str, Any]:
         """Pure-Python fallback: CSV parsing and simple baseline metrics with pickle artifact.
 
         - Determines target column like primary path
@@ -256,6 +362,8 @@ class TrainingService:
         import io
         import pickle
 
+        cancel_token = cancel_token or CancellationToken()
+
         # Read CSV
         with open(csv_path, "rb") as fh:
             raw = fh.read()
@@ -282,6 +390,8 @@ class TrainingService:
         # Collect rows
         rows: list[list[str]] = []
         for row in reader:
+            if len(rows) % _CANCEL_CHECK_ROWS == 0:
+                cancel_token.raise_if_cancelled()
             if row and any(str(c).strip() != "" for c in row):
                 rows.append(row)
         if not rows:
@@ -292,6 +402,7 @@ class TrainingService:
         for i, name in enumerate(header):
             if i == target_idx:
                 continue
+            cancel_token.raise_if_cancelled()
             # try parse all rows to float; if any fail, skip column
             ok = True
             for r in rows:
@@ -322,6 +433,7 @@ class TrainingService:
         if y_all_float and len(y_unique) > 20:
             task = "regression"
 
+        cancel_token.raise_if_cancelled()
         n_features = len(feature_indices)
         n_samples = len(rows)
 
@@ -335,6 +447,7 @@ class TrainingService:
             acc = majority / n_samples if n_samples else 0.0
             metrics = {
                 "task": task,
+                "trainer": TRAINER_BASELINE,
                 "accuracy": float(acc),
                 # Fallback baseline cannot meaningfully compute precision/recall/f1 for majority classifier
                 "precision": None,
@@ -353,6 +466,7 @@ class TrainingService:
             mae = sum(abs(yv - mean_y) for yv in y_as_float) / n_samples if n_samples else 0.0
             metrics = {
                 "task": task,
+                "trainer": TRAINER_BASELINE,
                 "r2": 0.0,
                 "mse": float(mse),
                 "mae": float(mae),
@@ -0,0 +1,181 @@
+"""Потоковая загрузка файлов: чтение UploadFile чанками без буферизации всего файла.
+
+``UploadStream`` отдаёт чанки писателю хранилища (``FileSaverService.save_stream``) и по
+пути считает размер и sha256 и кормит валидаторы. Лимит размера проверяется при чтении,
+ошибка валидации прерывает поток до commit, и хранилище отбрасывает недописанный файл.
+"""
+
+import asyncio
+import codecs
+import csv
+import hashlib
+import re
+from typing import AsyncIterator, Protocol, Sequence
+
+from fastapi import HTTPException, UploadFile, status
+
+CHUNK_SIZE = 1024 * 1024
+# Незаконченная запись CSV длиннее этого (незакрытая кавычка) считается битым файлом
+MAX_RECORD_CHARS = 1024 * 1024
+_EMPTY_VALUES = {"nan", "none", "null"}
+_LINE = re.compile(r"[^\n]*\n|[^\n]+")
+
+
+class UploadTooLargeError(Exception):
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class ChunkValidator(Protocol):
+    def feed(self, chunk: bytes) -> None: ...
+
+    def finish(self) -> None: ...
+
+
+class UploadStream:
+    """Чанки ``UploadFile``: лимит размера, sha256 и валидаторы применяются при чтении."""
+
+    def __init__(
+        self,
+        file: UploadFile,
+        *,
+        max_bytes: int,
+        validators: Sequence[ChunkValidator] = (),
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        self._file = file
+        self._max_bytes = max_bytes
+        self._validators = validators
+        self._chunk_size = chunk_size
+        self._hasher = hashlib.sha256()
+        self.size = 0
+
+    @property
+    def sha256(self) -> str:
+        return self._hasher.hexdigest()
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._chunks()
+
+    async def _chunks(self) -> AsyncIterator[bytes]:
+        if self._file.size is not None and self._file.size > self._max_bytes:
+            raise UploadTooLargeError(self._max_bytes)
+        while chunk := await self._file.read(self._chunk_size):
+            self.size += len(chunk)
+            if self.size > self._max_bytes:
+                raise UploadTooLargeError(self._max_bytes)
+            # Хеш и разбор CSV не держат event loop
+            await asyncio.to_thread(self._consume, chunk)
+            yield chunk
+        for validator in self._validators:
+            validator.finish()
+
+    def _consume(self, chunk: bytes) -> None:
+        self._hasher.update(chunk)
+        for validator in self._validators:
+            validator.feed(chunk)
+
+
+async def content_sha256(file: UploadFile, chunk_size: int = CHUNK_SIZE) -> str:
+    """sha256 всего ``UploadFile`` до потоковой загрузки; файл перематывается в начало."""
+
+    def _hash() -> str:
+        digest = hashlib.sha256()
+        file.file.seek(0)
+        while chunk := file.file.read(chunk_size):
+            digest.update(chunk)
+        file.file.seek(0)
+        return digest.hexdigest()
+
+    return await asyncio.to_thread(_hash)
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class CsvValidator:
+    """Инкрементальная проверка CSV: заголовок >= 2 колонок, число строк, доля пустых.
+
+    Байты декодируются инкрементально (UTF-8, битые символы заменяются). Каждый чанк
+    разбирается ``csv.reader`` до последнего перевода строки вне кавычек, хвост ждёт
+    следующего чанка; в памяти только текущий чанк и незаконченная запись.
+    """
+
+    def __init__(self, *, min_rows: int = 2, max_empty_ratio: float = 0.5) -> None:
+        self.min_rows = min_rows
+        self.max_empty_ratio = max_empty_ratio
+        self.header: list[str] | None = None
+        self.rows = 0
+        self.empty_cells = 0
+        self._seen_bytes = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = ""
+
+    def feed(self, chunk: bytes) -> None:
+        self._seen_bytes = self._seen_bytes or bool(chunk)
+        text = self._pending + self._decoder.decode(chunk)
+        end = _records_end(text)
+        self._pending = text[end:]
+        if len(self._pending) > MAX_RECORD_CHARS:
+            raise _bad_request("Ошибка чтения CSV: слишком длинная строка")
+        self._parse(text, end)
+
+    def finish(self) -> None:
+        if not self._seen_bytes:
+            raise _bad_request("Пустой файл")
+        text = self._pending + self._decoder.decode(b"", final=True)
+        self._parse(text, len(text))
+        self._pending = ""
+        if self.header is None:
+            raise _bad_request("Отсутствует заголовок CSV")
+        if not self.rows:
+            raise _bad_request("Пустой CSV без данных")
+        if self.rows < self.min_rows:
+            raise _bad_request(f"Недостаточно строк данных: {self.rows} < {self.min_rows}")
+        total_cells = self.rows * len(self.header)
+        if total_cells > 0 and (self.empty_cells / total_cells) > self.max_empty_ratio:
+            raise _bad_request("Слишком много пустых значений в CSV")
+
+    def _parse(self, text: str, end: int) -> None:
+        if not end:
+            return
+        # Строки по одной, без копии чанка
+        rows = csv.reader(m.group() for m in _LINE.finditer(text, 0, end))
+        try:
+            if self.header is None:
+                self._set_header(next(rows, None))
+            for row in rows:
+                empty = blank = 0
+                for cell in row:
+                    if not cell.strip():
+                        blank += 1
+                    elif cell.lower() in _EMPTY_VALUES:
+                        empty += 1
+                if blank == len(row):
+                    continue
+                self.rows += 1
+                self.empty_cells += blank + empty
+        except csv.Error as e:
+            raise _bad_request(f"Ошибка чтения CSV: {e}")
+
+    def _set_header(self, row: list[str] | None) -> None:
+        if not row:
+            raise _bad_request("Отсутствует заголовок CSV")
+        self.header = [c.strip() for c in row if c is not None and str(c).strip() != ""]
+        if len(self.header) < 2:
+            raise _bad_request("Недостаточно колонок в CSV")
+
+
+def _records_end(text: str) -> int:
+    """Позиция после последнего перевода строки вне кавычек (0, если такого нет)."""
+    quotes = text.count('"')
+    end = len(text)
+    while (newline := text.rfind("\n", 0, end)) != -1:
+        # Кавычки до перевода строки: чётное число — он не внутри поля в кавычках
+        quotes -= text.count('"', newline, end)
+        if quotes % 2 == 0:
+            return newline + 1
+        end = newline
+    return 0
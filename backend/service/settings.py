@@ -48,10 +48,30 @@ class Postgresql(BaseModel):
     db_pool_pre_ping: bool = True
     db_echo: bool = False
 
+    # Statement caching: SQLAlchemy compiled-SQL cache and asyncpg prepared statements
+    sql_compile_cache_size: int = 500
+    prepared_statement_cache_size: int = 100  # per connection, asyncpg side
+    # Behind PgBouncer in transaction mode prepared statements do not survive a checkout
+    pgbouncer_mode: bool = False
+
+    # Instrumentation (pool/query stats in the admin API)
+    slow_query_ms: float = 200.0  # statements slower than this are logged with the call site
+    request_query_warn: int = 30  # a request running more statements is logged (N+1)
+
+    # Read replicas ("host" or "host:port"); read-only repository calls may go there
+    replica_hosts: list[str] = Field(default_factory=list)
+    replica_max_lag_sec: float = 5.0  # a replica lagging more than this is skipped
+    replica_check_interval_sec: float = 5.0
+    read_your_writes_sec: float = 10.0  # a user's reads stay on the primary after a write
+
     @property
     def dsn(self) -> str:
         return f"{self.protocol}://{self.user}:{self.password}@{self.host}:{self.port}/{self.db}"
 
+    def replica_dsn(self, host: str) -> str:
+        address = host if ":" in host else f"{host}:{self.port}"
+        return f"{self.protocol}://{self.user}:{self.password}@{address}/{self.db}"
+
     @property
     def dsn_safe(self) -> str:
         return f"{self.protocol}://{self.user}:***@{self.host}:{self.port}/{self.db}"
@@ -64,6 +84,7 @@ class AuthConf(BaseModel):
     jwt_exp_hours: int = 3600 * 24
     code_exp_hours: int = 5
     debug_mode_code: str = "1111"
+    admin_token: str = ""  # X-Admin-Token for operator endpoints; empty disables them
 
 
 class ProfileConf(BaseModel):
@@ -75,6 +96,57 @@ class JobConf(BaseModel):
     processing_interval_sec: int = 5
     processing_batch_size: int = 5
     processing_timeout_sec: int = 300
+    stream_heartbeat_sec: int = 15  # SSE keep-alive interval for job status streams
+    long_poll_max_sec: int = 30  # upper bound for `wait` of the result endpoint
+
+    # Queueing and fair-share scheduling
+    max_pending_jobs_per_user: int = 5  # NEW jobs a user may keep queued
+    max_batch_size: int = 5  # jobs per batch submission, never above max_pending_jobs_per_user
+    max_running_jobs_per_user: int = 1
+    scheduling_scan_factor: int = 10  # candidates scanned per claim = batch_size * factor
+    default_job_cost: int = 1000  # expected rows when dataset size is unknown
+    tier_weights: dict[str, float] = Field(
+        default_factory=lambda: {"STANDARD": 1.0, "PREMIUM": 2.0}
+    )
+
+    # Retries of transient failures (exponential backoff with jitter, then DEAD_LETTER)
+    retry_max_attempts: int = 3  # storage/database/connection errors
+    retry_timeout_max_attempts: int = 2  # processing timeouts are expensive to repeat
+    retry_base_delay_sec: float = 5.0
+    retry_max_delay_sec: float = 300.0
+    retry_jitter: float = 0.5  # share of the delay that is randomized
+
+    # Leases of claimed jobs and graceful drain on shutdown
+    lease_sec: int = 120  # a claimed job is considered abandoned after this without renewal
+    lease_renew_interval_sec: int = 30
+    drain_timeout_sec: int = 600  # how long running jobs may finish before leases are released
+    # After SIGTERM /api/health answers 503 this long before the server stops listening
+    drain_readiness_grace_sec: float = 10.0
+    lease_reap_interval_sec: int = 30  # expired leases are taken back by the leader process
+    lease_reap_batch_limit: int = 100
+
+    # Queue position and ETA (runtime models fitted on recorded training durations)
+    eta_model_refresh_sec: int = 300
+    eta_history_limit: int = 200  # latest successful runs used for fitting
+    eta_default_train_sec: float = 60.0  # expected training time while there is no history
+
+    # In-memory cache of finished job results (per process)
+    result_cache_size: int = 10_000
+    result_cache_ttl_sec: int = 60  # bounds staleness of available_launches in cached results
+
+
+class IdempotencyConf(BaseModel):
+    ttl_sec: int = 24 * 3600  # how long a stored response is replayed
+    in_flight_timeout_sec: int = 300  # an unfinished request older than this may be retaken
+    cleanup_interval_sec: int = 3600
+    cleanup_batch_limit: int = 1000
+
+
+class LeaderConf(BaseModel):
+    # Singleton loops (cleanups, lease reaping) run in one process, elected via advisory lock
+    enabled: bool = True  # False: every process runs them (single-process deployments)
+    lock_name: str = "mlservice:singleton-loops"
+    check_interval_sec: float = 5.0  # follower retry and leader liveness check period
 
 
 class MLConfig(BaseSettings):
@@ -105,6 +177,15 @@ class MinioConfig(BaseModel):
     retry_attempts: int = 3
     retry_backoff: float = 0.5
     presign_expiry: int = 3600  # 1 hour default
+    # Синхронный клиент работает в своём пуле потоков, по одному HTTP-соединению на поток
+    io_threads: int = 16
+    timeout_sec: float = 300
+    # Объекты больше части передаются multipart-загрузкой и range-запросами (минимум S3 — 5 MiB)
+    part_size: int = 8 * 1024 * 1024
+    # Сколько частей одного объекта передаётся параллельно
+    transfer_concurrency: int = 4
+    # Потоковые загрузки держат свой поток до последнего чанка клиента: отдельный пул
+    stream_upload_threads: int = 8
 
 
 class Config(BaseSettings):
@@ -114,6 +195,8 @@ class Config(BaseSettings):
     profile: ProfileConf = ProfileConf()
     pg: Postgresql = Postgresql()
     job: JobConf = JobConf()
+    idempotency: IdempotencyConf = IdempotencyConf()
+    leader: LeaderConf = LeaderConf()
 
     ml: MLConfig = Field(default_factory=MLConfig)
     cors: CorsConfig = Field(default_factory=CorsConfig)
@@ -121,6 +204,8 @@ class Config(BaseSettings):
 
     # Storage backend selection
     storage_backend: str = "local"  # "local" or "minio"
+    # Сколько удалений (потоков / bulk-запросов к MinIO) идёт одновременно при очистке
+    storage_delete_concurrency: int = int(os.getenv("STORAGE_DELETE_CONCURRENCY", "8"))
 
     # Настройки загрузки файлов (используются files API)
     allowed_extensions: tuple[str, ...] = (".png", ".jpg", ".jpeg", ".csv")
@@ -132,6 +217,12 @@ class Config(BaseSettings):
         os.getenv("DATASET_TTL_CHECK_INTERVAL_SEC", "3600")
     )  # default: hourly
     dataset_ttl_batch_limit: int = int(os.getenv("DATASET_TTL_BATCH_LIMIT", "500"))
+    # Один цикл очистки: транзакции по txn_max_rows строк, DELETE-батчи по batch_limit
+    dataset_ttl_txn_max_rows: int = int(os.getenv("DATASET_TTL_TXN_MAX_ROWS", "5000"))
+    dataset_ttl_txn_budget_sec: float = float(os.getenv("DATASET_TTL_TXN_BUDGET_SEC", "2"))
+    # Пауза между транзакциями растёт, пока батч медленнее target, до max_pause
+    dataset_ttl_target_batch_ms: int = int(os.getenv("DATASET_TTL_TARGET_BATCH_MS", "250"))
+    dataset_ttl_max_pause_sec: float = float(os.getenv("DATASET_TTL_MAX_PAUSE_SEC", "5"))
 
     model_config = SettingsConfigDict(
         case_sensitive=False,
@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import signal
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -36,37 +38,80 @@ async def lifespan(app: FastAPI):
                 task_name="new-jobs-processor",
                 restart_delay=5,
             )
+            _drain_on_sigterm(job_processor)
         except Exception:
             logger.warning("Job processor is not available; background processing disabled")
 
+        # Лаг реплик чтения: отстающие реплики исключаются из маршрутизации
+        if pg_connector.replicas:
+            await pg_connector.check_replicas()
+            await task_manager.start_task_with_restart(
+                pg_connector.run_replica_monitor,
+                task_name="pg-replica-monitor",
+                restart_delay=5,
+            )
+
+        # Ретрансляция событий задач между репликами (Postgres LISTEN/NOTIFY)
+        try:
+            notify_bridge = container.get(container.PgNotifyBridgeName)
+            await task_manager.start_task_with_restart(
+                notify_bridge.listen,
+                task_name="job-events-listener",
+                restart_delay=5,
+            )
+        except Exception:
+            logger.warning("Job events listener is not available; streaming is local-only")
+
+        # Singleton-циклы: в мульти-процессном деплое их выполняет только лидер
+        singletons = {}
+        try:
+            idempotency_service = container.get(container.IdempotencyServiceName)
+            singletons["idempotency-keys-cleanup"] = idempotency_service.run_cleanup_loop
+        except Exception:
+            logger.exception("Failed to set up idempotency keys cleanup task")
+
+        try:
+            job_processor = container.get(container.NewJobProcessorName)
+            singletons["job-lease-reaper"] = job_processor.run_lease_reaper
+        except Exception:
+            logger.warning("Job processor is not available; expired leases are not reclaimed")
+
         # Dataset TTL background cleanup
         try:
             if config.dataset_ttl_days > 0:
-                from service.services.dataset_ttl_worker import run_dataset_ttl_loop
+                from service.services.dataset_ttl_worker import (
+                    AdaptivePacer,
+                    run_dataset_ttl_loop,
+                )
 
                 training_repo = container.get(container.TrainingRepositoryName)
                 file_saver = container.get(container.FileSaverServiceName)
 
-                await task_manager.start_task_with_restart(
-                    lambda: run_dataset_ttl_loop(
-                        ttl_days_supplier=lambda: config.dataset_ttl_days,
-                        interval_sec_supplier=lambda: config.dataset_ttl_check_interval_sec,
-                        batch_limit_supplier=lambda: config.dataset_ttl_batch_limit,
-                        training_repo=training_repo,
-                        file_saver=file_saver,
+                singletons["dataset-ttl-cleanup"] = lambda: run_dataset_ttl_loop(
+                    ttl_days_supplier=lambda: config.dataset_ttl_days,
+                    interval_sec_supplier=lambda: config.dataset_ttl_check_interval_sec,
+                    batch_limit_supplier=lambda: config.dataset_ttl_batch_limit,
+                    training_repo=training_repo,
+                    file_saver=file_saver,
+                    txn_max_rows=config.dataset_ttl_txn_max_rows,
+                    txn_budget_sec=config.dataset_ttl_txn_budget_sec,
+                    pacer=AdaptivePacer(
+                        target_batch_sec=config.dataset_ttl_target_batch_ms / 1000,
+                        max_pause_sec=config.dataset_ttl_max_pause_sec,
                     ),
-                    task_name="dataset-ttl-cleanup",
-                    restart_delay=10,
+                    delete_concurrency=config.storage_delete_concurrency,
                 )
                 logger.info(
-                    "Dataset TTL cleanup task started (days=%s, interval=%ss)",
+                    "Dataset TTL cleanup enabled (days=%s, interval=%ss)",
                     config.dataset_ttl_days,
                     config.dataset_ttl_check_interval_sec,
                 )
             else:
                 logger.info("Dataset TTL cleanup disabled (dataset_ttl_days <= 0)")
         except Exception:
-            logger.exception("Failed to start dataset TTL cleanup task")
+            logger.exception("Failed to set up dataset TTL cleanup task")
+
+        await _start_singletons(config, task_manager, singletons)
 
         logger.info("Application started successfully!")
 
@@ -79,6 +124,14 @@ async def lifespan(app: FastAPI):
     finally:
         logger.info("Shutting down TeleRAG application...")
 
+        try:
+            # Running jobs finish (or are released to other replicas) before tasks stop
+            job_processor = container.get(container.NewJobProcessorName)
+            logger.info("Draining job processor...")
+            await job_processor.drain()
+        except Exception as e:
+            logger.error(f"Error during job processor drain: {e}")
+
         try:
             logger.info("Stopping background task manager...")
             task_manager = container.get(container.BackgroundTaskManagerName)
@@ -92,6 +145,72 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
 
+        try:
+            # MinIO keeps a transfer thread pool; the local backend has nothing to close
+            storage = container.get(container.FileStorageName)
+            close = getattr(storage, "close", None)
+            if callable(close):
+                logger.info("Closing file storage...")
+                close()
+        except Exception as e:
+            logger.error(f"Error closing file storage: {e}")
+
+
+async def _start_singletons(config: Config, task_manager, singletons: dict) -> None:
+    """Run loops that must not be duplicated: under the elected leader, or right here."""
+    if not config.leader.enabled:
+        for name, loop in singletons.items():
+            await task_manager.start_task_with_restart(loop, task_name=name, restart_delay=10)
+        return
+
+    leader = container.get(container.LeaderElectionName)
+    for name, loop in singletons.items():
+        leader.add_loop(name, loop)
+    await task_manager.start_task_with_restart(
+        leader.run, task_name="leader-election", restart_delay=5
+    )
+    logger.info("Singleton loops %s run in the elected leader process", sorted(singletons))
+
+
+def _drain_on_sigterm(job_processor) -> None:
+    """Stop claiming jobs as soon as SIGTERM arrives, then let the server shut down.
+
+    uvicorn stops listening right after its own SIGTERM handler runs, long before the
+    lifespan shutdown, so a drain started there is never visible to probes. Here the
+    drain starts first and /api/health answers 503 ("draining") for
+    ``drain_readiness_grace_sec``; only then is uvicorn's handler chained. A second
+    SIGTERM chains it at once. The drain itself is awaited in the lifespan shutdown.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        previous = signal.getsignal(signal.SIGTERM)
+    except ValueError:
+        return
+    pending: list[asyncio.TimerHandle] = []
+
+    def _chain(signum, frame) -> None:
+        if callable(previous):
+            previous(signum, frame)
+
+    def _on_sigterm(signum, frame) -> None:
+        job_processor.start_drain()
+        if pending:
+            pending[0].cancel()
+            _chain(signum, frame)
+            return
+        grace = job_processor.config.drain_readiness_grace_sec
+        logger.info(f"SIGTERM: failing readiness for {grace} seconds before shutdown")
+        pending.append(loop.call_later(grace, _chain, signum, frame))
+
+    def _handler(signum, frame):
+        loop.call_soon_threadsafe(_on_sigterm, signum, frame)
+
+    try:
+        signal.signal(signal.SIGTERM, _handler)
+    except ValueError:
+        # Not in the main thread (e.g. under a test client): rely on the lifespan drain
+        logger.debug("SIGTERM drain hook not installed")
+
 
 async def health_check():
     try:
@@ -0,0 +1,27 @@
+import threading
+
+
+class JobCancelledError(Exception):
+    """Raised inside a running job when its cancellation token has been triggered."""
+
+
+class CancellationToken:
+    """Thread-safe cancellation flag shared between the event loop and offloaded CPU work.
+
+    Trainers running in worker threads call ``raise_if_cancelled`` between chunks of work,
+    so a cancelled or timed-out job stops consuming CPU shortly after the request.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise JobCancelledError("Job was cancelled")
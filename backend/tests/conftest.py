@@ -0,0 +1,140 @@
+"""Shared fakes of the job tests: one in-memory job repository and a job factory."""
+
+import uuid
+from types import SimpleNamespace
+
+from service.models.jobs_models import JobLogic, JobResultView, QueueSnapshot, QuotaSnapshot
+from service.models.key_value import ProcessingStatus, ServiceMode, ServiceType
+from service.services.job_processor import NewJobProcessor
+from service.settings import JobConf
+
+
+def make_job(status: ProcessingStatus = ProcessingStatus.NEW, **fields) -> JobLogic:
+    """TRAIN job of a new user in LIPS mode; ``fields`` override any attribute."""
+    defaults = {"user_id": uuid.uuid4(), "mode": ServiceMode.LIPS, "type": ServiceType.TRAIN}
+    return JobLogic(**{**defaults, "status": status, **fields})
+
+
+class FakeJobRepo:
+    """JobRepository fake: ``job`` is the stored job, calls are recorded as attributes.
+
+    Jobs other than ``job`` (e.g. handed straight to a processor) are completed as is;
+    the stored job is only completed while PROCESSING, like the leased UPDATE.
+    """
+
+    def __init__(
+        self,
+        job: JobLogic | None = None,
+        *,
+        launches: int = 3,
+        metrics: dict | None = None,
+        snapshot: QueueSnapshot | None = None,
+        pending: int = 0,
+        running: int = 0,
+    ):
+        self.job = job
+        self.launches = launches
+        self.metrics = metrics
+        self.snapshot = snapshot or QueueSnapshot()
+        self.pending, self.running = pending, running
+        self.foreign_files: set = set()
+        # Recorded calls
+        self.fetches = self.charged = self.claims = self.snapshots = 0
+        self.batches: list[list[JobLogic]] = []
+        self.completed: list[ProcessingStatus] = []
+        self.errors: list[str | None] = []
+        self.retries: list = []
+        self.released: list[tuple[list, str]] = []
+        self.requeued_with = None
+
+    def _stored(self, job_id, user_id=None) -> JobLogic | None:
+        job = self.job
+        if job is None or job.id != job_id or user_id not in (None, job.user_id):
+            return None
+        return job
+
+    async def fetch_job_by_id(self, job_id, user_id):
+        return self._stored(job_id, user_id)
+
+    async def fetch_job_result_view(self, job_id, user_id, default_cost=1000):
+        self.fetches += 1
+        if (job := self._stored(job_id, user_id)) is None:
+            return None
+        return JobResultView(
+            job=job,
+            available_launches=self.launches,
+            model_url="/storage/models/m.pkl" if self.metrics else None,
+            metrics=self.metrics,
+        )
+
+    async def fetch_available_launches(self, user_id):
+        return self.launches
+
+    async def fetch_queue_snapshot(self, job_id, created_before, default_cost):
+        self.snapshots += 1
+        return self.snapshot
+
+    async def create_jobs_with_quota(self, user_id, jobs, admit):
+        files = {(job.file_id, job.mode) for job in jobs if job.file_id is not None}
+        quota = QuotaSnapshot(
+            available_launches=self.launches,
+            pending=self.pending,
+            running=self.running,
+            files_found=len({f for f in files if f[0] not in self.foreign_files}),
+        )
+        if not admit(quota):
+            return quota, []
+        self.batches.append(list(jobs))
+        return quota, list(jobs)
+
+    async def take_payment(self, job_id):
+        # Conditional UPDATE: only the first caller charges
+        if self.job.is_payment_taken:
+            return None
+        self.job = self.job.model_copy(update={"is_payment_taken": True})
+        self.charged += 1
+        self.launches -= 1
+        return self.launches
+
+    async def cancel_job(self, job_id, user_id):
+        job = self._stored(job_id, user_id)
+        if job is None or job.status not in (ProcessingStatus.NEW, ProcessingStatus.PROCESSING):
+            return None
+        self.job = job.model_copy(update={"status": ProcessingStatus.CANCELLED})
+        return self.job
+
+    async def complete_job(self, job_id, status, *, last_error=None):
+        job = self._stored(job_id) or make_job(ProcessingStatus.PROCESSING, id=job_id)
+        if job.status != ProcessingStatus.PROCESSING:
+            return None
+        self.completed.append(status)
+        self.errors.append(last_error)
+        job = job.model_copy(update={"status": status})
+        if self.job is not None and self.job.id == job_id:
+            self.job = job
+        return job
+
+    async def schedule_retry(self, job_id, next_attempt_at, last_error=None):
+        self.retries.append(next_attempt_at)
+        return SimpleNamespace(id=job_id, user_id=uuid.uuid4(), status=ProcessingStatus.NEW)
+
+    async def requeue_dead_letter_jobs(self, job_ids=None, limit=1000):
+        self.requeued_with = (job_ids, limit)
+        return list(job_ids or [])
+
+    async def fetch_new_jobs(self, *args, **kwargs):
+        self.claims += 1
+        return []
+
+    async def release_jobs(self, job_ids, worker_id):
+        self.released.append((list(job_ids), worker_id))
+        return list(job_ids)
+
+
+class FakeProfileService:
+    async def fetch_user_profile(self, user_id):
+        return SimpleNamespace(available_launches=3)
+
+
+def make_processor(repo, runner=None, events=None, **conf) -> NewJobProcessor:
+    return NewJobProcessor(JobConf(**conf), repo, training_runner=runner, events=events)
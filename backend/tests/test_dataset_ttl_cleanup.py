@@ -1,12 +1,19 @@
+from datetime import datetime, timezone
 from uuid import uuid4
 
+import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
 
+from service.infrastructure.storage.abstract_file_storage import delete_many
+from service.infrastructure.storage.local_file_storage import LocalFileStorage
 from service.models.auth_models import AuthProfile
 from service.models.key_value import UserTypes
 from service.presentation.dependencies.auth_checker import check_auth
 from service.presentation.routers.ml_api.ml_api import ml_router
+from service.repositories.training_repository import _DELETE_EXPIRED_BATCH
+from service.services.dataset_ttl_worker import AdaptivePacer, drain_expired_datasets
 
 
 class _FakeRepo:
@@ -67,3 +74,73 @@ def test_ttl_cleanup_deletes_files_and_reports():
     assert data["files_removed"] == 2
     assert data["files_missing"] == 0
     assert len(storage.deleted) == 2
+
+
+class _BacklogRepo:
+    def __init__(self, backlog: int):
+        self.backlog = [f"uploads/LIPS/{i}.csv" for i in range(backlog)]
+        self.calls = []
+
+    async def cleanup_expired_datasets(self, *, cutoff, limit, batch_size, time_budget_sec):
+        self.calls.append((limit, batch_size, time_budget_sec))
+        batch, self.backlog = self.backlog[:limit], self.backlog[limit:]
+        return batch
+
+
+@pytest.mark.asyncio
+async def test_drain_runs_transactions_until_backlog_is_clear():
+    repo, storage = _BacklogRepo(25), _FakeStorage()
+
+    cycle = await drain_expired_datasets(
+        cutoff=datetime.now(timezone.utc),
+        training_repo=repo,
+        file_saver=_FakeSaver(storage),
+        batch_limit=5,
+        txn_max_rows=10,
+        txn_budget_sec=1.0,
+    )
+
+    # 10 + 10 + 5, then an empty transaction confirms nothing is left
+    assert repo.calls == [(10, 5, 1.0)] * 4
+    assert cycle.datasets == cycle.files_removed == len(storage.deleted) == 25
+    assert cycle.transactions == 4
+    assert cycle.rows_per_sec > 0
+
+
+def test_pacer_backs_off_while_batches_are_slow():
+    pacer = AdaptivePacer(target_batch_sec=0.1, min_pause_sec=0.05, max_pause_sec=0.3)
+
+    assert [pacer.observe(0.5) for _ in range(4)] == [0.05, 0.1, 0.2, 0.3]
+    assert [pacer.observe(0.01) for _ in range(4)] == [0.15, 0.075, 0.0, 0.0]
+
+
+def test_cleanup_batch_is_one_delete_returning_statement():
+    sql = str(_DELETE_EXPIRED_BATCH.compile(dialect=postgresql.asyncpg.dialect()))
+
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    # Runs go in the same statement (FK RESTRICT), datasets return their file keys
+    assert "DELETE FROM profile.training_run" in sql
+    assert sql.rstrip().endswith("RETURNING profile.dataset.name")
+
+
+@pytest.mark.asyncio
+async def test_local_storage_bulk_delete_counts_missing_files(tmp_path):
+    storage = LocalFileStorage(tmp_path)
+    keys = [f"uploads/LIPS/{i}.csv" for i in range(200)]
+    for key in keys[:150]:
+        await storage.upload_file(file_key=key, file_data=b"x")
+
+    result = await delete_many(storage, keys, concurrency=4)
+
+    assert (result.removed, result.missing, result.failed) == (150, 50, [])
+    assert not any((tmp_path / key).exists() for key in keys)
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_falls_back_to_concurrent_single_deletes():
+    storage = _FakeStorage()
+
+    result = await delete_many(storage, ["a.csv", "b.csv"], concurrency=2)
+
+    assert result.removed == 2
+    assert sorted(storage.deleted) == ["a.csv", "b.csv"]
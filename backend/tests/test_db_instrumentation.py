@@ -0,0 +1,139 @@
+import logging
+import sqlite3
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+import service.container as di
+from service.infrastructure.database.instrumentation import (
+    DbStats,
+    InstrumentedPool,
+    fingerprint,
+    instrument,
+    instrument_pool,
+)
+from service.presentation.dependencies.db_stats import count_db_queries
+from service.presentation.routers.admin_api.admin_api import admin_router
+from service.repositories.decorators.session_processor import connection
+from service.settings import config
+
+
+def test_fingerprint_drops_values_and_in_list_lengths():
+    one = fingerprint("SELECT * FROM t WHERE id IN ($1, $2, $3) AND name = 'a'  LIMIT 10")
+    two = fingerprint("SELECT * FROM t WHERE id IN ($1) AND name = 'b''c' LIMIT 20")
+
+    assert one == two == "SELECT * FROM t WHERE id IN (?) AND name = ? LIMIT ?"
+    # Identifiers with digits are not values
+    assert fingerprint("SELECT anon_1.id FROM anon_1") == "SELECT anon_1.id FROM anon_1"
+
+
+def test_pool_checkout_wait_and_saturation():
+    pool = InstrumentedPool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0)
+    stats = DbStats()
+    instrument_pool(pool, stats, "primary", capacity=1)
+
+    conn = pool.connect()
+    assert stats.pools["primary"].in_use == 1
+    conn.close()
+
+    snapshot = stats.snapshot()["pools"]["primary"]
+    assert snapshot["checkouts"] == 1
+    assert snapshot["saturated_checkouts"] == 1
+    assert snapshot["in_use"] == 0 and snapshot["peak_in_use"] == 1
+    assert snapshot["checkout_wait_ms"]["count"] == 1
+
+
+class _Connector:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def get_session_context(self, read_only: bool = False):
+        return _AsyncSession(Session(self.engine))
+
+
+class _AsyncSession:
+    def __init__(self, session):
+        self._session = session
+        self.info = session.info
+
+    async def execute(self, *args, **kwargs):
+        return self._session.execute(*args, **kwargs)
+
+    async def commit(self):
+        self._session.commit()
+
+    async def rollback(self):
+        self._session.rollback()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._session.close()
+
+
+class _Repo:
+    def __init__(self, connector):
+        self.connector = connector
+
+    @connection()
+    async def count(self, n: int, session=None) -> int:
+        for _ in range(n):
+            await session.execute(text("SELECT 1"))
+        return n
+
+
+def _instrumented_engine(**stats_kwargs):
+    engine = create_engine("sqlite://")
+    stats = DbStats(**stats_kwargs)
+    instrument(engine, stats, "primary", capacity=5)
+    return engine, stats
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_are_logged_with_the_repository_method(caplog):
+    engine, stats = _instrumented_engine(slow_query_ms=0)
+    repo = _Repo(_Connector(engine))
+
+    with caplog.at_level(logging.WARNING):
+        await repo.count(2)
+
+    slow = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Slow query")]
+    assert len(slow) == 2 and stats.slow_queries == 2
+    assert "_Repo.count" in slow[0]
+    (query,) = stats.snapshot()["queries"]
+    assert query["sql"] == "SELECT ?" and query["count"] == 2
+
+
+def test_queries_are_counted_per_endpoint(caplog, monkeypatch):
+    engine, stats = _instrumented_engine(request_query_warn=3)
+    connector = _Connector(engine)
+    connector.stats = stats
+    repo = _Repo(connector)
+
+    monkeypatch.setattr(config.auth, "admin_token", "s3cret")
+    app = FastAPI(dependencies=[Depends(count_db_queries)])
+    app.include_router(admin_router)
+
+    @app.get("/items/{n}")
+    async def items(n: int) -> int:
+        return await repo.count(n)
+
+    original_get = di.get
+    di.get = lambda name: connector if name == di.PgConnectorName else original_get(name)
+    try:
+        with TestClient(app) as client, caplog.at_level(logging.WARNING):
+            client.get("/items/2")
+            client.get("/items/5")
+            response = client.get("/api/admin/v1/db/stats", headers={"X-Admin-Token": "s3cret"})
+    finally:
+        di.get = original_get
+
+    assert response.status_code == 200
+    per_request = response.json()["requests"]["GET /items/{n}"]
+    assert per_request["count"] == 2
+    assert per_request["max"] == 5
+    assert any("GET /items/{n} ran 5 queries" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,246 @@
+import io
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from service import container as di
+from service.models.auth_models import AuthProfile
+from service.models.idempotency_models import IdempotencyRecord
+from service.models.key_value import ProcessingStatus, ServiceMode, UserTypes
+from service.presentation.dependencies.auth_checker import check_auth
+from service.presentation.routers.files_api.schemas import UploadResponse
+from service.presentation.routers.jobs_api.schemas import JobResponse
+from service.presentation.routers.ml_api.ml_api import (
+    get_file_repo,
+    get_file_saver,
+    get_training_repo,
+    ml_router,
+)
+from service.services.idempotency_service import IdempotencyService
+from service.settings import IdempotencyConf
+
+
+class _FakeIdempotencyRepo:
+    """In-memory stand-in for the keyed table with its unique index."""
+
+    def __init__(self):
+        self.records: dict[tuple, IdempotencyRecord] = {}
+
+    async def reserve(self, user_id, scope, key, request_hash, *, ttl_sec, in_flight_timeout_sec):
+        existing = self.records.get((user_id, scope, key))
+        if existing is not None and existing.expires_at > datetime.now(UTC):
+            return existing, False
+        record = IdempotencyRecord(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            scope=scope,
+            key=key,
+            request_hash=request_hash,
+            expires_at=datetime.now(UTC) + timedelta(seconds=ttl_sec),
+        )
+        self.records[(user_id, scope, key)] = record
+        return record, True
+
+    async def complete(self, record_id, status_code, response):
+        for k, r in self.records.items():
+            if r.id == record_id:
+                self.records[k] = r.model_copy(
+                    update={"status_code": status_code, "response": response}
+                )
+
+    async def release(self, record_id):
+        self.records = {k: r for k, r in self.records.items() if r.id != record_id}
+
+
+def _job_response() -> JobResponse:
+    return JobResponse(
+        job_id=uuid.uuid4(),
+        status=ProcessingStatus.NEW,
+        available_launches=2,
+        wait_time_sec=10,
+    )
+
+
+async def _run(service, user_id, handler):
+    return await service.run(user_id, "jobs.start", "k1", "h", handler, JobResponse)
+
+
+@pytest.mark.asyncio
+async def test_replay_returns_stored_response_without_running_handler():
+    service = IdempotencyService(IdempotencyConf(), _FakeIdempotencyRepo())
+    user_id = uuid.uuid4()
+    calls = []
+
+    async def _handler():
+        calls.append(1)
+        return _job_response()
+
+    first, replayed_first = await _run(service, user_id, _handler)
+    again, replayed_again = await _run(service, user_id, _handler)
+
+    assert calls == [1]
+    assert (replayed_first, replayed_again) == (False, True)
+    assert again == first
+
+
+@pytest.mark.asyncio
+async def test_key_reuse_with_other_request_and_in_flight_are_rejected():
+    repo = _FakeIdempotencyRepo()
+    service = IdempotencyService(IdempotencyConf(), repo)
+    user_id = uuid.uuid4()
+    await repo.reserve(user_id, "jobs.start", "busy", "h", ttl_sec=60, in_flight_timeout_sec=60)
+
+    async def _handler():
+        return _job_response()
+
+    await service.run(user_id, "jobs.start", "done", "h1", _handler, JobResponse)
+    with pytest.raises(HTTPException) as mismatch:
+        await service.run(user_id, "jobs.start", "done", "h2", _handler, JobResponse)
+    with pytest.raises(HTTPException) as in_flight:
+        await service.run(user_id, "jobs.start", "busy", "h", _handler, JobResponse)
+
+    assert mismatch.value.status_code == 422
+    assert in_flight.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_key_for_retry():
+    repo = _FakeIdempotencyRepo()
+    service = IdempotencyService(IdempotencyConf(), repo)
+
+    async def _failing():
+        raise HTTPException(status_code=403, detail="No available launches")
+
+    with pytest.raises(HTTPException):
+        await service.run(uuid.uuid4(), "jobs.start", "k", "h", _failing, JobResponse)
+    assert repo.records == {}
+
+
+@pytest.mark.asyncio
+async def test_key_is_reserved_and_released_outside_the_request_transaction():
+    from contextlib import asynccontextmanager
+
+    from service.repositories.unit_of_work import current_session, unit_of_work
+
+    class _Connector:
+        @asynccontextmanager
+        async def get_session_context(self):
+            yield _Session()
+
+    class _Session:
+        async def commit(self):
+            pass
+
+        async def rollback(self):
+            pass
+
+    class _Repo(_FakeIdempotencyRepo):
+        def __init__(self):
+            super().__init__()
+            self.joined: list[tuple[str, bool]] = []
+
+        async def reserve(self, *args, **kwargs):
+            self.joined.append(("reserve", current_session() is not None))
+            return await super().reserve(*args, **kwargs)
+
+        async def complete(self, *args):
+            self.joined.append(("complete", current_session() is not None))
+            return await super().complete(*args)
+
+        async def release(self, record_id):
+            self.joined.append(("release", current_session() is not None))
+            return await super().release(record_id)
+
+    async def _ok():
+        return _job_response()
+
+    async def _failing():
+        raise HTTPException(status_code=403, detail="No available launches")
+
+    repo = _Repo()
+    service = IdempotencyService(IdempotencyConf(), repo)
+    async with unit_of_work(_Connector()):
+        await service.run(uuid.uuid4(), "jobs.start", "k", "h", _ok, JobResponse)
+    with pytest.raises(HTTPException):
+        async with unit_of_work(_Connector()):
+            await service.run(uuid.uuid4(), "jobs.start", "k", "h", _failing, JobResponse)
+
+    # The stored response commits with the work; the reservation does not wait for it
+    assert repo.joined == [
+        ("reserve", False),
+        ("complete", True),
+        ("reserve", False),
+        ("release", False),
+    ]
+
+
+class _CountingSaver:
+    def __init__(self):
+        self.saved = 0
+
+    async def save_stream(self, user_id, mode, file_name, chunks):
+        async for _ in chunks:
+            pass
+        self.saved += 1
+        return UploadResponse(file_id=uuid.uuid4(), file_url=f"/storage/uploads/{file_name}")
+
+    async def get_presigned_url_by_key(self, file_key, expiry_sec):
+        return None
+
+
+class _FakeTrainingRepo:
+    async def get_or_create_dataset_from_file(
+        self, user_id, launch_id, mode, file_name, file_url, *, row_count=None, column_count=None
+    ):
+        class _Obj:
+            id = uuid.uuid4()
+            name = file_name
+            version = 1
+            created_at = datetime.now(UTC)
+
+        _Obj.mode = mode
+        _Obj.file_url = file_url
+        return _Obj()
+
+
+def test_upload_replay_does_not_store_dataset_twice():
+    user_id = uuid.uuid4()
+    saver = _CountingSaver()
+    idempotency = IdempotencyService(IdempotencyConf(), _FakeIdempotencyRepo())
+
+    app = FastAPI()
+    app.include_router(ml_router)
+    app.dependency_overrides[check_auth] = lambda: AuthProfile(
+        user_id=user_id, fingerprint=None, type=UserTypes.REGISTERED
+    )
+    app.dependency_overrides[get_file_saver] = lambda: saver
+    app.dependency_overrides[get_training_repo] = lambda: _FakeTrainingRepo()
+    app.dependency_overrides[get_file_repo] = lambda: None
+    _orig_get = di.get
+    di.get = lambda name: idempotency if name == di.IdempotencyServiceName else _orig_get(name)
+    try:
+        client = TestClient(app)
+
+        def _upload(content=b"a,b\n1,2\n3,4\n"):
+            files = {"file": ("data.csv", io.BytesIO(content), "text/csv")}
+            return client.post(
+                "/api/ml/v1/datasets/upload",
+                params={"mode": ServiceMode.LIPS.value},
+                files=files,
+                headers={"Idempotency-Key": "upload-1"},
+            )
+
+        first, second = _upload(), _upload()
+        # Same name and size, other content: not a replay
+        other = _upload(b"a,b\n5,6\n7,8\n")
+    finally:
+        di.get = _orig_get
+
+    assert first.status_code == second.status_code == 201
+    assert second.json() == first.json()
+    assert second.headers.get("Idempotent-Replayed") == "true"
+    assert other.status_code == 422
+    assert saver.saved == 1
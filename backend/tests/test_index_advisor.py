@@ -0,0 +1,71 @@
+from tools.index_advisor import analyze_plan
+
+
+def _plan(root):
+    return {"Plan": root, "Execution Time": 1.0}
+
+
+def test_flags_big_seq_scans_sorts_and_wasteful_index_scans():
+    plan = _plan(
+        {
+            "Node Type": "Limit",
+            "Actual Rows": 100,
+            "Plans": [
+                {
+                    "Node Type": "Sort",
+                    "Actual Rows": 100,
+                    "Sort Key": ["dataset.created_at"],
+                    "Sort Method": "top-N heapsort",
+                    "Plans": [
+                        {
+                            "Node Type": "Seq Scan",
+                            "Relation Name": "dataset",
+                            "Actual Rows": 1200,
+                            "Rows Removed by Filter": 8800,
+                            "Filter": "(created_at < $1)",
+                        }
+                    ],
+                },
+                {
+                    "Node Type": "Index Scan",
+                    "Relation Name": "user_launch",
+                    "Index Name": "ix_profile_user_launch_user_id",
+                    "Actual Rows": 2,
+                    "Rows Removed by Filter": 4998,
+                    "Filter": "(status = 'NEW')",
+                },
+            ],
+        }
+    )
+
+    findings = analyze_plan("ttl", plan)
+
+    assert [(f.node, f.relation, f.rows) for f in findings] == [
+        ("Sort", None, 1200),
+        ("Seq Scan", "dataset", 10000),
+        ("Index Scan", "user_launch", 5000),
+    ]
+    assert "dataset.created_at" in findings[0].detail
+    assert "ix_profile_user_launch_user_id" in str(findings[2])
+
+
+def test_small_or_selective_nodes_are_fine():
+    plan = _plan(
+        {
+            "Node Type": "Nested Loop",
+            "Actual Rows": 20,
+            "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "user", "Actual Rows": 50},
+                {
+                    "Node Type": "Index Scan",
+                    "Relation Name": "training_run",
+                    "Actual Rows": 20,
+                    "Actual Loops": 1,
+                    "Rows Removed by Filter": 30,
+                    "Filter": "(status = 'SUCCESS')",
+                },
+            ],
+        }
+    )
+
+    assert analyze_plan("runs", plan) == []
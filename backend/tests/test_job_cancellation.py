@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from service.infrastructure.job_state.event_broadcaster import JobEventBroadcaster
+from service.models.jobs_models import JobEvent
+from service.models.key_value import ProcessingStatus, ServiceType
+from service.repositories.unit_of_work import unit_of_work
+from service.services.job_processor import NewJobProcessor
+from service.services.job_service import JobService
+from service.settings import JobConf
+from service.utils.cancellation import CancellationToken, JobCancelledError
+from tests.conftest import FakeJobRepo, FakeProfileService, make_job
+
+
+def test_token_raises_after_cancel():
+    token = CancellationToken()
+    token.raise_if_cancelled()
+    token.cancel()
+    assert token.cancelled
+    with pytest.raises(JobCancelledError):
+        token.raise_if_cancelled()
+
+
+@pytest.mark.asyncio
+async def test_cancel_event_stops_running_job_and_keeps_cancelled_status():
+    job = make_job(ProcessingStatus.PROCESSING)
+    repo = FakeJobRepo(job)
+    events = JobEventBroadcaster()
+    started = asyncio.Event()
+    seen_token: list[CancellationToken] = []
+    release = threading.Event()
+
+    async def _runner(job, cancel_token):
+        seen_token.append(cancel_token)
+        started.set()
+        await asyncio.to_thread(release.wait, 5)
+        return {"model_url": "/storage/models/m.pkl"}
+
+    processor = NewJobProcessor(
+        JobConf(processing_timeout_sec=5), repo, training_runner=_runner, events=events
+    )
+    service = JobService(JobConf(), repo, FakeProfileService(), events=events)
+
+    task = asyncio.create_task(processor._process_job_with_timeout(job))
+    await started.wait()
+    resp = await service.cancel_job(job.user_id, job.id)
+    result = await asyncio.wait_for(task, timeout=1)
+    release.set()
+
+    assert resp.status == ProcessingStatus.CANCELLED
+    assert result is None
+    assert seen_token[0].cancelled
+    assert repo.job.status == ProcessingStatus.CANCELLED
+    assert repo.completed == []
+    assert processor._running == {}
+
+
+@pytest.mark.asyncio
+async def test_late_result_does_not_overwrite_cancelled_job():
+    job = make_job(ProcessingStatus.PROCESSING, type=ServiceType.FRENCH)
+    repo = FakeJobRepo(job.model_copy(update={"status": ProcessingStatus.CANCELLED}))
+    events = JobEventBroadcaster()
+    received: list[JobEvent] = []
+    events.add_listener(received.append)
+    processor = NewJobProcessor(JobConf(wait_time_sec=0), repo, events=events)
+
+    await processor._process_job_with_timeout(job)
+
+    assert repo.job.status == ProcessingStatus.CANCELLED
+    assert [e.status for e in received] == [ProcessingStatus.PROCESSING]
+
+
+@pytest.mark.asyncio
+async def test_cancel_unknown_or_finished_job():
+    job = make_job(ProcessingStatus.SUCCESS)
+    service = JobService(JobConf(), FakeJobRepo(job), FakeProfileService())
+
+    with pytest.raises(HTTPException) as missing:
+        await service.cancel_job(job.user_id, uuid.uuid4())
+    with pytest.raises(HTTPException) as finished:
+        await service.cancel_job(job.user_id, job.id)
+
+    assert missing.value.status_code == 404
+    assert finished.value.status_code == 409
+
+
+class _Session:
+    def __init__(self, received: list[JobEvent]):
+        self.received = received
+        self.events_at_commit: list[JobEvent] | None = None
+
+    async def commit(self):
+        self.events_at_commit = list(self.received)
+
+    async def rollback(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_cancelled_event_is_published_after_the_commit():
+    job = make_job(ProcessingStatus.NEW)
+    events = JobEventBroadcaster()
+    received: list[JobEvent] = []
+    events.add_listener(received.append)
+    service = JobService(JobConf(), FakeJobRepo(job), FakeProfileService(), events=events)
+    session = _Session(received)
+    connector = SimpleNamespace(get_session_context=lambda: session)
+
+    async with unit_of_work(connector):
+        await service.cancel_job(job.user_id, job.id)
+        assert received == []
+
+    assert session.events_at_commit == []
+    assert [e.status for e in received] == [ProcessingStatus.CANCELLED]
+
+    # A rolled back cancellation is never announced
+    received.clear()
+    service.repository.job = job
+    with pytest.raises(RuntimeError):
+        async with unit_of_work(connector):
+            await service.cancel_job(job.user_id, job.id)
+            raise RuntimeError("commit failed")
+    assert received == []
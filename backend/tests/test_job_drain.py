@@ -0,0 +1,99 @@
+import asyncio
+import signal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from service import container as di
+from service.models.key_value import ProcessingStatus
+from service.presentation.routers.admin_api.admin_api import admin_router
+from service.services.job_processor import NewJobProcessor
+from service.settings import config
+from service.utils.app_lifespan import _drain_on_sigterm
+from tests.conftest import FakeJobRepo, make_job, make_processor
+
+
+def _processor(repo, duration: float) -> NewJobProcessor:
+    async def _runner(job, cancel_token):
+        await asyncio.sleep(duration)
+        return {"model_url": "/storage/models/m.pkl"}
+
+    return make_processor(repo, _runner, processing_timeout_sec=10)
+
+
+@pytest.mark.asyncio
+async def test_drain_lets_running_job_finish_and_stops_claiming():
+    repo = FakeJobRepo()
+    processor = _processor(repo, duration=0.05)
+    job_task = asyncio.create_task(
+        processor._process_job_with_timeout(make_job(ProcessingStatus.PROCESSING, attempts=1))
+    )
+    await asyncio.sleep(0)
+
+    await processor.drain(timeout_sec=5)
+
+    assert (await job_task).status == ProcessingStatus.SUCCESS
+    assert await processor._claim_jobs() == []
+    assert repo.claims == 0
+    assert repo.released == []
+    assert processor.drain_status()["state"] == "drained"
+
+
+@pytest.mark.asyncio
+async def test_drain_releases_jobs_still_running_at_deadline():
+    repo = FakeJobRepo()
+    processor = _processor(repo, duration=5)
+    job = make_job(ProcessingStatus.PROCESSING, attempts=1)
+    job_task = asyncio.create_task(processor._process_job_with_timeout(job))
+    await asyncio.sleep(0)
+
+    await processor.drain(timeout_sec=0.05)
+
+    assert await asyncio.wait_for(job_task, timeout=1) is None
+    assert repo.released == [([job.id], processor.worker_id)]
+    assert repo.completed == []
+    status = processor.drain_status()
+    assert (status["state"], status["released_jobs"], status["running_jobs"]) == ("drained", 1, 0)
+
+
+def test_admin_drain_endpoint_reports_progress(monkeypatch):
+    repo = FakeJobRepo()
+    processor = _processor(repo, duration=0)
+    monkeypatch.setattr(config.auth, "admin_token", "s3cret")
+
+    app = FastAPI()
+    app.include_router(admin_router)
+    _orig_get = di.get
+    di.get = lambda name: processor if name == di.NewJobProcessorName else _orig_get(name)
+    try:
+        client = TestClient(app)
+        headers = {"X-Admin-Token": "s3cret"}
+        before = client.get("/api/admin/v1/drain", headers=headers)
+        started = client.post("/api/admin/v1/drain", json={"timeout_sec": 1}, headers=headers)
+    finally:
+        di.get = _orig_get
+
+    assert before.json()["state"] == "running"
+    assert started.status_code == 200
+    assert started.json()["state"] in {"draining", "drained"}
+    assert processor.draining
+
+
+@pytest.mark.asyncio
+async def test_sigterm_fails_readiness_before_the_server_stops():
+    processor = _processor(FakeJobRepo(), duration=0)
+    processor.config.drain_readiness_grace_sec = 0.05
+    server_signals = []
+    original = signal.signal(signal.SIGTERM, lambda signum, frame: server_signals.append(signum))
+    try:
+        _drain_on_sigterm(processor)
+        signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)
+        await asyncio.sleep(0.01)
+        # Draining, but the server (uvicorn's handler) still serves the health probe
+        assert processor.draining and server_signals == []
+
+        await asyncio.sleep(0.1)
+        assert server_signals == [signal.SIGTERM]
+    finally:
+        signal.signal(signal.SIGTERM, original)
@@ -0,0 +1,144 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from service.models.jobs_models import JobLogic, QueueSnapshot
+from service.models.key_value import ProcessingStatus, ServiceMode, ServiceType
+from service.presentation.routers.jobs_api.schemas import StartJobRequest, StartJobsBatchRequest
+from service.services.job_eta import JobEtaEstimator, RuntimeModel
+from service.services.job_service import JobService
+from service.settings import JobConf
+from tests.conftest import FakeJobRepo, make_job
+
+
+class _FakeTrainingRepo:
+    def __init__(self, runs):
+        self.runs = runs
+        self.calls = 0
+
+    async def list_runtime_samples(self, limit=200):
+        self.calls += 1
+        return self.runs
+
+
+def _run(rows, features, duration, trainer="sklearn"):
+    return {"n_samples": rows, "n_features": features, "duration_sec": duration, "trainer": trainer}
+
+
+def _job(status=ProcessingStatus.NEW, rows=1000, **kwargs) -> JobLogic:
+    return make_job(status, estimated_cost=rows, created_at=datetime.now(UTC), **kwargs)
+
+
+def test_runtime_model_fits_rows_times_features():
+    # duration = 2 + 0.001 * rows * features
+    model = RuntimeModel.fit([(1000, 2, 4.0), (2000, 2, 6.0), (5000, 4, 22.0)])
+
+    assert model.intercept == pytest.approx(2.0)
+    assert model.slope == pytest.approx(0.001)
+    assert model.predict(10_000, 3) == pytest.approx(32.0)
+    # Without variance (or with a negative slope) the mean is the best guess
+    assert RuntimeModel.fit([(100, 2, 3.0), (100, 2, 5.0)]).predict(10**6) == pytest.approx(4.0)
+    assert RuntimeModel.fit([]) is None
+
+
+@pytest.mark.asyncio
+async def test_new_job_eta_combines_queue_depth_slots_and_runtime():
+    # 10s per job regardless of size
+    runs = [_run(1000, 2, 10.0), _run(1000, 2, 10.0)]
+    snapshot = QueueSnapshot(jobs_ahead=8, cost_ahead=8000, running_jobs=2, active_workers=2)
+    conf = JobConf(processing_batch_size=2, processing_interval_sec=5)
+    estimator = JobEtaEstimator(
+        conf,
+        FakeJobRepo(snapshot=snapshot, launches=5),
+        _FakeTrainingRepo(runs),
+        trainer=lambda: "sklearn",
+    )
+
+    eta = await estimator.estimate(_job())
+
+    # (8 * 10 + 2 * 10 / 2) / (2 slots * 2 workers) + 5 poll interval + 10 own run
+    assert (eta.queue_position, eta.eta_sec, eta.run_sec) == (9, 38, 10)
+
+
+@pytest.mark.asyncio
+async def test_running_and_finished_jobs_and_fallback_without_history():
+    training_repo = _FakeTrainingRepo([])
+    conf = JobConf(eta_default_train_sec=60)
+    estimator = JobEtaEstimator(conf, FakeJobRepo(), training_repo)
+
+    started = datetime.now(UTC) - timedelta(seconds=45)
+    running = await estimator.estimate(_job(ProcessingStatus.PROCESSING, started_at=started))
+    done = await estimator.estimate(_job(ProcessingStatus.SUCCESS))
+
+    assert running.queue_position == 0
+    assert 14 <= running.eta_sec <= 15
+    assert (done.queue_position, done.eta_sec) == (None, 0)
+    # History is cached between estimates
+    assert training_repo.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_create_job_response_carries_queue_position_and_eta():
+    snapshot = QueueSnapshot(jobs_ahead=3, cost_ahead=3000)
+    conf = JobConf(processing_batch_size=1, processing_interval_sec=0, eta_default_train_sec=20)
+    repo = FakeJobRepo(snapshot=snapshot, launches=5)
+    service = JobService(
+        conf, repo, profile_source=None, eta=JobEtaEstimator(conf, repo, training_repo=None)
+    )
+
+    class _Request:
+        file_id = uuid.uuid4()
+        mode = ServiceMode.LIPS
+        type = ServiceType.TRAIN
+
+    response = await service.create_job(uuid.uuid4(), _Request())
+
+    assert (response.queue_position, response.eta_sec) == (4, 80)
+    assert response.wait_time_sec == 80
+
+
+@pytest.mark.asyncio
+async def test_batch_positions_come_from_one_snapshot():
+    snapshot = QueueSnapshot(jobs_ahead=3, cost_ahead=3000)
+    conf = JobConf(processing_batch_size=1, processing_interval_sec=0, eta_default_train_sec=20)
+    repo = FakeJobRepo(snapshot=snapshot, launches=5)
+    service = JobService(
+        conf, repo, profile_source=None, eta=JobEtaEstimator(conf, repo, training_repo=None)
+    )
+    body = StartJobsBatchRequest(
+        jobs=[
+            StartJobRequest(file_id=uuid.uuid4(), mode=ServiceMode.LIPS, type=ServiceType.TRAIN)
+            for _ in range(3)
+        ]
+    )
+
+    response = await service.create_jobs_batch(uuid.uuid4(), body)
+
+    # Every job also waits for the ones submitted before it in the batch
+    assert [(job.queue_position, job.eta_sec) for job in response.jobs] == [
+        (4, 80),
+        (5, 100),
+        (6, 120),
+    ]
+    assert repo.snapshots == 1
+
+
+@pytest.mark.asyncio
+async def test_runtime_uses_the_feature_count_of_the_job():
+    # duration = 2 + 0.001 * rows * features, history averages 3 features
+    runs = [_run(1000, 2, 4.0), _run(2000, 2, 6.0), _run(5000, 4, 22.0), _run(1000, 4, 6.0)]
+    estimator = JobEtaEstimator(
+        JobConf(), FakeJobRepo(), _FakeTrainingRepo(runs), trainer=lambda: "sklearn"
+    )
+    started = datetime.now(UTC)
+
+    wide = await estimator.estimate(
+        _job(ProcessingStatus.PROCESSING, rows=10_000, feature_count=10, started_at=started)
+    )
+    unknown = await estimator.estimate(
+        _job(ProcessingStatus.PROCESSING, rows=10_000, started_at=started)
+    )
+
+    assert wide.run_sec == 102
+    assert unknown.run_sec == 32
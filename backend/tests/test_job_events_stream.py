@@ -0,0 +1,194 @@
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from service import container as di
+from service.infrastructure.job_state.event_broadcaster import JobEventBroadcaster
+from service.infrastructure.job_state.pg_notify_bridge import PgNotifyBridge
+from service.models.auth_models import AuthProfile
+from service.models.jobs_models import JobEvent
+from service.models.key_value import ProcessingStatus, ServiceType, UserTypes
+from service.presentation.dependencies.auth_checker import check_auth
+from service.presentation.routers.jobs_api.jobs_api import jobs_router
+from service.services.job_service import JobService
+from service.settings import JobConf
+from tests.conftest import FakeJobRepo, FakeProfileService, make_job
+
+
+@pytest.mark.asyncio
+async def test_broadcaster_drops_oldest_event_for_slow_subscriber():
+    broadcaster = JobEventBroadcaster(queue_size=2)
+    job = make_job(ProcessingStatus.PROCESSING, type=ServiceType.FRENCH)
+    async with broadcaster.subscribe(job.id) as queue:
+        for progress in (0.1, 0.5, 0.9):
+            broadcaster.publish_local(
+                JobEvent(job_id=job.id, user_id=job.user_id, status=job.status, progress=progress)
+            )
+        assert [queue.get_nowait().progress for _ in range(2)] == [0.5, 0.9]
+    assert broadcaster.subscriber_count(job.id) == 0
+
+
+def test_notify_bridge_skips_own_events_and_strips_large_metrics():
+    broadcaster = JobEventBroadcaster()
+    bridge = PgNotifyBridge(connector=None, broadcaster=broadcaster)
+    other = PgNotifyBridge(connector=None, broadcaster=broadcaster)
+    job = make_job(ProcessingStatus.SUCCESS, type=ServiceType.FRENCH)
+    event = JobEvent(
+        job_id=job.id,
+        user_id=job.user_id,
+        status=job.status,
+        metrics={"confusion_matrix": [[1] * 500] * 20},
+    )
+
+    payload = bridge.encode(event)
+    assert len(payload.encode()) < 8000
+    assert bridge.decode(payload) is None
+    decoded = other.decode(payload)
+    assert decoded.job_id == job.id and decoded.metrics is None
+
+
+@pytest.mark.asyncio
+async def test_notify_bridge_sends_on_the_listener_connection():
+    sent, sessions = [], []
+
+    class _Listener:
+        def is_closed(self):
+            return False
+
+        async def execute(self, query, channel, payload):
+            sent.append(json.loads(payload)["event"]["stage"])
+
+    class _Session:
+        async def execute(self, stmt, params):
+            sent.append(json.loads(params["payload"])["event"]["stage"])
+
+        async def commit(self):
+            pass
+
+    @asynccontextmanager
+    async def _session_context():
+        sessions.append(1)
+        yield _Session()
+
+    bridge = PgNotifyBridge(
+        SimpleNamespace(get_session_context=_session_context), JobEventBroadcaster()
+    )
+    job = make_job(ProcessingStatus.PROCESSING, type=ServiceType.FRENCH)
+    progress = JobEvent(job_id=job.id, user_id=job.user_id, status=job.status, stage="training")
+    done = JobEvent(job_id=job.id, user_id=job.user_id, status=ProcessingStatus.SUCCESS)
+
+    bridge._connection = _Listener()
+    await bridge.notify(progress)
+    await bridge.notify(done)
+    assert (sent, sessions) == (["training", None], [])
+
+    # Listener reconnecting: status changes go through the pool, progress is dropped
+    bridge._connection, sent[:] = None, []
+    await bridge.notify(progress)
+    await bridge.notify(done)
+    assert (sent, sessions) == ([None], [1])
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_progress_and_final_result_without_polling():
+    job = make_job(ProcessingStatus.PROCESSING, type=ServiceType.FRENCH)
+    repo = FakeJobRepo(job)
+    events = JobEventBroadcaster()
+    service = JobService(JobConf(stream_heartbeat_sec=5), repo, FakeProfileService(), events=events)
+
+    updates = service.stream_job_updates(job.user_id, job.id)
+    name, snapshot = await anext(updates)
+    assert (name, snapshot.status) == ("status", ProcessingStatus.PROCESSING)
+
+    async def _producer():
+        await events.publish(
+            JobEvent(job_id=job.id, user_id=job.user_id, status=job.status, stage="training")
+        )
+        repo.job = job.model_copy(update={"status": ProcessingStatus.SUCCESS})
+        await events.publish(
+            JobEvent(job_id=job.id, user_id=job.user_id, status=ProcessingStatus.SUCCESS)
+        )
+
+    producer = asyncio.create_task(_producer())
+    received = [item async for item in updates]
+    await producer
+
+    assert [name for name, _ in received] == ["progress", "result"]
+    assert received[-1][1].status == ProcessingStatus.SUCCESS
+    # one snapshot fetch + one final fetch, nothing in between
+    assert repo.fetches == 2
+
+
+@pytest.mark.asyncio
+async def test_long_poll_returns_after_status_change():
+    job = make_job(ProcessingStatus.NEW, type=ServiceType.FRENCH)
+    repo = FakeJobRepo(job)
+    events = JobEventBroadcaster()
+    service = JobService(JobConf(long_poll_max_sec=5), repo, FakeProfileService(), events=events)
+
+    async def _producer():
+        while events.subscriber_count(job.id) == 0:
+            await asyncio.sleep(0)
+        # same status (progress) does not wake the waiter
+        await events.publish(
+            JobEvent(job_id=job.id, user_id=job.user_id, status=job.status, stage="queued")
+        )
+        repo.job = job.model_copy(update={"status": ProcessingStatus.PROCESSING})
+        await events.publish(
+            JobEvent(job_id=job.id, user_id=job.user_id, status=ProcessingStatus.PROCESSING)
+        )
+
+    producer = asyncio.create_task(_producer())
+    result = await service.fetch_job_result(job.user_id, job.id, wait_sec=5)
+    await producer
+
+    assert result.status == ProcessingStatus.PROCESSING
+    assert repo.fetches == 2
+
+
+@pytest.mark.asyncio
+async def test_long_poll_times_out_with_current_status():
+    job = make_job(ProcessingStatus.NEW, type=ServiceType.FRENCH)
+    repo = FakeJobRepo(job)
+    service = JobService(
+        JobConf(long_poll_max_sec=1), repo, FakeProfileService(), events=JobEventBroadcaster()
+    )
+
+    result = await service.fetch_job_result(job.user_id, job.id, wait_sec=0.05)
+
+    assert result.status == ProcessingStatus.NEW
+    assert repo.fetches == 1
+
+
+def test_stream_endpoint_returns_result_event_for_finished_job():
+    job = make_job(ProcessingStatus.FAILURE, type=ServiceType.FRENCH)
+    service = JobService(
+        JobConf(), FakeJobRepo(job), FakeProfileService(), events=JobEventBroadcaster()
+    )
+
+    app = FastAPI()
+    app.include_router(jobs_router)
+    app.dependency_overrides[check_auth] = lambda: AuthProfile(
+        user_id=job.user_id, fingerprint=None, type=UserTypes.REGISTERED
+    )
+    _orig_get = di.get
+    di.get = lambda name: service if name == di.JobServiceName else _orig_get(name)
+    try:
+        client = TestClient(app)
+        resp = client.get(f"/api/jobs/v1/stream/{job.id}")
+        missing = client.get(f"/api/jobs/v1/stream/{uuid.uuid4()}")
+    finally:
+        di.get = _orig_get
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    lines = resp.text.strip().splitlines()
+    assert lines[0] == "event: result"
+    assert json.loads(lines[1][len("data: ") :])["status"] == ProcessingStatus.FAILURE.value
+    assert missing.status_code == 404
@@ -0,0 +1,98 @@
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import HTTPException
+
+from service.models.key_value import ProcessingStatus
+from service.repositories.job_repository import JobRepository
+from service.services.job_service import JobService
+from service.settings import JobConf
+from service.utils.lru_cache import LRUCache
+from tests.conftest import FakeJobRepo, make_job
+
+
+@pytest.mark.asyncio
+async def test_finished_job_is_paid_once_and_then_served_from_cache():
+    job = make_job(ProcessingStatus.SUCCESS)
+    metrics = {"task": "classification", "accuracy": 0.9, "n_features": 2, "n_samples": 10}
+    repo = FakeJobRepo(job, metrics=metrics)
+    service = JobService(JobConf(), repo, profile_source=None)
+
+    first = await service.fetch_job_result(job.user_id, job.id)
+    second = await service.fetch_job_result(job.user_id, job.id)
+
+    assert repo.fetches == 1
+    assert repo.charged == 1
+    assert (first.available_launches, first.metrics.accuracy) == (2, 0.9)
+    assert second == first
+
+    # Another job or process changed the balance: the cached result shows the current one
+    repo.launches = 7
+    third = await service.fetch_job_result(job.user_id, job.id)
+    assert repo.fetches == 1
+    assert third == first.model_copy(update={"available_launches": 7})
+
+
+@pytest.mark.asyncio
+async def test_running_job_is_not_cached_and_other_users_miss():
+    job = make_job(ProcessingStatus.PROCESSING)
+    repo = FakeJobRepo(job)
+    service = JobService(JobConf(), repo, profile_source=None)
+
+    await service.fetch_job_result(job.user_id, job.id)
+    repo.job = job.model_copy(update={"status": ProcessingStatus.FAILURE})
+    failed = await service.fetch_job_result(job.user_id, job.id)
+    await service.fetch_job_result(job.user_id, job.id)
+
+    assert failed.status == ProcessingStatus.FAILURE
+    assert repo.fetches == 2
+    with pytest.raises(HTTPException):
+        await service.fetch_job_result(uuid.uuid4(), job.id)
+
+
+def test_lru_cache_is_bounded_and_keeps_recent_entries():
+    cache: LRUCache[int, str] = LRUCache(maxsize=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    cache.get(1)
+    cache.put(3, "c")
+
+    assert (cache.get(1), cache.get(2), cache.get(3)) == ("a", None, "c")
+    assert cache.discard_where(lambda key: key == 3) == 1
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_result_view_is_a_single_round_trip():
+    class _Session:
+        def __init__(self):
+            self.statements = []
+
+        async def execute(self, stmt, params=None):
+            self.statements.append(str(stmt))
+
+            class _Result:
+                def mappings(self):
+                    return self
+
+                def one_or_none(self):
+                    return None
+
+            return _Result()
+
+        async def commit(self):
+            pass
+
+    session = _Session()
+
+    class _Connector:
+        @asynccontextmanager
+        async def get_session_context(self):
+            yield session
+
+    repo = JobRepository(_Connector())
+    assert await repo.fetch_job_result_view(uuid.uuid4(), uuid.uuid4()) is None
+
+    assert len(session.statements) == 1
+    assert "LATERAL" in session.statements[0]
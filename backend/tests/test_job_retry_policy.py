@@ -0,0 +1,132 @@
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from service import container as di
+from service.models.key_value import ProcessingStatus
+from service.presentation.routers.admin_api.admin_api import admin_router
+from service.repositories.exceptions import RepositoryOperationalError
+from service.services.job_retry_policy import JobTimeoutError, RetryPolicy
+from service.services.job_service import JobService
+from service.settings import JobConf, config
+from tests.conftest import FakeJobRepo, make_job, make_processor
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def test_backoff_grows_exponentially_with_bounded_jitter():
+    policy = RetryPolicy(
+        JobConf(retry_base_delay_sec=2, retry_max_delay_sec=10, retry_jitter=0.5),
+        rng=random.Random(1),
+    )
+    for attempt, full in [(1, 2), (2, 4), (3, 8), (6, 10)]:
+        delays = [policy.backoff(attempt) for _ in range(50)]
+        assert all(full / 2 <= d <= full for d in delays)
+        assert len(set(delays)) > 1
+
+
+def test_error_classes_get_their_own_rules():
+    policy = RetryPolicy(JobConf(retry_max_attempts=3, retry_timeout_max_attempts=2))
+
+    retry = policy.decide(RepositoryOperationalError(), attempts=1, now=NOW)
+    assert retry.retry and retry.next_attempt_at > NOW
+    assert policy.decide(ConnectionError(), attempts=3).status == ProcessingStatus.DEAD_LETTER
+    assert policy.decide(JobTimeoutError(), attempts=2).status == ProcessingStatus.DEAD_LETTER
+    # A socket/storage timeout inside the job is transient, not a processing timeout
+    assert policy.decide(TimeoutError(), attempts=2).retry
+    assert policy.decide(ValueError("bad csv"), attempts=1).status == ProcessingStatus.FAILURE
+    assert policy.decide(FileNotFoundError(), attempts=1).status == ProcessingStatus.FAILURE
+
+
+@pytest.mark.asyncio
+async def test_transient_error_schedules_retry_instead_of_failure():
+    repo = FakeJobRepo()
+
+    async def _runner(job, cancel_token):
+        raise RepositoryOperationalError("connection reset")
+
+    before = datetime.now(timezone.utc)
+    await make_processor(repo, _runner, retry_base_delay_sec=10)._process_job_with_timeout(
+        make_job(ProcessingStatus.PROCESSING, attempts=1)
+    )
+
+    assert repo.completed == []
+    assert len(repo.retries) == 1
+    assert repo.retries[0] >= before + timedelta(seconds=5)
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_go_to_dead_letter_and_bad_input_fails():
+    repo = FakeJobRepo()
+
+    async def _flaky(job, cancel_token):
+        raise ConnectionError("storage unavailable")
+
+    async def _broken(job, cancel_token):
+        raise ValueError("No numeric features available for training")
+
+    await make_processor(repo, _flaky, retry_max_attempts=3)._process_job_with_timeout(
+        make_job(ProcessingStatus.PROCESSING, attempts=3)
+    )
+    await make_processor(repo, _broken)._process_job_with_timeout(
+        make_job(ProcessingStatus.PROCESSING, attempts=1)
+    )
+
+    assert repo.completed == [ProcessingStatus.DEAD_LETTER, ProcessingStatus.FAILURE]
+    assert repo.errors[0] == "ConnectionError: storage unavailable"
+    assert repo.retries == []
+
+
+@pytest.mark.asyncio
+async def test_only_the_processing_deadline_counts_as_a_job_timeout():
+    repo = FakeJobRepo()
+
+    async def _slow(job, cancel_token):
+        await asyncio.sleep(10)
+
+    async def _read_timeout(job, cancel_token):
+        raise TimeoutError("read timed out")
+
+    conf = {"retry_max_attempts": 3, "retry_timeout_max_attempts": 1}
+    slow = make_processor(repo, _slow, **conf)
+    slow.config.processing_timeout_sec = 0.01  # the setting itself is whole seconds
+    await slow._process_job_with_timeout(make_job(ProcessingStatus.PROCESSING, attempts=1))
+    await make_processor(repo, _read_timeout, **conf)._process_job_with_timeout(
+        make_job(ProcessingStatus.PROCESSING, attempts=1)
+    )
+
+    assert repo.completed == [ProcessingStatus.FAILURE]
+    assert repo.errors == ["Processing timed out"]
+    assert len(repo.retries) == 1
+
+
+def test_admin_requeue_requires_token(monkeypatch):
+    repo = FakeJobRepo()
+    service = JobService(JobConf(), repo, profile_source=None)
+    monkeypatch.setattr(config.auth, "admin_token", "s3cret")
+
+    app = FastAPI()
+    app.include_router(admin_router)
+    _orig_get = di.get
+    di.get = lambda name: service if name == di.JobServiceName else _orig_get(name)
+    try:
+        client = TestClient(app)
+        job_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+        denied = client.post("/api/admin/v1/jobs/dead-letter/requeue", json={})
+        resp = client.post(
+            "/api/admin/v1/jobs/dead-letter/requeue",
+            json={"job_ids": job_ids},
+            headers={"X-Admin-Token": "s3cret"},
+        )
+    finally:
+        di.get = _orig_get
+
+    assert denied.status_code == 401
+    assert resp.status_code == 200
+    assert resp.json()["requeued"] == 2
+    assert [str(i) for i in repo.requeued_with[0]] == job_ids
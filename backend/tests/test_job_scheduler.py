@@ -0,0 +1,69 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from service.models.jobs_models import JobLogic
+from service.models.key_value import ProcessingStatus, ServiceMode, ServiceType
+from service.services.job_scheduler import FairShareScheduler
+from service.settings import JobConf
+
+_T0 = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def _job(user_id: uuid.UUID, cost: int | None, minute: int = 0) -> JobLogic:
+    return JobLogic(
+        user_id=user_id,
+        mode=ServiceMode.LIPS,
+        type=ServiceType.TRAIN,
+        status=ProcessingStatus.NEW,
+        estimated_cost=cost,
+        created_at=_T0 + timedelta(minutes=minute),
+    )
+
+
+def test_heavy_user_does_not_take_every_slot():
+    heavy, light = uuid.uuid4(), uuid.uuid4()
+    scheduler = FairShareScheduler(JobConf(max_running_jobs_per_user=5))
+    candidates = [(_job(heavy, 10, minute=i), "STANDARD") for i in range(5)]
+    candidates.append((_job(light, 10_000, minute=10), "STANDARD"))
+
+    picked = scheduler.select(candidates, running={}, limit=2)
+
+    assert {j.user_id for j in picked} == {heavy, light}
+
+
+def test_per_user_running_cap_is_enforced():
+    busy, idle = uuid.uuid4(), uuid.uuid4()
+    scheduler = FairShareScheduler(JobConf(max_running_jobs_per_user=2))
+    candidates = [(_job(busy, 1, minute=i), None) for i in range(3)]
+    candidates.append((_job(idle, 1), None))
+
+    picked = scheduler.select(candidates, running={busy: 1}, limit=5)
+
+    assert sum(1 for j in picked if j.user_id == busy) == 1
+    assert sum(1 for j in picked if j.user_id == idle) == 1
+
+
+def test_shortest_expected_first_within_user_share():
+    user_id = uuid.uuid4()
+    scheduler = FairShareScheduler(JobConf(max_running_jobs_per_user=1, default_job_cost=500))
+    big = _job(user_id, 100_000, minute=0)
+    unknown = _job(user_id, None, minute=1)
+    small = _job(user_id, 50, minute=2)
+
+    picked = scheduler.select([(big, None), (unknown, None), (small, None)], running={}, limit=3)
+
+    assert [j.id for j in picked] == [small.id]
+
+
+def test_tier_weight_gives_larger_share():
+    premium, standard = uuid.uuid4(), uuid.uuid4()
+    scheduler = FairShareScheduler(
+        JobConf(max_running_jobs_per_user=10, tier_weights={"STANDARD": 1.0, "PREMIUM": 3.0})
+    )
+    candidates = [(_job(premium, 10, minute=i), "PREMIUM") for i in range(6)]
+    candidates += [(_job(standard, 10, minute=i), "STANDARD") for i in range(6)]
+
+    picked = scheduler.select(candidates, running={}, limit=4)
+
+    assert sum(1 for j in picked if j.user_id == premium) == 3
+    assert sum(1 for j in picked if j.user_id == standard) == 1
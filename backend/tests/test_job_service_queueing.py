@@ -0,0 +1,129 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from service.models.key_value import ProcessingStatus, ServiceMode, ServiceType
+from service.presentation.routers.jobs_api.schemas import StartJobRequest, StartJobsBatchRequest
+from service.services.job_service import JobService
+from service.services.profile_service import ProfileService
+from service.settings import JobConf, ProfileConf
+from tests.conftest import FakeJobRepo
+
+
+def _request() -> StartJobRequest:
+    return StartJobRequest(file_id=uuid.uuid4(), mode=ServiceMode.LIPS, type=ServiceType.TRAIN)
+
+
+def _service(repo, launches=10, **conf) -> JobService:
+    repo.launches = launches
+    return JobService(JobConf(**conf), repo, profile_source=None)
+
+
+@pytest.mark.asyncio
+async def test_job_can_be_queued_while_another_is_running():
+    repo = FakeJobRepo(pending=1, running=1)
+    resp = await _service(repo).create_job(uuid.uuid4(), _request())
+    assert resp.status == ProcessingStatus.NEW
+    assert len(repo.batches) == 1
+
+
+@pytest.mark.asyncio
+async def test_pending_limit_rejects_extra_jobs():
+    repo = FakeJobRepo(pending=2)
+    with pytest.raises(HTTPException) as exc:
+        await _service(repo, max_pending_jobs_per_user=2).create_job(uuid.uuid4(), _request())
+    assert exc.value.status_code == 400
+    assert repo.batches == []
+
+
+@pytest.mark.asyncio
+async def test_batch_is_created_in_one_repository_call():
+    repo = FakeJobRepo()
+    body = StartJobsBatchRequest(jobs=[_request() for _ in range(3)])
+    resp = await _service(repo).create_jobs_batch(uuid.uuid4(), body)
+    assert len(resp.jobs) == 3
+    assert [len(b) for b in repo.batches] == [3]
+
+
+@pytest.mark.asyncio
+async def test_batch_enqueues_one_job_per_file_and_counts_down_launches():
+    repo = FakeJobRepo()
+    body = StartJobsBatchRequest(jobs=[_request() for _ in range(3)])
+    resp = await _service(repo, launches=5).create_jobs_batch(uuid.uuid4(), body)
+
+    # Each job reports the launches left once it and the jobs before it are charged
+    assert [job.available_launches for job in resp.jobs] == [4, 3, 2]
+    assert [job.file_id for job in repo.batches[0]] == [job.file_id for job in body.jobs]
+
+
+@pytest.mark.asyncio
+async def test_job_for_a_file_of_another_user_is_rejected():
+    repo = FakeJobRepo()
+    request = _request()
+    repo.foreign_files.add(request.file_id)
+    body = StartJobsBatchRequest(jobs=[_request(), request])
+
+    with pytest.raises(HTTPException) as exc:
+        await _service(repo).create_jobs_batch(uuid.uuid4(), body)
+    assert exc.value.status_code == 404
+    assert repo.batches == []
+
+
+@pytest.mark.asyncio
+async def test_batch_larger_than_quota_is_rejected():
+    repo = FakeJobRepo(running=1)
+    body = StartJobsBatchRequest(jobs=[_request() for _ in range(3)])
+    with pytest.raises(HTTPException) as exc:
+        await _service(repo, launches=3).create_jobs_batch(uuid.uuid4(), body)
+    assert exc.value.status_code == 403
+    assert repo.batches == []
+
+
+@pytest.mark.asyncio
+async def test_batch_is_capped_at_the_pending_limit():
+    repo = FakeJobRepo()
+    body = StartJobsBatchRequest(jobs=[_request() for _ in range(4)])
+    with pytest.raises(HTTPException) as exc:
+        await _service(repo, max_batch_size=20, max_pending_jobs_per_user=3).create_jobs_batch(
+            uuid.uuid4(), body
+        )
+    assert (exc.value.status_code, exc.value.detail) == (400, "Too many jobs in batch. Max: 3")
+    assert repo.batches == []
+    # Defaults: the largest batch fits an empty queue
+    conf = JobConf()
+    assert conf.max_batch_size <= conf.max_pending_jobs_per_user
+
+
+@pytest.mark.asyncio
+async def test_missing_user_is_rejected_before_insert():
+    class _NoUserRepo(FakeJobRepo):
+        async def create_jobs_with_quota(self, user_id, jobs, admit):
+            return None, []
+
+    with pytest.raises(HTTPException) as exc:
+        await _service(_NoUserRepo()).create_job(uuid.uuid4(), _request())
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_profile_charge_is_a_single_conditional_update():
+    class _ProfileRepo:
+        def __init__(self):
+            self.launches = 1
+            self.calls: list[int] = []
+
+        async def add_available_launches(self, user_id, delta):
+            self.calls.append(delta)
+            if self.launches + delta < 0:
+                return None
+            self.launches += delta
+            return self.launches
+
+    repo = _ProfileRepo()
+    service = ProfileService(ProfileConf(), repo)
+
+    assert await service.decrement_available_launches(uuid.uuid4()) == 0
+    with pytest.raises(ValueError):
+        await service.decrement_available_launches(uuid.uuid4())
+    assert repo.calls == [-1, -1]
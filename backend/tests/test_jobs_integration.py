@@ -42,7 +42,9 @@ class _FakeJobService:
             metrics=None,
         )
 
-    async def fetch_job_result(self, user_id: uuid.UUID, job_id: uuid.UUID) -> JobResponse:
+    async def fetch_job_result(
+        self, user_id: uuid.UUID, job_id: uuid.UUID, wait_sec: float = 0
+    ) -> JobResponse:
         job = self._jobs.get(job_id)
         assert job is not None and job.user_id == user_id
         # Simulate finished TRAIN job with enrichment
@@ -0,0 +1,178 @@
+import asyncio
+import uuid
+
+import pytest
+
+from service.infrastructure.database.leader import LeaderElection, lock_key
+from service.infrastructure.database.postgresql import PgConnector, _drop_inherited_pools
+from service.models.jobs_models import JobLogic
+from service.models.key_value import ProcessingStatus, ServiceMode, ServiceType
+from service.services.job_processor import NewJobProcessor
+from service.settings import JobConf, Postgresql
+
+
+class _Result:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar(self):
+        return self._value
+
+
+class _Server:
+    """Session-level advisory locks: held until the holding session is closed."""
+
+    def __init__(self):
+        self.holders: dict[int, "_Conn"] = {}
+
+    def close(self, conn: "_Conn") -> None:
+        conn.alive = False
+        self.holders = {key: c for key, c in self.holders.items() if c is not conn}
+
+
+class _Conn:
+    def __init__(self, server: _Server):
+        self.server = server
+        self.alive = True
+
+    async def execute(self, stmt, params=None):
+        if not self.alive:
+            raise ConnectionError("server closed the connection")
+        if params is None:
+            return _Result(1)
+        holder = self.server.holders.setdefault(params["key"], self)
+        return _Result(holder is self)
+
+    async def commit(self):
+        pass
+
+    async def invalidate(self):
+        self.server.close(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        # Back to the pool: the session (and any lock it holds) stays open
+        pass
+
+
+class _Engine:
+    def __init__(self, server: _Server):
+        self.server = server
+        self.connections: list[_Conn] = []
+
+    def connect(self) -> _Conn:
+        conn = _Conn(self.server)
+        self.connections.append(conn)
+        return conn
+
+
+class _Connector:
+    def __init__(self, server: _Server):
+        self.engine = _Engine(server)
+
+
+def _election(server: _Server, runs: list[str], name: str) -> LeaderElection:
+    election = LeaderElection(_Connector(server), "singletons", check_interval_sec=0.01)
+
+    async def loop():
+        runs.append(name)
+        await asyncio.Event().wait()
+
+    election.add_loop("cleanup", loop)
+    return election
+
+
+def test_lock_key_is_stable_signed_bigint():
+    assert lock_key("singletons") == lock_key("singletons") != lock_key("other")
+    assert -(2**63) <= lock_key("singletons") < 2**63
+
+
+@pytest.mark.asyncio
+async def test_only_the_leader_runs_loops_and_another_process_takes_over():
+    server, runs = _Server(), []
+    first, second = _election(server, runs, "first"), _election(server, runs, "second")
+    tasks = [asyncio.create_task(first.run()), asyncio.create_task(second.run())]
+    try:
+        await asyncio.sleep(0.05)
+        assert [first.is_leader, second.is_leader].count(True) == 1
+        leader, follower = (first, second) if first.is_leader else (second, first)
+        assert len(runs) == 1
+
+        # The leader's database session dies: the lock is released with it
+        (lock_conn,) = [c for c in leader.connector.engine.connections if c.alive]
+        server.close(lock_conn)
+        await asyncio.sleep(0.1)
+
+        assert follower.is_leader
+        assert runs[-1] != runs[0]
+        # The old leader stopped its loops and is a follower now
+        assert not leader.is_leader
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Stepping down closes the lock session instead of returning it to the pool
+    assert server.holders == {}
+
+
+class _LeaseRepo:
+    def __init__(self, reclaimed: list[JobLogic]):
+        self.reclaimed = reclaimed
+        self.calls: list[tuple[int, int]] = []
+
+    async def reclaim_expired_leases(self, max_attempts, limit=100):
+        self.calls.append((max_attempts, limit))
+        reclaimed, self.reclaimed = self.reclaimed, []
+        return reclaimed
+
+
+class _Events:
+    def __init__(self):
+        self.published = []
+
+    def add_listener(self, listener):
+        pass
+
+    async def publish(self, event):
+        self.published.append(event)
+
+
+@pytest.mark.asyncio
+async def test_lease_reaper_requeues_jobs_of_lost_workers():
+    job = JobLogic(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        mode=ServiceMode.LIPS,
+        type=ServiceType.TRAIN,
+        status=ProcessingStatus.NEW,
+    )
+    repo, events = _LeaseRepo([job]), _Events()
+    config = JobConf(retry_max_attempts=4, lease_reap_interval_sec=0, lease_reap_batch_limit=7)
+    processor = NewJobProcessor(config, repo, events=events)
+
+    reaper = asyncio.create_task(processor.run_lease_reaper())
+    await asyncio.sleep(0.01)
+    reaper.cancel()
+    await asyncio.gather(reaper, return_exceptions=True)
+
+    assert repo.calls[0] == (4, 7)
+    assert [(e.job_id, e.status) for e in events.published] == [(job.id, ProcessingStatus.NEW)]
+
+
+def test_forked_child_gets_empty_pools():
+    saved = PgConnector._engine, PgConnector._session_maker, PgConnector._replicas
+    PgConnector._engine = PgConnector._session_maker = PgConnector._replicas = None
+    try:
+        connector = PgConnector(Postgresql(replica_hosts=["r1"]))
+        pools = [connector.engine.sync_engine.pool, connector.replicas[0].engine.sync_engine.pool]
+
+        _drop_inherited_pools()
+
+        assert connector.engine.sync_engine.pool is not pools[0]
+        assert connector.replicas[0].engine.sync_engine.pool is not pools[1]
+        assert type(connector.engine.sync_engine.pool) is type(pools[0])
+    finally:
+        PgConnector._engine, PgConnector._session_maker, PgConnector._replicas = saved
@@ -52,6 +52,35 @@ def minio_storage(mock_minio_config):
         yield storage
 
 
+class _Responses(list):
+    """Ranged GETs against an in-memory object, like ``Minio.get_object``"""
+
+    def __init__(self, data: bytes, etag: str):
+        super().__init__()
+        self.data = data
+        self.etag = etag
+
+    def get_range(self, bucket, key, *, offset=0, length=0, request_headers=None):
+        import io
+
+        end = min(offset + length, len(self.data)) - 1
+        body = io.BytesIO(self.data[offset : end + 1])
+        response = Mock()
+        response.headers = {
+            "Content-Range": f"bytes {offset}-{end}/{len(self.data)}",
+            "ETag": self.etag,
+        }
+        response.readinto.side_effect = body.readinto
+        self.append(response)
+        return response
+
+
+def _serve_object(storage, data: bytes, etag: str = '"etag"') -> _Responses:
+    responses = _Responses(data, etag)
+    storage._client.get_object.side_effect = responses.get_range
+    return responses
+
+
 class TestMinioFileStorageInit:
     """Tests for MinioFileStorage initialization"""
 
@@ -69,9 +98,7 @@ class TestMinioFileStorageInit:
             _ = MinioFileStorage(mock_minio_config)
 
             # Verify bucket creation was called
-            mock_client.make_bucket.assert_called_once_with(
-                "test-bucket", location="us-east-1"
-            )
+            mock_client.make_bucket.assert_called_once_with("test-bucket", location="us-east-1")
 
     def test_init_skips_bucket_creation_if_exists(self, mock_minio_config):
         """Test that bucket creation is skipped if bucket exists"""
@@ -137,6 +164,18 @@ class TestMinioFileStorageUpload:
         assert call_args[1]["bucket_name"] == "test-bucket"
         assert call_args[1]["object_name"] == file_key
         assert call_args[1]["length"] == len(file_data)
+        assert call_args[1]["part_size"] == minio_storage._part_size
+        assert call_args[1]["num_parallel_uploads"] == minio_storage._transfer_concurrency
+
+    @pytest.mark.asyncio
+    async def test_upload_file_keeps_parts_under_the_s3_limit(self, minio_storage):
+        """Test that the part size grows so an object never needs more than 10000 parts"""
+        minio_storage._client.put_object.return_value = Mock(etag="etag")
+        minio_storage._part_size = 8
+
+        await minio_storage.upload_file(file_key="big.bin", file_data=bytes(100_001))
+
+        assert minio_storage._client.put_object.call_args[1]["part_size"] == 11
 
     @pytest.mark.asyncio
     async def test_upload_file_retry_on_failure(self, minio_storage):
@@ -182,20 +221,94 @@ class TestMinioFileStorageDownload:
         """Test successful file download"""
         file_key = "test.txt"
         expected_data = b"test file content"
-
-        # Mock successful download
-        mock_response = Mock()
-        mock_response.read.return_value = expected_data
-        mock_response.close = Mock()
-        mock_response.release_conn = Mock()
-        minio_storage._client.get_object.return_value = mock_response
+        responses = _serve_object(minio_storage, expected_data)
 
         result = await minio_storage.get_file(file_key)
 
         assert result == expected_data
-        minio_storage._client.get_object.assert_called_once_with("test-bucket", file_key)
-        mock_response.close.assert_called_once()
-        mock_response.release_conn.assert_called_once()
+        assert type(result) is bytes
+        # Smaller than a part: a single ranged GET
+        minio_storage._client.get_object.assert_called_once_with(
+            "test-bucket", file_key, offset=0, length=minio_storage._part_size, request_headers=None
+        )
+        responses[0].close.assert_called_once()
+        responses[0].release_conn.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_file_fetches_parts_in_parallel(self, minio_storage, tmp_path):
+        """Test that a large object is assembled from concurrent ranged GETs"""
+        import os
+
+        minio_storage._part_size = 1000
+        data = os.urandom(10_500)
+        responses = _serve_object(minio_storage, data, etag='"v1"')
+
+        assert await minio_storage.get_file("big.bin") == data
+        assert await minio_storage.download_file("big.bin", tmp_path / "big.bin") == len(data)
+        assert (tmp_path / "big.bin").read_bytes() == data
+        assert list(tmp_path.iterdir()) == [tmp_path / "big.bin"]
+
+        calls = minio_storage._client.get_object.call_args_list[:11]
+        assert sorted(c.kwargs["offset"] for c in calls) == list(range(0, 10_500, 1000))
+        # Later parts are pinned to the version seen by the first GET
+        assert {c.kwargs["request_headers"]["If-Match"] for c in calls[1:]} == {'"v1"'}
+        assert all(r.release_conn.called for r in responses)
+
+    @pytest.mark.asyncio
+    async def test_get_file_retries_a_failed_part(self, minio_storage):
+        """Test that a broken part is fetched again without restarting the download"""
+        minio_storage._part_size = 4
+        minio_storage._retry_backoff = 0
+        get_range = _serve_object(minio_storage, b"0123456789ab").get_range
+        failures = iter([OSError("connection reset")])
+
+        def flaky(bucket, key, *, offset, length, request_headers):
+            if offset == 4 and (error := next(failures, None)):
+                raise error
+            return get_range(bucket, key, offset=offset, length=length)
+
+        minio_storage._client.get_object.side_effect = flaky
+
+        assert await minio_storage.get_file("a.bin") == b"0123456789ab"
+        assert minio_storage._client.get_object.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_download_file_waits_for_running_parts_before_cleanup(
+        self, minio_storage, tmp_path
+    ):
+        """Test that a failed part does not close the file under a part still being written"""
+        import threading
+
+        minio_storage._part_size = 4
+        minio_storage._retry_attempts = 1
+        get_range = _serve_object(minio_storage, b"0123456789ab").get_range
+        release, events = threading.Event(), []
+
+        def slow_readinto(body_readinto):
+            def readinto(view):
+                release.wait(5)
+                events.append("part written")
+                return body_readinto(view)
+
+            return readinto
+
+        def broken(bucket, key, *, offset, length, request_headers):
+            if offset == 4:
+                raise OSError("connection reset")
+            response = get_range(bucket, key, offset=offset, length=length)
+            if offset == 8:
+                response.readinto.side_effect = slow_readinto(response.readinto.side_effect)
+            return response
+
+        minio_storage._client.get_object.side_effect = broken
+        threading.Timer(0.1, release.set).start()
+
+        with pytest.raises(OSError, match="connection reset"):
+            await minio_storage.download_file("a.bin", tmp_path / "a.bin")
+        events.append("download failed")
+
+        assert events == ["part written", "download failed"]
+        assert list(tmp_path.iterdir()) == []
 
     @pytest.mark.asyncio
     async def test_get_file_not_found(self, minio_storage):
@@ -239,6 +352,55 @@ class TestMinioFileStorageDelete:
         assert minio_storage._client.remove_object.call_count == minio_storage._retry_attempts
 
 
+class TestMinioFileStorageBulkDelete:
+    """Tests for delete_files method"""
+
+    @pytest.mark.asyncio
+    async def test_delete_files_sends_one_request_per_thousand_keys(self, minio_storage):
+        """Test that keys are deleted in multi-object requests of up to 1000 keys"""
+        keys = [f"datasets/{i}.csv" for i in range(2500)]
+        sent = []
+
+        def remove_objects(bucket, objects):
+            sent.append([o.name for o in objects])
+            return iter([])
+
+        minio_storage._client.remove_objects.side_effect = remove_objects
+
+        result = await minio_storage.delete_files(file_keys=keys)
+
+        assert sorted(len(batch) for batch in sent) == [500, 1000, 1000]
+        assert sorted(k for batch in sent for k in batch) == sorted(keys)
+        assert result.removed == 2500 and result.failed == []
+
+    @pytest.mark.asyncio
+    async def test_delete_files_reports_per_key_errors(self, minio_storage):
+        """Test that errors returned by MinIO are reported per key"""
+        from minio.deleteobjects import DeleteError
+
+        minio_storage._client.remove_objects.return_value = iter(
+            [
+                DeleteError("NoSuchKey", "gone", "b.csv", None),
+                DeleteError("AccessDenied", "denied", "c.csv", None),
+            ]
+        )
+
+        result = await minio_storage.delete_files(file_keys=["a.csv", "b.csv", "c.csv"])
+
+        assert (result.removed, result.missing, result.failed) == (1, 1, ["c.csv"])
+
+    @pytest.mark.asyncio
+    async def test_delete_files_gives_up_after_retries(self, minio_storage):
+        """Test that a failing batch is reported as failed, not raised"""
+        minio_storage._retry_backoff = 0
+        minio_storage._client.remove_objects.side_effect = Exception("Network error")
+
+        result = await minio_storage.delete_files(file_keys=["a.csv", "b.csv"])
+
+        assert result.failed == ["a.csv", "b.csv"]
+        assert minio_storage._client.remove_objects.call_count == minio_storage._retry_attempts
+
+
 class TestMinioFileStoragePresignedUrls:
     """Tests for presigned URL generation"""
 
@@ -314,26 +476,81 @@ class TestMinioFileStoragePresignedUrls:
 class TestMinioFileStorageFileExists:
     """Tests for file_exists method"""
 
-    def test_file_exists_true(self, minio_storage):
+    @pytest.mark.asyncio
+    async def test_file_exists_true(self, minio_storage):
         """Test file_exists returns True when file exists"""
+        import threading
+
         file_key = "test.txt"
 
-        # Mock file exists
-        mock_stat = Mock()
-        minio_storage._client.stat_object.return_value = mock_stat
+        # Mock file exists; the blocking stat runs in the storage thread pool
+        threads = []
+        minio_storage._client.stat_object.side_effect = lambda *args: threads.append(
+            threading.current_thread().name
+        )
 
-        result = minio_storage.file_exists(file_key)
+        result = await minio_storage.file_exists(file_key)
 
         assert result is True
         minio_storage._client.stat_object.assert_called_once_with("test-bucket", file_key)
+        assert threads[0].startswith("minio")
 
-    def test_file_exists_false(self, minio_storage):
+    @pytest.mark.asyncio
+    async def test_file_exists_false(self, minio_storage):
         """Test file_exists returns False when file doesn't exist"""
         file_key = "nonexistent.txt"
 
         # Mock file doesn't exist
         minio_storage._client.stat_object.side_effect = Exception("Not found")
 
-        result = minio_storage.file_exists(file_key)
+        result = await minio_storage.file_exists(file_key)
 
         assert result is False
+
+
+class TestMinioFileStorageEventLoop:
+    """The synchronous client must not block the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_large_upload_does_not_stall_other_requests(self, minio_storage):
+        """Test that requests are served while a 100MB object is being uploaded"""
+        import asyncio
+        import time
+
+        import httpx
+        from fastapi import FastAPI
+
+        def slow_put_object(*, bucket_name, object_name, data, length, **kwargs):
+            # Network transfer: 8MB per 20ms, blocking like the real client
+            while data.read(8 * 1024 * 1024):
+                time.sleep(0.02)
+            return Mock(etag="etag")
+
+        minio_storage._client.put_object.side_effect = slow_put_object
+        app = FastAPI()
+
+        @app.get("/ping")
+        async def ping() -> str:
+            return "pong"
+
+        @app.post("/upload")
+        async def upload() -> str:
+            return await minio_storage.upload_file(
+                file_key="big.bin", file_data=bytes(100 * 1024 * 1024)
+            )
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            pending = asyncio.create_task(client.post("/upload"))
+            await asyncio.sleep(0.01)
+            lags = []
+            while not pending.done():
+                started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                assert (await client.get("/ping")).status_code == 200
+                lags.append(time.perf_counter() - started - 0.005)
+            assert (await pending).status_code == 200
+
+        # The upload takes ~260ms; pings kept being answered in the meantime
+        assert len(lags) >= 10
+        assert max(lags) < 0.1
@@ -1,18 +1,25 @@
 from datetime import datetime, timedelta, timezone
-from uuid import uuid4
+from types import SimpleNamespace
+from uuid import UUID, uuid4
 
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from service import container
 from service.models.auth_models import AuthProfile
 from service.models.key_value import ServiceMode, UserTypes
 from service.presentation.dependencies.auth_checker import check_auth
+from service.presentation.routers.files_api.files_api import files_router
 from service.presentation.routers.ml_api.ml_api import ml_router
+from service.repositories.pagination import Cursor
+from service.services.file_saver_service import FileSaverService
 
 
 class _FakeRepo:
-    async def list_training_metrics_trends(self, user_id, mode=None, limit: int = 50, session=None):
+    async def list_training_metrics_trends(
+        self, user_id, mode=None, limit: int = 50, cursor=None, session=None
+    ):
         now = datetime.now(timezone.utc)
         # produce 3 fake entries
         items = []
@@ -74,3 +81,43 @@ def test_metrics_trends_with_mode_filter(app):
     assert r.status_code == 200
     data = r.json()
     assert len(data) >= 1
+
+
+def test_metrics_trends_cursor_header_and_invalid_cursor(app):
+    client = TestClient(app)
+
+    full = client.get("/api/ml/v1/metrics/trends?limit=2")
+    last = client.get("/api/ml/v1/metrics/trends?limit=5")
+    token = full.headers["X-Next-Cursor"]
+    assert Cursor.decode(token).id == UUID(full.json()[-1]["run_id"])
+    assert "X-Next-Cursor" not in last.headers
+
+    assert client.get(f"/api/ml/v1/metrics/trends?cursor={token}").status_code == 200
+    assert client.get("/api/ml/v1/metrics/trends?cursor=garbage").status_code == 400
+
+
+def test_files_list_uses_the_same_cursor_header(monkeypatch):
+    now = datetime.now(timezone.utc)
+
+    class _FileRepo:
+        async def fetch_user_files_metadata(self, user_id, mode, limit=100, cursor=None):
+            return [
+                SimpleNamespace(id=uuid4(), file_url=f"/f/{i}", created_at=now - timedelta(i))
+                for i in range(3)
+            ][:limit]
+
+    monkeypatch.setitem(
+        container._CONTAINER, container.FileSaverServiceName, FileSaverService(_FileRepo(), "files")
+    )
+    files_app = FastAPI()
+    files_app.dependency_overrides[check_auth] = _fake_auth
+    files_app.include_router(files_router)
+    client = TestClient(files_app)
+
+    page = client.get(f"/api/service/files/v1/fetch/{ServiceMode.LIPS.value}?limit=2")
+    last = client.get(f"/api/service/files/v1/fetch/{ServiceMode.LIPS.value}?limit=5")
+    assert page.status_code == 200, page.text
+    assert set(page.json()) == {"files"}
+    token = page.headers["X-Next-Cursor"]
+    assert Cursor.decode(token).id == UUID(page.json()["files"][-1]["file_id"])
+    assert "X-Next-Cursor" not in last.headers
@@ -19,15 +19,24 @@ from service.presentation.routers.ml_api.ml_api import (
 
 # ---- Fakes for dependency overrides ----
 class _FakeSaver:
-    async def save(self, user_id, mode, file_name, file_content: bytes):
-        # emulate FileSaverService.save returning UploadResponse
+    async def save_stream(self, user_id, mode, file_name, chunks):
+        # emulate FileSaverService.save_stream returning UploadResponse
+        async for _ in chunks:
+            pass
         # map to /storage/uploads/<mode>/<file_name>
         url = f"/storage/uploads/{mode.value}/{file_name}"
         return UploadResponse(file_id=uuid.uuid4(), file_url=url)
 
 
 class _FakeTrainingRepo:
-    async def get_or_create_dataset_from_file(self, user_id, launch_id, mode, file_name, file_url):
+    def __init__(self):
+        self.shape = None
+
+    async def get_or_create_dataset_from_file(
+        self, user_id, launch_id, mode, file_name, file_url, *, row_count=None, column_count=None
+    ):
+        self.shape = (row_count, column_count)
+
         # minimal dataset-like object
         class _Obj:
             def __init__(self):
@@ -56,7 +65,8 @@ def test_dataset_upload_endpoint(tmp_path):
     app = FastAPI()
     app.include_router(ml_router)
 
-    app.dependency_overrides[get_training_repo] = lambda: _FakeTrainingRepo()
+    fake_repo = _FakeTrainingRepo()
+    app.dependency_overrides[get_training_repo] = lambda: fake_repo
     app.dependency_overrides[get_file_saver] = lambda: _FakeSaver()
     app.dependency_overrides[get_file_repo] = lambda: _FakeFileRepo()
     app.dependency_overrides[ml_module.check_auth] = _fake_auth
@@ -75,3 +85,38 @@ def test_dataset_upload_endpoint(tmp_path):
     assert data["name"] == "dataset.csv"
     assert data["mode"] == ServiceMode.LIPS.value
     assert data["version"] == 3
+    # dataset shape is recorded for size-aware job scheduling
+    assert fake_repo.shape == (2, 3)
+
+
+def test_dataset_version_is_issued_after_presigning():
+    calls = []
+
+    class _PresigningSaver(_FakeSaver):
+        async def save_stream(self, user_id, mode, file_name, chunks):
+            resp = await super().save_stream(user_id, mode, file_name, chunks)
+            return resp.model_copy(update={"file_key": f"uploads/{file_name}"})
+
+        async def get_presigned_url_by_key(self, *, file_key, expiry_sec=3600):
+            calls.append("presign")
+            return f"https://minio/{file_key}"
+
+    class _RecordingRepo(_FakeTrainingRepo):
+        async def get_or_create_dataset_from_file(self, *args, **kwargs):
+            calls.append("version")
+            return await super().get_or_create_dataset_from_file(*args, **kwargs)
+
+    app = FastAPI()
+    app.include_router(ml_router)
+    app.dependency_overrides[get_training_repo] = _RecordingRepo
+    app.dependency_overrides[get_file_saver] = _PresigningSaver
+    app.dependency_overrides[get_file_repo] = _FakeFileRepo
+    app.dependency_overrides[ml_module.check_auth] = _fake_auth
+
+    files = {"file": ("dataset.csv", io.BytesIO(b"x1,x2,target\n1,2,0\n2,3,1\n"), "text/csv")}
+    resp = TestClient(app).post("/api/ml/v1/datasets/upload", files=files)
+
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["download_url"] == "https://minio/uploads/dataset.csv"
+    # The per-user version counter row is locked from the upsert until commit
+    assert calls == ["presign", "version"]
@@ -17,9 +17,11 @@ from service.presentation.routers.ml_api.ml_api import (
 
 
 class _FakeSaver:
-    async def save(self, user_id, mode, file_name, file_content: bytes):  # pragma: no cover
-        # Should not be called in negative cases after validation fails
-        raise AssertionError("Saver should not be invoked for invalid CSV uploads")
+    async def save_stream(self, user_id, mode, file_name, chunks):
+        # Validation fails while the upload is streamed: it never gets committed
+        async for _ in chunks:
+            pass
+        raise AssertionError("Invalid CSV upload should not be committed")
 
 
 class _FakeTrainingRepo:
@@ -0,0 +1,361 @@
+"""Round trips per repository call, pinned on an in-memory SQLite copy of the schema.
+
+Repositories run unchanged: the connector hands them a thin async facade over a sync
+session, and every statement that reaches the driver is counted.
+"""
+
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from service.models.db.base_db_model import Base
+from service.models.db.db_models import (
+    Dataset,
+    DatasetVersionCounter,
+    ModelArtifact,
+    TrainingRun,
+    User,
+    UserFile,
+    UserLaunch,
+)
+from service.models.jobs_models import JobLogic
+from service.models.key_value import ProcessingStatus, ServiceMode, ServiceType
+from service.repositories.file_repository import FileRepository
+from service.repositories.job_repository import JobRepository
+from service.repositories.pagination import Cursor, next_cursor
+from service.repositories.profile_repository import ProfileRepository
+from service.repositories.training_repository import TrainingRepository
+from service.services.job_eta import JobEtaEstimator
+from service.services.job_service import JobService
+from service.settings import JobConf
+
+# Dataset.created_at defaults to datetime.utcnow
+pytestmark = pytest.mark.filterwarnings("ignore::DeprecationWarning")
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+class _AsyncFacade:
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def execute(self, *args, **kwargs):
+        return self._session.execute(*args, **kwargs)
+
+    async def flush(self):
+        self._session.flush()
+
+    async def commit(self):
+        self._session.commit()
+
+    async def rollback(self):
+        self._session.rollback()
+
+    async def merge(self, instance):
+        return self._session.merge(instance)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._session.close()
+
+
+class _SqliteConnector:
+    def __init__(self):
+        self.engine = create_engine("sqlite://")
+        self.statements: list[str] = []
+
+        @event.listens_for(self.engine, "connect")
+        def _attach_schemas(dbapi_conn, _record):
+            dbapi_conn.execute("ATTACH DATABASE ':memory:' AS profile")
+            dbapi_conn.execute("ATTACH DATABASE ':memory:' AS session")
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, *args):
+            self.statements.append(statement)
+
+        Base.metadata.create_all(self.engine)
+        self._maker = sessionmaker(bind=self.engine, expire_on_commit=False, autoflush=False)
+
+    def get_session_context(self):
+        return _AsyncFacade(self._maker())
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+
+def _seed_history(session, user_id: uuid.UUID, size: int) -> None:
+    # As if uploaded in one transaction: every file gets the same now()
+    uploaded_at = datetime(2025, 1, 1, 12, 0)
+    for i in range(size):
+        launch = UserLaunch(
+            user_id=user_id,
+            mode=ServiceMode.LIPS,
+            type=ServiceType.TRAIN,
+            status=ProcessingStatus.SUCCESS,
+            is_payment_taken=True,
+        )
+        dataset = Dataset(
+            user_id=user_id,
+            mode=ServiceMode.LIPS,
+            name=f"d{i}.csv",
+            file_url=f"/storage/d{i}.csv",
+            version=i + 1,
+        )
+        session.add_all([launch, dataset])
+        session.flush()
+        session.add_all(
+            [
+                UserFile(
+                    user_id=user_id,
+                    mode=ServiceMode.LIPS,
+                    file_name=f"d{i}.csv",
+                    file_url=f"/storage/d{i}.csv",
+                    created_at=uploaded_at,
+                ),
+                TrainingRun(
+                    user_id=user_id,
+                    launch_id=launch.id,
+                    dataset_id=dataset.id,
+                    status=ProcessingStatus.SUCCESS,
+                    model_url="/m.pkl",
+                    metrics={"task": "regression", "n_features": 2, "n_samples": 10},
+                ),
+                ModelArtifact(user_id=user_id, launch_id=launch.id, model_url="/m.pkl"),
+            ]
+        )
+    # The counter is where versioning continues (backfilled by migration 013)
+    session.add(DatasetVersionCounter(user_id=user_id, mode=ServiceMode.LIPS, last_version=size))
+
+
+@pytest.fixture
+def db():
+    """A user with a long history: 50 launches, files, runs, artifacts and datasets."""
+    connector = _SqliteConnector()
+    user_id = uuid.uuid4()
+    with connector._maker() as session:
+        session.add(
+            User(
+                id=user_id,
+                email="heavy@example.com",
+                password_hash="x",
+                available_launches=100,
+            )
+        )
+        session.flush()
+        _seed_history(session, user_id, 50)
+        session.commit()
+    connector.reset()
+    connector.user_id = user_id
+    return connector
+
+
+@pytest.mark.asyncio
+async def test_profile_fetch_is_one_query_regardless_of_history(db):
+    repo = ProfileRepository(db)
+
+    by_id = await repo.fetch_user_profile(db.user_id)
+    by_email = await repo.fetch_user_by_email("heavy@example.com")
+
+    assert by_id.available_launches == by_email.available_launches == 100
+    assert len(db.statements) == 2
+    assert all("user_launch" not in s and "user_file" not in s for s in db.statements)
+
+
+@pytest.mark.asyncio
+async def test_job_reads_and_submission_round_trips(db):
+    repo = JobRepository(db)
+
+    jobs = await repo.fetch_jobs_by_user_id(db.user_id, [ProcessingStatus.SUCCESS])
+    assert len(jobs) == 50
+    assert len(db.statements) == 1
+
+    db.reset()
+    new_job = JobLogic(
+        user_id=db.user_id,
+        mode=ServiceMode.LIPS,
+        type=ServiceType.TRAIN,
+        status=ProcessingStatus.NEW,
+    )
+    quota, created = await repo.create_jobs_with_quota(db.user_id, [new_job], lambda q: True)
+    assert (quota.available_launches, len(created)) == (100, 1)
+    # quota + locks, dataset size lookup, insert
+    assert len(db.statements) == 3
+
+    # One job per dataset version: the file check rides on the quota query
+    with db._maker() as session:
+        files = session.query(UserFile).order_by(UserFile.file_name).limit(3).all()
+        rows = {f.id: int(f.file_name[1:-4]) for f in files}
+        for dataset in session.query(Dataset).all():
+            dataset.row_count = int(dataset.name[1:-4]) * 10
+            dataset.column_count = 3
+        session.commit()
+    db.reset()
+    jobs = [new_job.model_copy(update={"id": uuid.uuid4(), "file_id": f}) for f in rows]
+    quota, created = await repo.create_jobs_with_quota(db.user_id, jobs, lambda q: True)
+    assert quota.files_found == 3
+    assert {job.file_id: (job.estimated_cost, job.feature_count) for job in created} == {
+        file_id: (row * 10, 2) for file_id, row in rows.items()
+    }
+    # quota + locks + file check, dataset size lookup, insert
+    assert len(db.statements) == 3
+
+    # A file of another mode is not an input of the job
+    with db._maker() as session:
+        session.query(UserFile).filter(UserFile.id == jobs[0].file_id).update({"mode": "OTHER"})
+        session.commit()
+    quota, created = await repo.create_jobs_with_quota(db.user_id, jobs, lambda q: True)
+    assert quota.files_found == 2
+
+
+@pytest.mark.asyncio
+async def test_ml_listings_are_one_query_each_and_never_lazy_load(db):
+    repo = TrainingRepository(db)
+
+    runs = await repo.list_training_runs(db.user_id, limit=20)
+    artifacts = await repo.list_artifacts(db.user_id, limit=20)
+    datasets = await repo.list_datasets(db.user_id, limit=20)
+    trends = await repo.list_training_metrics_trends(db.user_id, limit=20)
+
+    assert [len(runs), len(artifacts), len(datasets), len(trends)] == [20, 20, 20, 20]
+    assert len(db.statements) == 4
+    with pytest.raises(InvalidRequestError):
+        runs[0].dataset
+    with pytest.raises(InvalidRequestError):
+        artifacts[0].launch
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_history_once_at_one_query_per_page(db):
+    training = TrainingRepository(db)
+    files = FileRepository(db)
+
+    async def walk(fetch):
+        seen, cursor = [], None
+        for _ in range(10):
+            db.reset()
+            page = await fetch(cursor)
+            assert len(db.statements) == 1
+            seen.extend(row.id for row in page)
+            if (token := next_cursor(page, 7)) is None:
+                return seen
+            cursor = Cursor.decode(token)
+        raise AssertionError("pagination does not advance")
+
+    datasets = await walk(lambda c: training.list_datasets(db.user_id, limit=7, cursor=c))
+    # All user_file rows share created_at: id breaks the tie
+    user_files = await walk(
+        lambda c: files.fetch_user_files_metadata(db.user_id, ServiceMode.LIPS, limit=7, cursor=c)
+    )
+
+    assert len(datasets) == len(set(datasets)) == 50
+    assert len(user_files) == len(set(user_files)) == 50
+
+
+@pytest.mark.asyncio
+async def test_dataset_version_costs_the_same_with_or_without_history(db):
+    repo = TrainingRepository(db)
+    newcomer = uuid.uuid4()
+    with db._maker() as session:
+        session.add(
+            User(id=newcomer, email="new@example.com", password_hash="x", available_launches=3)
+        )
+        session.commit()
+
+    async def create(user_id):
+        db.reset()
+        dataset = await repo.create_dataset_with_version(
+            user_id, None, ServiceMode.LIPS, "d.csv", "/storage/d.csv"
+        )
+        # Counter upsert and the insert; never a max() over the history
+        assert len(db.statements) == 2
+        assert not any("max(" in s.lower() for s in db.statements)
+        return dataset.version
+
+    assert [await create(newcomer), await create(newcomer)] == [1, 2]
+    assert await create(db.user_id) == 51
+
+
+@pytest.mark.asyncio
+async def test_poll_of_a_queued_job_is_one_round_trip():
+    # LATERAL joins are PostgreSQL only: the statements are recorded, not run on SQLite
+    job = JobLogic(
+        user_id=uuid.uuid4(),
+        mode=ServiceMode.LIPS,
+        type=ServiceType.TRAIN,
+        status=ProcessingStatus.NEW,
+        estimated_cost=1000,
+        created_at=datetime(2025, 1, 1, 12, 0),
+    )
+    row = {
+        **job.model_dump(),
+        "available_launches": 5,
+        "run_model_url": None,
+        "run_metrics": None,
+        "artifact_model_url": None,
+        "artifact_metrics": None,
+        "jobs_ahead": 4,
+        "cost_ahead": 4000,
+        "running_jobs": 0,
+        "running_cost": 0,
+        "active_workers": 1,
+    }
+
+    class _Recorder:
+        statements: list = []
+
+        async def execute(self, stmt, params=None):
+            self.statements.append(stmt)
+            return self
+
+        def mappings(self):
+            return self
+
+        def one_or_none(self):
+            return row
+
+        async def flush(self):
+            pass
+
+        async def commit(self):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            pass
+
+    class _Connector:
+        def get_session_context(self, read_only=False):
+            return _Recorder()
+
+    class _History:
+        calls = 0
+
+        async def list_runtime_samples(self, limit=200):
+            self.calls += 1
+            return [{"n_samples": 1000, "n_features": 1, "duration_sec": 10, "trainer": "t"}]
+
+    conf = JobConf(processing_batch_size=1, processing_interval_sec=0)
+    repo, history = JobRepository(_Connector()), _History()
+    service = JobService(conf, repo, None, eta=JobEtaEstimator(conf, repo, history))
+
+    for _ in range(3):
+        response = await service.fetch_job_result(job.user_id, job.id)
+        assert (response.queue_position, response.eta_sec) == (5, 50)
+    # The runtime history is read once per process, never per poll
+    assert (len(_Recorder.statements), history.calls) == (3, 1)
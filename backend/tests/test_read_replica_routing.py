@@ -0,0 +1,230 @@
+import asyncio
+import contextvars
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from service.infrastructure.database.postgresql import PgConnector
+from service.infrastructure.database.routing import (
+    WROTE_KEY,
+    ReadYourWrites,
+    bind_user,
+    session_wrote,
+)
+from service.repositories.decorators.session_processor import connection
+from service.settings import Postgresql
+
+
+class _Session:
+    def __init__(self, target: str):
+        self.target = target
+        self.info: dict = {}
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+class _Connector:
+    def __init__(self):
+        self.read_routing = ReadYourWrites(window_sec=60)
+
+    @asynccontextmanager
+    async def get_session_context(self, read_only: bool = False):
+        yield _Session("replica" if read_only else "primary")
+
+
+class _Repo:
+    def __init__(self, connector):
+        self.connector = connector
+
+    @connection(read_only=True)
+    async def read(self, session=None) -> str:
+        return session.target
+
+    @connection()
+    async def write(self, session=None) -> str:
+        session.info[WROTE_KEY] = True
+        return session.target
+
+    @connection()
+    async def fresh_read(self, session=None) -> str:
+        return session.target
+
+
+async def _request(user_id, *calls):
+    """Run calls as one request of ``user_id`` (own context, like a FastAPI request task)."""
+
+    async def _run():
+        if user_id is not None:
+            bind_user(user_id)
+        return [await call() for call in calls]
+
+    return await asyncio.create_task(_run())
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_until_the_user_writes():
+    repo = _Repo(_Connector())
+    alice, bob = uuid.uuid4(), uuid.uuid4()
+
+    assert await _request(alice, repo.read, repo.fresh_read) == ["replica", "primary"]
+    # Own write: the rest of the request and the next requests read the primary
+    assert await _request(alice, repo.read, repo.write, repo.read) == [
+        "replica",
+        "primary",
+        "primary",
+    ]
+    assert await _request(alice, repo.read) == ["primary"]
+    assert await _request(bob, repo.read) == ["replica"]
+    # Background work is not bound to a user and always reads the primary
+    assert await _request(None, repo.read) == ["primary"]
+
+
+def test_pin_expires_after_the_window():
+    routing = ReadYourWrites(window_sec=0.01)
+    user_id = uuid.uuid4()
+
+    def request(write: bool = False) -> bool:
+        bind_user(user_id)
+        if write:
+            routing.note_write()
+        return routing.reads_need_primary()
+
+    assert contextvars.copy_context().run(request, True) is True
+    assert contextvars.copy_context().run(request) is True
+    time.sleep(0.02)
+    assert contextvars.copy_context().run(request) is False
+
+
+def test_connector_round_robins_fresh_replicas_and_falls_back_to_primary():
+    saved = PgConnector._engine, PgConnector._session_maker, PgConnector._replicas
+    PgConnector._engine = PgConnector._session_maker = PgConnector._replicas = None
+    try:
+        config = Postgresql(host="primary", replica_hosts=["r1", "r2:6432"], replica_max_lag_sec=5)
+        connector = PgConnector(config)
+        r1, r2 = connector.replicas
+
+        def read_host():
+            return connector.get_session_context(read_only=True).bind.url.host
+
+        # Lag unknown until the first check: primary only
+        assert read_host() == "primary"
+        r1.lag_sec, r2.lag_sec = 0.0, 1.0
+        assert {read_host(), read_host()} == {"r1", "r2"}
+        assert r2.engine.url.port == 6432
+        r2.lag_sec = 30.0
+        assert {read_host(), read_host()} == {"r1"}
+        r1.lag_sec = None
+        assert read_host() == "primary"
+        assert connector.get_session_context().bind.url.host == "primary"
+    finally:
+        PgConnector._engine, PgConnector._session_maker, PgConnector._replicas = saved
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class _Item(_Base):
+    __tablename__ = "item"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+def test_sessions_record_whether_they_wrote():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        session.execute(select(_Item))
+        assert session_wrote(session) is False
+
+        session.add(_Item(id=1, name="a"))
+        session.flush()
+        assert session_wrote(session) is True
+        assert session_wrote(session) is False
+
+        session.execute(update(_Item).values(name="b"))
+        assert session_wrote(session) is True
+
+
+def test_dataset_list_reads_the_replica_and_holds_no_session_while_presigning(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from service import container
+    from service.models.auth_models import AuthProfile
+    from service.models.db.db_models import Dataset, UserFile
+    from service.models.key_value import ServiceMode, UserTypes
+    from service.presentation.dependencies.auth_checker import check_auth
+    from service.presentation.routers.ml_api import ml_api
+    from service.repositories.file_repository import FileRepository
+    from service.repositories.training_repository import TrainingRepository
+
+    user_id, dataset_id = uuid.uuid4(), uuid.uuid4()
+    rows = {
+        Dataset: Dataset(
+            id=dataset_id,
+            user_id=user_id,
+            mode=ServiceMode.LIPS,
+            name="d.csv",
+            file_url="/d.csv",
+            version=1,
+            created_at=datetime.now(timezone.utc),
+        ),
+        UserFile: UserFile(id=dataset_id, user_id=user_id, file_name="key.csv"),
+    }
+    opened, open_sessions = [], []
+
+    class _ResultSession(_Session):
+        async def execute(self, stmt):
+            row = rows[stmt.column_descriptions[0]["entity"]]
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: [row]))
+
+    class _RecordingConnector(_Connector):
+        @asynccontextmanager
+        async def get_session_context(self, read_only: bool = False):
+            opened.append("replica" if read_only else "primary")
+            open_sessions.append(1)
+            try:
+                yield _ResultSession(opened[-1])
+            finally:
+                open_sessions.pop()
+
+    class _Saver:
+        async def get_presigned_url_by_key(self, *, file_key, expiry_sec=3600):
+            assert not open_sessions
+            return f"https://minio/{file_key}"
+
+    async def _auth() -> AuthProfile:
+        bind_user(user_id)
+        return AuthProfile(user_id=user_id, fingerprint=None, type=UserTypes.REGISTERED)
+
+    connector = _RecordingConnector()
+    # A request unit of work on the route would check out the primary
+    monkeypatch.setitem(container._CONTAINER, container.PgConnectorName, connector)
+    app = FastAPI()
+    app.dependency_overrides[check_auth] = _auth
+    app.dependency_overrides[ml_api.get_training_repo] = lambda: TrainingRepository(connector)
+    app.dependency_overrides[ml_api.get_file_repo] = lambda: FileRepository(connector)
+    app.dependency_overrides[ml_api.get_file_saver] = _Saver
+    app.include_router(ml_api.ml_router)
+
+    response = TestClient(app).get("/api/ml/v1/datasets")
+
+    assert response.status_code == 200, response.text
+    assert response.json()[0]["download_url"] == "https://minio/key.csv"
+    assert opened == ["replica", "replica"]
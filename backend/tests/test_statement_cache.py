@@ -0,0 +1,44 @@
+from sqlalchemy.dialects import postgresql
+
+from service.infrastructure.database.postgresql import PgConnector
+from service.repositories import job_repository, profile_repository
+from service.settings import Postgresql
+
+
+def _engine_for(config: Postgresql):
+    saved = PgConnector._engine, PgConnector._session_maker, PgConnector._replicas
+    PgConnector._engine = PgConnector._session_maker = PgConnector._replicas = None
+    try:
+        connector = PgConnector(config)
+        return connector._engine, connector._connect_args()
+    finally:
+        PgConnector._engine, PgConnector._session_maker, PgConnector._replicas = saved
+
+
+def test_engine_caches_follow_settings():
+    engine, connect_args = _engine_for(
+        Postgresql(sql_compile_cache_size=64, prepared_statement_cache_size=32)
+    )
+
+    assert engine.sync_engine._compiled_cache.capacity == 64
+    assert connect_args == {"prepared_statement_cache_size": 32, "statement_cache_size": 32}
+
+
+def test_pgbouncer_mode_disables_named_prepared_statements():
+    _, connect_args = _engine_for(Postgresql(pgbouncer_mode=True))
+
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+def test_hot_statements_bind_parameters_instead_of_values():
+    dialect = postgresql.asyncpg.dialect()
+    compiled = profile_repository._USER_BY_ID.compile(dialect=dialect)
+    assert set(compiled.params) == {"user_id"}
+
+    view = job_repository._JOB_RESULT_VIEW.compile(dialect=dialect)
+    # Besides constants (LIMIT 1, statuses) only the request values are parameters
+    request_params = {name for name, value in view.params.items() if value is None}
+    assert request_params == {"job_id", "user_id", "default_cost"}
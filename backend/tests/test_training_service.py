@@ -1,3 +1,4 @@
+import os
 import types
 import uuid
 
@@ -16,12 +17,16 @@ class _FakeFile:
 
 
 class _FakeFileRepo:
-    def __init__(self, files):
+    def __init__(self, files, by_id=None):
         self._files = files
+        self._by_id = by_id or {}
 
-    async def fetch_user_files_metadata(self, user_id, mode):
+    async def fetch_user_files_metadata(self, user_id, mode, limit=100, cursor=None):
         return self._files
 
+    async def fetch_user_file_by_id(self, user_id, file_id):
+        return self._by_id.get(file_id)
+
 
 class _FakeTrainingRepo:
     def __init__(self):
@@ -133,3 +138,66 @@ async def test_training_service_no_files(tmp_path):
 
     with pytest.raises(ValueError):
         await svc.run_for_job(job)
+
+
+@pytest.mark.asyncio
+async def test_training_service_uses_the_file_of_the_job(tmp_path):
+    (tmp_path / "v1.csv").write_text("x1,x2,target\n1,2,0\n2,1,1\n3,4,1\n4,3,0\n")
+    (tmp_path / "v2.csv").write_text("x1,target\n1,0\n2,1\n3,1\n4,0\n5,1\n6,0\n")
+    v1 = _FakeFile("v1.csv", "/storage/v1.csv", created_at=0)
+    latest = _FakeFile("v2.csv", "/storage/v2.csv", created_at=1)
+    file_id = uuid.uuid4()
+    file_repo = _FakeFileRepo([latest], by_id={file_id: v1})
+    svc = TrainingService(
+        training_repo=_FakeTrainingRepo(), file_repo=file_repo, storage_root=str(tmp_path)
+    )
+    job = JobLogic(
+        user_id=uuid.uuid4(),
+        mode=ServiceMode.LIPS,
+        type=ServiceType.TRAIN,
+        status=ProcessingStatus.NEW,
+        file_id=file_id,
+    )
+
+    metrics = await svc.run_for_job(job)
+    assert (metrics["n_samples"], metrics["n_features"]) == (4, 2)
+
+    with pytest.raises(ValueError):
+        await svc.run_for_job(job.model_copy(update={"file_id": uuid.uuid4()}))
+    # The file was deleted while the job was queued: file_id is cleared, the job fails
+    with pytest.raises(ValueError):
+        await svc.run_for_job(job.model_copy(update={"file_id": None, "file_pinned": True}))
+
+
+@pytest.mark.asyncio
+async def test_training_service_downloads_minio_input(tmp_path):
+    downloads = []
+
+    class _Storage:
+        async def download_file(self, file_key, path):
+            downloads.append((file_key, path))
+            with open(path, "w") as f:
+                f.write("x1,x2,target\n1,2,0\n2,1,1\n3,4,1\n4,3,0\n")
+            return 1
+
+    s3_file = _FakeFile("uploads/lips/a.csv", "s3://mlops-files/uploads/lips/a.csv", created_at=0)
+    svc = TrainingService(
+        training_repo=_FakeTrainingRepo(),
+        file_repo=_FakeFileRepo([s3_file]),
+        storage_root=str(tmp_path),
+        storage=_Storage(),
+    )
+    job = JobLogic(
+        user_id=uuid.uuid4(),
+        mode=ServiceMode.LIPS,
+        type=ServiceType.TRAIN,
+        status=ProcessingStatus.NEW,
+    )
+
+    metrics = await svc.run_for_job(job)
+
+    assert (metrics["n_samples"], metrics["n_features"]) == (4, 2)
+    [(file_key, path)] = downloads
+    assert file_key == "uploads/lips/a.csv"
+    # The downloaded copy is removed once the model is trained
+    assert not os.path.exists(os.path.dirname(path))
@@ -18,7 +18,9 @@ class _FakeFileRepo:
     def __init__(self, files):
         self._files = files
 
-    async def fetch_user_files_metadata(self, user_id, mode):  # pragma: no cover - simple
+    async def fetch_user_files_metadata(  # pragma: no cover - simple
+        self, user_id, mode, limit=100, cursor=None
+    ):
         return self._files
 
 
@@ -0,0 +1,117 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from service import container as di
+from service.presentation.dependencies.unit_of_work import request_unit_of_work
+from service.repositories.decorators.session_processor import connection
+from service.repositories.unit_of_work import unit_of_work
+
+
+class _Session:
+    def __init__(self):
+        self.calls: list[str] = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+class _Connector:
+    def __init__(self):
+        self.sessions: list[_Session] = []
+
+    @asynccontextmanager
+    async def get_session_context(self):
+        session = _Session()
+        self.sessions.append(session)
+        yield session
+
+
+class _Repo:
+    def __init__(self, connector):
+        self.connector = connector
+
+    @connection()
+    async def touch(self, name: str, session=None) -> int:
+        session.calls.append(name)
+        return id(session)
+
+
+@pytest.mark.asyncio
+async def test_repository_calls_share_one_session_and_commit_once():
+    connector = _Connector()
+    repo = _Repo(connector)
+
+    async with unit_of_work(connector):
+        first = await repo.touch("a")
+        async with unit_of_work(connector):
+            second = await repo.touch("b")
+
+    assert first == second
+    assert len(connector.sessions) == 1
+    assert connector.sessions[0].calls == ["a", "b"]
+    assert connector.sessions[0].commits == 1
+
+    # Outside of a unit of work every call keeps its own session
+    await repo.touch("c")
+    await repo.touch("d")
+    assert [s.commits for s in connector.sessions] == [1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_failure_rolls_back_and_spawned_tasks_do_not_join():
+    connector = _Connector()
+    repo = _Repo(connector)
+
+    with pytest.raises(RuntimeError):
+        async with unit_of_work(connector):
+            await repo.touch("a")
+            # May outlive the request, so it gets a session of its own
+            await asyncio.create_task(repo.touch("spawned"))
+            raise RuntimeError("boom")
+
+    request_session, task_session = connector.sessions
+    assert (request_session.calls, request_session.commits) == (["a"], 0)
+    assert request_session.rollbacks == 1
+    assert (task_session.calls, task_session.commits) == (["spawned"], 1)
+
+
+def test_request_dependency_wraps_the_endpoint():
+    connector = _Connector()
+    repo = _Repo(connector)
+    app = FastAPI()
+
+    @app.post("/ok", dependencies=[Depends(request_unit_of_work)])
+    async def ok():
+        await repo.touch("a")
+        await repo.touch("b")
+        return {}
+
+    @app.post("/fail", dependencies=[Depends(request_unit_of_work)])
+    async def fail():
+        await repo.touch("c")
+        raise HTTPException(403, "no launches")
+
+    original_get = di.get
+    di.get = lambda name: connector
+    try:
+        client = TestClient(app)
+        assert client.post("/ok").status_code == 200
+        assert client.post("/fail").status_code == 403
+    finally:
+        di.get = original_get
+
+    ok_session, fail_session = connector.sessions
+    assert (ok_session.calls, ok_session.commits) == (["a", "b"], 1)
+    assert (fail_session.commits, fail_session.rollbacks) == (0, 1)
@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import io
+import tracemalloc
+import uuid
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from service.infrastructure.storage.local_file_storage import LocalFileStorage
+from service.models.key_value import ServiceMode
+from service.services.file_saver_service import FileSaverService
+from service.services.upload_pipeline import CsvValidator, UploadStream, UploadTooLargeError
+from service.settings import MinioConfig
+
+
+class _FakeFileRepo:
+    async def add_file_metadata(self, metadata):
+        metadata.id = uuid.uuid4()
+        return metadata
+
+
+def _upload(content: bytes, size: int | None = None) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename="data.csv", size=size)
+
+
+async def _drain(stream: UploadStream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+@pytest.mark.asyncio
+async def test_csv_is_validated_across_chunk_boundaries():
+    content = 'name,comment,score\nаня,"two\nlines, quoted",1\nборис,,nan\n\nвера,"a ""b""",3'
+    raw = content.encode()
+    validator = CsvValidator(min_rows=3, max_empty_ratio=0.5)
+    # 3-byte chunks split records, quoted newlines and multi-byte characters
+    stream = UploadStream(_upload(raw), max_bytes=1024, validators=[validator], chunk_size=3)
+
+    assert await _drain(stream) == raw
+    assert validator.header == ["name", "comment", "score"]
+    assert (validator.rows, validator.empty_cells) == (3, 2)
+    assert stream.sha256 == hashlib.sha256(raw).hexdigest() and stream.size == len(raw)
+
+
+@pytest.mark.asyncio
+async def test_size_limit_is_enforced_while_reading():
+    # Unknown size (chunked request): the limit trips on the chunk that crosses it
+    stream = UploadStream(_upload(b"a,b\n" * 100), max_bytes=100, chunk_size=64)
+
+    with pytest.raises(UploadTooLargeError):
+        await _drain(stream)
+    assert stream.size == 128
+
+
+@pytest.mark.asyncio
+async def test_local_stream_is_renamed_into_place_only_on_success(tmp_path):
+    saver = FileSaverService(_FakeFileRepo(), "uploads", LocalFileStorage(tmp_path))
+    good = UploadStream(_upload(b"a,b\n1,2\n3,4\n"), max_bytes=1024, validators=[CsvValidator()])
+
+    response = await saver.save_stream(uuid.uuid4(), ServiceMode.LIPS, "data.csv", good)
+
+    assert (tmp_path / response.file_key).read_bytes() == b"a,b\n1,2\n3,4\n"
+
+    bad = UploadStream(_upload(b"a,b\n1,2\n"), max_bytes=1024, validators=[CsvValidator()])
+    with pytest.raises(HTTPException, match="Недостаточно строк"):
+        await saver.save_stream(uuid.uuid4(), ServiceMode.LIPS, "data.csv", bad)
+
+    # Neither the rejected file nor temp files are left behind
+    files = [p for p in tmp_path.rglob("*") if p.is_file()]
+    assert files == [tmp_path / response.file_key]
+
+
+@pytest.mark.asyncio
+async def test_streaming_upload_memory_does_not_grow_with_file_size(tmp_path):
+    source = tmp_path / "big.csv"
+    with source.open("wb") as f:
+        f.write(b"x1,x2,target\n")
+        for _ in range(32):
+            f.write((b"1" * 48 + b"," + b"2" * 48 + b",0\n") * 10_000)  # 32MB
+    saver = FileSaverService(_FakeFileRepo(), "uploads", LocalFileStorage(tmp_path / "storage"))
+
+    with source.open("rb") as f:
+        upload = UploadFile(file=f, filename="big.csv")
+        validator = CsvValidator()
+        stream = UploadStream(upload, max_bytes=1 << 30, validators=[validator])
+        tracemalloc.start()
+        try:
+            await saver.save_stream(uuid.uuid4(), ServiceMode.LIPS, "big.csv", stream)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert validator.rows == 320_000
+    assert stream.size == source.stat().st_size
+    # A few chunks in flight, not the file
+    assert peak < 8 * 1024 * 1024
+
+
+@pytest.fixture
+def minio_storage():
+    with patch("minio.Minio") as mock_minio_class:
+        mock_client = MagicMock()
+        mock_client.bucket_exists.return_value = True
+        mock_minio_class.return_value = mock_client
+
+        from service.infrastructure.storage.minio_file_storage import MinioFileStorage
+
+        storage = MinioFileStorage(MinioConfig(bucket="test-bucket", part_size=8, io_threads=1))
+        yield storage
+
+
+@pytest.mark.asyncio
+async def test_minio_writer_streams_parts_to_put_object(minio_storage):
+    received = []
+
+    def put_object(*, bucket_name, object_name, data, length, part_size, num_parallel_uploads):
+        assert (length, part_size) == (-1, 8)
+        while part := data.read(part_size):
+            received.append(part)
+        return Mock(etag="etag")
+
+    minio_storage._client.put_object.side_effect = put_object
+    writer = minio_storage.open_writer(file_key="uploads/a.csv")
+    for chunk in (b"a,b\n", b"1,2\n3,4\n", b"5,6\n"):
+        await writer.write(chunk)
+
+    assert await writer.commit() == "s3://test-bucket/uploads/a.csv"
+    assert b"".join(received) == b"a,b\n1,2\n3,4\n5,6\n"
+
+
+@pytest.mark.asyncio
+async def test_minio_writer_abort_fails_the_upload(minio_storage):
+    def put_object(*, bucket_name, object_name, data, length, part_size, num_parallel_uploads):
+        while data.read(part_size):
+            pass
+        raise AssertionError("aborted upload must not complete")
+
+    minio_storage._client.put_object.side_effect = put_object
+    writer = minio_storage.open_writer(file_key="uploads/a.csv")
+    await writer.write(b"a,b\n")
+
+    await writer.abort()
+
+    assert minio_storage._client.put_object.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_minio_writer_leaves_the_io_threads_to_other_calls(minio_storage):
+    def put_object(*, bucket_name, object_name, data, length, part_size, num_parallel_uploads):
+        while data.read(part_size):
+            pass
+        return Mock(etag="etag")
+
+    minio_storage._client.put_object.side_effect = put_object
+    writer = minio_storage.open_writer(file_key="uploads/a.csv")
+    await writer.write(b"a,b\n")
+
+    # The upload waits for the client; the only io thread still serves short calls
+    assert await asyncio.wait_for(minio_storage.file_exists("uploads/b.csv"), 1) is True
+    await writer.commit()
+
+
+@pytest.mark.asyncio
+async def test_local_writer_creates_the_file_on_first_write(tmp_path):
+    storage = LocalFileStorage(tmp_path)
+
+    writer = storage.open_writer(file_key="uploads/lips/a.csv")
+    assert not (tmp_path / "uploads").exists()
+    await writer.write(b"a,b\n")
+    await writer.abort()
+    assert list((tmp_path / "uploads" / "lips").iterdir()) == []
+
+    writer = storage.open_writer(file_key="uploads/lips/a.csv")
+    await writer.write(b"a,b\n")
+    assert await writer.commit() == str((tmp_path / "uploads/lips/a.csv").resolve())
+    assert (tmp_path / "uploads/lips/a.csv").read_bytes() == b"a,b\n"
@@ -0,0 +1,163 @@
+"""Benchmark: dataset versions under parallel uploads, counter upsert vs. max() + insert.
+
+Runs against the configured (migrated) Postgres. For every history size a throwaway user
+gets that many datasets, then ``--uploads`` datasets are created by ``--parallel``
+concurrent callers, each in its own transaction like concurrent API requests:
+
+- ``counter``: ``TrainingRepository.create_dataset_with_version`` (counter row upsert);
+- ``max-scan``: the previous ``SELECT max(version)`` + insert, for comparison. The unique
+  index rejects the duplicate versions it hands out; those show up as collisions.
+
+Reported: latency per upload and whether the issued versions are distinct and gapless.
+The user and its datasets are deleted afterwards.
+
+    cd backend && alembic upgrade head
+    python -m tools.bench_dataset_versioning --history 0 10000 100000 --parallel 16
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from service.infrastructure.database.postgresql import PgConnector
+from service.models.db.db_models import Dataset, DatasetVersionCounter, User
+from service.models.key_value import ServiceMode
+from service.repositories.training_repository import TrainingRepository
+from service.settings import config
+
+MODE = ServiceMode.LIPS
+
+
+async def _seed(connector: PgConnector, history: int) -> uuid.UUID:
+    user_id = uuid.uuid4()
+    async with connector.get_session_context() as session:
+        await session.execute(
+            insert(User).values(
+                id=user_id,
+                email=f"bench-{user_id}@example.com",
+                password_hash="x",
+                available_launches=0,
+            )
+        )
+        for start in range(0, history, 10_000):
+            rows = [
+                dict(user_id=user_id, mode=MODE, name=f"{i}.csv", file_url="/b", version=i + 1)
+                for i in range(start, min(start + 10_000, history))
+            ]
+            await session.execute(insert(Dataset), rows)
+        if history:
+            await session.execute(
+                insert(DatasetVersionCounter).values(
+                    user_id=user_id, mode=MODE, last_version=history
+                )
+            )
+        await session.commit()
+    return user_id
+
+
+async def _max_scan_upload(connector: PgConnector, user_id: uuid.UUID) -> int:
+    async with connector.get_session_context() as session:
+        current = (
+            await session.execute(
+                select(func.max(Dataset.version)).where(
+                    Dataset.user_id == user_id, Dataset.mode == MODE
+                )
+            )
+        ).scalar()
+        version = (current or 0) + 1
+        await session.execute(
+            insert(Dataset).values(
+                user_id=user_id, mode=MODE, name="b.csv", file_url="/b", version=version
+            )
+        )
+        await session.commit()
+        return version
+
+
+async def _run(strategy: str, connector: PgConnector, history: int, uploads: int, parallel: int):
+    repo = TrainingRepository(connector)
+    user_id = await _seed(connector, history)
+    latencies: list[float] = []
+    versions: list[int] = []
+    collisions = 0
+    queue = iter(range(uploads))
+
+    async def worker() -> None:
+        nonlocal collisions
+        for _ in queue:
+            started = time.perf_counter()
+            try:
+                if strategy == "counter":
+                    dataset = await repo.create_dataset_with_version(
+                        user_id, None, MODE, "b.csv", "/b"
+                    )
+                    versions.append(dataset.version)
+                else:
+                    versions.append(await _max_scan_upload(connector, user_id))
+            except IntegrityError:
+                collisions += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(parallel)))
+        elapsed = time.perf_counter() - started
+    finally:
+        async with connector.get_session_context() as session:
+            await session.execute(delete(User).where(User.id == user_id))
+            await session.commit()
+
+    gapless = sorted(versions) == list(range(history + 1, history + len(versions) + 1))
+    latencies.sort()
+    return {
+        "strategy": strategy,
+        "history": history,
+        "uploads/s": uploads / elapsed,
+        "p50 ms": statistics.median(latencies),
+        "p95 ms": latencies[int(len(latencies) * 0.95) - 1],
+        "collisions": collisions,
+        "distinct": len(set(versions)) == len(versions) and gapless,
+    }
+
+
+async def run(histories: list[int], uploads: int, parallel: int, strategies: list[str]):
+    connector = PgConnector(config.pg)
+    results = []
+    try:
+        for history in histories:
+            for strategy in strategies:
+                results.append(await _run(strategy, connector, history, uploads, parallel))
+    finally:
+        await connector.close()
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--history", type=int, nargs="+", default=[0, 10_000, 100_000])
+    parser.add_argument("--uploads", type=int, default=500, help="datasets created per run")
+    parser.add_argument("--parallel", type=int, default=16, help="concurrent uploaders")
+    parser.add_argument(
+        "--strategy", nargs="+", choices=["counter", "max-scan"], default=["counter", "max-scan"]
+    )
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.history, args.uploads, args.parallel, args.strategy))
+    columns = ["strategy", "history", "uploads/s", "p50 ms", "p95 ms", "collisions", "distinct"]
+    print("".join(f"{c:>12}" for c in columns))
+    for row in results:
+        cells = [
+            f"{row[c]:>12.1f}" if isinstance(row[c], float) else f"{row[c]!s:>12}" for c in columns
+        ]
+        print("".join(cells))
+    return 0 if all(r["distinct"] for r in results if r["strategy"] == "counter") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
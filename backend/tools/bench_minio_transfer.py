@@ -0,0 +1,107 @@
+"""Benchmark: MinIO upload/download throughput by part concurrency.
+
+Every object size is uploaded with ``MinioFileStorage.upload_file`` and downloaded with
+``get_file`` (into memory) and ``download_file`` (into a file) once per concurrency.
+Concurrency 1 moves one part at a time over one connection, like the previous single
+``put_object`` / ``get_object().read()``. Objects are deleted afterwards.
+
+    docker run --rm -p 9000:9000 -e MINIO_ROOT_USER=minioadmin \\
+        -e MINIO_ROOT_PASSWORD=minioadmin minio/minio server /data
+    cd backend && python -m tools.bench_minio_transfer --endpoint localhost:9000 \\
+        --sizes 64 512 --concurrency 1 4 8
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from service.infrastructure.storage.minio_file_storage import MinioFileStorage
+from service.settings import config
+
+MB = 1024 * 1024
+
+
+async def _timed(coro) -> tuple[float, object]:
+    started = time.perf_counter()
+    result = await coro
+    return time.perf_counter() - started, result
+
+
+async def _run(storage: MinioFileStorage, size_mb: int, concurrency: int, workdir: str):
+    storage._transfer_concurrency = concurrency
+    data = os.urandom(size_mb * MB)
+    digest = hashlib.sha256(data).digest()
+    key = f"bench/{uuid.uuid4()}.bin"
+    path = os.path.join(workdir, "download.bin")
+    try:
+        upload_sec, _ = await _timed(storage.upload_file(file_key=key, file_data=data))
+        del data
+        get_sec, body = await _timed(storage.get_file(key))
+        ok = hashlib.sha256(body).digest() == digest
+        del body
+        file_sec, _ = await _timed(storage.download_file(key, path))
+        with open(path, "rb") as f:
+            ok = ok and hashlib.file_digest(f, "sha256").digest() == digest
+    finally:
+        await storage.delete_file(file_key=key)
+        if os.path.exists(path):
+            os.unlink(path)
+    return {
+        "size MB": size_mb,
+        "parallel": concurrency,
+        "put MB/s": size_mb / upload_sec,
+        "get MB/s": size_mb / get_sec,
+        "file MB/s": size_mb / file_sec,
+        "intact": ok,
+    }
+
+
+async def run(minio_config, sizes: list[int], concurrencies: list[int]):
+    storage = MinioFileStorage(minio_config)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for size_mb in sizes:
+                for concurrency in concurrencies:
+                    results.append(await _run(storage, size_mb, concurrency, workdir))
+    finally:
+        storage.close()
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 512], help="object MB")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--part-size-mb", type=int, default=config.minio.part_size // MB)
+    parser.add_argument("--endpoint", default=config.minio.endpoint)
+    parser.add_argument("--bucket", default=config.minio.bucket)
+    args = parser.parse_args(argv)
+
+    minio_config = config.minio.model_copy(
+        update={
+            "endpoint": args.endpoint,
+            "bucket": args.bucket,
+            "part_size": args.part_size_mb * MB,
+            "io_threads": max(args.concurrency),
+            "transfer_concurrency": max(args.concurrency),
+        }
+    )
+    results = asyncio.run(run(minio_config, args.sizes, args.concurrency))
+    columns = ["size MB", "parallel", "put MB/s", "get MB/s", "file MB/s", "intact"]
+    print("".join(f"{c:>12}" for c in columns))
+    for row in results:
+        cells = [
+            f"{row[c]:>12.1f}" if isinstance(row[c], float) else f"{row[c]!s:>12}" for c in columns
+        ]
+        print("".join(cells))
+    return 0 if all(r["intact"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
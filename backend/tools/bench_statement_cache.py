@@ -0,0 +1,114 @@
+"""Microbenchmark: hot statements rebuilt per call vs. built once with bind parameters.
+
+Measures CPU time (``time.process_time``) per call on the Python side only, which is what
+statement caching saves: building the ``select()``, computing its cache key and, on a
+cache miss, compiling it. Lookups run end to end on in-memory SQLite so the database cost
+is tiny and constant; the job result view (LATERAL, Postgres only) is measured up to the
+cache key.
+
+    cd backend && python -m tools.bench_statement_cache --calls 20000
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from typing import Callable
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from service.models.db.db_models import Base, User, UserLaunch
+from service.models.key_value import ProcessingStatus, ServiceMode, ServiceType
+from service.repositories import job_repository, profile_repository
+
+
+def _engine():
+    engine = create_engine("sqlite://")
+
+    @event.listens_for(engine, "connect")
+    def _attach_schemas(dbapi_conn, _record):
+        dbapi_conn.execute("ATTACH DATABASE ':memory:' AS profile")
+        dbapi_conn.execute("ATTACH DATABASE ':memory:' AS session")
+
+    tables = [User.__table__, UserLaunch.__table__]
+    Base.metadata.create_all(engine, tables=tables)
+    return engine
+
+
+def _per_call(fn: Callable[[], object], calls: int) -> float:
+    """Microseconds of CPU per call, after a warm-up that fills the compiled cache."""
+    for _ in range(min(calls, 1000)):
+        fn()
+    started = time.process_time()
+    for _ in range(calls):
+        fn()
+    return (time.process_time() - started) / calls * 1e6
+
+
+def run(calls: int) -> list[tuple[str, float, float]]:
+    engine = _engine()
+    user_id, job_id = uuid.uuid4(), uuid.uuid4()
+    with Session(engine) as session:
+        user = User(id=user_id, email="bench@example.com", password_hash="x", available_launches=0)
+        session.add(user)
+        session.flush()
+        session.add(
+            UserLaunch(
+                id=job_id,
+                user_id=user_id,
+                mode=ServiceMode.LIPS,
+                type=ServiceType.TRAIN,
+                status=ProcessingStatus.NEW,
+                is_payment_taken=False,
+            )
+        )
+        session.commit()
+
+        def user_rebuilt():
+            stmt = select(User).where(User.id == user_id)
+            stmt = stmt.options(profile_repository._PROFILE_COLUMNS)
+            return session.execute(stmt).scalar_one()
+
+        def user_cached():
+            params = {"user_id": user_id}
+            return session.execute(profile_repository._USER_BY_ID, params).scalar_one()
+
+        def job_rebuilt():
+            stmt = select(UserLaunch).where(UserLaunch.id == job_id, UserLaunch.user_id == user_id)
+            return session.execute(stmt).scalar_one()
+
+        def job_cached():
+            params = {"job_id": job_id, "user_id": user_id}
+            return session.execute(job_repository._JOB_BY_ID, params).scalar_one()
+
+        cases = [
+            ("profile by id", user_rebuilt, user_cached),
+            ("job by id", job_rebuilt, job_cached),
+            (
+                "job result view (cache key)",
+                lambda: job_repository._job_result_view_stmt()._generate_cache_key(),
+                lambda: job_repository._JOB_RESULT_VIEW._generate_cache_key(),
+            ),
+        ]
+        results = []
+        for label, rebuilt, cached in cases:
+            session.expunge_all()
+            results.append((label, _per_call(rebuilt, calls), _per_call(cached, calls)))
+    engine.dispose()
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000, help="calls per case")
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<30}{'rebuilt, us':>14}{'cached, us':>14}{'speedup':>10}")
+    for label, rebuilt, cached in run(args.calls):
+        print(f"{label:<30}{rebuilt:>14.1f}{cached:>14.1f}{rebuilt / cached:>9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
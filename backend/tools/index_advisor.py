@@ -0,0 +1,322 @@
+"""Index advisor: EXPLAIN (ANALYZE, BUFFERS) of the repository queries on seeded data.
+
+Seeds a local, migrated Postgres with synthetic users and history, runs the hot repository
+calls exactly as the service does, and explains every statement they sent. Sequential scans,
+sorts and index scans that throw most of their rows away are reported with the sort key or
+filter, which is what a new index would have to cover. Everything runs in one transaction
+that is rolled back unless ``--keep`` is given.
+
+    cd backend && alembic upgrade head
+    python -m tools.index_advisor --users 200 --rows 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import uuid
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any, Awaitable, Callable, Iterator
+
+from sqlalchemy import event, insert, text
+
+from service.infrastructure.database.postgresql import PgConnector
+from service.models.db.db_models import (
+    Dataset,
+    ModelArtifact,
+    TrainingRun,
+    User,
+    UserFile,
+    UserLaunch,
+)
+from service.models.jobs_models import JobLogic
+from service.models.key_value import ProcessingStatus, ServiceMode, ServiceType
+from service.repositories.file_repository import FileRepository
+from service.repositories.job_repository import JobRepository
+from service.repositories.pagination import Cursor
+from service.repositories.profile_repository import ProfileRepository
+from service.repositories.training_repository import TrainingRepository
+from service.repositories.unit_of_work import unit_of_work
+from service.settings import config
+
+EXPLAIN = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+_SCAN_NODES = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+
+
+@dataclass(frozen=True, slots=True)
+class Finding:
+    query: str
+    node: str
+    relation: str | None
+    rows: int
+    detail: str
+
+    def __str__(self) -> str:
+        on = f" on {self.relation}" if self.relation else ""
+        return f"{self.node}{on}: {self.rows} rows, {self.detail}"
+
+
+@dataclass(slots=True)
+class QueryReport:
+    query: str
+    statement: str
+    execution_ms: float
+    shared_hit: int
+    shared_read: int
+    findings: list[Finding] = field(default_factory=list)
+
+
+def analyze_plan(query: str, plan: dict[str, Any], min_rows: int = 1000) -> list[Finding]:
+    """Flag plan nodes that would not survive a large table.
+
+    ``plan`` is one element of ``EXPLAIN (ANALYZE, FORMAT JSON)`` output. Only nodes that
+    touch at least ``min_rows`` rows are reported, small lookups are fine as they are.
+    """
+    findings: list[Finding] = []
+    for node in _walk(plan["Plan"]):
+        kind = node["Node Type"]
+        relation = node.get("Relation Name")
+        loops = node.get("Actual Loops", 1)
+        returned = node.get("Actual Rows", 0) * loops
+        removed = node.get("Rows Removed by Filter", 0) * loops
+        if kind == "Seq Scan" and returned + removed >= min_rows:
+            detail = f"filter {node['Filter']}" if "Filter" in node else "no filter"
+            findings.append(Finding(query, kind, relation, returned + removed, detail))
+        elif kind in {"Sort", "Incremental Sort"}:
+            child = node.get("Plans", [{}])[0]
+            sorted_rows = child.get("Actual Rows", returned) * child.get("Actual Loops", 1)
+            if sorted_rows >= min_rows:
+                detail = f"key {', '.join(node.get('Sort Key', []))}"
+                detail += f" ({node.get('Sort Method', 'unknown method')})"
+                findings.append(Finding(query, kind, None, sorted_rows, detail))
+        elif kind in _SCAN_NODES and removed >= max(min_rows, 10 * returned):
+            detail = f"{node.get('Index Name', '?')} keeps {returned}, filter {node['Filter']}"
+            findings.append(Finding(query, kind, relation, returned + removed, detail))
+    return findings
+
+
+def _walk(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+@dataclass(slots=True)
+class _Seed:
+    user_ids: list[uuid.UUID]
+    job_ids: list[uuid.UUID]
+
+
+async def _seed(session, users: int, rows: int) -> _Seed:
+    rnd = random.Random(42)
+    now = datetime.now(UTC)
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    await session.execute(
+        insert(User),
+        [
+            dict(
+                id=uid,
+                email=f"advisor-{uid}@example.com",
+                password_hash="x",
+                available_launches=100,
+            )
+            for uid in user_ids
+        ],
+    )
+
+    launches, files, datasets, runs, artifacts = [], [], [], [], []
+    finished = [ProcessingStatus.SUCCESS] * 8 + [ProcessingStatus.FAILURE]
+    for uid in user_ids:
+        for i in range(rows):
+            # A couple of jobs of every user are still queued or running
+            active = [ProcessingStatus.NEW, ProcessingStatus.PROCESSING]
+            status = rnd.choice(active if i < 2 else finished)
+            launch_id, dataset_id = uuid.uuid4(), uuid.uuid4()
+            owned = dict(user_id=uid, created_at=now - timedelta(days=rnd.uniform(0, 90)))
+            file = dict(mode=ServiceMode.LIPS, file_url=f"/storage/{uid}/{i}.csv")
+            metrics = dict(
+                task="regression",
+                n_samples=1000,
+                n_features=4,
+                duration_sec=rnd.uniform(1, 60),
+                trainer="sklearn",
+            )
+            launches.append(
+                dict(
+                    owned,
+                    id=launch_id,
+                    mode=ServiceMode.LIPS,
+                    type=ServiceType.TRAIN,
+                    status=status,
+                    is_payment_taken=status != ProcessingStatus.NEW,
+                    estimated_cost=rnd.randint(100, 100_000),
+                )
+            )
+            files.append(dict(owned, **file, id=uuid.uuid4(), file_name=f"{i}.csv"))
+            datasets.append(
+                dict(
+                    owned,
+                    **file,
+                    id=dataset_id,
+                    launch_id=launch_id,
+                    name=f"{i}.csv",
+                    version=i + 1,
+                    row_count=rnd.randint(100, 100_000),
+                )
+            )
+            runs.append(
+                dict(
+                    owned,
+                    id=uuid.uuid4(),
+                    launch_id=launch_id,
+                    dataset_id=dataset_id,
+                    status=status,
+                    model_url="/m.pkl",
+                    metrics=metrics,
+                )
+            )
+            artifacts.append(
+                dict(
+                    owned,
+                    id=uuid.uuid4(),
+                    launch_id=launch_id,
+                    model_url="/m.pkl",
+                    metrics=metrics,
+                )
+            )
+
+    for model, values in [
+        (UserLaunch, launches),
+        (UserFile, files),
+        (Dataset, datasets),
+        (TrainingRun, runs),
+        (ModelArtifact, artifacts),
+    ]:
+        await session.execute(insert(model), values)
+        await session.execute(text(f"ANALYZE {model.__table__.fullname}"))
+
+    return _Seed(user_ids, [row["id"] for row in launches])
+
+
+def _workloads(connector: PgConnector, seed: _Seed) -> list[tuple[str, Callable[[], Awaitable]]]:
+    jobs, training = JobRepository(connector), TrainingRepository(connector)
+    files, profiles = FileRepository(connector), ProfileRepository(connector)
+    user_id, job_id = seed.user_ids[0], seed.job_ids[0]
+    # Deep page: a cursor from the middle of the user's history
+    cursor = Cursor(created_at=datetime.now(UTC) - timedelta(days=45), id=uuid.uuid4())
+    new_job = JobLogic(
+        user_id=user_id,
+        mode=ServiceMode.LIPS,
+        type=ServiceType.TRAIN,
+        status=ProcessingStatus.NEW,
+    )
+    active = [ProcessingStatus.NEW, ProcessingStatus.PROCESSING]
+    return [
+        ("profile.fetch_user_profile", lambda: profiles.fetch_user_profile(user_id)),
+        ("jobs.fetch_jobs_by_user_id", lambda: jobs.fetch_jobs_by_user_id(user_id, active)),
+        ("jobs.fetch_job_result_view", lambda: jobs.fetch_job_result_view(job_id, user_id)),
+        ("jobs.fetch_queue_snapshot", lambda: jobs.fetch_queue_snapshot(job_id, None, 1000)),
+        (
+            "jobs.create_jobs_with_quota",
+            lambda: jobs.create_jobs_with_quota(user_id, [new_job], lambda quota: True),
+        ),
+        ("jobs.fetch_new_jobs", lambda: jobs.fetch_new_jobs(10, per_user_limit=2, scan_limit=100)),
+        ("ml.list_training_runs", lambda: training.list_training_runs(user_id, cursor=cursor)),
+        ("ml.list_artifacts", lambda: training.list_artifacts(user_id, cursor=cursor)),
+        ("ml.list_datasets", lambda: training.list_datasets(user_id, cursor=cursor)),
+        ("ml.list_metrics_trends", lambda: training.list_training_metrics_trends(user_id)),
+        ("ml.list_runtime_samples", lambda: training.list_runtime_samples()),
+        (
+            "files.fetch_user_files_metadata",
+            lambda: files.fetch_user_files_metadata(user_id, ServiceMode.LIPS, cursor=cursor),
+        ),
+        (
+            "ml.cleanup_expired_datasets",
+            lambda: training.cleanup_expired_datasets(
+                cutoff=datetime.now(UTC) - timedelta(days=80), limit=100
+            ),
+        ),
+    ]
+
+
+class _Rollback(Exception):
+    pass
+
+
+async def run(users: int, rows: int, min_rows: int, keep: bool) -> list[QueryReport]:
+    connector = PgConnector(config.pg)
+    captured: list[tuple[str, Any]] | None = None
+
+    @event.listens_for(connector.engine.sync_engine, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if captured is not None and not executemany:
+            captured.append((statement, parameters))
+
+    reports: list[QueryReport] = []
+    try:
+        async with unit_of_work(connector) as session:
+            seed = await _seed(session, users, rows)
+            conn = await session.connection()
+            for label, call in _workloads(connector, seed):
+                captured = []
+                await call()
+                statements, captured = captured, None
+                for statement, parameters in statements:
+                    if statement.lstrip().upper().startswith("INSERT"):
+                        continue
+                    result = await conn.exec_driver_sql(EXPLAIN + statement, parameters)
+                    raw = result.scalar_one()
+                    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+                    reports.append(
+                        QueryReport(
+                            query=label,
+                            statement=" ".join(statement.split()),
+                            execution_ms=plan.get("Execution Time", 0.0),
+                            shared_hit=plan["Plan"].get("Shared Hit Blocks", 0),
+                            shared_read=plan["Plan"].get("Shared Read Blocks", 0),
+                            findings=analyze_plan(label, plan, min_rows),
+                        )
+                    )
+            if not keep:
+                raise _Rollback()
+    except _Rollback:
+        pass
+    finally:
+        await connector.close()
+    return reports
+
+
+def _print_report(reports: list[QueryReport]) -> None:
+    for report in reports:
+        flag = "!!" if report.findings else "ok"
+        print(
+            f"[{flag}] {report.query}: {report.execution_ms:.2f} ms, "
+            f"buffers hit={report.shared_hit} read={report.shared_read}"
+        )
+        for finding in report.findings:
+            print(f"     - {finding}")
+            print(f"       {report.statement[:200]}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200, help="synthetic users to seed")
+    parser.add_argument("--rows", type=int, default=50, help="history rows per user and table")
+    parser.add_argument("--min-rows", type=int, default=1000, help="ignore smaller nodes")
+    parser.add_argument("--keep", action="store_true", help="commit the seeded data")
+    parser.add_argument(
+        "--fail-on-findings", action="store_true", help="exit with 1 if anything is flagged"
+    )
+    args = parser.parse_args(argv)
+
+    reports = asyncio.run(run(args.users, args.rows, args.min_rows, args.keep))
+    _print_report(reports)
+    flagged = sum(bool(report.findings) for report in reports)
+    print(f"\n{len(reports)} statements explained, {flagged} flagged")
+    return 1 if args.fail_on_findings and flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())